@@ -70,6 +70,16 @@ class FlightTicketsModel(BaseModel):
 class FlightLinkResponse(BaseModel):
     url: str
 
+class FlightLinksRequest(BaseModel):
+    trips: List[FlightTicketsModel] = Field(..., min_length=1, max_length=500)
+
+class FlightLinkResult(BaseModel):
+    url: Optional[str] = None
+    error: Optional[str] = None
+
+class FlightLinksResponse(BaseModel):
+    links: List[FlightLinkResult]
+
 # ------------------------- Trip plan schema ----------------------
 Transport = Literal["walk","bus","metro","tram","train","car","taxi","ferry","bike","rideshare","plane","other"]
 Priority  = Literal["essential","nice_to_have","optional"]
@@ -291,7 +301,7 @@ async def health():
     return {"status": "ok"}
 
 @app.post("/flight/link", response_model=FlightLinkResponse)
-async def flight_link(filters: FlightTicketsModel):
+def flight_link(filters: FlightTicketsModel):
     """
     Build and return a Skyscanner URL for client-side navigation.
     Your frontend can handle the redirect, e.g. window.location = url.
@@ -303,6 +313,18 @@ async def flight_link(filters: FlightTicketsModel):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not build flight link: {str(e)}")
 
+@app.post("/flight/links", response_model=FlightLinksResponse)
+def flight_links(req: FlightLinksRequest):
+    """
+    Build Skyscanner URLs for many trips at once, in request order.
+    A trip that can't be linked gets an error instead of a url. Geocoding
+    unknown cities may block, so this runs in the threadpool.
+    """
+    results = url_builder.build_urls(_to_tripfilters(t) for t in req.trips)
+    return FlightLinksResponse(
+        links=[FlightLinkResult(url=r.url, error=r.error) for r in results]
+    )
+
 @app.post("/ai/plan", response_model=PlanResponse)
 def ai_plan(req: PlanRequest):
     sid = req.session_id or str(uuid.uuid4())
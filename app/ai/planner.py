@@ -2,17 +2,13 @@
 
 import json
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from openai import OpenAI
 from pydantic import BaseModel, Field, field_validator
 
-from app.core.settings import settings
+from app.core.llm import get_openai_client, openai_slot
 from app.db.models import Trip
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
-
 # ------------------------- Structured Output Schemas -------------------------
 
 Transport = Literal[
@@ -148,21 +144,16 @@ def _build_planning_context(trip: Trip) -> Dict[str, Any]:
         context["budget_tier"] = "mid"
 
     # Add flight information if available
-    if trip.selected_flight_airline:
+    flight = trip.flight
+    if flight and flight.airline:
         flight_event = {
-            "title": f"Flight {trip.selected_flight_airline} {trip.selected_flight_number}",
+            "title": f"Flight {flight.airline} {flight.flight_number}",
             "start": (
-                trip.selected_flight_departure_time.isoformat()
-                if trip.selected_flight_departure_time
-                else ""
-            ),
-            "end": (
-                trip.selected_flight_arrival_time.isoformat()
-                if trip.selected_flight_arrival_time
-                else ""
+                flight.departure_time.isoformat() if flight.departure_time else ""
             ),
-            "location_name": f"{trip.selected_flight_departure_airport} to {trip.selected_flight_arrival_airport}",
-            "notes": f"Flight from {trip.selected_flight_departure_airport} to {trip.selected_flight_arrival_airport}",
+            "end": flight.arrival_time.isoformat() if flight.arrival_time else "",
+            "location_name": f"{flight.departure_airport} to {flight.arrival_airport}",
+            "notes": f"Flight from {flight.departure_airport} to {flight.arrival_airport}",
             "transport_reco": "plane",
             "priority": "essential",
         }
@@ -171,10 +162,11 @@ def _build_planning_context(trip: Trip) -> Dict[str, Any]:
         context["hard_events"] = []
 
     # Add hotel information if available
-    if trip.selected_hotel_name:
+    hotel = trip.hotel
+    if hotel and hotel.name:
         hotel_note = (
-            f"Hotel: {trip.selected_hotel_name} in {trip.selected_hotel_location}. "
-            f"Check-in: {trip.selected_hotel_check_in}, Check-out: {trip.selected_hotel_check_out}. "
+            f"Hotel: {hotel.name} in {hotel.location}. "
+            f"Check-in: {hotel.check_in}, Check-out: {hotel.check_out}. "
             f"Plan activities around this accommodation."
         )
         if context.get("notes"):
@@ -215,8 +207,8 @@ def _build_planning_context(trip: Trip) -> Dict[str, Any]:
     return context
 
 
-def _normalize_trip_plan(plan: TripPlan) -> TripPlan:
-    """Normalize transport and priority values in the plan."""
+def _normalize_trip_day(day: TripDay) -> TripDay:
+    """Normalize transport and priority values of one day's events."""
     ALLOWED_TRANSPORT = {
         "walk",
         "bus",
@@ -250,35 +242,55 @@ def _normalize_trip_plan(plan: TripPlan) -> TripPlan:
         "low": "optional",
     }
 
-    for day in plan.days:
-        for ev in day.events:
-            # Normalize transport
-            if ev.transport_reco:
-                vv = ev.transport_reco.strip().lower()
-                if vv not in ALLOWED_TRANSPORT:
-                    ev.transport_reco = TRANSPORT_SYNONYMS.get(vv, "other")  # type: ignore
-
-            # Normalize priority
-            if ev.priority:
-                vv = PRIORITY_SYNONYMS.get(
-                    ev.priority.strip().lower(), ev.priority.strip().lower()
-                )
-                if vv not in PRIORITY_CANON:
-                    ev.priority = "essential"  # type: ignore
-                else:
-                    ev.priority = vv  # type: ignore
-
-            # Clean tags
-            if ev.tags:
-                ev.tags = [str(t).strip().lower() for t in ev.tags if str(t).strip()]
+    for ev in day.events:
+        # Normalize transport
+        if ev.transport_reco:
+            vv = ev.transport_reco.strip().lower()
+            if vv not in ALLOWED_TRANSPORT:
+                ev.transport_reco = TRANSPORT_SYNONYMS.get(vv, "other")  # type: ignore
+
+        # Normalize priority
+        if ev.priority:
+            vv = PRIORITY_SYNONYMS.get(
+                ev.priority.strip().lower(), ev.priority.strip().lower()
+            )
+            if vv not in PRIORITY_CANON:
+                ev.priority = "essential"  # type: ignore
+            else:
+                ev.priority = vv  # type: ignore
 
+        # Clean tags
+        if ev.tags:
+            ev.tags = [str(t).strip().lower() for t in ev.tags if str(t).strip()]
+
+    return day
+
+
+def _normalize_trip_plan(plan: TripPlan) -> TripPlan:
+    """Normalize transport and priority values in the plan."""
+    for day in plan.days:
+        _normalize_trip_day(day)
     return plan
 
 
 # ------------------------- Main Planning Function -------------------------
 
+PLANNER_MODEL = "gpt-4o-2024-08-06"  # Structured outputs snapshot
+
+
+def _build_messages(trip: Trip) -> List[Dict[str, str]]:
+    """Build the chat messages for a planning request."""
+    context = _build_planning_context(trip)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"Produce TripPlan JSON for this request.\n{json.dumps(context, ensure_ascii=False, default=str)}",
+        },
+    ]
+
 
-def generate_trip_plan(trip: Trip) -> Dict[str, Any]:
+async def generate_trip_plan(trip: Trip) -> Dict[str, Any]:
     """
     Generate a structured trip plan using OpenAI Structured Outputs.
 
@@ -291,22 +303,15 @@ def generate_trip_plan(trip: Trip) -> Dict[str, Any]:
     Raises:
         Exception: If OpenAI API call fails or returns invalid data
     """
-    # Build planning context from trip
-    context = _build_planning_context(trip)
-
-    # Call OpenAI with Structured Outputs
-    completion = client.beta.chat.completions.parse(
-        model="gpt-4o-2024-08-06",  # Structured outputs snapshot
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": f"Produce TripPlan JSON for this request.\n{json.dumps(context, ensure_ascii=False, default=str)}",
-            },
-        ],
-        response_format=TripPlan,
-        max_tokens=6000,
-    )
+    # Call OpenAI with Structured Outputs (non-blocking for the event loop)
+    client = get_openai_client()
+    async with openai_slot():
+        completion = await client.beta.chat.completions.parse(
+            model=PLANNER_MODEL,
+            messages=_build_messages(trip),
+            response_format=TripPlan,
+            max_tokens=6000,
+        )
 
     # Check completion status
     if not completion.choices:
@@ -324,3 +329,110 @@ def generate_trip_plan(trip: Trip) -> Dict[str, Any]:
 
     # Convert to dict for storage
     return plan.model_dump()
+
+
+# ------------------------- Streaming Planning -------------------------
+
+
+class _DaysArrayScanner:
+    """
+    Incrementally find complete elements of the top-level "days" array.
+
+    Tracks JSON nesting and string state across chunks, so each day object is
+    returned as raw JSON text as soon as its closing brace arrives, long before
+    the whole TripPlan document is complete.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._in_days = False
+        self._item_start = -1
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk of the streamed JSON; return completed day objects."""
+        self._text += chunk
+        text = self._text
+        items: List[str] = []
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = json.loads(text[self._string_start : i + 1])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif ch in "{[":
+                if self._in_days and self._depth == 2 and ch == "{":
+                    self._item_start = i
+                if ch == "[" and self._depth == 1 and self._key == "days":
+                    self._in_days = True
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._in_days and self._depth == 2 and ch == "}":
+                    items.append(text[self._item_start : i + 1])
+                    self._item_start = -1
+                elif self._in_days and self._depth == 1:
+                    self._in_days = False
+
+        self._pos = len(text)
+        return items
+
+
+async def stream_trip_plan(trip: Trip) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Generate a trip plan with OpenAI streaming, yielding days as they parse.
+
+    Yields ``("day", TripDay)`` for every day validated from the partial
+    output, then a final ``("plan", dict)`` with the complete, normalized plan
+    (the same shape `generate_trip_plan` returns).
+
+    Raises:
+        Exception: If OpenAI API call fails or returns invalid data
+    """
+    scanner = _DaysArrayScanner()
+
+    client = get_openai_client()
+    async with openai_slot():
+        async with client.beta.chat.completions.stream(
+            model=PLANNER_MODEL,
+            messages=_build_messages(trip),
+            response_format=TripPlan,
+            max_tokens=6000,
+        ) as stream:
+            async for event in stream:
+                if event.type != "content.delta":
+                    continue
+                for raw_day in scanner.feed(event.delta):
+                    day = TripDay.model_validate_json(raw_day)
+                    yield "day", _normalize_trip_day(day)
+
+            completion = await stream.get_final_completion()
+
+    if not completion.choices:
+        raise Exception("OpenAI returned no choices")
+
+    parsed_message = completion.choices[0].message
+    if not getattr(parsed_message, "parsed", None):
+        raise Exception("OpenAI did not return a parsed TripPlan")
+
+    plan = _normalize_trip_plan(parsed_message.parsed)
+    yield "plan", plan.model_dump()
@@ -3,10 +3,12 @@
 from fastapi import APIRouter
 
 from app.auth import auth_router
+from app.core.metrics import collect_metrics
 from app.culture import culture_router
 from app.entertainment import entertainment_router
 from app.flights import flights_router
 from app.hotels import hotels_router
+from app.jobs import jobs_router
 from app.trips import trips_router
 
 # Create main API router
@@ -19,6 +21,7 @@ api_router.include_router(flights_router)
 api_router.include_router(hotels_router)
 api_router.include_router(culture_router)
 api_router.include_router(entertainment_router)
+api_router.include_router(jobs_router)
 
 
 # Health check endpoint
@@ -26,3 +29,10 @@ api_router.include_router(entertainment_router)
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "version": "1.0.0"}
+
+
+# Runtime metrics endpoint (connection pools, caches, ...)
+@api_router.get("/metrics")
+async def runtime_metrics():
+    """Snapshot of in-process runtime metrics."""
+    return collect_metrics()
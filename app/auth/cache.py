@@ -0,0 +1,262 @@
+"""In-process bearer-token -> user cache with cross-worker invalidation."""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+from app.db.database import async_session_factory
+from app.db.models import TokenRevocation, User
+
+logger = get_logger(__name__)
+
+
+def token_hash(token: str) -> str:
+    """Digest used in place of raw tokens outside this process."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def utc_timestamp(value: datetime) -> float:
+    # SQLite returns naive datetimes; session expiries are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class CachedUser(NamedTuple):
+    user: User
+    expires_at: float  # min(cache TTL, session expiry), unix timestamp
+
+
+class Revocation(NamedTuple):
+    key: str  # Session token hash or signed token id
+    expires_at: Optional[float]  # Signed tokens: keep denylisted until then
+
+
+class RevocationChannel:
+    """
+    Cross-worker invalidation through the ``token_revocations`` table.
+
+    A revoking worker inserts a row; every worker polls for rows newer than
+    its last poll from a background task, so request handling never waits on
+    it, and hands them to its subscribers. Session token rows are pruned after
+    ``retention_seconds`` (no cache can still hold them), signed token rows
+    once the token itself has expired.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        poll_seconds: Optional[float] = None,
+        retention_seconds: Optional[float] = None,
+    ):
+        self.session_factory = session_factory or async_session_factory
+        self.poll_seconds = poll_seconds or settings.auth_invalidation_poll_seconds
+        self.retention_seconds = (
+            retention_seconds
+            if retention_seconds is not None
+            else settings.auth_cache_ttl_seconds * 2
+        )
+        self.since = time.time()
+        self._subscribers: List[Callable[[List[Revocation]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, callback: Callable[[List[Revocation]], None]) -> None:
+        self._subscribers.append(callback)
+
+    async def publish(self, key: str, expires_at: Optional[float] = None) -> None:
+        async with self.session_factory() as session:
+            await session.merge(
+                TokenRevocation(token_hash=key, revoked_at=time.time(), expires_at=expires_at)
+            )
+            await session.commit()
+
+    async def poll(self) -> List[Revocation]:
+        now = time.time()
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(TokenRevocation.token_hash, TokenRevocation.expires_at).where(
+                    TokenRevocation.revoked_at >= self.since - 1.0
+                )
+            )
+            rows = [Revocation(*row) for row in result]
+            await session.execute(
+                delete(TokenRevocation).where(
+                    TokenRevocation.revoked_at < now - self.retention_seconds,
+                    or_(
+                        TokenRevocation.expires_at.is_(None),
+                        TokenRevocation.expires_at < now,
+                    ),
+                )
+            )
+            await session.commit()
+        self.since = now
+        return rows
+
+    async def active(self) -> List[Revocation]:
+        """Signed token revocations that are still in force."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(TokenRevocation.token_hash, TokenRevocation.expires_at).where(
+                    TokenRevocation.expires_at > time.time()
+                )
+            )
+            return [Revocation(*row) for row in result]
+
+    def _dispatch(self, rows: List[Revocation]) -> None:
+        for callback in self._subscribers:
+            callback(rows)
+
+    async def sync(self) -> None:
+        """Apply revocations published by other workers."""
+        rows = await self.poll()
+        if rows:
+            self._dispatch(rows)
+
+    async def start(self) -> None:
+        """Load revocations still in force, then poll in the background."""
+        if self._task is not None:
+            return
+        self.since = time.time()
+        try:
+            self._dispatch(await self.active())
+        except Exception as e:
+            logger.warning(f"Loading token revocations failed: {e}")
+        self._task = asyncio.create_task(self._poll(), name="token-revocations")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Token revocation poll failed: {e}")
+
+
+class TokenCache:
+    """
+    Bounded LRU of token hash -> detached ``User`` snapshot.
+
+    Entries live for ``ttl_seconds`` but never past the session expiry.
+    Logout invalidates locally right away and, through the revocation
+    channel, in other workers within one poll interval; the TTL bounds
+    staleness if the channel is disabled or lagging.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        channel: Optional[RevocationChannel] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.max_entries = max_entries or settings.auth_cache_max_entries
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else settings.auth_cache_ttl_seconds
+        )
+        self.channel = channel
+        self.enabled = settings.auth_cache_enabled if enabled is None else enabled
+        self._entries: "OrderedDict[str, CachedUser]" = OrderedDict()
+        if channel is not None:
+            channel.subscribe(self._on_revoked)
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        key = token_hash(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.user
+
+    def set(self, token: str, user: User, session_expires_at: datetime) -> None:
+        if not self.enabled:
+            return
+        key = token_hash(token)
+        expires_at = min(time.time() + self.ttl_seconds, utc_timestamp(session_expires_at))
+        self._entries[key] = CachedUser(self._snapshot(user), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _snapshot(user: User) -> User:
+        """Detached copy, so cached users never share a request's session."""
+        copy = User(id=user.id, username=user.username, created_at=user.created_at)
+        make_transient_to_detached(copy)
+        return copy
+
+    def _drop(self, hashes: List[str]) -> None:
+        for key in hashes:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def _on_revoked(self, rows: List[Revocation]) -> None:
+        self._drop([row.key for row in rows])
+
+    def discard(self, token: str) -> None:
+        """Forget ``token`` in this worker only."""
+        self._drop([token_hash(token)])
+
+    async def invalidate(self, token: str) -> None:
+        """Forget ``token`` here and tell the other workers."""
+        key = token_hash(token)
+        self._drop([key])
+        if self.channel is not None:
+            try:
+                await self.channel.publish(key)
+            except Exception as e:
+                logger.warning(f"Token revocation broadcast failed: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "cross_worker": self.channel is not None,
+        }
+
+
+# Global revocation channel (polled from the application lifespan) and cache
+revocations: Optional[RevocationChannel] = (
+    RevocationChannel() if settings.auth_invalidation_backend == "database" else None
+)
+token_cache = TokenCache(channel=revocations)
+register_metrics("auth_cache", token_cache.stats)
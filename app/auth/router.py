@@ -1,12 +1,13 @@
 """Authentication router."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_async_session
 from app.auth.schemas import UserRegisterRequest, UserLoginRequest, AuthResponse, UserResponse
 from app.auth.service import auth_service
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, security
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -51,11 +52,11 @@ async def login(
 @router.post("/logout")
 async def logout(
     session: AsyncSession = Depends(get_async_session),
-    current_user = Depends(get_current_user)
+    current_user = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Logout current user and invalidate session token."""
-    # We can't easily get the token here without modifying the dependency
-    # For now, return success (token will expire naturally)
+    await auth_service.logout_user(session, credentials.credentials)
     return {"message": "Logged out successfully"}
 
 
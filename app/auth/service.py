@@ -9,6 +9,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.settings import settings
 from app.db.models import User, UserSession
+from app.auth.cache import token_cache
+from app.auth.tokens import signed_tokens
 from app.auth.schemas import AuthResponse
 
 
@@ -42,9 +44,19 @@ class AuthService:
         if not user:
             return None
         
+        expires_at = datetime.utcnow() + timedelta(days=settings.access_token_expire_days)
+
+        if settings.auth_token_mode == "signed":
+            # Self-describing token, no session row to write or look up
+            return AuthResponse(
+                access_token=signed_tokens.issue(user.id, expires_at),
+                expires_at=expires_at,
+                user_id=user.id,
+                username=user.username
+            )
+
         # Create session token
         token = str(uuid.uuid4())
-        expires_at = datetime.utcnow() + timedelta(days=settings.access_token_expire_days)
         
         user_session = UserSession(
             user_id=user.id,
@@ -63,9 +75,19 @@ class AuthService:
         )
 
     async def get_user_by_token(self, session: AsyncSession, token: str) -> Optional[User]:
-        """Get user by session token."""
+        """Get user by session token (served from the token cache when possible)."""
+        if signed_tokens.is_signed(token):
+            # Only honoured when signed tokens are enabled (and so have a real key)
+            if settings.auth_token_mode != "signed":
+                return None
+            return await self._get_user_by_signed_token(session, token)
+
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
         stmt = (
-            select(User)
+            select(User, UserSession.expires_at)
             .join(UserSession)
             .where(
                 UserSession.token == token,
@@ -73,14 +95,48 @@ class AuthService:
             )
         )
         result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        row = result.first()
+        if row is None:
+            return None
+
+        user, expires_at = row
+        token_cache.set(token, user, expires_at)
+        return user
+
+    async def _get_user_by_signed_token(
+        self, session: AsyncSession, token: str
+    ) -> Optional[User]:
+        """Verify a signed token in CPU; only a cache miss loads the user by id."""
+        claims = signed_tokens.verify(token)
+        if claims is None:
+            return None
+
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        user = await session.get(User, claims.user_id)
+        if user is not None:
+            token_cache.set(token, user, datetime.utcfromtimestamp(claims.expires_at))
+        return user
 
     async def logout_user(self, session: AsyncSession, token: str) -> bool:
         """Logout user by invalidating session token."""
+        if signed_tokens.is_signed(token):
+            if settings.auth_token_mode != "signed":
+                return False
+            claims = signed_tokens.verify(token)
+            token_cache.discard(token)
+            if claims is None:
+                return False
+            await signed_tokens.denylist.revoke(claims.token_id, claims.expires_at)
+            return True
+
         stmt = select(UserSession).where(UserSession.token == token)
         result = await session.execute(stmt)
         user_session = result.scalar_one_or_none()
         
+        await token_cache.invalidate(token)
         if user_session:
             await session.delete(user_session)
             await session.commit()
@@ -0,0 +1,193 @@
+"""Stateless HMAC-signed session tokens with a revocation denylist."""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.auth.cache import Revocation, RevocationChannel, utc_timestamp, revocations
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.core.settings import DEFAULT_SECRET_KEY, settings
+
+logger = get_logger(__name__)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _derive(secret: str) -> bytes:
+    # Dedicated signing key, so SECRET_KEY can serve other purposes too
+    return hmac.new(secret.encode("utf-8"), b"session-token", hashlib.sha256).digest()
+
+
+class TokenClaims(NamedTuple):
+    user_id: str
+    expires_at: int  # Unix timestamp
+    key_id: str
+    token_id: str
+
+
+class TokenDenylist:
+    """
+    Ids of revoked signed tokens, each kept only until the token expires.
+
+    Ids are 12 random bytes, so the set stays small: it holds just the
+    logouts of the last ``ACCESS_TOKEN_EXPIRE_DAYS``, not every session.
+    Other workers learn about revocations through the revocation channel.
+    """
+
+    def __init__(self, channel: Optional[RevocationChannel] = None):
+        self.channel = channel
+        self._entries: Dict[str, float] = {}
+        if channel is not None:
+            channel.subscribe(self._on_revoked)
+
+    def __contains__(self, token_id: str) -> bool:
+        expires_at = self._entries.get(token_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._entries[token_id]
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        self._entries[token_id] = expires_at
+
+    def prune(self) -> None:
+        now = time.time()
+        for token_id in [t for t, expires_at in self._entries.items() if expires_at <= now]:
+            del self._entries[token_id]
+
+    def _on_revoked(self, rows: List[Revocation]) -> None:
+        for row in rows:
+            if row.expires_at is not None:
+                self.add(row.key, row.expires_at)
+        self.prune()
+
+    async def revoke(self, token_id: str, expires_at: float) -> None:
+        """Deny ``token_id`` here and tell the other workers."""
+        self.add(token_id, expires_at)
+        if self.channel is not None:
+            try:
+                await self.channel.publish(token_id, expires_at=expires_at)
+            except Exception as e:
+                logger.warning(f"Token revocation broadcast failed: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SignedTokens:
+    """
+    Issue and verify self-describing tokens: ``<payload>.<signature>``.
+
+    The payload is ``user_id:expires_at:key_id:token_id`` (base64url) and the
+    signature an HMAC-SHA256 under the key named by ``key_id``, so
+    verification is pure CPU. New tokens are signed with ``SECRET_KEY`` as
+    ``SECRET_KEY_ID``; keys listed in ``SECRET_KEYS_PREVIOUS`` still verify
+    the tokens they signed until those expire.
+    """
+
+    def __init__(
+        self,
+        secret_key: Optional[str] = None,
+        key_id: Optional[str] = None,
+        previous_keys: Optional[Dict[str, str]] = None,
+        denylist: Optional[TokenDenylist] = None,
+    ):
+        self.key_id = key_id or settings.secret_key_id
+        previous = (
+            previous_keys if previous_keys is not None else settings.secret_keys_previous
+        )
+        self._keys = {kid: _derive(secret) for kid, secret in previous.items()}
+        self._keys[self.key_id] = _derive(secret_key or settings.secret_key)
+        self.denylist = denylist if denylist is not None else TokenDenylist()
+
+        # Counters
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+
+    @staticmethod
+    def is_signed(token: str) -> bool:
+        # Session tokens are UUIDs, which never contain a dot
+        return "." in token
+
+    def _sign(self, key: bytes, payload: str) -> str:
+        return _b64encode(hmac.new(key, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, user_id: str, expires_at: datetime) -> str:
+        expires = int(utc_timestamp(expires_at))
+        payload = _b64encode(
+            f"{user_id}:{expires}:{self.key_id}:{_b64encode(secrets.token_bytes(12))}".encode()
+        )
+        self.issued += 1
+        return f"{payload}.{self._sign(self._keys[self.key_id], payload)}"
+
+    def verify(self, token: str) -> Optional[TokenClaims]:
+        """Claims of a valid, unexpired, unrevoked token, else ``None``."""
+        claims = self._verify(token)
+        if claims is None:
+            self.rejected += 1
+        else:
+            self.verified += 1
+        return claims
+
+    def _verify(self, token: str) -> Optional[TokenClaims]:
+        payload, _, signature = token.partition(".")
+        try:
+            user_id, expires, key_id, token_id = _b64decode(payload).decode().split(":")
+            claims = TokenClaims(user_id, int(expires), key_id, token_id)
+        except ValueError:
+            return None
+
+        key = self._keys.get(claims.key_id)
+        if key is None or not hmac.compare_digest(
+            signature.encode(), self._sign(key, payload).encode()
+        ):
+            return None
+        if claims.expires_at <= time.time() or claims.token_id in self.denylist:
+            return None
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.auth_token_mode,
+            "key_id": self.key_id,
+            "keys": len(self._keys),
+            "issued": self.issued,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "denylisted": len(self.denylist),
+        }
+
+
+def check_signing_key() -> None:
+    """
+    Refuse signed mode without a real ``SECRET_KEY``: anyone can sign tokens
+    with the public placeholder.
+    """
+    if settings.auth_token_mode != "signed":
+        return
+    if not settings.secret_key or settings.secret_key == DEFAULT_SECRET_KEY:
+        raise RuntimeError(
+            "AUTH_TOKEN_MODE=signed requires SECRET_KEY to be set to a private value"
+        )
+
+
+# Global signer; its denylist follows the shared revocation channel
+signed_tokens = SignedTokens(denylist=TokenDenylist(channel=revocations))
+register_metrics("auth_tokens", signed_tokens.stats)
@@ -0,0 +1,452 @@
+"""Pluggable TTL response cache with stale-while-revalidate semantics."""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import delete, select
+
+from app.core.logging import get_logger
+from app.db.database import async_session_factory
+from app.db.models import CacheRecord
+
+logger = get_logger(__name__)
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty values and secrets so equivalent queries produce equal keys."""
+    return {
+        k: v
+        for k, v in sorted(params.items())
+        if v is not None and v != "" and k != "api_key"
+    }
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Build a stable cache key from a namespace and normalized parameters."""
+    payload = json.dumps(
+        normalize_params(params), sort_keys=True, separators=(",", ":"), default=str
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    return f"{namespace}:{digest}"
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with its freshness deadlines (unix timestamps)."""
+
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class MemoryCacheBackend:
+    """In-process LRU store bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Local on-disk store backed by a SQLite file.
+
+    Survives restarts and is shared by workers on the same host. Values must
+    be JSON-serializable. Blocking sqlite3 calls run in a worker thread.
+    """
+
+    def __init__(self, path: str, namespace: str = "default", max_entries: int = 10000):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " fresh_until REAL NOT NULL,"
+            " stale_until REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fresh_until, stale_until FROM response_cache"
+                " WHERE namespace = ? AND key = ? AND stale_until > ?",
+                (self.namespace, key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache"
+                " (namespace, key, value, fresh_until, stale_until)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.namespace,
+                    key,
+                    json.dumps(entry.value, default=str),
+                    entry.fresh_until,
+                    entry.stale_until,
+                ),
+            )
+            # Evict expired rows, then the oldest rows beyond the size bound
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE namespace = ? AND stale_until <= ?",
+                (self.namespace, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM response_cache WHERE namespace = ?"
+                " ORDER BY fresh_until DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+            self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            self._conn.commit()
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE namespace = ?", (self.namespace,)
+            )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM response_cache WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return row[0]
+
+
+class DatabaseCacheBackend:
+    """
+    Persistent store in the application database (SQLite or Postgres).
+
+    Shared by every worker and host using the same database. Values must be
+    JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 10000,
+        session_factory: Optional[Any] = None,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.session_factory = session_factory or async_session_factory
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        async with self.session_factory() as session:
+            record = await session.get(CacheRecord, (self.namespace, key))
+        if record is None or record.stale_until <= time.time():
+            return None
+        return CacheEntry(record.value, record.fresh_until, record.stale_until)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        async with self.session_factory() as session:
+            await session.merge(
+                CacheRecord(
+                    namespace=self.namespace,
+                    key=key,
+                    value=entry.value,
+                    fresh_until=entry.fresh_until,
+                    stale_until=entry.stale_until,
+                )
+            )
+            # Evict expired rows, then the oldest rows beyond the size bound
+            await session.execute(
+                delete(CacheRecord).where(
+                    CacheRecord.namespace == self.namespace,
+                    CacheRecord.stale_until <= time.time(),
+                )
+            )
+            overflow = (
+                select(CacheRecord.key)
+                .where(CacheRecord.namespace == self.namespace)
+                .order_by(CacheRecord.fresh_until.desc())
+                .offset(self.max_entries)
+                .scalar_subquery()
+            )
+            await session.execute(
+                delete(CacheRecord).where(
+                    CacheRecord.namespace == self.namespace,
+                    CacheRecord.key.in_(overflow),
+                )
+            )
+            await session.commit()
+
+    async def delete(self, key: str) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(CacheRecord).where(
+                    CacheRecord.namespace == self.namespace, CacheRecord.key == key
+                )
+            )
+            await session.commit()
+
+    async def clear(self) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(CacheRecord).where(CacheRecord.namespace == self.namespace)
+            )
+            await session.commit()
+
+
+class TieredCacheBackend:
+    """
+    Small in-memory LRU (L1) in front of a shared persistent store (L2).
+
+    Reads check L1 first and promote L2 hits into it; writes go to both. A
+    failing L2 degrades to L1-only instead of failing the request.
+    """
+
+    def __init__(self, memory: MemoryCacheBackend, persistent: Any):
+        self.memory = memory
+        self.persistent = persistent
+
+        # Counters
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.persistent_errors = 0
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = await self.memory.get(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return entry
+        try:
+            entry = await self.persistent.get(key)
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Persistent cache read failed: {e}")
+            return None
+        if entry is not None:
+            self.persistent_hits += 1
+            await self.memory.set(key, entry)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await self.memory.set(key, entry)
+        try:
+            await self.persistent.set(key, entry)
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Persistent cache write failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        await self.memory.delete(key)
+        await self.persistent.delete(key)
+
+    async def clear(self) -> None:
+        await self.memory.clear()
+        await self.persistent.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "persistent_errors": self.persistent_errors,
+        }
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+
+class ResponseCache:
+    """
+    TTL cache in front of an expensive async fetch.
+
+    Fresh entries are returned directly. Entries past their TTL but inside the
+    stale window are returned immediately while a single background task
+    refreshes them (stale-while-revalidate). Anything older is a miss.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: Any,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+    ):
+        self.name = name
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for ``key`` or fetch, store and return it."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = await self.backend.get(key)
+        now = time.time()
+
+        if entry is not None and now < entry.fresh_until:
+            self.hits += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self.stale_hits += 1
+            self._schedule_refresh(key, fetch, ttl, cache_if)
+            return entry.value
+
+        self.misses += 1
+        value = await fetch()
+        await self._store(key, value, ttl, cache_if)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        await self.backend.delete(key)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    async def _store(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        cache_if: Optional[Callable[[Any], bool]],
+    ) -> None:
+        if ttl <= 0 or (cache_if is not None and not cache_if(value)):
+            return
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + self.stale_seconds)
+        try:
+            await self.backend.set(key, entry)
+        except Exception as e:  # a broken cache must never fail the request
+            logger.warning(f"Cache '{self.name}' store failed: {e}")
+
+    def _schedule_refresh(self, key, fetch, ttl, cache_if) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, fetch, ttl, cache_if))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key, fetch, ttl, cache_if) -> None:
+        try:
+            value = await fetch()
+            await self._store(key, value, ttl, cache_if)
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Cache '{self.name}' background refresh failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.stale_hits + self.misses
+        stats = {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+            ),
+            "background_refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+        }
+        if hasattr(self.backend, "stats"):
+            stats.update(self.backend.stats())
+        return stats
+
+
+def create_response_cache(
+    name: str,
+    backend: str,
+    ttl_seconds: float,
+    stale_seconds: float = 0.0,
+    max_entries: int = 1000,
+    path: Optional[str] = None,
+) -> ResponseCache:
+    """Build a ResponseCache with the configured backend ("memory" or "sqlite")."""
+    if backend == "sqlite":
+        store = SQLiteCacheBackend(
+            path or "./response_cache.sqlite", namespace=name, max_entries=max_entries
+        )
+    elif backend == "memory":
+        store = MemoryCacheBackend(max_entries=max_entries)
+    else:
+        raise ValueError(f"Unknown cache backend: {backend!r}")
+    return ResponseCache(name, store, ttl_seconds, stale_seconds)
@@ -0,0 +1,180 @@
+"""Shared, application-scoped HTTP client pool for outbound API calls."""
+
+import asyncio
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+
+logger = get_logger(__name__)
+
+
+def _http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientPool:
+    """
+    A single keep-alive ``httpx.AsyncClient`` shared by all external services.
+
+    Reusing one client keeps TCP+TLS connections to upstream hosts (SerpAPI)
+    warm across requests instead of paying a fresh handshake per call.
+    The pool is started and closed by the application lifespan, but starts
+    lazily on first use so scripts and tests can use services directly.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        max_connections_per_host: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.timeout = timeout if timeout is not None else settings.http_timeout_seconds
+        self.max_connections = (
+            max_connections
+            if max_connections is not None
+            else settings.http_max_connections
+        )
+        self.max_keepalive_connections = (
+            max_keepalive_connections
+            if max_keepalive_connections is not None
+            else settings.http_max_keepalive_connections
+        )
+        self.keepalive_expiry = (
+            keepalive_expiry
+            if keepalive_expiry is not None
+            else settings.http_keepalive_expiry_seconds
+        )
+        self.max_connections_per_host = (
+            max_connections_per_host
+            if max_connections_per_host is not None
+            else settings.http_max_connections_per_host
+        )
+        self.http2 = settings.http2_enabled if http2 is None else http2
+        self._active_http2 = False
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+        # Counters
+        self.requests = 0
+        self.errors = 0
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self) -> None:
+        """Create the underlying client and connection pool."""
+        if self.started:
+            return
+
+        http2 = self.http2
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        self._transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+        self._client = httpx.AsyncClient(
+            transport=self._transport, timeout=self.timeout
+        )
+        self._active_http2 = http2
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._transport = None
+
+    async def get(
+        self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> httpx.Response:
+        """Issue a GET through the shared pool, honouring the per-host cap."""
+        return await self.request("GET", url, params=params, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Issue a request through the shared pool, honouring the per-host cap."""
+        if not self.started:
+            await self.start()
+
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_limits[host] = limit
+
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions.setdefault("trace", self._trace)
+
+        async with limit:
+            self.requests += 1
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            try:
+                return await self._client.request(
+                    method, url, extensions=extensions, **kwargs
+                )
+            except httpx.HTTPError:
+                self.errors += 1
+                raise
+            finally:
+                self._in_flight[host] -= 1
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook used to count new connections and handshakes."""
+        if event_name == "connection.connect_tcp.complete":
+            self.tcp_connects += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage and handshake counters."""
+        connections = []
+        pool = getattr(self._transport, "_pool", None)
+        if pool is not None:
+            connections = list(pool.connections)
+
+        return {
+            "started": self.started,
+            "http2": self.started and self._active_http2,
+            "requests": self.requests,
+            "errors": self.errors,
+            "tcp_connects": self.tcp_connects,
+            "tls_handshakes": self.tls_handshakes,
+            "connections_open": len(connections),
+            "connections_in_use": sum(1 for c in connections if not c.is_idle()),
+            "connections_idle": sum(1 for c in connections if c.is_idle()),
+            "in_flight_by_host": {h: n for h, n in self._in_flight.items() if n},
+            "limits": {
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry,
+                "max_connections_per_host": self.max_connections_per_host,
+            },
+        }
+
+
+# Global pool shared by all SerpAPI services
+http_pool = HTTPClientPool()
+register_metrics("http_pool", http_pool.stats)
@@ -0,0 +1,80 @@
+"""Shared AsyncOpenAI client with bounded request concurrency."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from openai import AsyncOpenAI
+
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_in_use = 0
+_waiting = 0
+_completed = 0
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Return the process-wide AsyncOpenAI client, creating it on first use.
+
+    All OpenAI calls go through this non-blocking client so a long completion
+    never stalls the event loop for other requests on the worker.
+    """
+    global _client
+    if not settings.openai_api_key:
+        raise RuntimeError(
+            "OPENAI_API_KEY missing. Ensure .env is loaded in the app process."
+        )
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            timeout=settings.openai_timeout_seconds,
+        )
+    return _client
+
+
+@asynccontextmanager
+async def openai_slot() -> AsyncIterator[None]:
+    """Limit the number of concurrent OpenAI requests per worker."""
+    global _semaphore, _in_use, _waiting, _completed
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+
+    _waiting += 1
+    try:
+        await _semaphore.acquire()
+    finally:
+        _waiting -= 1
+
+    _in_use += 1
+    try:
+        yield
+    finally:
+        _in_use -= 1
+        _completed += 1
+        _semaphore.release()
+
+
+async def close_openai_client() -> None:
+    """Close the shared client (called from the application lifespan)."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _semaphore = None
+
+
+def openai_stats() -> Dict[str, Any]:
+    """Concurrency counters for OpenAI calls."""
+    return {
+        "max_concurrency": settings.openai_max_concurrency,
+        "in_use": _in_use,
+        "waiting": _waiting,
+        "completed": _completed,
+    }
+
+
+register_metrics("openai", openai_stats)
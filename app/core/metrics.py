@@ -0,0 +1,26 @@
+"""Lightweight registry for in-process runtime metrics."""
+
+from typing import Any, Callable, Dict
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """Register a callable that returns a snapshot of metrics for ``name``."""
+    _collectors[name] = collector
+
+
+def collect_metrics() -> Dict[str, Any]:
+    """Collect a snapshot from every registered metrics source."""
+    snapshot: Dict[str, Any] = {}
+    for name, collector in _collectors.items():
+        try:
+            snapshot[name] = collector()
+        except Exception as e:  # never let metrics break the endpoint
+            logger.warning(f"Metrics collector '{name}' failed: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
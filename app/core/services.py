@@ -0,0 +1,91 @@
+"""Application-scoped service registry (rankers, SerpAPI services)."""
+
+import inspect
+from typing import Any, Callable, Dict, Optional
+
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+
+logger = get_logger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Named singletons built once by the application lifespan and handed to
+    routes through FastAPI dependencies, instead of constructing rankers and
+    API clients on every request.
+
+    Domain modules register a factory at import time. ``start`` builds every
+    service; one that fails to build (e.g. a missing API key) is logged and
+    retried on the next ``get`` so the endpoint reports the error as before.
+    ``get`` also builds lazily, so scripts and tests work without a lifespan.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._closers: Dict[str, Optional[Callable[[Any], Any]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self.builds: Dict[str, int] = {}
+        self.lookups = 0
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """Register how to build (and optionally close) service ``name``."""
+        self._factories[name] = factory
+        self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        self.lookups += 1
+        instance = self._instances.get(name)
+        if instance is None:
+            instance = self._build(name)
+        return instance
+
+    def _build(self, name: str) -> Any:
+        if name not in self._factories:
+            raise KeyError(f"Service '{name}' is not registered")
+        instance = self._factories[name]()
+        self._instances[name] = instance
+        self.builds[name] = self.builds.get(name, 0) + 1
+        return instance
+
+    async def start(self) -> None:
+        for name in self._factories:
+            if name in self._instances:
+                continue
+            try:
+                self._build(name)
+            except Exception as e:
+                logger.warning(f"Service '{name}' unavailable at startup: {e}")
+        logger.info(f"Service registry started: {', '.join(sorted(self._instances))}")
+
+    async def close(self) -> None:
+        """Run close hooks and drop every instance (rebuilt on next use)."""
+        for name, instance in list(self._instances.items()):
+            close = self._closers.get(name)
+            if close is None:
+                continue
+            try:
+                result = close(instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Closing service '{name}' failed: {e}")
+        self._instances.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "registered": sorted(self._factories),
+            "active": sorted(self._instances),
+            "builds": dict(self.builds),
+            "lookups": self.lookups,
+        }
+
+
+# Global registry, started and closed by the application lifespan
+services = ServiceRegistry()
+register_metrics("services", services.stats)
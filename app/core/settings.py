@@ -1,11 +1,14 @@
 """Core configuration and settings for the travel planning application."""
 
 import os
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+# Public placeholder; signed tokens refuse to run with it
+DEFAULT_SECRET_KEY = "your-secret-key-change-this-in-production"
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
@@ -14,6 +17,27 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="sqlite+aiosqlite:///./travel_db.sqlite", env="DATABASE_URL"
     )
+    # SQLite connection profile: "performance" applies the pragmas below on
+    # every connect (WAL lets readers run alongside a writer); "default"
+    # leaves SQLite's rollback journal and settings untouched
+    sqlite_profile: Literal["default", "performance"] = Field(
+        default="performance", env="SQLITE_PROFILE"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL"] = Field(
+        default="NORMAL", env="SQLITE_SYNCHRONOUS"
+    )
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size_kib: int = Field(default=65536, env="SQLITE_CACHE_SIZE_KIB")
+    sqlite_mmap_size_bytes: int = Field(
+        default=268435456, env="SQLITE_MMAP_SIZE_BYTES"
+    )
+    # Connection pool for server databases (Postgres/asyncpg); SQLite keeps
+    # SQLAlchemy's defaults
+    db_pool_size: int = Field(default=10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(default=30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(default=1800, env="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, env="DB_POOL_PRE_PING")
 
     # API Keys
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -37,15 +61,136 @@ class Settings(BaseSettings):
     base_url: str = Field(default="http://localhost:8001", env="BASE_URL")
 
     # Security
-    secret_key: str = Field(
-        default="your-secret-key-change-this-in-production", env="SECRET_KEY"
-    )
+    secret_key: str = Field(default=DEFAULT_SECRET_KEY, env="SECRET_KEY")
     access_token_expire_days: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_DAYS")
+    # "signed" issues HMAC tokens verified without a session row;
+    # "session" keeps random tokens backed by user_sessions
+    auth_token_mode: Literal["session", "signed"] = Field(
+        default="session", env="AUTH_TOKEN_MODE"
+    )
+    # Signed tokens carry the id of the key that signed them; rotate by
+    # moving the old key into SECRET_KEYS_PREVIOUS, e.g. {"1": "old-secret"}
+    secret_key_id: str = Field(default="1", env="SECRET_KEY_ID")
+    secret_keys_previous: Dict[str, str] = Field(
+        default_factory=dict, env="SECRET_KEYS_PREVIOUS"
+    )
+
+    # Bearer token -> user cache (skips the session lookup on the hot path)
+    auth_cache_enabled: bool = Field(default=True, env="AUTH_CACHE_ENABLED")
+    auth_cache_ttl_seconds: int = Field(default=60, env="AUTH_CACHE_TTL_SECONDS")
+    auth_cache_max_entries: int = Field(default=10000, env="AUTH_CACHE_MAX_ENTRIES")
+    # Cross-worker logout propagation through the token_revocations table
+    auth_invalidation_backend: Literal["none", "database"] = Field(
+        default="database", env="AUTH_INVALIDATION_BACKEND"
+    )
+    auth_invalidation_poll_seconds: float = Field(
+        default=1.0, env="AUTH_INVALIDATION_POLL_SECONDS"
+    )
+
+    # GET /trips totals are cached per user and status (0 disables)
+    trips_count_cache_ttl_seconds: int = Field(
+        default=30, env="TRIPS_COUNT_CACHE_TTL_SECONDS"
+    )
+
+    # Confirmed trip ownership is cached per user and trip (0 disables)
+    trip_ownership_cache_ttl_seconds: int = Field(
+        default=60, env="TRIP_OWNERSHIP_CACHE_TTL_SECONDS"
+    )
+
+    # OpenAI
+    openai_max_concurrency: int = Field(default=8, env="OPENAI_MAX_CONCURRENCY")
+    openai_timeout_seconds: float = Field(default=120.0, env="OPENAI_TIMEOUT_SECONDS")
+
+    # Background jobs (trip finalization)
+    job_worker_concurrency: int = Field(default=2, env="JOB_WORKER_CONCURRENCY")
+    job_lease_seconds: int = Field(default=600, env="JOB_LEASE_SECONDS")
+    job_events_poll_seconds: float = Field(default=1.0, env="JOB_EVENTS_POLL_SECONDS")
 
     # External APIs
     google_flights_base_url: str = "https://www.googleapis.com/travel/v1"
     google_maps_base_url: str = "https://maps.googleapis.com/maps/api/v1"
 
+    # Outbound HTTP connection pool (shared by SerpAPI services)
+    http_timeout_seconds: float = Field(default=30.0, env="HTTP_TIMEOUT_SECONDS")
+    http_max_connections: int = Field(default=100, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(
+        default=20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    http_keepalive_expiry_seconds: float = Field(
+        default=60.0, env="HTTP_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    http_max_connections_per_host: int = Field(
+        default=20, env="HTTP_MAX_CONNECTIONS_PER_HOST"
+    )
+    http2_enabled: bool = Field(default=True, env="HTTP2_ENABLED")
+
+    # Flight search response cache
+    flight_cache_enabled: bool = Field(default=True, env="FLIGHT_CACHE_ENABLED")
+    flight_cache_backend: Literal["memory", "sqlite"] = Field(
+        default="memory", env="FLIGHT_CACHE_BACKEND"
+    )
+    flight_cache_path: str = Field(
+        default="./response_cache.sqlite", env="FLIGHT_CACHE_PATH"
+    )
+    flight_cache_max_entries: int = Field(default=1000, env="FLIGHT_CACHE_MAX_ENTRIES")
+    flight_cache_ttl_seconds: int = Field(default=900, env="FLIGHT_CACHE_TTL_SECONDS")
+    flight_cache_stale_seconds: int = Field(
+        default=3600, env="FLIGHT_CACHE_STALE_SECONDS"
+    )
+    # Per-route freshness overrides, e.g. {"DOH-LHR": 300}
+    flight_cache_route_ttls: Dict[str, int] = Field(
+        default_factory=dict, env="FLIGHT_CACHE_ROUTE_TTLS"
+    )
+
+    # Metro-area flight search: airports tried per city, concurrent SerpAPI calls
+    flight_metro_max_airports: int = Field(default=3, env="FLIGHT_METRO_MAX_AIRPORTS")
+    flight_metro_concurrency: int = Field(default=9, env="FLIGHT_METRO_CONCURRENCY")
+
+    # Stored flight searches older than this are deleted at startup (0 keeps all)
+    flight_search_retention_days: int = Field(
+        default=30, env="FLIGHT_SEARCH_RETENTION_DAYS"
+    )
+
+    # Flexible-date calendar: widest +/- day window, concurrent SerpAPI calls
+    flight_calendar_max_days: int = Field(default=3, env="FLIGHT_CALENDAR_MAX_DAYS")
+    flight_calendar_concurrency: int = Field(default=6, env="FLIGHT_CALENDAR_CONCURRENCY")
+
+    # LLM ranking result cache (memory LRU in front of the app database)
+    ranking_cache_enabled: bool = Field(default=True, env="RANKING_CACHE_ENABLED")
+    ranking_cache_backend: Literal["memory", "database"] = Field(
+        default="database", env="RANKING_CACHE_BACKEND"
+    )
+    ranking_cache_ttl_seconds: int = Field(
+        default=86400, env="RANKING_CACHE_TTL_SECONDS"
+    )
+    ranking_cache_memory_entries: int = Field(
+        default=500, env="RANKING_CACHE_MEMORY_ENTRIES"
+    )
+    ranking_cache_max_entries: int = Field(
+        default=10000, env="RANKING_CACHE_MAX_ENTRIES"
+    )
+
+    # Hybrid ranking: heuristic pre-filter, only the top-K go to the LLM
+    # (0 sends every candidate)
+    ranking_llm_top_k_flights: int = Field(default=15, env="RANKING_LLM_TOP_K_FLIGHTS")
+    ranking_llm_top_k_hotels: int = Field(default=10, env="RANKING_LLM_TOP_K_HOTELS")
+    ranking_llm_top_k_venues: int = Field(default=10, env="RANKING_LLM_TOP_K_VENUES")
+    # Max shortlisted candidates per diversity group (0 disables the constraint)
+    ranking_max_per_group: int = Field(default=4, env="RANKING_MAX_PER_GROUP")
+    # Candidate serialization in ranking prompts: tabular "compact" or the
+    # original one-block-per-candidate "verbose" layout
+    ranking_prompt_format: Literal["verbose", "compact"] = Field(
+        default="compact", env="RANKING_PROMPT_FORMAT"
+    )
+
+    # Offline airport index: city names resolving below this confidence are
+    # rejected instead of being searched under a guessed code
+    airport_match_min_confidence: float = Field(
+        default=0.75, env="AIRPORT_MATCH_MIN_CONFIDENCE"
+    )
+    # Coordinates of cities outside the index, geocoded once and kept here
+    city_cache_path: str = Field(default="./city_cache.json", env="CITY_CACHE_PATH")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
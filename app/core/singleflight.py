@@ -0,0 +1,87 @@
+"""Single-flight request coalescing for concurrent identical upstream calls."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.metrics import register_metrics
+
+
+class _Call:
+    """An in-flight upstream call and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one upstream request.
+
+    The first caller for a key starts the upstream call in its own task; every
+    caller arriving while it is in flight awaits the same task and receives the
+    same result (treat it as read-only). A caller being cancelled never cancels
+    the upstream call for the others; the call is only cancelled once every
+    caller waiting on it has gone away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+        # Counters
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key at a time and share its result."""
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda t, k=key, c=call: self._finished(k, c))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller left (cancelled): stop the upstream call and let
+                # the next caller start a fresh one
+                self.abandoned += 1
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _finished(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved when nobody was left to await it
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Coalescing counters."""
+        return {
+            "calls": self.calls,
+            "upstream_executions": self.executions,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._calls),
+        }
+
+
+def create_singleflight(name: str) -> SingleFlight:
+    """Create a SingleFlight group and expose its counters via /metrics."""
+    group = SingleFlight(name)
+    register_metrics(f"singleflight_{name}", group.stats)
+    return group
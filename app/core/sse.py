@@ -0,0 +1,9 @@
+"""Server-Sent Events formatting shared by the streaming endpoints."""
+
+import json
+from typing import Any
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
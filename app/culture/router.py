@@ -3,21 +3,17 @@
 from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
-from openai import OpenAI
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.settings import settings
+from app.core.llm import get_openai_client, openai_slot
 from app.db.database import get_async_session
 from app.db.models import CultureGuide as CultureGuideModel
 from app.db.models import Trip
 
 router = APIRouter(prefix="/culture", tags=["culture"])
 
-# Initialize OpenAI client with API key from settings
-client = OpenAI(api_key=settings.openai_api_key)
-
 # --- Structured Output (Pydantic) ---
 
 TipCategory = Literal[
@@ -110,10 +106,9 @@ async def culture_guide(
         HTTPException: 404 if trip not found, 502 if OpenAI API call fails
     """
     # Verify trip exists
-    result = await session.execute(select(Trip).where(Trip.id == req.trip_id))
-    trip = result.scalar_one_or_none()
+    result = await session.execute(select(Trip.id).where(Trip.id == req.trip_id))
 
-    if not trip:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Trip not found")
 
     # Check if culture guide already exists for this trip
@@ -132,23 +127,25 @@ async def culture_guide(
 
     try:
         # Use Structured Outputs (schema-enforced)
-        completion = client.beta.chat.completions.parse(
-            model="gpt-4o-2024-08-06",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": (
-                        f"Destination: {req.destination}\n"
-                        f"Language: {req.language}\n"
-                        "Generate 3–4 tips only. "
-                        "Make 'summary' 1–2 sentences. "
-                        "Keep 'title' short (3–6 words)."
-                    ),
-                },
-            ],
-            response_format=CultureGuide,
-        )
+        client = get_openai_client()
+        async with openai_slot():
+            completion = await client.beta.chat.completions.parse(
+                model="gpt-4o-2024-08-06",
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Destination: {req.destination}\n"
+                            f"Language: {req.language}\n"
+                            "Generate 3–4 tips only. "
+                            "Make 'summary' 1–2 sentences. "
+                            "Keep 'title' short (3–6 words)."
+                        ),
+                    },
+                ],
+                response_format=CultureGuide,
+            )
 
         parsed: CultureGuide = completion.choices[0].message.parsed  # schema-validated
 
@@ -13,6 +13,8 @@ __all__ = [
     "User",
     "UserSession",
     "Trip",
+    "TripFlight",
+    "TripHotel",
     "FlightSearch",
     "FlightOption",
     "FlightSelection",
@@ -24,6 +26,9 @@ __all__ = [
     "ItineraryItem",
     "TripPlan",
     "TripChecklist",
+    "PlanJob",
+    "CacheRecord",
+    "TokenRevocation",
     "CultureTip",
     "CultureGuide",
     "GoogleAccount",
@@ -34,4 +39,5 @@ __all__ = [
     "TransportType",
     "TripStatus",
     "ItineraryItemType",
+    "JobStatus",
 ]
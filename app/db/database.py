@@ -1,7 +1,12 @@
 """Database configuration and session management."""
 
-from typing import AsyncGenerator
+from pathlib import Path
+from typing import AsyncGenerator, List, Optional, Tuple
 
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -12,15 +17,64 @@ from sqlalchemy.orm import declarative_base
 
 from app.core.settings import settings
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
 # SQLAlchemy Base
 Base = declarative_base()
 
+
+def sqlite_pragmas(profile: str) -> List[str]:
+    """PRAGMA statements run on each new SQLite connection for ``profile``."""
+    if profile == "default":
+        return []
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size_bytes}",
+    ]
+
+
+def create_engine(url: str, sqlite_profile: Optional[str] = None) -> AsyncEngine:
+    """
+    Create the async engine for ``url`` with the configured tuning.
+
+    SQLite connections get the pragmas of ``sqlite_profile`` (default:
+    SQLITE_PROFILE) as they are opened; other databases get the DB_POOL_*
+    pool settings.
+    """
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            echo=settings.debug,
+            future=True,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+
+    sqlite_engine = create_async_engine(url, echo=settings.debug, future=True)
+    pragmas = sqlite_pragmas(sqlite_profile or settings.sqlite_profile)
+    if pragmas:
+
+        @event.listens_for(sqlite_engine.sync_engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return sqlite_engine
+
+
 # Async engine
-engine: AsyncEngine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-)
+engine: AsyncEngine = create_engine(settings.database_url)
 
 # Async session factory
 async_session_factory = async_sessionmaker(
@@ -39,10 +93,38 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def head_revision() -> str:
+    """Latest migration in ``migrations/versions``."""
+    return ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_current_head()
+
+
+def _schema_state(connection) -> Tuple[Optional[str], bool]:
+    current = MigrationContext.configure(connection).get_current_revision()
+    return current, inspect(connection).has_table("users")
+
+
 async def init_db() -> None:
-    """Initialize database tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Verify the database schema is at the latest migration.
+
+    The schema is managed by Alembic (``alembic upgrade head``); startup only
+    checks the version instead of running ``create_all`` on every boot.
+    """
+    async with engine.connect() as conn:
+        current, has_tables = await conn.run_sync(_schema_state)
+
+    head = head_revision()
+    if current == head:
+        return
+    if current is None and has_tables:
+        # The baseline migration adopts databases built by create_all
+        raise RuntimeError(
+            "Database predates schema migrations. Run `alembic upgrade head`."
+        )
+    raise RuntimeError(
+        f"Database schema is at revision {current or 'none'}, expected {head}. "
+        "Run `alembic upgrade head`."
+    )
 
 
 async def close_db() -> None:
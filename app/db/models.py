@@ -12,15 +12,19 @@ from sqlalchemy import (
     Column,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.sqlite import JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.types import VARCHAR, TypeDecorator
 
@@ -42,6 +46,13 @@ class TripStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class ItineraryItemType(str, enum.Enum):
     FLIGHT = "flight"
     HOTEL = "hotel"
@@ -93,15 +104,19 @@ class UserSession(Base):
     __tablename__ = "user_sessions"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     token = Column(String(255), unique=True, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
 
     # Relationships
     user = relationship("User", back_populates="sessions")
 
 
+# Literal (not a bound parameter) so the planner can match the partial index
+TRIP_NOT_CANCELLED = "status != 'CANCELLED'"
+
+
 class Trip(Base):
     __tablename__ = "trips"
 
@@ -124,47 +139,10 @@ class Trip(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Selected flight information
-    selected_flight_id = Column(String(255), nullable=True)
-    selected_flight_airline = Column(String(100), nullable=True)
-    selected_flight_number = Column(String(50), nullable=True)
-    selected_flight_departure_airport = Column(String(10), nullable=True)
-    selected_flight_arrival_airport = Column(String(10), nullable=True)
-    selected_flight_departure_time = Column(DateTime(timezone=True), nullable=True)
-    selected_flight_arrival_time = Column(DateTime(timezone=True), nullable=True)
-    selected_flight_price = Column(Numeric(10, 2), nullable=True)
-    selected_flight_currency = Column(String(10), nullable=True)
-    selected_flight_duration_min = Column(Integer, nullable=True)
-    selected_flight_stops = Column(Integer, nullable=True)
-    selected_flight_score = Column(Numeric(3, 2), nullable=True)
-    selected_flight_title = Column(String(255), nullable=True)
-    selected_flight_pros = Column(JSON, nullable=True)  # Array of pros keywords
-    selected_flight_cons = Column(JSON, nullable=True)  # Array of cons keywords
-
-    # Selected hotel information
-    selected_hotel_id = Column(String(255), nullable=True)
-    selected_hotel_name = Column(String(255), nullable=True)
-    selected_hotel_location = Column(String(500), nullable=True)
-    selected_hotel_price_per_night = Column(Numeric(10, 2), nullable=True)
-    selected_hotel_total_price = Column(Numeric(10, 2), nullable=True)
-    selected_hotel_currency = Column(String(10), nullable=True)
-    selected_hotel_check_in = Column(String(50), nullable=True)
-    selected_hotel_check_out = Column(String(50), nullable=True)
-    selected_hotel_rating = Column(Numeric(3, 2), nullable=True)
-    selected_hotel_reviews_count = Column(Integer, nullable=True)
-    selected_hotel_class = Column(Integer, nullable=True)
-    selected_hotel_amenities = Column(JSON, nullable=True)  # Array of amenities
-    selected_hotel_free_cancellation = Column(Boolean, nullable=True)
-    selected_hotel_score = Column(Numeric(3, 2), nullable=True)
-    selected_hotel_title = Column(String(255), nullable=True)
-    selected_hotel_pros = Column(JSON, nullable=True)  # Array of pros keywords
-    selected_hotel_cons = Column(JSON, nullable=True)  # Array of cons keywords
-    selected_hotel_thumbnail = Column(String(1000), nullable=True)
-    selected_hotel_link = Column(String(1000), nullable=True)  # Booking URL
-
-    # Selected entertainments information (array of entertainment venues)
-    selected_entertainments = Column(
-        JSON, nullable=True
+    # Selected entertainments information (array of entertainment venues).
+    # Deferred: only loaded when asked for (TripsService with_selections)
+    selected_entertainments = deferred(
+        Column(JSON, nullable=True), raiseload=True
     )  # Array of entertainment objects
 
     # Relationships
@@ -176,14 +154,100 @@ class Trip(Base):
         "EntertainmentSelection", back_populates="trip"
     )
     itinerary_items = relationship("ItineraryItem", back_populates="trip")
+    # Selected flight and hotel live in side tables so list and ownership
+    # queries don't carry them; load them explicitly (lazy loads raise)
+    flight = relationship(
+        "TripFlight", back_populates="trip", uselist=False, lazy="raise"
+    )
+    hotel = relationship(
+        "TripHotel", back_populates="trip", uselist=False, lazy="raise"
+    )
+
+    # Keyset pagination of GET /trips on (created_at, id), with and without
+    # a status filter. The unfiltered listing hides cancelled (deleted) trips,
+    # so its index skips them where the dialect supports partial indexes.
+    __table_args__ = (
+        Index("ix_trips_user_status_created", "user_id", "status", "created_at", "id"),
+        Index(
+            "ix_trips_user_active_created",
+            "user_id",
+            "created_at",
+            "id",
+            sqlite_where=text(TRIP_NOT_CANCELLED),
+            postgresql_where=text(TRIP_NOT_CANCELLED),
+        ),
+    )
+
+
+class TripFlight(Base):
+    """The flight selected for a trip (at most one per trip)."""
+
+    __tablename__ = "trip_flights"
+
+    trip_id = Column(String(36), ForeignKey("trips.id"), primary_key=True)
+    flight_id = Column(String(255), nullable=True)
+    airline = Column(String(100), nullable=True)
+    flight_number = Column(String(50), nullable=True)
+    departure_airport = Column(String(10), nullable=True)
+    arrival_airport = Column(String(10), nullable=True)
+    departure_time = Column(DateTime(timezone=True), nullable=True)
+    arrival_time = Column(DateTime(timezone=True), nullable=True)
+    price = Column(Numeric(10, 2), nullable=True)
+    currency = Column(String(10), nullable=True)
+    duration_min = Column(Integer, nullable=True)
+    stops = Column(Integer, nullable=True)
+    score = Column(Numeric(3, 2), nullable=True)
+    title = Column(String(255), nullable=True)
+    pros = Column(JSON, nullable=True)  # Array of pros keywords
+    cons = Column(JSON, nullable=True)  # Array of cons keywords
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Relationships
+    trip = relationship("Trip", back_populates="flight")
+
+
+class TripHotel(Base):
+    """The hotel selected for a trip (at most one per trip)."""
+
+    __tablename__ = "trip_hotels"
+
+    trip_id = Column(String(36), ForeignKey("trips.id"), primary_key=True)
+    hotel_id = Column(String(255), nullable=True)
+    name = Column(String(255), nullable=True)
+    location = Column(String(500), nullable=True)
+    price_per_night = Column(Numeric(10, 2), nullable=True)
+    total_price = Column(Numeric(10, 2), nullable=True)
+    currency = Column(String(10), nullable=True)
+    check_in = Column(String(50), nullable=True)
+    check_out = Column(String(50), nullable=True)
+    rating = Column(Numeric(3, 2), nullable=True)
+    reviews_count = Column(Integer, nullable=True)
+    hotel_class = Column(Integer, nullable=True)
+    amenities = Column(JSON, nullable=True)  # Array of amenities
+    free_cancellation = Column(Boolean, nullable=True)
+    score = Column(Numeric(3, 2), nullable=True)
+    title = Column(String(255), nullable=True)
+    pros = Column(JSON, nullable=True)  # Array of pros keywords
+    cons = Column(JSON, nullable=True)  # Array of cons keywords
+    thumbnail = Column(String(1000), nullable=True)
+    link = Column(String(1000), nullable=True)  # Booking URL
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Relationships
+    trip = relationship("Trip", back_populates="hotel")
 
 
 class FlightSearch(Base):
     __tablename__ = "flight_searches"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
-    query = Column(JSON, nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
+    query = Column(JSON, nullable=False)  # Resolved search parameters
+    google_flights_url = Column(String(2000), nullable=True)  # Shared by all options
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -193,13 +257,16 @@ class FlightSearch(Base):
 
 class FlightOption(Base):
     __tablename__ = "flight_options"
+    # Options are read back per search in result order
+    __table_args__ = (Index("ix_flight_options_search_position", "search_id", "position"),)
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     search_id = Column(String(36), ForeignKey("flight_searches.id"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # Rank in the results
     provider = Column(String(100), nullable=False)
     price_amount = Column(Numeric(10, 2), nullable=False)
     price_currency = Column(String(3), nullable=False)
-    payload = Column(JSON, nullable=False)
+    payload = Column(JSON, nullable=False)  # Itinerary minus price and search URL
     pros = Column(JSONArray, nullable=True)  # SQLite-compatible array
     cons = Column(JSONArray, nullable=True)  # SQLite-compatible array
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -213,8 +280,10 @@ class FlightSelection(Base):
     __tablename__ = "flight_selections"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
-    option_id = Column(String(36), ForeignKey("flight_options.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
+    option_id = Column(
+        String(36), ForeignKey("flight_options.id"), nullable=False, index=True
+    )
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -226,7 +295,7 @@ class HotelSearch(Base):
     __tablename__ = "hotel_searches"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     query = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -239,7 +308,9 @@ class HotelOption(Base):
     __tablename__ = "hotel_options"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    search_id = Column(String(36), ForeignKey("hotel_searches.id"), nullable=False)
+    search_id = Column(
+        String(36), ForeignKey("hotel_searches.id"), nullable=False, index=True
+    )
     provider = Column(String(100), nullable=False)
     price_amount = Column(Numeric(10, 2), nullable=False)
     price_currency = Column(String(3), nullable=False)
@@ -257,8 +328,10 @@ class HotelSelection(Base):
     __tablename__ = "hotel_selections"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
-    option_id = Column(String(36), ForeignKey("hotel_options.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
+    option_id = Column(
+        String(36), ForeignKey("hotel_options.id"), nullable=False, index=True
+    )
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -270,7 +343,7 @@ class ActivitySearch(Base):
     __tablename__ = "activity_searches"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     query = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -283,7 +356,9 @@ class Activity(Base):
     __tablename__ = "activities"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    search_id = Column(String(36), ForeignKey("activity_searches.id"), nullable=False)
+    search_id = Column(
+        String(36), ForeignKey("activity_searches.id"), nullable=False, index=True
+    )
     provider = Column(String(100), nullable=False)
     payload = Column(JSON, nullable=False)
     pros = Column(JSONArray, nullable=True)  # SQLite-compatible array
@@ -296,6 +371,12 @@ class Activity(Base):
 
 class EntertainmentSelection(Base):
     __tablename__ = "entertainment_selections"
+    # One row per venue and trip (upsert target); also serves trip_id lookups
+    __table_args__ = (
+        Index(
+            "uq_entertainment_selections_trip_venue", "trip_id", "venue_id", unique=True
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
@@ -328,7 +409,7 @@ class ItineraryItem(Base):
     __tablename__ = "itinerary_items"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     day_date = Column(DateTime(timezone=True), nullable=False)
     type = Column(Enum(ItineraryItemType), nullable=False)
     ref_table = Column(String(50), nullable=True)
@@ -346,7 +427,7 @@ class TripPlan(Base):
     __tablename__ = "trip_plans"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     plan_json = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -355,11 +436,62 @@ class TripChecklist(Base):
     __tablename__ = "trip_checklists"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     checklist_json = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class PlanJob(Base):
+    """Background job for slow trip work (e.g. AI plan generation)."""
+
+    __tablename__ = "plan_jobs"
+    # One job per trip and kind makes finalize idempotent
+    __table_args__ = (UniqueConstraint("trip_id", "kind", name="uq_plan_jobs_trip_kind"),)
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String(50), nullable=False, default="finalize_trip")
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED, index=True)
+    stage = Column(String(50), nullable=True)  # Human-readable progress step
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class CacheRecord(Base):
+    """Persistent tier of the in-process caches (e.g. LLM ranking results)."""
+
+    __tablename__ = "cache_entries"
+
+    namespace = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    value = Column(JSON, nullable=False)
+    fresh_until = Column(Float, nullable=False)  # Unix timestamps
+    stale_until = Column(Float, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TokenRevocation(Base):
+    """
+    Revoked auth tokens, polled by every worker: session token hashes (drop
+    cached users) and signed token ids (denylisted until ``expires_at``).
+    """
+
+    __tablename__ = "token_revocations"
+
+    token_hash = Column(String(64), primary_key=True)
+    revoked_at = Column(Float, nullable=False, index=True)  # Unix timestamp
+    expires_at = Column(Float, nullable=True)  # Signed tokens only
+
+
 class CultureTip(Base):
     __tablename__ = "culture_tips"
 
@@ -392,7 +524,7 @@ class GoogleAccount(Base):
     __tablename__ = "google_accounts"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     google_user_id = Column(String(100), nullable=False)
     email = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -406,7 +538,7 @@ class GoogleToken(Base):
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     google_account_id = Column(
-        String(36), ForeignKey("google_accounts.id"), nullable=False
+        String(36), ForeignKey("google_accounts.id"), nullable=False, index=True
     )
     access_token = Column(Text, nullable=False)
     refresh_token = Column(Text, nullable=True)
@@ -425,9 +557,9 @@ class CalendarBinding(Base):
     __tablename__ = "calendar_bindings"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     google_account_id = Column(
-        String(36), ForeignKey("google_accounts.id"), nullable=False
+        String(36), ForeignKey("google_accounts.id"), nullable=False, index=True
     )
     calendar_id = Column(String(255), nullable=False)
     sync_mode = Column(String(20), nullable=False)  # "push" or "ics"
@@ -438,9 +570,9 @@ class CalendarEvent(Base):
     __tablename__ = "calendar_events"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(36), ForeignKey("trips.id"), nullable=False, index=True)
     itinerary_item_id = Column(
-        String(36), ForeignKey("itinerary_items.id"), nullable=False
+        String(36), ForeignKey("itinerary_items.id"), nullable=False, index=True
     )
     google_event_id = Column(String(255), nullable=False)
     etag = Column(String(255), nullable=True)
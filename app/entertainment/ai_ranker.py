@@ -1,10 +1,11 @@
 """OpenAI client for entertainment venue ranking and analysis."""
 
 import json
-from typing import Any, Dict, List
-
-from openai import AsyncOpenAI
+from typing import Any, Dict, List, Tuple
 
+from app.core.llm import get_openai_client, openai_slot
+from app.core.logging import get_logger
+from app.core.services import services
 from app.core.settings import settings
 from app.entertainment.schemas import (
     EntertainmentRankItem,
@@ -13,6 +14,22 @@ from app.entertainment.schemas import (
     EntertainmentRankResponse,
     GoogleMapsVenue,
 )
+from app.ranking import (
+    VENUE_SCORING,
+    ScoredCandidates,
+    Shortlist,
+    diverse_shortlist,
+    merge_ranked_ids,
+    ranking_cache,
+    ranking_cache_key,
+)
+from app.ranking.engine import price_level
+from app.ranking.serialization import compact_table
+
+logger = get_logger(__name__)
+
+# Bump whenever the prompts or response schema change to invalidate cached rankings
+PROMPT_VERSION = "venues-v1"
 
 
 class OpenAIEntertainmentRanker:
@@ -23,30 +40,99 @@ class OpenAIEntertainmentRanker:
             raise RuntimeError(
                 "OPENAI_API_KEY missing. Ensure .env is loaded in the app process."
             )
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = getattr(settings, "OPENAI_MODEL", None) or "gpt-4o-mini"
-        print(f"DEBUG: Entertainment OpenAI client initialized successfully")
+        self.prompt_format = settings.ranking_prompt_format
+        logger.debug("Entertainment ranker initialized (model %s)", self.model)
 
     async def rank_venues(
         self, request: EntertainmentRankRequest
     ) -> EntertainmentRankResponse:
-        """Rank entertainment venues using OpenAI with structured output."""
-        # Limit to 15 venues for cost control
-        limited_venues = request.venues[:15]
-
+        """
+        Rank entertainment venues: the heuristic scores every venue, OpenAI
+        re-ranks a diverse top-K shortlist (at most a few venues per type) and
+        the remaining venues follow in heuristic order.
+        """
+        venues = request.venues
+        scored = self._score(request)
+        shortlist = diverse_shortlist(
+            scored,
+            [v.type for v in venues],
+            settings.ranking_llm_top_k_venues,
+            settings.ranking_max_per_group,
+        )
+        limited_venues = [venues[i] for i in shortlist.head]
+
+        key = ranking_cache_key(
+            "venues",
+            self.model,
+            PROMPT_VERSION,
+            request.preferences_prompt,
+            limited_venues,
+            extra={
+                "entertainment_tags": request.entertainment_tags or [],
+                "prompt_format": self.prompt_format,
+            },
+        )
         try:
-            print(f"DEBUG: Attempting to call OpenAI for {len(limited_venues)} venues")
-            # Call OpenAI with JSON schema
-            response = await self._call_openai(request, limited_venues)
-
-            print(f"DEBUG: OpenAI call successful")
-            # Validate and return
-            return self._parse_openai_response(response, request)
-
+            ranked = await ranking_cache.get_or_rank(
+                key,
+                lambda: self._rank_uncached(request, limited_venues),
+                EntertainmentRankResponse,
+                overrides={"trip_id": request.trip_id, "search_id": request.search_id},
+            )
         except Exception as e:
             print(f"OpenAI venue ranking failed: {e}")
-            # Fallback to heuristic ranking
-            return self._heuristic_ranking(request, limited_venues)
+            # Fallback to heuristic ranking over this request's full result set
+            return self._heuristic_ranking(request)
+        return self._merge_with_heuristic(ranked, request, scored, shortlist)
+
+    def _merge_with_heuristic(
+        self,
+        ranked: EntertainmentRankResponse,
+        request: EntertainmentRankRequest,
+        scored: ScoredCandidates,
+        shortlist: Shortlist,
+    ) -> EntertainmentRankResponse:
+        """Append the venues the model did not rank, in heuristic order."""
+        venues = request.venues
+        head_ids = [venues[i].place_id for i in shortlist.head]
+        tail_ids = [venues[i].place_id for i in shortlist.tail]
+        ordered_place_ids = merge_ranked_ids(ranked.ordered_place_ids, head_ids, tail_ids)
+
+        items_by_id = {item.place_id: item for item in ranked.items}
+        unranked = [
+            i
+            for i in shortlist.head + shortlist.tail
+            if venues[i].place_id not in items_by_id
+        ]
+        for item in self._heuristic_items(request, scored, unranked):
+            items_by_id[item.place_id] = item
+
+        notes = list(ranked.meta.notes or [])
+        if tail_ids:
+            notes.append(
+                f"Model re-ranked the top {len(head_ids)} of {len(venues)} venues; "
+                "the rest follow in heuristic order"
+            )
+        return EntertainmentRankResponse(
+            trip_id=ranked.trip_id,
+            search_id=ranked.search_id,
+            ordered_place_ids=ordered_place_ids,
+            items=[items_by_id[i] for i in ordered_place_ids],
+            meta=ranked.meta.model_copy(update={"notes": notes}),
+        )
+
+    async def _rank_uncached(
+        self, request: EntertainmentRankRequest, limited_venues: List[GoogleMapsVenue]
+    ) -> EntertainmentRankResponse:
+        """Model ranking of the shortlist; raises when OpenAI fails."""
+        logger.debug("Ranking %d venues with OpenAI", len(limited_venues))
+        # Call OpenAI with JSON schema
+        response = await self._call_openai(request, limited_venues)
+
+        # Validate and return
+        return self._parse_openai_response(response, request)
 
     async def _call_openai(
         self, request: EntertainmentRankRequest, venues: List[GoogleMapsVenue]
@@ -110,6 +196,30 @@ class OpenAIEntertainmentRanker:
             },
         }
 
+        system_prompt, user_prompt = self._build_prompts(request, venues)
+
+        # Call OpenAI
+        async with openai_slot():
+            completion = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {"name": "venue_ranking", "schema": response_schema},
+                },
+                temperature=0.3,
+            )
+
+        response_text = completion.choices[0].message.content
+        return json.loads(response_text)
+
+    def _build_prompts(
+        self, request: EntertainmentRankRequest, venues: List[GoogleMapsVenue]
+    ) -> Tuple[str, str]:
+        """Build the system and user prompts for venue ranking."""
         # Build user preferences text
         preferences_text = request.preferences_prompt or ""
         if request.entertainment_tags:
@@ -119,20 +229,7 @@ class OpenAIEntertainmentRanker:
             )
 
         # Prepare venue data
-        venues_data = []
-        for v in venues:
-            venue_dict = {
-                "place_id": v.place_id,
-                "title": v.title,
-                "rating": v.rating,
-                "reviews": v.reviews,
-                "price": v.price,
-                "type": v.type,
-                "types": v.types,
-                "address": v.address,
-                "description": v.description,
-            }
-            venues_data.append(venue_dict)
+        venues_text = self._serialize_venues(venues)
 
         # System prompt
         system_prompt = f"""You are an expert travel advisor specializing in entertainment and activities.
@@ -159,28 +256,51 @@ Rank venues from best to worst match. Consider:
 
 Be honest about cons - help users make informed decisions."""
 
-        user_prompt = f"""Rank these {len(venues_data)} entertainment venues:
-
-{json.dumps(venues_data, indent=2)}
-
-Return exactly {len(venues_data)} ranked venues in JSON format following the schema."""
-
-        # Call OpenAI
-        completion = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {"name": "venue_ranking", "schema": response_schema},
-            },
-            temperature=0.3,
-        )
+        user_prompt = f"""Rank these {len(venues)} entertainment venues:
+
+{venues_text}
+
+Return exactly {len(venues)} ranked venues in JSON format following the schema."""
+
+        return system_prompt, user_prompt
+
+    def _serialize_venues(self, venues: List[GoogleMapsVenue]) -> str:
+        """Venue data for the prompt: a compact table or indented JSON."""
+        if self.prompt_format == "compact":
+            table = compact_table(
+                ["place_id", "title", "rt", "rv", "pr", "type", "types", "addr", "desc"],
+                (
+                    [
+                        v.place_id,
+                        v.title,
+                        v.rating,
+                        v.reviews,
+                        v.price,
+                        v.type,
+                        v.types,
+                        v.address,
+                        v.description,
+                    ]
+                    for v in venues
+                ),
+            )
+            return f"(rt=rating /5, rv=reviews, pr=price level)\n{table}"
 
-        response_text = completion.choices[0].message.content
-        return json.loads(response_text)
+        venues_data = []
+        for v in venues:
+            venue_dict = {
+                "place_id": v.place_id,
+                "title": v.title,
+                "rating": v.rating,
+                "reviews": v.reviews,
+                "price": v.price,
+                "type": v.type,
+                "types": v.types,
+                "address": v.address,
+                "description": v.description,
+            }
+            venues_data.append(venue_dict)
+        return json.dumps(venues_data, indent=2)
 
     def _parse_openai_response(
         self, response: Dict[str, Any], request: EntertainmentRankRequest
@@ -208,19 +328,53 @@ Return exactly {len(venues_data)} ranked venues in JSON format following the sch
             meta=meta,
         )
 
+    def _score(self, request: EntertainmentRankRequest) -> ScoredCandidates:
+        """Heuristic scores for every venue in the request."""
+        venues = request.venues
+        return VENUE_SCORING.score(
+            {
+                "rating": [v.rating for v in venues],
+                "reviews": [v.reviews or 0 for v in venues],
+                "price": [price_level(v.price) for v in venues],
+            },
+            request.weights,
+        )
+
     def _heuristic_ranking(
-        self, request: EntertainmentRankRequest, venues: List[GoogleMapsVenue]
+        self, request: EntertainmentRankRequest
     ) -> EntertainmentRankResponse:
-        """Fallback heuristic ranking based on ratings and reviews."""
+        """Fallback heuristic ranking based on ratings, reviews and price level."""
         print("Using heuristic venue ranking (OpenAI unavailable)")
 
-        # Sort by rating * log(reviews + 1)
-        scored_venues = []
-        for v in venues:
-            rating = v.rating or 3.0
+        scored = self._score(request)
+        items = self._heuristic_items(request, scored, scored.ranked())
+
+        return EntertainmentRankResponse(
+            trip_id=request.trip_id,
+            search_id=request.search_id,
+            ordered_place_ids=[item.place_id for item in items],
+            items=items,
+            meta=EntertainmentRankMeta(
+                used_model="heuristic",
+                deterministic=True,
+                notes=["Fallback heuristic ranking used"],
+            ),
+        )
+
+    def _heuristic_items(
+        self,
+        request: EntertainmentRankRequest,
+        scored: ScoredCandidates,
+        indices: List[int],
+    ) -> List[EntertainmentRankItem]:
+        """Build heuristic rank items for the given venues (by index)."""
+        scores = scored.scores.tolist()
+        items = []
+
+        for index in indices:
+            v = request.venues[index]
+            rating = v.rating
             reviews = v.reviews or 0
-            score = rating * (1 + (reviews / 1000) ** 0.5) / 6.0  # Normalize to 0-1
-            score = min(max(score, 0.0), 1.0)
 
             # Generate simple pros/cons
             pros = []
@@ -228,7 +382,7 @@ Return exactly {len(venues_data)} ranked venues in JSON format following the sch
 
             if rating and rating >= 4.5:
                 pros.append("highly-rated")
-            if reviews and reviews > 500:
+            if reviews > 500:
                 pros.append("popular")
             if v.price in ["$", "$$"]:
                 pros.append("affordable")
@@ -242,52 +396,20 @@ Return exactly {len(venues_data)} ranked venues in JSON format following the sch
             if v.price in ["$$$", "$$$$"]:
                 cons.append("expensive")
 
-            # Fallback values
-            if not pros:
-                pros = ["available"]
-            if not cons:
-                cons = ["none-noted"]
-
-            scored_venues.append(
-                {
-                    "venue": v,
-                    "score": score,
-                    "pros": pros,
-                    "cons": cons,
-                }
+            items.append(
+                EntertainmentRankItem(
+                    place_id=v.place_id,
+                    score=round(scores[index], 3),
+                    title=f"{v.title} - {v.type or 'Venue'}",
+                    rationale_short=f"Rating {v.rating or 'N/A'}, {v.reviews or 0} reviews",
+                    pros_keywords=pros or ["available"],
+                    cons_keywords=cons or ["none-noted"],
+                    tags=v.types[:3] if v.types else [],
+                    link=v.link,
+                )
             )
+        return items
 
-        # Sort by score descending
-        scored_venues.sort(key=lambda x: x["score"], reverse=True)
 
-        # Build response
-        items = []
-        ordered_place_ids = []
-
-        for sv in scored_venues:
-            v = sv["venue"]
-            ordered_place_ids.append(v.place_id)
-
-            item = EntertainmentRankItem(
-                place_id=v.place_id,
-                score=sv["score"],
-                title=f"{v.title} - {v.type or 'Venue'}",
-                rationale_short=f"Rating {v.rating or 'N/A'}, {v.reviews or 0} reviews",
-                pros_keywords=sv["pros"],
-                cons_keywords=sv["cons"],
-                tags=v.types[:3] if v.types else [],
-                link=v.link,
-            )
-            items.append(item)
-
-        return EntertainmentRankResponse(
-            trip_id=request.trip_id,
-            search_id=request.search_id,
-            ordered_place_ids=ordered_place_ids,
-            items=items,
-            meta=EntertainmentRankMeta(
-                used_model="heuristic",
-                deterministic=True,
-                notes=["Fallback heuristic ranking used"],
-            ),
-        )
+# Built once by the service registry at application startup
+services.register("venue_ranker", OpenAIEntertainmentRanker)
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user
+from app.core.services import services
 from app.db import EntertainmentSelection, User, get_async_session
 from app.entertainment.ai_ranker import OpenAIEntertainmentRanker
 from app.entertainment.schemas import (
@@ -16,17 +17,33 @@ from app.entertainment.schemas import (
     EntertainmentSelectionRequest,
     EntertainmentSelectionResponse,
 )
-from app.entertainment.service import google_maps_service
+from app.entertainment.selections import upsert_selections
+from app.entertainment.service import GoogleMapsService
+from app.trips.dependencies import require_trip_owner
 from app.trips.service import trips_service
 
 router = APIRouter(prefix="/entertainment", tags=["entertainment"])
 
 
+async def _maps() -> GoogleMapsService:
+    """Dependency to get the shared Google Maps service."""
+    return services.get("google_maps")
+
+
+async def _ranker() -> OpenAIEntertainmentRanker:
+    """Dependency to get the shared venue ranker."""
+    try:
+        return services.get("venue_ranker")
+    except RuntimeError as e:  # e.g. OPENAI_API_KEY missing
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/search", response_model=EntertainmentSearchResponse)
 async def search_entertainment_venues(
     req: EntertainmentSearchRequest,
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
+    maps: GoogleMapsService = Depends(_maps),
 ):
     """Search for entertainment venues using Google Maps API."""
     try:
@@ -38,7 +55,7 @@ async def search_entertainment_venues(
         print(f"🎭 Searching entertainment for trip {req.trip_id} in {req.destination}")
 
         # Fetch venues from Google Maps
-        result = await google_maps_service.search_venues(
+        result = await maps.search_venues(
             request=req, entertainment_tags=trip.entertainment_tags
         )
 
@@ -60,6 +77,7 @@ async def rank_entertainment_venues(
     req: EntertainmentRankRequest,
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
+    ranker: OpenAIEntertainmentRanker = Depends(_ranker),
 ):
     """Rank entertainment venues using AI."""
     try:
@@ -75,7 +93,6 @@ async def rank_entertainment_venues(
             req.entertainment_tags = trip.entertainment_tags
 
         # Rank venues using AI
-        ranker = OpenAIEntertainmentRanker()
         result = await ranker.rank_venues(req)
 
         print(f"✅ Ranked venues with model: {result.meta.used_model}")
@@ -102,107 +119,61 @@ async def select_entertainment_venues(
         print(f"🎭 Selecting {len(req.selections)} venues for trip {req.trip_id}")
 
         # Get the trip and verify ownership
-        trip = await trips_service.get_trip_by_id(session, req.trip_id, current_user.id)
+        trip = await trips_service.get_trip_by_id(
+            session, req.trip_id, current_user.id, with_selections=True
+        )
         if not trip:
             raise HTTPException(status_code=404, detail="Trip not found")
 
         print(f"✅ Trip found: {trip.from_city} → {trip.to_city}")
 
-        # Create EntertainmentSelection records
-        created_selections = []
-
-        for selection_data in req.selections:
-            # Extract venue data
-            venue = selection_data.get("venue", {})
-            ranking = selection_data.get("ranking", {})
-
-            # Create selection record
-            selection = EntertainmentSelection(
-                trip_id=req.trip_id,
-                venue_id=venue.get("place_id", ""),
-                venue_name=venue.get("title", "Unknown Venue"),
-                venue_type=venue.get("type"),
-                address=venue.get("address"),
-                rating=venue.get("rating"),
-                reviews_count=venue.get("reviews"),
-                price_level=venue.get("price"),
-                latitude=(
-                    venue.get("gps_coordinates", {}).get("latitude")
-                    if venue.get("gps_coordinates")
-                    else None
-                ),
-                longitude=(
-                    venue.get("gps_coordinates", {}).get("longitude")
-                    if venue.get("gps_coordinates")
-                    else None
-                ),
-                website=venue.get("website"),
-                phone=venue.get("phone"),
-                opening_hours=venue.get("operating_hours"),
-                types=venue.get("types"),
-                description=venue.get("description"),
-                thumbnail=venue.get("thumbnail"),
-                score=ranking.get("score"),
-                title=ranking.get("title"),
-                pros_keywords=ranking.get("pros_keywords"),
-                cons_keywords=ranking.get("cons_keywords"),
-            )
-
-            session.add(selection)
-            created_selections.append(selection)
+        # Insert or refresh every venue in one statement
+        rows = await upsert_selections(session, req.trip_id, req.selections)
 
         # Also update trip's selected_entertainments JSON for quick access
-        if trip.selected_entertainments is None:
-            trip.selected_entertainments = []
-
-        # Append new selections (avoid duplicates by place_id)
+        # (read by the planner and the trip view); skip it when nothing is new
         existing_ids = {
-            e.get("place_id")
-            for e in trip.selected_entertainments
+            e.get("venue", {}).get("place_id")
+            for e in trip.selected_entertainments or []
             if isinstance(e, dict)
         }
-
+        new_selections = []
         for selection_data in req.selections:
-            venue = selection_data.get("venue", {})
-            place_id = venue.get("place_id")
+            place_id = selection_data.get("venue", {}).get("place_id")
             if place_id and place_id not in existing_ids:
-                trip.selected_entertainments.append(selection_data)
-
-        # Mark as modified for SQLAlchemy
-        from sqlalchemy.orm.attributes import flag_modified
-
-        flag_modified(trip, "selected_entertainments")
+                existing_ids.add(place_id)
+                new_selections.append(selection_data)
+        if new_selections:
+            # Assign a new list so SQLAlchemy sees the change
+            trip.selected_entertainments = [
+                *(trip.selected_entertainments or []),
+                *new_selections,
+            ]
 
-        # Save to database
         await session.commit()
 
-        # Refresh to get IDs
-        for sel in created_selections:
-            await session.refresh(sel)
-
-        print(f"✅ Saved {len(created_selections)} entertainment selections!")
+        print(f"✅ Saved {len(rows)} entertainment selections!")
 
         # Build response
-        response_selections = []
-        for sel in created_selections:
-            response_selections.append(
-                {
-                    "id": sel.id,
-                    "venue_name": sel.venue_name,
-                    "venue_type": sel.venue_type,
-                    "address": sel.address,
-                    "rating": float(sel.rating) if sel.rating else None,
-                    "price": sel.price_level,
-                    "score": float(sel.score) if sel.score else None,
-                    "title": sel.title,
-                }
-            )
+        response_selections = [
+            {
+                "id": row.id,
+                "venue_name": row.venue_name,
+                "venue_type": row.venue_type,
+                "address": row.address,
+                "rating": float(row.rating) if row.rating else None,
+                "price": row.price_level,
+                "score": float(row.score) if row.score else None,
+                "title": row.title,
+            }
+            for row in rows
+        ]
 
         return EntertainmentSelectionResponse(
             success=True,
-            message=f"Successfully added {len(created_selections)} entertainment venues to trip",
+            message=f"Successfully added {len(rows)} entertainment venues to trip",
             trip_id=trip.id,
-            selected_count=len(created_selections),
+            selected_count=len(rows),
             selections=response_selections,
         )
 
@@ -218,17 +189,11 @@ async def select_entertainment_venues(
 
 @router.get("/{trip_id}/selections")
 async def get_entertainment_selections(
-    trip_id: str,
+    trip_id: str = Depends(require_trip_owner),
     session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
 ):
     """Get all entertainment selections for a trip."""
     try:
-        # Verify trip exists and user owns it
-        trip = await trips_service.get_trip_by_id(session, trip_id, current_user.id)
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-
         # Query selections
         from sqlalchemy import select
 
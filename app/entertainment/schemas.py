@@ -4,7 +4,9 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.ranking.engine import VENUE_SCORING
 
 
 class GPSCoordinates(BaseModel):
@@ -88,6 +90,16 @@ class EntertainmentRankRequest(BaseModel):
         None  # Custom preferences, or uses entertainment_tags
     )
     entertainment_tags: Optional[List[str]] = None  # From trip
+    weights: Optional[Dict[str, float]] = Field(
+        None, description="Heuristic scoring weights: rating, reviews, price"
+    )
+
+    @field_validator("weights")
+    @classmethod
+    def validate_weights(cls, v):
+        if v is not None:
+            VENUE_SCORING.resolve_weights(v)
+        return v
 
 
 class EntertainmentRankItem(BaseModel):
@@ -0,0 +1,138 @@
+"""Bulk upsert of a trip's entertainment selections."""
+
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import EntertainmentSelection
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Columns sent back to the client after the upsert
+_RETURNED = (
+    EntertainmentSelection.id,
+    EntertainmentSelection.venue_id,
+    EntertainmentSelection.venue_name,
+    EntertainmentSelection.venue_type,
+    EntertainmentSelection.address,
+    EntertainmentSelection.rating,
+    EntertainmentSelection.price_level,
+    EntertainmentSelection.score,
+    EntertainmentSelection.title,
+)
+
+
+def selection_values(trip_id: str, selection_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one ``{"venue": ..., "ranking": ...}`` selection."""
+    venue = selection_data.get("venue", {})
+    ranking = selection_data.get("ranking", {})
+    gps = venue.get("gps_coordinates") or {}
+    selection_id = str(uuid.uuid4())
+
+    return {
+        "id": selection_id,
+        "trip_id": trip_id,
+        # Venues without a place_id can't be matched later; key them by row
+        "venue_id": venue.get("place_id") or selection_id,
+        "venue_name": venue.get("title", "Unknown Venue"),
+        "venue_type": venue.get("type"),
+        "address": venue.get("address"),
+        "rating": venue.get("rating"),
+        "reviews_count": venue.get("reviews"),
+        "price_level": venue.get("price"),
+        "latitude": gps.get("latitude"),
+        "longitude": gps.get("longitude"),
+        "website": venue.get("website"),
+        "phone": venue.get("phone"),
+        "opening_hours": venue.get("operating_hours"),
+        "types": venue.get("types"),
+        "description": venue.get("description"),
+        "thumbnail": venue.get("thumbnail"),
+        "score": ranking.get("score"),
+        "title": ranking.get("title"),
+        "pros_keywords": ranking.get("pros_keywords"),
+        "cons_keywords": ranking.get("cons_keywords"),
+    }
+
+
+async def upsert_selections(
+    session: AsyncSession, trip_id: str, selections: List[Dict[str, Any]]
+) -> List[Any]:
+    """
+    Insert or refresh a trip's venue selections in one statement.
+
+    Rows conflict on the unique ``(trip_id, venue_id)``; a venue selected
+    again keeps its id and gets the new venue and ranking data. Returns the
+    affected rows (``_RETURNED`` columns), via RETURNING where the database
+    supports it. Databases without ``ON CONFLICT`` get a per-row update or
+    insert instead. Does not commit.
+    """
+    # One row per venue (last wins): a statement can't update a row twice
+    rows = list(
+        {
+            values["venue_id"]: values
+            for values in (selection_values(trip_id, data) for data in selections)
+        }.values()
+    )
+    if not rows:
+        return []
+
+    dialect = session.bind.dialect
+    insert = _INSERTS.get(dialect.name)
+    if insert is None:
+        await _upsert_rows(session, trip_id, rows)
+        return await _selected(session, trip_id, rows)
+
+    stmt = insert(EntertainmentSelection).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EntertainmentSelection.trip_id, EntertainmentSelection.venue_id],
+        set_={
+            name: stmt.excluded[name]
+            for name in rows[0]
+            if name not in ("id", "trip_id", "venue_id")
+        },
+    )
+
+    if dialect.insert_returning:
+        result = await session.execute(stmt.returning(*_RETURNED))
+        return list(result.all())
+
+    await session.execute(stmt)
+    return await _selected(session, trip_id, rows)
+
+
+async def _upsert_rows(
+    session: AsyncSession, trip_id: str, rows: List[Dict[str, Any]]
+) -> None:
+    """Portable upsert for databases without ``ON CONFLICT``: update, then insert."""
+    result = await session.execute(
+        select(EntertainmentSelection).where(
+            EntertainmentSelection.trip_id == trip_id,
+            EntertainmentSelection.venue_id.in_([row["venue_id"] for row in rows]),
+        )
+    )
+    existing = {selection.venue_id: selection for selection in result.scalars()}
+    for row in rows:
+        selection = existing.get(row["venue_id"])
+        if selection is None:
+            session.add(EntertainmentSelection(**row))
+            continue
+        for name, value in row.items():
+            if name not in ("id", "trip_id", "venue_id"):
+                setattr(selection, name, value)
+    await session.flush()
+
+
+async def _selected(
+    session: AsyncSession, trip_id: str, rows: List[Dict[str, Any]]
+) -> List[Any]:
+    result = await session.execute(
+        select(*_RETURNED).where(
+            EntertainmentSelection.trip_id == trip_id,
+            EntertainmentSelection.venue_id.in_([row["venue_id"] for row in rows]),
+        )
+    )
+    return list(result.all())
@@ -5,7 +5,11 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.cache import cache_key
+from app.core.http import HTTPClientPool, http_pool
+from app.core.services import services
 from app.core.settings import settings
+from app.core.singleflight import SingleFlight, create_singleflight
 from app.entertainment.schemas import (
     EntertainmentSearchRequest,
     EntertainmentSearchResponse,
@@ -14,15 +18,24 @@ from app.entertainment.schemas import (
     OperatingHours,
 )
 
+# Shared across instances so concurrent identical searches coalesce
+_maps_singleflight = create_singleflight("google_maps")
+
 
 class GoogleMapsService:
     """Service for interacting with Google Maps API via SerpAPI."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        http: Optional[HTTPClientPool] = None,
+        singleflight: Optional[SingleFlight] = None,
+    ):
         if not settings.serpapi_key:
             raise RuntimeError("SERPAPI_KEY missing. Cannot fetch Google Maps data.")
         self.api_key = settings.serpapi_key
         self.base_url = "https://serpapi.com/search.json"
+        self.http = http or http_pool
+        self.singleflight = singleflight or _maps_singleflight
 
     async def search_venues(
         self,
@@ -66,13 +79,10 @@ class GoogleMapsService:
         print(f"🗺️  Searching Google Maps: {params['q']}")
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-            # Parse venues from response
-            venues = self._parse_venues(data.get("local_results", []))
+            # Concurrent identical searches share one upstream request
+            venues = await self.singleflight.do(
+                cache_key("google_maps", params), lambda: self._fetch_venues(params)
+            )
 
             search_id = str(uuid.uuid4())
 
@@ -81,7 +91,7 @@ class GoogleMapsService:
                 trip_id=request.trip_id,
                 query=search_query,
                 destination=request.destination,
-                venues=venues,
+                venues=list(venues),
                 total_results=len(venues),
             )
 
@@ -89,6 +99,15 @@ class GoogleMapsService:
             print(f"❌ Google Maps API error: {e}")
             raise RuntimeError(f"Failed to fetch Google Maps data: {e}")
 
+    async def _fetch_venues(self, params: dict) -> List[GoogleMapsVenue]:
+        """Call SerpAPI Google Maps and parse the local results."""
+        response = await self.http.get(self.base_url, params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        # Parse venues from response
+        return self._parse_venues(data.get("local_results", []))
+
     def _build_query_from_tags(self, tags: List[str], destination: str) -> str:
         """Build search query from entertainment tags."""
         # Map common tags to search queries
@@ -178,5 +197,5 @@ class GoogleMapsService:
         return venues
 
 
-# Singleton instance
-google_maps_service = GoogleMapsService()
+# Singleton instance, built by the service registry at application startup
+services.register("google_maps", GoogleMapsService)
@@ -4,63 +4,126 @@ import asyncio
 import json
 from typing import Any, Dict, List, Optional
 
-from openai import AsyncOpenAI
-
+from app.core.llm import get_openai_client, openai_slot
+from app.core.logging import get_logger
+from app.core.services import services
 from app.core.settings import settings
 from app.flights.schemas import Itinerary, RankItem, RankMeta, RankRequest, RankResponse
+from app.ranking import (
+    FLIGHT_SCORING,
+    ScoredCandidates,
+    Shortlist,
+    diverse_shortlist,
+    merge_ranked_ids,
+    ranking_cache,
+    ranking_cache_key,
+)
+from app.ranking.serialization import compact_table, first_date, relative_time
+
+logger = get_logger(__name__)
+
+# Bump whenever the prompts or response schema change to invalidate cached rankings
+PROMPT_VERSION = "flights-v1"
 
 
 class OpenAIFlightRanker:
     """OpenAI client for ranking flights with pros/cons analysis."""
 
     def __init__(self):
-        from app.core.settings import settings
-
-        print(f"DEBUG: openai_api_key exists: {bool(settings.openai_api_key)}")
-        print(
-            f"DEBUG: openai_api_key starts with: {settings.openai_api_key[:10] if settings.openai_api_key else 'None'}..."
-        )
         if not settings.openai_api_key:
             raise RuntimeError(
                 "OPENAI_API_KEY missing. Ensure .env is loaded in the app process."
             )
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.model = getattr(settings, "OPENAI_MODEL", None) or "gpt-4o-mini"
-        print(f"DEBUG: OpenAI client initialized successfully")
+        self.prompt_format = settings.ranking_prompt_format
+        logger.debug("Flight ranker initialized (model %s)", self.model)
 
     async def rank_flights(self, request: RankRequest) -> RankResponse:
-        """Rank flights using OpenAI with structured output."""
-        # Limit to 30 flights for cost control
-        limited_flights = request.flights[:30]
-
+        """
+        Hybrid ranking: the heuristic scores every flight, the model re-ranks a
+        diverse top-K shortlist (cached by content) and the remaining flights
+        follow in heuristic order.
+        """
+        flights = request.flights
+        scored = self._score(request)
+        shortlist = diverse_shortlist(
+            scored,
+            [(self._airline(f), f.stops) for f in flights],
+            settings.ranking_llm_top_k_flights,
+            settings.ranking_max_per_group,
+        )
+        limited_flights = [flights[i] for i in shortlist.head]
+
+        key = ranking_cache_key(
+            "flights",
+            self.model,
+            PROMPT_VERSION,
+            request.preferences_prompt,
+            limited_flights,
+            extra={
+                "locale": request.locale.model_dump() if request.locale else None,
+                "prompt_format": self.prompt_format,
+            },
+        )
         try:
-            print(
-                f"DEBUG: Attempting to call OpenAI for {len(limited_flights)} flights"
+            ranked = await ranking_cache.get_or_rank(
+                key,
+                lambda: self._rank_uncached(request, limited_flights),
+                RankResponse,
+                overrides={"search_id": request.search_id},
             )
-            # Call OpenAI with JSON schema
-            response = await self._call_openai(request, limited_flights)
-
-            print(f"DEBUG: OpenAI call successful")
-            # Validate and return
-            return self._parse_openai_response(response, request.search_id)
-
         except Exception as e:
             print(f"OpenAI ranking failed: {e}")
-            # Fallback to heuristic ranking
+            # Built per caller: the failed call may have been shared with
+            # requests whose other flights or weights differ
             return self._heuristic_ranking(request)
-        limited_flights = request.flights[:30]
-
-        try:
-            # Call OpenAI with JSON schema
-            response = await self._call_openai(request, limited_flights)
+        return self._merge_with_heuristic(ranked, request, scored, shortlist)
+
+    def _merge_with_heuristic(
+        self,
+        ranked: RankResponse,
+        request: RankRequest,
+        scored: ScoredCandidates,
+        shortlist: Shortlist,
+    ) -> RankResponse:
+        """Append the flights the model did not rank, in heuristic order."""
+        flights = request.flights
+        head_ids = [flights[i].id for i in shortlist.head]
+        tail_ids = [flights[i].id for i in shortlist.tail]
+        ordered_ids = merge_ranked_ids(ranked.ordered_ids, head_ids, tail_ids)
+
+        items_by_id = {item.id: item for item in ranked.items}
+        unranked = [
+            i for i in shortlist.head + shortlist.tail if flights[i].id not in items_by_id
+        ]
+        for item in self._heuristic_items(request, scored, unranked):
+            item.tags = ["heuristic"]
+            items_by_id[item.id] = item
+
+        notes = list(ranked.meta.notes or [])
+        if tail_ids:
+            notes.append(
+                f"Model re-ranked the top {len(head_ids)} of {len(flights)} flights; "
+                "the rest follow in heuristic order"
+            )
+        return RankResponse(
+            search_id=ranked.search_id,
+            ordered_ids=ordered_ids,
+            items=[items_by_id[i] for i in ordered_ids],
+            meta=ranked.meta.model_copy(update={"notes": notes}),
+        )
 
-            # Validate and return
-            return self._parse_openai_response(response, request.search_id)
+    async def _rank_uncached(
+        self, request: RankRequest, limited_flights: List[Itinerary]
+    ) -> RankResponse:
+        """Model ranking of the shortlist; raises when OpenAI fails."""
+        logger.debug("Ranking %d flights with OpenAI", len(limited_flights))
+        # Call OpenAI with JSON schema
+        response = await self._call_openai(request, limited_flights)
 
-        except Exception as e:
-            print(f"OpenAI ranking failed: {e}")
-            # Fallback to heuristic ranking
-            return self._heuristic_ranking(request)
+        # Validate and return
+        return self._parse_openai_response(response, request.search_id)
 
     async def _call_openai(
         self, request: RankRequest, flights: List[Itinerary]
@@ -129,24 +192,25 @@ class OpenAIFlightRanker:
         user_prompt = self._build_user_prompt(request, flights)
 
         # Call OpenAI
-        completion = await self.client.chat.completions.create(
-            model=self.model,
-            temperature=0.2,
-            top_p=0.9,
-            seed=42,  # For reproducibility
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "FlightRankResult",
-                    "schema": response_schema,
-                    "strict": True,
+        async with openai_slot():
+            completion = await self.client.chat.completions.create(
+                model=self.model,
+                temperature=0.2,
+                top_p=0.9,
+                seed=42,  # For reproducibility
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "FlightRankResult",
+                        "schema": response_schema,
+                        "strict": True,
+                    },
                 },
-            },
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
 
         # Parse response
         content = completion.choices[0].message.content
@@ -176,6 +240,9 @@ Return ONLY valid JSON matching the exact schema."""
 
     def _build_user_prompt(self, request: RankRequest, flights: List[Itinerary]) -> str:
         """Build user prompt with preferences and flight data."""
+        if self.prompt_format == "compact":
+            return self._build_compact_user_prompt(request, flights)
+
         locale = request.locale
 
         # Prepare compact flight data for the model
@@ -218,6 +285,50 @@ Return ONLY valid JSON matching the exact schema."""
 
         return json.dumps(prompt_data, indent=2)
 
+    def _build_compact_user_prompt(
+        self, request: RankRequest, flights: List[Itinerary]
+    ) -> str:
+        """Tabular prompt: one row per flight, short aliases, relative times."""
+        locale = request.locale
+        reference = first_date(leg.dep_time for f in flights for leg in f.legs)
+        currency = flights[0].price.currency if flights else "USD"
+
+        rows = []
+        for flight in flights:
+            legs = flight.legs
+            rows.append(
+                [
+                    flight.id,
+                    float(flight.price.amount),
+                    flight.total_duration_min,
+                    flight.stops,
+                    flight.emissions_kg,
+                    flight.layovers_min,
+                    "-".join([legs[0].dep_iata] + [leg.arr_iata for leg in legs])
+                    if legs
+                    else None,
+                    [relative_time(leg.dep_time, reference) for leg in legs],
+                    [relative_time(leg.arr_time, reference) for leg in legs],
+                    [leg.flight_no for leg in legs],
+                    sorted({leg.marketing for leg in legs if leg.marketing}),
+                ]
+            )
+        table = compact_table(
+            ["id", "p", "dur", "st", "co2", "lay", "route", "dep", "arr", "fno", "air"],
+            rows,
+        )
+
+        return (
+            f"preferences: {request.preferences_prompt}\n"
+            f"locale: hl={locale.hl if locale else 'en'} "
+            f"currency={locale.currency if locale else 'USD'} "
+            f"tz={(locale.tz if locale else None) or '-'}\n"
+            f"flights (p=price {currency}, dur=total minutes, st=stops, "
+            f"co2=emissions kg, lay=total layover minutes, per-leg values ;-separated, "
+            f"dep/arr=local HH:MM with +N days after {reference or '-'}):\n"
+            f"{table}"
+        )
+
     def _parse_openai_response(
         self, response: Dict[str, Any], search_id: str
     ) -> RankResponse:
@@ -251,40 +362,26 @@ Return ONLY valid JSON matching the exact schema."""
             search_id=search_id, ordered_ids=ordered_ids, items=items, meta=meta
         )
 
-    def _heuristic_ranking(self, request: RankRequest) -> RankResponse:
-        """Fallback heuristic ranking when OpenAI is unavailable."""
-        flights = request.flights[:30]  # Limit for consistency
-
-        # Sort by: price asc -> stops asc -> duration asc
-        sorted_flights = sorted(
-            flights,
-            key=lambda f: (float(f.price.amount), f.stops, f.total_duration_min),
+    def _score(self, request: RankRequest) -> ScoredCandidates:
+        """Heuristic scores for every flight in the request."""
+        flights = request.flights
+        return FLIGHT_SCORING.score(
+            {
+                "price": [self._price(f) for f in flights],
+                "duration": [f.total_duration_min for f in flights],
+                "stops": [f.stops for f in flights],
+                "emissions": [f.emissions_kg for f in flights],
+                "layover": [f.layovers_min or 0 for f in flights],
+            },
+            request.weights,
         )
 
-        ordered_ids = [f.id for f in sorted_flights]
-        items = []
-
-        for i, flight in enumerate(sorted_flights):
-            # Generate basic pros/cons
-            pros = self._generate_heuristic_pros(flight, i == 0)
-            cons = self._generate_heuristic_cons(flight)
-
-            # Simple scoring (best to worst)
-            score = max(0.1, 1.0 - (i * 0.1))
-
-            # Generate title
-            title = self._generate_heuristic_title(flight)
-
-            item = RankItem(
-                id=flight.id,
-                score=score,
-                title=title,
-                rationale_short=f"Ranked #{i+1} by price, stops, and duration",
-                pros_keywords=pros,
-                cons_keywords=cons,
-                tags=["heuristic"] if i == 0 else None,
-            )
-            items.append(item)
+    def _heuristic_ranking(self, request: RankRequest) -> RankResponse:
+        """Fallback heuristic ranking over the full result set (weighted scores)."""
+        scored = self._score(request)
+        items = self._heuristic_items(request, scored, scored.ranked())
+        if items:
+            items[0].tags = ["heuristic"]
 
         meta = RankMeta(
             used_model="heuristic_fallback",
@@ -293,14 +390,65 @@ Return ONLY valid JSON matching the exact schema."""
         )
 
         return RankResponse(
-            search_id=request.search_id, ordered_ids=ordered_ids, items=items, meta=meta
+            search_id=request.search_id,
+            ordered_ids=[item.id for item in items],
+            items=items,
+            meta=meta,
         )
 
-    def _generate_heuristic_pros(self, flight: Itinerary, is_best: bool) -> List[str]:
+    def _heuristic_items(
+        self, request: RankRequest, scored: ScoredCandidates, indices: List[int]
+    ) -> List[RankItem]:
+        """Build heuristic rank items for the given flights (by index)."""
+        flights = request.flights
+        scores = scored.scores.tolist()
+        prices = [self._price(f) for f in flights]
+        min_price = min((p for p in prices if p is not None), default=None)
+
+        items = []
+        for index in indices:
+            flight = flights[index]
+
+            # Generate basic pros/cons
+            pros = self._generate_heuristic_pros(
+                flight, prices[index] is not None and prices[index] <= min_price
+            )
+            cons = self._generate_heuristic_cons(flight)
+
+            items.append(
+                RankItem(
+                    id=flight.id,
+                    score=round(scores[index], 3),
+                    title=self._generate_heuristic_title(flight),
+                    rationale_short="Scored by weighted price, duration, and stops",
+                    pros_keywords=pros,
+                    cons_keywords=cons,
+                )
+            )
+        return items
+
+    @staticmethod
+    def _price(flight: Itinerary) -> Optional[float]:
+        """Fare amount, or None when SerpAPI gave no price (parsed as 0)."""
+        amount = float(flight.price.amount)
+        return amount if amount > 0 else None
+
+    @staticmethod
+    def _airline(flight: Itinerary) -> Optional[str]:
+        return flight.legs[0].marketing if flight.legs else None
+
+    @staticmethod
+    def _average_layover(flight: Itinerary) -> Optional[float]:
+        """Average connection time in minutes (layovers_min is the total)."""
+        if not flight.layovers_min or flight.stops <= 0:
+            return None
+        return flight.layovers_min / flight.stops
+
+    def _generate_heuristic_pros(self, flight: Itinerary, is_cheapest: bool) -> List[str]:
         """Generate heuristic pros keywords."""
         pros = []
 
-        if is_best:
+        if is_cheapest:
             pros.append("lowest price")
 
         if flight.stops == 0:
@@ -308,9 +456,9 @@ Return ONLY valid JSON matching the exact schema."""
         elif flight.stops == 1:
             pros.append("1 stop")
 
-        if flight.layovers_min:
-            if all(layover >= 60 and layover <= 120 for layover in flight.layovers_min):
-                pros.append("reasonable layovers")
+        layover = self._average_layover(flight)
+        if layover is not None and 60 <= layover <= 120:
+            pros.append("reasonable layovers")
 
         if flight.total_duration_min < 360:  # Less than 6 hours
             pros.append("short flight")
@@ -336,10 +484,11 @@ Return ONLY valid JSON matching the exact schema."""
         if flight.stops >= 2:
             cons.append("multiple stops")
 
-        if flight.layovers_min:
-            if any(layover < 60 for layover in flight.layovers_min):
+        layover = self._average_layover(flight)
+        if layover is not None:
+            if layover < 60:
                 cons.append("tight connection")
-            elif any(layover > 300 for layover in flight.layovers_min):
+            elif layover > 300:
                 cons.append("long layover")
 
         if flight.total_duration_min > 720:  # More than 12 hours
@@ -373,6 +522,7 @@ Return ONLY valid JSON matching the exact schema."""
 
 
 # Do NOT create a global OpenAIFlightRanker instance at import time.
-# Instantiating the ranker may access settings and API keys and should be
-# done lazily inside request handlers or startup events to avoid import-time
-# failures when environment variables are not loaded or named differently.
+# Instantiating the ranker may access settings and API keys, so the service
+# registry builds it once at application startup (or on first use) to avoid
+# import-time failures when environment variables are not loaded.
+services.register("flight_ranker", OpenAIFlightRanker)
@@ -1,19 +1,42 @@
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user
-from app.db import User, get_async_session
+from app.auth import get_current_user, get_current_user_optional
+from app.core.services import services
+from app.core.settings import settings
+from app.core.sse import format_sse
+from app.db import FlightSearch, TripFlight, User, get_async_session
 from app.flights.ai_ranker import OpenAIFlightRanker
-from app.flights.schemas import FlightSearchResponse, RankRequest, RankResponse
+from app.flights.schemas import (
+    CalendarCell,
+    FlightCalendarResponse,
+    FlightSearchResponse,
+    Itinerary,
+    RankRequest,
+    RankResponse,
+)
+from app.flights.searches import load_search, save_search
 from app.flights.service import flight_search_service
+from app.geo import AirportIndex
 from app.trips.schemas import FlightSelectionRequest, FlightSelectionResponse
+from app.trips.dependencies import require_trip_owner
 from app.trips.service import trips_service
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 
 
+async def _ranker() -> OpenAIFlightRanker:
+    """Dependency to get the shared flight ranker."""
+    try:
+        return services.get("flight_ranker")
+    except RuntimeError as e:  # e.g. OPENAI_API_KEY missing
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/search", response_model=FlightSearchResponse)
 async def search_flights(
     trip_id: str = Query(..., description="Trip ID to search flights for"),
@@ -33,6 +56,12 @@ async def search_flights(
     ),
     currency: Optional[str] = Query("USD", description="Currency code (e.g., 'USD')"),
     hl: Optional[str] = Query("en", description="Language code (e.g., 'en')"),
+    metro: bool = Query(
+        False, description="Search every major airport of the trip's cities"
+    ),
+    max_airports: Optional[int] = Query(
+        None, ge=1, le=5, description="Airports per city in metro mode"
+    ),
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
@@ -41,6 +70,11 @@ async def search_flights(
 
     If departure_id, arrival_id, or dates are not provided,
     they will be automatically pulled from the trip.
+
+    With ``metro=true`` each city resolves to up to ``max_airports`` airports
+    (e.g. London: LHR, LGW, STN) and every pair is searched concurrently;
+    the merged results are de-duplicated and ordered by price. An explicit
+    departure_id/arrival_id pins that side to one airport.
     """
     try:
         # Get trip details
@@ -61,12 +95,11 @@ async def search_flights(
         print(f"🎫 Provided codes: dep='{dep_id}', arr='{arr_id}'")
 
         # If no IATA codes provided, try to map from city names
-        if not dep_id:
-            dep_id = _get_airport_code(trip.from_city)
-            print(f"   Mapped '{trip.from_city}' → '{dep_id}'")
-        if not arr_id:
-            arr_id = _get_airport_code(trip.to_city)
-            print(f"   Mapped '{trip.to_city}' → '{arr_id}'")
+        limit = (max_airports or settings.flight_metro_max_airports) if metro else 1
+        dep_ids = [dep_id] if dep_id else _get_airport_codes(trip.from_city, limit)
+        arr_ids = [arr_id] if arr_id else _get_airport_codes(trip.to_city, limit)
+        dep_id, arr_id = dep_ids[0], arr_ids[0]
+        print(f"   Mapped '{trip.from_city}' → {dep_ids}, '{trip.to_city}' → {arr_ids}")
 
         print(
             f"🔍 Searching flights: {dep_id} → {arr_id}, "
@@ -75,44 +108,65 @@ async def search_flights(
 
         # Search flights via SerpAPI
         try:
-            flights, google_flights_url = await flight_search_service.search_flights(
-                departure_id=dep_id,
-                arrival_id=arr_id,
-                outbound_date=out_date,
-                return_date=ret_date,
-                adults=num_adults,
-                children=num_children,
-                currency=currency,
-                hl=hl,
-            )
-            
-            # Add the Google Flights URL to all flights
-            for flight in flights:
-                flight.google_flights_url = google_flights_url
-                
+            if metro:
+                # Each itinerary keeps the URL of the airport pair it came from
+                flights, google_flights_url = await flight_search_service.search_metro(
+                    departure_ids=dep_ids,
+                    arrival_ids=arr_ids,
+                    outbound_date=out_date,
+                    return_date=ret_date,
+                    adults=num_adults,
+                    children=num_children,
+                    currency=currency,
+                    hl=hl,
+                )
+            else:
+                flights, google_flights_url = await flight_search_service.search_flights(
+                    departure_id=dep_id,
+                    arrival_id=arr_id,
+                    outbound_date=out_date,
+                    return_date=ret_date,
+                    adults=num_adults,
+                    children=num_children,
+                    currency=currency,
+                    hl=hl,
+                )
+
+                # Add the Google Flights URL to all flights
+                for flight in flights:
+                    flight.google_flights_url = google_flights_url
+
             print(f"✅ Found {len(flights)} flights")
         except Exception as e:
             print(f"⚠️  Flight search returned an error: {e}")
             flights = []
 
-        # Generate search ID
-        import uuid
-
-        search_id = str(uuid.uuid4())
+        search_params = {
+            "departure_id": dep_id,
+            "arrival_id": arr_id,
+            "outbound_date": out_date,
+            "return_date": ret_date,
+            "adults": num_adults,
+            "children": num_children,
+            "currency": currency,
+        }
+        if metro:
+            search_params["departure_ids"] = dep_ids
+            search_params["arrival_ids"] = arr_ids
+
+        # Persist the results so they can be re-read and re-ranked by search_id;
+        # failed and empty searches have nothing worth keeping
+        search_id = None
+        if flights:
+            search_id = await save_search(
+                session, trip_id, search_params, flights, google_flights_url
+            )
 
         return FlightSearchResponse(
             trip_id=trip_id,
             search_id=search_id,
             flights=flights,
-            search_params={
-                "departure_id": dep_id,
-                "arrival_id": arr_id,
-                "outbound_date": out_date,
-                "return_date": ret_date,
-                "adults": num_adults,
-                "children": num_children,
-                "currency": currency,
-            },
+            search_params=search_params,
             total_results=len(flights),
         )
 
@@ -126,346 +180,210 @@ async def search_flights(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _get_airport_code(city_name: str) -> str:
-    """Map city name to primary airport IATA code."""
-    # Simple mapping - in production, use a proper airport lookup service
-    city_to_airport = {
-        # USA
-        "new york": "JFK",
-        "los angeles": "LAX",
-        "chicago": "ORD",
-        "san francisco": "SFO",
-        "miami": "MIA",
-        "boston": "BOS",
-        "seattle": "SEA",
-        "las vegas": "LAS",
-        "orlando": "MCO",
-        "atlanta": "ATL",
-        "washington": "IAD",
-        "denver": "DEN",
-        "phoenix": "PHX",
-        "dallas": "DFW",
-        "houston": "IAH",
-        "philadelphia": "PHL",
-        "detroit": "DTW",
-        "minneapolis": "MSP",
-        "tampa": "TPA",
-        "charlotte": "CLT",
-        "portland": "PDX",
-        "austin": "AUS",
-        "nashville": "BNA",
-        "salt lake city": "SLC",
-        "baltimore": "BWI",
-        "san diego": "SAN",
-        
-        # UK
-        "london": "LHR",
-        "manchester": "MAN",
-        "edinburgh": "EDI",
-        "birmingham": "BHX",
-        "glasgow": "GLA",
-        
-        # France
-        "paris": "CDG",
-        "nice": "NCE",
-        "lyon": "LYS",
-        "marseille": "MRS",
-        "bordeaux": "BOD",
-        
-        # Germany
-        "munich": "MUC",
-        "frankfurt": "FRA",
-        "berlin": "BER",
-        "hamburg": "HAM",
-        "cologne": "CGN",
-        
-        # Italy
-        "rome": "FCO",
-        "milan": "MXP",
-        "venice": "VCE",
-        "florence": "FLR",
-        "naples": "NAP",
-        
-        # Spain
-        "barcelona": "BCN",
-        "madrid": "MAD",
-        "valencia": "VLC",
-        "seville": "SVQ",
-        "malaga": "AGP",
-        
-        # Netherlands
-        "amsterdam": "AMS",
-        "rotterdam": "RTM",
-        
-        # Switzerland
-        "zurich": "ZRH",
-        "geneva": "GVA",
-        
-        # Austria
-        "vienna": "VIE",
-        "salzburg": "SZG",
-        
-        # Portugal
-        "lisbon": "LIS",
-        "porto": "OPO",
-        
-        # Greece
-        "athens": "ATH",
-        "thessaloniki": "SKG",
-        "rhodes": "RHO",
-        
-        # Turkey
-        "istanbul": "IST",
-        "ankara": "ESB",
-        "antalya": "AYT",
-        "izmir": "ADB",
-        
-        # Russia
-        "moscow": "SVO",
-        "saint petersburg": "LED",
-        
-        # China
-        "beijing": "PEK",
-        "shanghai": "PVG",
-        "guangzhou": "CAN",
-        "shenzhen": "SZX",
-        "chengdu": "CTU",
-        "xian": "XIY",
-        "hangzhou": "HGH",
-        
-        # Japan
-        "tokyo": "NRT",
-        "osaka": "KIX",
-        "kyoto": "KIX",
-        "fukuoka": "FUK",
-        "sapporo": "CTS",
-        
-        # South Korea
-        "seoul": "ICN",
-        "busan": "PUS",
-        
-        # Thailand
-        "bangkok": "BKK",
-        "phuket": "HKT",
-        "chiang mai": "CNX",
-        
-        # Malaysia
-        "kuala lumpur": "KUL",
-        "penang": "PEN",
-        
-        # Singapore
-        "singapore": "SIN",
-        
-        # Indonesia
-        "bali": "DPS",
-        "jakarta": "CGK",
-        "yogyakarta": "JOG",
-        
-        # Philippines
-        "manila": "MNL",
-        "cebu": "CEB",
-        
-        # Vietnam
-        "ho chi minh city": "SGN",
-        "hanoi": "HAN",
-        "da nang": "DAD",
-        
-        # India
-        "delhi": "DEL",
-        "mumbai": "BOM",
-        "bangalore": "BLR",
-        "chennai": "MAA",
-        "kolkata": "CCU",
-        "hyderabad": "HYD",
-        "pune": "PNQ",
-        "goa": "GOI",
-        
-        # UAE
-        "dubai": "DXB",
-        "abu dhabi": "AUH",
-        
-        # Saudi Arabia
-        "riyadh": "RUH",
-        "jeddah": "JED",
-        "makkah": "JED",
-        "medina": "MED",
-        
-        # Qatar
-        "doha": "DOH",
-        
-        # Kuwait
-        "kuwait city": "KWI",
-        
-        # Bahrain
-        "manama": "BAH",
-        
-        # Oman
-        "muscat": "MCT",
-        
-        # Egypt
-        "cairo": "CAI",
-        "alexandria": "ALY",
-        "luxor": "LXR",
-        "sharm el sheikh": "SSH",
-        
-        # Morocco
-        "casablanca": "CMN",
-        "marrakech": "RAK",
-        "rabat": "RBA",
-        "fes": "FEZ",
-        
-        # South Africa
-        "johannesburg": "JNB",
-        "cape town": "CPT",
-        "durban": "DUR",
-        
-        # Australia
-        "sydney": "SYD",
-        "melbourne": "MEL",
-        "brisbane": "BNE",
-        "perth": "PER",
-        "adelaide": "ADL",
-        "gold coast": "OOL",
-        
-        # New Zealand
-        "auckland": "AKL",
-        "wellington": "WLG",
-        "christchurch": "CHC",
-        
-        # Canada
-        "toronto": "YYZ",
-        "vancouver": "YVR",
-        "montreal": "YUL",
-        "calgary": "YYC",
-        "ottawa": "YOW",
-        "edmonton": "YEG",
-        
-        # Mexico
-        "mexico city": "MEX",
-        "cancun": "CUN",
-        "guadalajara": "GDL",
-        "monterrey": "MTY",
-        "tijuana": "TIJ",
-        
-        # Brazil
-        "sao paulo": "GRU",
-        "rio de janeiro": "GIG",
-        "brasilia": "BSB",
-        "salvador": "SSA",
-        
-        # Argentina
-        "buenos aires": "EZE",
-        "cordoba": "COR",
-        
-        # Chile
-        "santiago": "SCL",
-        "valparaiso": "SCL",
-        
-        # Peru
-        "lima": "LIM",
-        "cuzco": "CUZ",
-        
-        # Colombia
-        "bogota": "BOG",
-        "medellin": "MDE",
-        "cartagena": "CTG",
-        
-        # Panama
-        "panama city": "PTY",
-        
-        # Costa Rica
-        "san jose": "SJO",
-        
-        # Cuba
-        "havana": "HAV",
-        
-        # Dominican Republic
-        "punta cana": "PUJ",
-        
-        # Jamaica
-        "kingston": "KIN",
-        
-        # Israel
-        "tel aviv": "TLV",
-        "jerusalem": "TLV",
-        
-        # Jordan
-        "amman": "AMM",
-        
-        # Lebanon
-        "beirut": "BEY",
-        
-        # Hong Kong
-        "hong kong": "HKG",
-        
-        # Taiwan
-        "taipei": "TPE",
-        
-        # Iceland
-        "reykjavik": "KEF",
-        
-        # Denmark
-        "copenhagen": "CPH",
-        "aarhus": "AAR",
-        
-        # Sweden
-        "stockholm": "ARN",
-        "gothenburg": "GOT",
-        
-        # Norway
-        "oslo": "OSL",
-        "bergen": "BGO",
-        
-        # Finland
-        "helsinki": "HEL",
-        
-        # Belgium
-        "brussels": "BRU",
-        "antwerp": "ANR",
-        
-        # Ireland
-        "dublin": "DUB",
-        "cork": "ORK",
-        
-        # Poland
-        "warsaw": "WAW",
-        "krakow": "KRK",
-        
-        # Czech Republic
-        "prague": "PRG",
-        
-        # Hungary
-        "budapest": "BUD",
-        
-        # Croatia
-        "zagreb": "ZAG",
-        "dubrovnik": "DBV",
-        
-        # Serbia
-        "belgrade": "BEG",
-        
-        # Romania
-        "bucharest": "OTP",
-        
-        # Bulgaria
-        "sofia": "SOF",
-        
-        # Ukraine
-        "kyiv": "KBP",
-        "kiev": "KBP",
-    }
-
-    # Handle city names with countries like "Paris, France" or "Dubai, UAE"
-    # Split by comma and take the first part
-    city_only = city_name.split(',')[0].lower().strip()
-    return city_to_airport.get(city_only, city_name.upper()[:3])
+def _get_airport_codes(city_name: str, limit: int = 1) -> List[str]:
+    """
+    Map a city name to up to ``limit`` of its airports' IATA codes, primary
+    first, via the offline index.
+
+    Unknown or ambiguous names raise 422 with the closest candidates rather
+    than searching SerpAPI under a guessed code.
+    """
+    index: AirportIndex = services.get("airport_index")
+    matches = index.resolve(city_name, max(limit, 3), settings.airport_match_min_confidence)
+    if matches:
+        # Only airports serving the best-matching name, not other fuzzy matches
+        name = matches[0].matched
+        return [m.airport.iata for m in matches if m.matched == name][:limit]
+
+    suggestions = [
+        f"{m.airport.city} ({m.airport.iata})" for m in index.resolve(city_name, 3, 0.4)
+    ]
+    detail = f"Unknown city '{city_name}'."
+    if suggestions:
+        detail = f"Unknown city '{city_name}'; did you mean {', '.join(suggestions)}?"
+    raise HTTPException(
+        status_code=422,
+        detail=f"{detail} Pass departure_id/arrival_id as IATA codes instead.",
+    )
+
+
+@router.get("/calendar", response_model=FlightCalendarResponse)
+async def flight_calendar(
+    trip_id: str = Query(..., description="Trip ID whose dates anchor the calendar"),
+    days: int = Query(
+        1, ge=0, description="Days before and after the trip's dates to try"
+    ),
+    departure_id: Optional[str] = Query(
+        None, description="IATA departure airport code (e.g., 'JFK')"
+    ),
+    arrival_id: Optional[str] = Query(
+        None, description="IATA arrival airport code (e.g., 'NRT')"
+    ),
+    currency: Optional[str] = Query("USD", description="Currency code (e.g., 'USD')"),
+    hl: Optional[str] = Query("en", description="Language code (e.g., 'en')"),
+    stream: bool = Query(False, description="Stream cells as Server-Sent Events"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Flexible-date price calendar around a trip's start and end dates.
+
+    Searches every outbound date within ``days`` of the trip's start against
+    every return date within ``days`` of its end, concurrently and through
+    the per-query response cache, and returns the min-price matrix with the
+    cheapest itinerary per cell.
+
+    With ``stream=true`` the result is sent as Server-Sent Events instead:
+    - `cell`: one `CalendarCell`, as soon as its search completes
+    - `calendar`: the matrix (without cells) once every search is done
+    - `done`: end of the stream
+    """
+    if days > settings.flight_calendar_max_days:
+        raise HTTPException(
+            status_code=422,
+            detail=f"days must be at most {settings.flight_calendar_max_days}",
+        )
+
+    trip = await trips_service.get_trip_by_id(session, trip_id, current_user.id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    dep_id = (departure_id or _get_airport_codes(trip.from_city)[0]).strip().upper()
+    arr_id = (arrival_id or _get_airport_codes(trip.to_city)[0]).strip().upper()
+    outbound_dates = _date_window(trip.start_date, days)
+    return_dates = _date_window(trip.end_date, days)
+    currency = (currency or "USD").upper()
+
+    cells = flight_search_service.search_calendar(
+        departure_id=dep_id,
+        arrival_id=arr_id,
+        outbound_dates=outbound_dates,
+        return_dates=return_dates,
+        adults=trip.adults,
+        children=trip.children,
+        currency=currency,
+        hl=hl,
+    )
+
+    def calendar(found: List[CalendarCell]) -> FlightCalendarResponse:
+        return _calendar_response(
+            trip_id, dep_id, arr_id, currency, outbound_dates, return_dates, found
+        )
+
+    if not stream:
+        return calendar([cell async for cell in cells])
+
+    async def event_stream():
+        found = []
+        try:
+            async for cell in cells:
+                found.append(cell)
+                yield format_sse("cell", cell.model_dump(mode="json"))
+        finally:
+            await cells.aclose()  # Cancels outstanding searches on disconnect
+        summary = calendar(found).model_dump(mode="json", exclude={"cells"})
+        yield format_sse("calendar", summary)
+        yield format_sse("done", {"trip_id": trip_id, "cells": len(found)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _date_window(center: datetime, days: int) -> List[str]:
+    return [
+        (center + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for offset in range(-days, days + 1)
+    ]
+
+
+def _calendar_response(
+    trip_id: str,
+    departure_id: str,
+    arrival_id: str,
+    currency: str,
+    outbound_dates: List[str],
+    return_dates: List[str],
+    cells: List[CalendarCell],
+) -> FlightCalendarResponse:
+    by_dates = {(cell.outbound_date, cell.return_date): cell for cell in cells}
+    prices = [
+        [
+            by_dates[(out, ret)].min_price if (out, ret) in by_dates else None
+            for ret in return_dates
+        ]
+        for out in outbound_dates
+    ]
+    priced = [cell for cell in cells if cell.min_price is not None]
+    return FlightCalendarResponse(
+        trip_id=trip_id,
+        departure_id=departure_id,
+        arrival_id=arrival_id,
+        currency=currency,
+        outbound_dates=outbound_dates,
+        return_dates=return_dates,
+        prices=prices,
+        cheapest=min(priced, key=lambda cell: cell.min_price, default=None),
+        cells=sorted(cells, key=lambda cell: (cell.outbound_date, cell.return_date or "")),
+    )
+
+
+@router.get("/search/{search_id}", response_model=FlightSearchResponse)
+async def get_flight_search(
+    search_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Return the stored results of a previous flight search."""
+    search, flights = await _stored_search(session, search_id, current_user)
+    return FlightSearchResponse(
+        trip_id=search.trip_id,
+        search_id=search.id,
+        flights=flights,
+        search_params=search.query,
+        total_results=len(flights),
+    )
+
+
+async def _stored_search(
+    session: AsyncSession, search_id: str, user: Optional[User]
+) -> tuple[FlightSearch, list[Itinerary]]:
+    """Load a stored search of one of the user's trips, or raise 401/404."""
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Authentication required to use stored search results",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    stored = await load_search(session, search_id)
+    if stored is None or not await trips_service.owns_trip(
+        session, stored[0].trip_id, user.id
+    ):
+        raise HTTPException(status_code=404, detail="Flight search not found")
+    return stored
 
 
 @router.post("/rank", response_model=RankResponse)
-async def rank_flights(req: RankRequest):
-    """Rank flight itineraries using AI (or heuristic fallback)."""
+async def rank_flights(
+    req: RankRequest,
+    ranker: OpenAIFlightRanker = Depends(_ranker),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
+    """
+    Rank flight itineraries using AI (or heuristic fallback).
+
+    Without ``flights`` the stored results of ``search_id`` are ranked, so
+    re-ranking with new preferences needs neither SerpAPI nor a re-upload
+    (requires the Bearer token of the trip's owner).
+    """
+    if req.flights is None:
+        _, flights = await _stored_search(session, req.search_id, current_user)
+        req = req.model_copy(update={"flights": flights})
+
     try:
-        ranker = OpenAIFlightRanker()
         result = await ranker.rank_flights(req)
         return result
     except Exception as e:
@@ -476,9 +394,14 @@ async def rank_flights(req: RankRequest):
 
 
 @router.post("/ai-rank", response_model=RankResponse)
-async def rank_flights_alias(req: RankRequest):
+async def rank_flights_alias(
+    req: RankRequest,
+    ranker: OpenAIFlightRanker = Depends(_ranker),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+):
     """Legacy alias: /ai-rank -> /rank"""
-    return await rank_flights(req)
+    return await rank_flights(req, ranker, session, current_user)
 
 
 @router.post("/select")
@@ -491,33 +414,33 @@ async def select_flight_for_trip(
     try:
         print(f"🛫 Flight selection for trip {req.trip_id}")
 
-        # Get the trip and verify ownership
-        trip = await trips_service.get_trip_by_id(session, req.trip_id, current_user.id)
-        if not trip:
+        # Verify ownership; the trip row itself isn't needed
+        if not await trips_service.owns_trip(session, req.trip_id, current_user.id):
             raise HTTPException(status_code=404, detail="Trip not found")
 
-        print(f"✅ Trip found: {trip.from_city} → {trip.to_city}")
-
-        # Update trip with flight information directly
-        trip.selected_flight_id = req.flight_id
-        trip.selected_flight_airline = req.airline
-        trip.selected_flight_number = req.flight_number
-        trip.selected_flight_departure_airport = req.departure_airport
-        trip.selected_flight_arrival_airport = req.arrival_airport
-        trip.selected_flight_departure_time = req.departure_time
-        trip.selected_flight_arrival_time = req.arrival_time
-        trip.selected_flight_price = req.price
-        trip.selected_flight_currency = req.currency
-        trip.selected_flight_duration_min = req.total_duration_min
-        trip.selected_flight_stops = req.stops
-        trip.selected_flight_score = req.score
-        trip.selected_flight_title = req.title
-        trip.selected_flight_pros = req.pros_keywords
-        trip.selected_flight_cons = req.cons_keywords
+        # Upsert the trip's flight row (trip_flights, keyed by trip)
+        flight = await session.get(TripFlight, req.trip_id) or TripFlight(
+            trip_id=req.trip_id
+        )
+        flight.flight_id = req.flight_id
+        flight.airline = req.airline
+        flight.flight_number = req.flight_number
+        flight.departure_airport = req.departure_airport
+        flight.arrival_airport = req.arrival_airport
+        flight.departure_time = req.departure_time
+        flight.arrival_time = req.arrival_time
+        flight.price = req.price
+        flight.currency = req.currency
+        flight.duration_min = req.total_duration_min
+        flight.stops = req.stops
+        flight.score = req.score
+        flight.title = req.title
+        flight.pros = req.pros_keywords
+        flight.cons = req.cons_keywords
+        session.add(flight)
 
         # Save to database
         await session.commit()
-        await session.refresh(trip)
 
         print(f"✅ Flight {req.airline} {req.flight_number} saved successfully!")
 
@@ -525,7 +448,7 @@ async def select_flight_for_trip(
         return {
             "success": True,
             "message": f"Flight {req.airline} {req.flight_number} successfully added to trip",
-            "trip_id": trip.id,
+            "trip_id": req.trip_id,
             "flight": {
                 "airline": req.airline,
                 "flight_number": req.flight_number,
@@ -549,19 +472,13 @@ async def select_flight_for_trip(
 
 @router.get("/{trip_id}/selection")
 async def get_flight_selection(
-    trip_id: str,
+    trip_id: str = Depends(require_trip_owner),
     session=Depends(get_async_session),
-    current_user: User = Depends(get_current_user),
 ):
     """Get the selected flight for a trip."""
     try:
-        # Get the trip and verify ownership
-        trip = await trips_service.get_trip_by_id(session, trip_id, current_user.id)
-        if not trip:
-            raise HTTPException(status_code=404, detail="Trip not found")
-
-        # Build flight info
-        selected_flight = trips_service._build_selected_flight_info(trip)
+        flight = await session.get(TripFlight, trip_id)
+        selected_flight = trips_service._build_selected_flight_info(flight)
 
         if not selected_flight:
             return {
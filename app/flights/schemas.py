@@ -3,7 +3,9 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.ranking.engine import FLIGHT_SCORING
 
 
 class Price(BaseModel):
@@ -64,19 +66,64 @@ class FlightSearchResponse(BaseModel):
     """Response containing flight search results."""
 
     trip_id: str
-    search_id: str
+    search_id: Optional[str] = None  # None when nothing was found (not stored)
     flights: List[Itinerary]
     search_params: dict
     total_results: int
 
 
+class CalendarCell(BaseModel):
+    """The cheapest itinerary for one outbound/return date combination."""
+
+    outbound_date: str
+    return_date: Optional[str] = None
+    min_price: Optional[float] = None
+    currency: Optional[str] = None
+    itinerary: Optional[Itinerary] = None
+    error: Optional[str] = None
+
+
+class FlightCalendarResponse(BaseModel):
+    """Min-price matrix around a trip's dates.
+
+    ``prices[i][j]`` is the cheapest fare leaving on ``outbound_dates[i]`` and
+    returning on ``return_dates[j]`` (None when nothing was found or the
+    return precedes the departure); ``cells`` holds the matching itineraries.
+    """
+
+    trip_id: str
+    departure_id: str
+    arrival_id: str
+    currency: str
+    outbound_dates: List[str]
+    return_dates: List[str]
+    prices: List[List[Optional[float]]]
+    cheapest: Optional[CalendarCell] = None
+    cells: List[CalendarCell]
+
+
 class RankRequest(BaseModel):
-    """Request for flight ranking."""
+    """Request for flight ranking.
+
+    ``flights`` may be omitted to rank the stored results of ``search_id``
+    (as returned by ``GET /flights/search``).
+    """
 
     search_id: str
-    flights: List[Itinerary]
+    flights: Optional[List[Itinerary]] = None
     preferences_prompt: str
     locale: Optional[Locale] = None
+    weights: Optional[Dict[str, float]] = Field(
+        None,
+        description="Heuristic scoring weights: price, duration, stops, emissions, layover",
+    )
+
+    @field_validator("weights")
+    @classmethod
+    def validate_weights(cls, v):
+        if v is not None:
+            FLIGHT_SCORING.resolve_weights(v)
+        return v
 
 
 class RankItem(BaseModel):
@@ -0,0 +1,121 @@
+"""Persisted flight searches, so results can be re-read and re-ranked by id."""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.models import FlightOption, FlightSearch, FlightSelection
+from app.flights.schemas import Itinerary
+
+logger = get_logger(__name__)
+
+# Kept in their own columns (price) or once per search (URL)
+_NOT_IN_PAYLOAD = {"price", "google_flights_url"}
+
+
+def _payload(flight: Itinerary, google_flights_url: Optional[str]) -> Dict[str, Any]:
+    payload = flight.model_dump(mode="json", exclude=_NOT_IN_PAYLOAD, exclude_none=True)
+    # Metro-area searches mix URLs; keep the ones that differ from the search's
+    if flight.google_flights_url and flight.google_flights_url != google_flights_url:
+        payload["google_flights_url"] = flight.google_flights_url
+    return payload
+
+
+async def save_search(
+    session: AsyncSession,
+    trip_id: str,
+    params: Dict[str, Any],
+    flights: List[Itinerary],
+    google_flights_url: Optional[str],
+) -> str:
+    """
+    Store a search and its itineraries; returns the new search_id.
+
+    Each itinerary becomes a ``FlightOption`` row (written in one executemany)
+    with price and airline as columns and the rest as a compact JSON payload.
+    The Google Flights URL is stored once on the search; an option keeps its
+    own only when it differs (metro-area searches). Commits.
+    """
+    search_id = str(uuid.uuid4())
+    session.add(
+        FlightSearch(
+            id=search_id,
+            trip_id=trip_id,
+            query=params,
+            google_flights_url=google_flights_url,
+        )
+    )
+    await session.flush()
+
+    if flights:
+        await session.execute(
+            insert(FlightOption),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    "search_id": search_id,
+                    "position": position,
+                    "provider": flight.legs[0].marketing if flight.legs else "",
+                    "price_amount": flight.price.amount,
+                    "price_currency": flight.price.currency,
+                    "payload": _payload(flight, google_flights_url),
+                }
+                for position, flight in enumerate(flights)
+            ],
+        )
+    await session.commit()
+    return search_id
+
+
+async def load_search(
+    session: AsyncSession, search_id: str
+) -> Optional[Tuple[FlightSearch, List[Itinerary]]]:
+    """The stored search and its itineraries in result order, or None."""
+    search = await session.get(FlightSearch, search_id)
+    if search is None:
+        return None
+
+    result = await session.execute(
+        select(
+            FlightOption.payload, FlightOption.price_amount, FlightOption.price_currency
+        )
+        .where(FlightOption.search_id == search_id)
+        .order_by(FlightOption.position)
+    )
+    flights = [
+        Itinerary.model_validate(
+            {
+                "google_flights_url": search.google_flights_url,
+                **payload,
+                "price": {"amount": float(amount), "currency": currency},
+            }
+        )
+        for payload, amount, currency in result.all()
+    ]
+    return search, flights
+
+
+async def prune_searches(session: AsyncSession, max_age_days: int) -> int:
+    """
+    Delete searches (and their options) older than ``max_age_days``.
+
+    Searches with a selected option are kept. Returns the number of searches
+    deleted. Commits.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    selected = select(FlightOption.search_id).join(
+        FlightSelection, FlightSelection.option_id == FlightOption.id
+    )
+    expired = select(FlightSearch.id).where(
+        FlightSearch.created_at < cutoff, FlightSearch.id.not_in(selected)
+    )
+    await session.execute(delete(FlightOption).where(FlightOption.search_id.in_(expired)))
+    result = await session.execute(delete(FlightSearch).where(FlightSearch.id.in_(expired)))
+    await session.commit()
+    if result.rowcount:
+        logger.info(f"Pruned {result.rowcount} flight searches older than {max_age_days} days")
+    return result.rowcount
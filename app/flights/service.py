@@ -1,21 +1,126 @@
 """Flight search service using SerpAPI."""
 
-import uuid
+import asyncio
+import hashlib
+import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 import httpx
 
+from app.core.cache import ResponseCache, cache_key, create_response_cache
+from app.core.http import HTTPClientPool, http_pool
+from app.core.metrics import register_metrics
 from app.core.settings import settings
-from app.flights.schemas import FlightLeg, Itinerary, Price
+from app.core.singleflight import SingleFlight, create_singleflight
+from app.flights.schemas import CalendarCell, FlightLeg, Itinerary, Price
+
+
+def _build_flight_cache() -> Optional[ResponseCache]:
+    """Create the flight search cache from settings (None when disabled)."""
+    if not settings.flight_cache_enabled:
+        return None
+    cache = create_response_cache(
+        "google_flights",
+        backend=settings.flight_cache_backend,
+        ttl_seconds=settings.flight_cache_ttl_seconds,
+        stale_seconds=settings.flight_cache_stale_seconds,
+        max_entries=settings.flight_cache_max_entries,
+        path=settings.flight_cache_path,
+    )
+    register_metrics("flight_search_cache", cache.stats)
+    return cache
+
+
+# Shared across instances so concurrent identical searches coalesce
+_flights_singleflight = create_singleflight("google_flights")
+
+
+def itinerary_signature(legs: Sequence[FlightLeg]) -> Tuple[Tuple[str, str, str], ...]:
+    """
+    The flights an itinerary is made of: (carrier, flight number, departure)
+    per leg, normalized so "QR 3" and "QR3" compare equal.
+    """
+    return tuple(
+        (
+            " ".join(leg.marketing.split()).casefold(),
+            "".join(leg.flight_no.split()).upper(),
+            leg.dep_time.isoformat(),
+        )
+        for leg in legs
+    )
+
+
+def itinerary_id(legs: Sequence[FlightLeg], price: Price) -> str:
+    """
+    Stable ID for an itinerary: a hash of its leg signature and fare, so the
+    same flight at the same price keeps its ID across searches.
+    """
+    canonical = json.dumps(
+        [itinerary_signature(legs), round(price.amount, 2), price.currency.upper()],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _fare_rank(itinerary: Itinerary) -> Tuple[bool, float]:
+    """Sort key for fares: cheapest first, unknown fares (parsed as 0) last."""
+    amount = itinerary.price.amount
+    return (amount <= 0, amount)
+
+
+def dedupe_itineraries(flights: Sequence[Itinerary]) -> List[Itinerary]:
+    """
+    Merge itineraries that fly the same legs, in first-seen order.
+
+    The cheapest known fare wins (the earlier one on a tie; a copy without a
+    fare never replaces a priced one) and takes over fields only a duplicate
+    had, such as emissions.
+    """
+    merged: Dict[Tuple, Itinerary] = {}
+    for flight in flights:
+        signature = itinerary_signature(flight.legs)
+        kept = merged.get(signature)
+        if kept is None:
+            merged[signature] = flight
+            continue
+        if _fare_rank(flight) < _fare_rank(kept):
+            cheaper, other = flight, kept
+        else:
+            cheaper, other = kept, flight
+        missing = {
+            field: getattr(other, field)
+            for field in ("emissions_kg", "google_flights_url")
+            if getattr(cheaper, field) is None and getattr(other, field) is not None
+        }
+        merged[signature] = cheaper.model_copy(update=missing) if missing else cheaper
+    return list(merged.values())
+
+
+def merge_itineraries(flights: Sequence[Itinerary]) -> List[Itinerary]:
+    """
+    De-duplicate itineraries (see ``dedupe_itineraries``), ordered by price,
+    then duration; itineraries without a fare come last.
+    """
+    return sorted(
+        dedupe_itineraries(flights), key=lambda f: (*_fare_rank(f), f.total_duration_min)
+    )
 
 
 class FlightSearchService:
     """Service for searching flights via SerpAPI Google Flights."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        http: Optional[HTTPClientPool] = None,
+        cache: Optional[ResponseCache] = None,
+        singleflight: Optional[SingleFlight] = None,
+    ):
         self.api_key = settings.serpapi_key
         self.base_url = "https://serpapi.com/search"
+        self.http = http or http_pool
+        self.cache = cache if cache is not None else _build_flight_cache()
+        self.singleflight = singleflight or _flights_singleflight
 
     async def search_flights(
         self,
@@ -27,6 +132,7 @@ class FlightSearchService:
         children: int = 0,
         currency: str = "USD",
         hl: str = "en",
+        limiter: Optional[asyncio.Semaphore] = None,
     ) -> tuple[List[Itinerary], Optional[str]]:
         """
         Search for flights using SerpAPI.
@@ -40,17 +146,23 @@ class FlightSearchService:
             children: Number of child passengers
             currency: Currency code (e.g., "USD")
             hl: Language code (e.g., "en")
+            limiter: Semaphore held only while calling SerpAPI; cache hits
+                don't wait for it
 
         Returns:
-            List of Itinerary objects
+            List of Itinerary objects and the Google Flights URL. Results are
+            served from the response cache when an identical query is fresh.
         """
+        departure_id = departure_id.strip().upper()
+        arrival_id = arrival_id.strip().upper()
+
         params = {
             "engine": "google_flights",
             "departure_id": departure_id,
             "arrival_id": arrival_id,
             "outbound_date": outbound_date,
-            "currency": currency,
-            "hl": hl,
+            "currency": (currency or "USD").upper(),
+            "hl": (hl or "en").lower(),
             "api_key": self.api_key,
         }
 
@@ -66,47 +178,218 @@ class FlightSearchService:
         if children > 0:
             params["children"] = children
 
+        key = cache_key("google_flights", params)
+
+        async def fetch_flights():
+            if limiter is None:
+                return await self._fetch_flights(params)
+            async with limiter:
+                return await self._fetch_flights(params)
+
+        def fetch():
+            return self.singleflight.do(key, fetch_flights)
+
+        if self.cache is None:
+            result = await fetch()
+        else:
+            result = await self.cache.get_or_fetch(
+                key,
+                fetch,
+                ttl_seconds=self._route_ttl(departure_id, arrival_id),
+                cache_if=lambda r: bool(r["flights"]),
+            )
+
+        flights = [Itinerary.model_validate(f) for f in result["flights"]]
+        return flights, result["google_flights_url"]
+
+    async def search_metro(
+        self,
+        departure_ids: Sequence[str],
+        arrival_ids: Sequence[str],
+        outbound_date: str,
+        return_date: Optional[str] = None,
+        adults: int = 1,
+        children: int = 0,
+        currency: str = "USD",
+        hl: str = "en",
+        concurrency: Optional[int] = None,
+    ) -> tuple[List[Itinerary], Optional[str]]:
+        """
+        Search every departure/arrival airport pair of two metro areas.
+
+        Pairs run concurrently (at most ``concurrency`` at a time) through
+        ``search_flights``, so each pair is cached and coalesced on its own
+        and a fan-out within the limit takes about as long as one search.
+        Each itinerary keeps its own pair's Google Flights URL; the merged
+        list is de-duplicated and ordered by price. Returns the URL of the
+        first pair (the primary airports) that produced one. Pairs that fail
+        are skipped; if every pair fails the first error is raised.
+        """
+        pairs = [
+            (dep, arr)
+            for dep in dict.fromkeys(d.strip().upper() for d in departure_ids)
+            for arr in dict.fromkeys(a.strip().upper() for a in arrival_ids)
+            if dep != arr
+        ]
+        if not pairs:
+            return [], None
+        semaphore = asyncio.Semaphore(concurrency or settings.flight_metro_concurrency)
+
+        async def search_pair(dep: str, arr: str):
+            async with semaphore:
+                flights, url = await self.search_flights(
+                    departure_id=dep,
+                    arrival_id=arr,
+                    outbound_date=outbound_date,
+                    return_date=return_date,
+                    adults=adults,
+                    children=children,
+                    currency=currency,
+                    hl=hl,
+                )
+            for flight in flights:
+                flight.google_flights_url = url
+            return flights, url
+
+        results = await asyncio.gather(
+            *(search_pair(dep, arr) for dep, arr in pairs), return_exceptions=True
+        )
+        found = [r for r in results if not isinstance(r, BaseException)]
+        if not found:
+            raise results[0]
+        for (dep, arr), result in zip(pairs, results):
+            if isinstance(result, BaseException):
+                print(f"⚠️  Metro search {dep} → {arr} failed: {result}")
+
+        flights = merge_itineraries([f for pair_flights, _ in found for f in pair_flights])
+        url = next((url for _, url in found if url), None)
+        return flights, url
+
+    async def search_calendar(
+        self,
+        departure_id: str,
+        arrival_id: str,
+        outbound_dates: Sequence[str],
+        return_dates: Sequence[Optional[str]],
+        adults: int = 1,
+        children: int = 0,
+        currency: str = "USD",
+        hl: str = "en",
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[CalendarCell]:
+        """
+        Search every outbound/return date combination and yield one
+        ``CalendarCell`` per combination as soon as it completes.
+
+        Combinations returning before they leave are skipped. Cells go
+        through ``search_flights`` concurrently, with at most ``concurrency``
+        SerpAPI calls in flight; cells already in the response cache don't
+        wait for that budget and arrive first. A failed search yields a cell
+        with ``error`` set. Closing the iterator cancels the outstanding
+        searches.
+        """
+        limiter = asyncio.Semaphore(concurrency or settings.flight_calendar_concurrency)
+
+        async def search_cell(out: str, ret: Optional[str]) -> CalendarCell:
+            try:
+                flights, url = await self.search_flights(
+                    departure_id=departure_id,
+                    arrival_id=arrival_id,
+                    outbound_date=out,
+                    return_date=ret,
+                    adults=adults,
+                    children=children,
+                    currency=currency,
+                    hl=hl,
+                    limiter=limiter,
+                )
+            except Exception as e:
+                return CalendarCell(outbound_date=out, return_date=ret, error=str(e))
+
+            # Itineraries without a fare (parsed as 0) can't be the cheapest
+            priced = [f for f in flights if f.price.amount > 0]
+            best = min(priced, key=lambda f: f.price.amount, default=None)
+            if best is None:
+                return CalendarCell(outbound_date=out, return_date=ret)
+            best.google_flights_url = url
+            return CalendarCell(
+                outbound_date=out,
+                return_date=ret,
+                min_price=best.price.amount,
+                currency=best.price.currency,
+                itinerary=best,
+            )
+
+        tasks = [
+            asyncio.create_task(search_cell(out, ret))
+            for out in outbound_dates
+            for ret in return_dates
+            if ret is None or ret >= out
+        ]
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                # Debug: Check what we got from SerpAPI
-                print(f"📊 SerpAPI Response keys: {list(data.keys())}")
-                if "search_information" in data:
-                    print(f"📋 Search info: {data['search_information']}")
-                if "error" in data:
-                    print(f"⚠️  SerpAPI error: {data['error']}")
-
-                # Parse flights from response
-                flights = []
-
-                # Get best flights
-                if "best_flights" in data:
-                    print(f"✈️  Found {len(data['best_flights'])} best_flights")
-                    for idx, flight_data in enumerate(data["best_flights"][:2]):  # Debug first 2
-                        print(f"📋 Sample flight {idx}: {flight_data.get('flights', [])} legs")
-                    for flight_data in data["best_flights"]:
-                        itinerary = self._parse_flight(flight_data)
-                        if itinerary:
-                            flights.append(itinerary)
-
-                # Get other flights
-                if "other_flights" in data:
-                    print(f"✈️  Found {len(data['other_flights'])} other_flights")
-                    for flight_data in data["other_flights"]:
-                        itinerary = self._parse_flight(flight_data)
-                        if itinerary:
-                            flights.append(itinerary)
-
-                print(f"✅ Successfully parsed {len(flights)} itineraries")
-                
-                # Get the Google Flights URL from search metadata
-                google_flights_url = data.get("search_metadata", {}).get("google_flights_url")
-                
-                # Limit to 20 flights
-                return flights[:20], google_flights_url
+            for next_cell in asyncio.as_completed(tasks):
+                yield await next_cell
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _route_ttl(self, departure_id: str, arrival_id: str) -> int:
+        """Freshness for a route, honouring per-route overrides."""
+        return settings.flight_cache_route_ttls.get(
+            f"{departure_id}-{arrival_id}", settings.flight_cache_ttl_seconds
+        )
+
+    async def _fetch_flights(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Call SerpAPI and return JSON-serializable parsed results."""
+        try:
+            response = await self.http.get(self.base_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            # Debug: Check what we got from SerpAPI
+            print(f"📊 SerpAPI Response keys: {list(data.keys())}")
+            if "search_information" in data:
+                print(f"📋 Search info: {data['search_information']}")
+            if "error" in data:
+                print(f"⚠️  SerpAPI error: {data['error']}")
+
+            # Parse flights from response
+            flights = []
+
+            # Get best flights
+            if "best_flights" in data:
+                print(f"✈️  Found {len(data['best_flights'])} best_flights")
+                for idx, flight_data in enumerate(data["best_flights"][:2]):  # Debug first 2
+                    print(f"📋 Sample flight {idx}: {flight_data.get('flights', [])} legs")
+                for flight_data in data["best_flights"]:
+                    itinerary = self._parse_flight(flight_data)
+                    if itinerary:
+                        flights.append(itinerary)
+
+            # Get other flights
+            if "other_flights" in data:
+                print(f"✈️  Found {len(data['other_flights'])} other_flights")
+                for flight_data in data["other_flights"]:
+                    itinerary = self._parse_flight(flight_data)
+                    if itinerary:
+                        flights.append(itinerary)
+
+            print(f"✅ Successfully parsed {len(flights)} itineraries")
+
+            # best_flights and other_flights can list the same itinerary
+            unique = dedupe_itineraries(flights)
+            if len(unique) < len(flights):
+                print(f"🔁 Merged {len(flights) - len(unique)} duplicate itineraries")
+            flights = unique
+            
+            # Get the Google Flights URL from search metadata
+            google_flights_url = data.get("search_metadata", {}).get("google_flights_url")
+            
+            # Limit to 20 flights
+            return {
+                "flights": [f.model_dump(mode="json") for f in flights[:20]],
+                "google_flights_url": google_flights_url,
+            }
 
         except httpx.HTTPError as e:
             print(f"❌ SerpAPI HTTP Error: {e}")
@@ -118,9 +401,6 @@ class FlightSearchService:
     def _parse_flight(self, flight_data: dict) -> Optional[Itinerary]:
         """Parse a single flight from SerpAPI response."""
         try:
-            # Generate unique ID for this flight
-            flight_id = str(uuid.uuid4())
-
             # Parse price
             price = Price(
                 amount=float(flight_data.get("price", 0)),
@@ -182,7 +462,7 @@ class FlightSearchService:
 
             # Create itinerary
             itinerary = Itinerary(
-                id=flight_id,
+                id=itinerary_id(legs, price),
                 price=price,
                 total_duration_min=total_duration,
                 stops=stops,
@@ -0,0 +1,21 @@
+"""Offline geography: the airport index and city resolution."""
+
+from .airports import (
+    Airport,
+    AirportIndex,
+    AirportMatch,
+    NearbyAirport,
+    haversine_km,
+    normalize,
+)
+from .cities import CityResolver
+
+__all__ = [
+    "Airport",
+    "AirportIndex",
+    "AirportMatch",
+    "CityResolver",
+    "NearbyAirport",
+    "haversine_km",
+    "normalize",
+]
@@ -0,0 +1,320 @@
+"""Offline airport index: city/alias lookup, fuzzy matching, nearest airports."""
+
+import csv
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.metrics import register_metrics
+from app.core.services import services
+
+DATASET = Path(__file__).resolve().parent / "data" / "airports.csv"
+EARTH_RADIUS_KM = 6371.0
+TYPE_RANK = {"large": 0, "medium": 1}
+FUZZY_CANDIDATES = 4
+
+
+@dataclass(frozen=True)
+class Airport:
+    iata: str
+    name: str
+    city: str
+    country: str  # ISO 3166-1 alpha-2
+    latitude: float
+    longitude: float
+    type: str  # "large" or "medium"
+
+
+@dataclass(frozen=True)
+class AirportMatch:
+    """A name lookup result; ``confidence`` is 1.0 for exact matches."""
+
+    airport: Airport
+    confidence: float
+    matched: str  # The normalized name or alias that matched
+
+
+@dataclass(frozen=True)
+class NearbyAirport:
+    airport: Airport
+    distance_km: float
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII words: "São Paulo" -> "sao paulo", "Xi'an" -> "xian"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace("'", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Damerau-Levenshtein distance (optimal string alignment)."""
+    previous2: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            best = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < best:
+                best = previous[j] + 1
+            if current[j - 1] + 1 < best:
+                best = current[j - 1] + 1
+            if (
+                previous2 is not None
+                and j > 1
+                and ca == b[j - 2]
+                and a[i - 2] == cb
+                and previous2[j - 2] + 1 < best
+            ):
+                best = previous2[j - 2] + 1
+            current.append(best)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dphi = p2 - p1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    phi, lmb = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lmb), math.cos(phi) * math.sin(lmb), math.sin(phi))
+
+
+class KDTree:
+    """
+    Static 3-d tree over points on the unit sphere. Euclidean (chord)
+    distance grows with great-circle distance, so the nearest points in 3-d
+    are the nearest on the globe, with no special casing at the poles or the
+    antimeridian.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float, float]]):
+        self.points = list(points)
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices: List[int], depth: int):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        return (
+            indices[mid],
+            axis,
+            self._build(indices[:mid], depth + 1),
+            self._build(indices[mid + 1 :], depth + 1),
+        )
+
+    def query(self, target: Tuple[float, float, float], k: int) -> List[Tuple[float, int]]:
+        """The ``k`` nearest points as ``(squared chord distance, index)``, nearest first."""
+        heap: List[Tuple[float, int]] = []  # Max-heap of the best k (negated distances)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self.points[index]
+            dist = sum((p - t) ** 2 for p, t in zip(point, target))
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist, index))
+            elif dist < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist, index))
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return sorted((-dist, index) for dist, index in heap)
+
+
+class AirportIndex:
+    """
+    In-memory airport and city index built once from the bundled dataset.
+
+    ``resolve`` answers exact city, alias, airport name and IATA code lookups
+    from a dict and falls back to trigram (Dice) similarity for typos;
+    ``nearest`` walks a KD-tree. Each city's airports are kept in dataset
+    order, which lists the primary airport first.
+    """
+
+    def __init__(self, airports: Sequence[Airport], aliases: Sequence[Sequence[str]]):
+        self.airports = list(airports)
+        self._by_iata = {airport.iata: i for i, airport in enumerate(self.airports)}
+        self._by_name: Dict[str, List[int]] = {}
+        for i, airport in enumerate(self.airports):
+            for name in (airport.city, *aliases[i], airport.name):
+                key = normalize(name)
+                if key and i not in self._by_name.setdefault(key, []):
+                    self._by_name[key].append(i)
+
+        self._keys = list(self._by_name)
+        self._key_grams = [trigrams(key) for key in self._keys]
+        self._grams: Dict[str, List[int]] = {}
+        for key_id, grams in enumerate(self._key_grams):
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key_id)
+
+        self._tree = KDTree(
+            [_unit_vector(airport.latitude, airport.longitude) for airport in self.airports]
+        )
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+        self.stats_counters = {"exact": 0, "fuzzy": 0, "misses": 0}
+
+    @classmethod
+    def load(cls, path: Path = DATASET) -> "AirportIndex":
+        airports, aliases = [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                airports.append(
+                    Airport(
+                        iata=row["iata"],
+                        name=row["name"],
+                        city=row["city"],
+                        country=row["country"],
+                        latitude=float(row["latitude"]),
+                        longitude=float(row["longitude"]),
+                        type=row["type"],
+                    )
+                )
+                aliases.append([a for a in row["aliases"].split("|") if a])
+        return cls(airports, aliases)
+
+    def get(self, iata: str) -> Optional[Airport]:
+        index = self._by_iata.get(iata.strip().upper())
+        return None if index is None else self.airports[index]
+
+    def _resolve(
+        self, query: str, limit: int = 5, min_confidence: float = 0.5
+    ) -> Tuple[AirportMatch, ...]:
+        """
+        Airports for a city, alias, airport name or IATA code, best first.
+
+        "City, Country" queries use the part before the comma; a two-letter
+        country code after it moves that country's airports first. Exact
+        matches have confidence 1.0; otherwise names sharing enough trigrams
+        with the query are returned with their Dice similarity. Results are
+        memoized.
+        """
+        name, _, qualifier = query.partition(",")
+        key = normalize(name)
+        country = qualifier.strip().upper()
+        if not key:
+            return ()
+
+        exact = self._by_name.get(key)
+        if exact is None and len(key) == 3 and key.upper() in self._by_iata:
+            exact = [self._by_iata[key.upper()]]
+        if exact is not None:
+            self.stats_counters["exact"] += 1
+            # Dataset order: the city's primary airport first
+            matches = [(1.0, key, i) for i in exact]
+            matches.sort(key=lambda m: self.airports[m[2]].country != country)
+        else:
+            matches = self._fuzzy(key, min_confidence)
+            self.stats_counters["fuzzy" if matches else "misses"] += 1
+            matches.sort(
+                key=lambda m: (
+                    -m[0],
+                    self.airports[m[2]].country != country,
+                    TYPE_RANK.get(self.airports[m[2]].type, 2),
+                    m[2],
+                )
+            )
+        return tuple(
+            AirportMatch(self.airports[i], round(confidence, 3), matched)
+            for confidence, matched, i in matches[:limit]
+        )
+
+    def _fuzzy(self, key: str, min_confidence: float) -> List[Tuple[float, str, int]]:
+        """
+        Names sharing trigrams with ``key``, scored by the better of trigram
+        Dice similarity and edit similarity (which forgives the swapped or
+        dropped letters that break several trigrams in short names). Only the
+        FUZZY_CANDIDATES names of similar length sharing the most trigrams are
+        edit-scored.
+        """
+        grams = trigrams(key)
+        shared = Counter(
+            key_id for gram in grams for key_id in self._grams.get(gram, ())
+        )
+        best: Dict[int, Tuple[float, str]] = {}
+        edits = 0
+        # Dice can't reach min_confidence below this many shared trigrams
+        min_shared = min_confidence * len(grams) / 2
+        for key_id, count in shared.most_common():
+            if count < min_shared and edits >= FUZZY_CANDIDATES:
+                break
+            name = self._keys[key_id]
+            score = 2 * count / (len(grams) + len(self._key_grams[key_id]))
+            if edits < FUZZY_CANDIDATES and abs(len(name) - len(key)) <= 2:
+                edits += 1
+                similarity = 1 - edit_distance(key, name) / max(len(key), len(name))
+                score = max(score, similarity)
+            if score < min_confidence:
+                continue
+            for i in self._by_name[name]:
+                if i not in best or score > best[i][0]:
+                    best[i] = (score, name)
+        return [(score, name, i) for i, (score, name) in best.items()]
+
+    def airport_code(self, query: str, min_confidence: float = 0.5) -> Optional[str]:
+        """IATA code of the best airport for ``query``, or None."""
+        matches = self.resolve(query, 1, min_confidence)
+        return matches[0].airport.iata if matches else None
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        radius_km: Optional[float] = None,
+    ) -> List[NearbyAirport]:
+        """The ``k`` airports nearest to a point, optionally within ``radius_km``."""
+        found = self._tree.query(_unit_vector(latitude, longitude), min(k, len(self.airports)))
+        results = []
+        for _, index in found:
+            airport = self.airports[index]
+            distance = haversine_km(latitude, longitude, airport.latitude, airport.longitude)
+            if radius_km is not None and distance > radius_km:
+                break
+            results.append(NearbyAirport(airport, round(distance, 1)))
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        info = self.resolve.cache_info()
+        return {
+            "airports": len(self.airports),
+            "names": len(self._keys),
+            **self.stats_counters,
+            "memo_hits": info.hits,
+        }
+
+
+def _build_airport_index() -> AirportIndex:
+    """Load the bundled dataset (once, at startup) and publish its counters."""
+    index = AirportIndex.load()
+    register_metrics("airport_index", index.stats)
+    return index
+
+
+services.register("airport_index", _build_airport_index)
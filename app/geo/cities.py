@@ -0,0 +1,128 @@
+"""Persistent city coordinates and city -> airport resolution."""
+
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.core.services import services
+from app.core.settings import settings
+
+from .airports import TYPE_RANK, Airport, AirportIndex, normalize
+
+logger = get_logger(__name__)
+
+Geocoder = Callable[[str], Optional[Tuple[float, float]]]
+
+
+def photon_geocode(city: str) -> Optional[Tuple[float, float]]:
+    """Geocode through Photon when geopy is installed; None otherwise."""
+    try:
+        import certifi
+        from geopy.geocoders import Photon
+    except ImportError:
+        return None
+    os.environ.setdefault("SSL_CERT_FILE", certifi.where())
+    location = Photon(user_agent="qic-trip-url-builder/1.0").geocode(city)
+    return (location.latitude, location.longitude) if location else None
+
+
+class CityResolver:
+    """
+    Resolves city names to airports without touching the network on the
+    hot path.
+
+    Cities in the bundled airport index resolve directly to their airports.
+    Anything else is geocoded once (through ``geocoder``, Photon by default)
+    and the coordinates are written to a JSON file, so later calls and other
+    processes resolve it offline through the index's nearest-airport query.
+    Both steps are memoized per process.
+    """
+
+    def __init__(
+        self,
+        index: AirportIndex,
+        path: Optional[str] = None,
+        geocoder: Optional[Geocoder] = photon_geocode,
+    ):
+        self.index = index
+        self.path = path
+        self.geocoder = geocoder
+        self._coords: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self.geocoded = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._coords = {k: (v[0], v[1]) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable city cache {path}: {e}")
+        self.airports = lru_cache(maxsize=4096)(self._airports)
+
+    def coordinates(self, city: str) -> Tuple[float, float]:
+        """Coordinates of a city: the index, then the cache, then the geocoder."""
+        matches = self.index.resolve(city, 1, settings.airport_match_min_confidence)
+        if matches:
+            airport = matches[0].airport
+            return (airport.latitude, airport.longitude)
+
+        key = normalize(city)
+        cached = self._coords.get(key)
+        if cached is not None:
+            return cached
+        try:
+            found = self.geocoder(city) if self.geocoder else None
+        except Exception as e:
+            # Timeouts and service errors fail this city, not the caller
+            raise ValueError(f"Could not geocode city: {city!r}: {e}") from e
+        if not found:
+            raise ValueError(f"Could not geocode city: {city!r}")
+        self.geocoded += 1
+        self._remember(key, found)
+        return found
+
+    def _remember(self, key: str, coords: Tuple[float, float]) -> None:
+        with self._lock:
+            self._coords[key] = coords
+            if not self.path:
+                return
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({k: list(v) for k, v in self._coords.items()}, f)
+            os.replace(tmp, self.path)
+
+    def _airports(self, city: str, radius_km: float = 150, limit: int = 1) -> Tuple[Airport, ...]:
+        """
+        Up to ``limit`` airports for a city, best first: the index's own
+        airports for known cities, otherwise the airports within
+        ``radius_km`` of its coordinates ranked by size, then distance.
+        """
+        matches = self.index.resolve(city, limit, settings.airport_match_min_confidence)
+        if matches:
+            return tuple(m.airport for m in matches)
+
+        lat, lon = self.coordinates(city)
+        nearby = self.index.nearest(lat, lon, k=16, radius_km=radius_km)
+        nearby.sort(key=lambda n: (TYPE_RANK.get(n.airport.type, 2), n.distance_km))
+        return tuple(n.airport for n in nearby[:limit])
+
+    def stats(self) -> Dict[str, int]:
+        info = self.airports.cache_info()
+        return {
+            "cached_cities": len(self._coords),
+            "geocoded": self.geocoded,
+            "hits": info.hits,
+            "misses": info.misses,
+        }
+
+
+def _build_city_resolver() -> CityResolver:
+    resolver = CityResolver(services.get("airport_index"), settings.city_cache_path)
+    register_metrics("city_resolver", resolver.stats)
+    return resolver
+
+
+services.register("city_resolver", _build_city_resolver)
@@ -1,17 +1,32 @@
 """AI-powered hotel ranking using OpenAI."""
 
 import json
-from typing import Optional
-
-import openai
+from typing import List, Optional
 
+from app.core.llm import get_openai_client, openai_slot
+from app.core.services import services
 from app.core.settings import settings
 from app.hotels.schemas import (
+    HotelForRanking,
     HotelRankItem,
     HotelRankMeta,
     HotelRankRequest,
     HotelRankResponse,
 )
+from app.ranking import (
+    HOTEL_SCORING,
+    ScoredCandidates,
+    Shortlist,
+    diverse_shortlist,
+    merge_ranked_ids,
+    ranking_cache,
+    ranking_cache_key,
+)
+from app.ranking.serialization import compact_table
+
+# Bump whenever the prompts or response format change to invalidate cached rankings
+PROMPT_VERSION = "hotels-v1"
+HEURISTIC_MODEL = "hotel-ranking-heuristic-v1"
 
 
 class OpenAIHotelRanker:
@@ -19,66 +34,108 @@ class OpenAIHotelRanker:
 
     def __init__(self, model: str = "gpt-4o-mini"):
         self.model = model
+        self.prompt_format = settings.ranking_prompt_format
         self.client = None
         if settings.openai_api_key:
-            openai.api_key = settings.openai_api_key
-            self.client = openai.OpenAI(api_key=settings.openai_api_key)
+            self.client = get_openai_client()
 
     async def rank_hotels(self, request: HotelRankRequest) -> HotelRankResponse:
-        """Rank hotels using AI or fallback to heuristic."""
+        """
+        Rank hotels using AI or fallback to heuristic.
+
+        The heuristic scores every hotel; only a diverse top-K shortlist goes
+        to the model and the remaining hotels follow in heuristic order.
+        """
 
         if self.client:
+            hotels = request.hotels
+            scored = self._score(request)
+            shortlist = diverse_shortlist(
+                scored,
+                [(h.property_type, h.hotel_class) for h in hotels],
+                settings.ranking_llm_top_k_hotels,
+                settings.ranking_max_per_group,
+            )
+            limited_hotels = [hotels[i] for i in shortlist.head]
+
+            key = ranking_cache_key(
+                "hotels",
+                self.model,
+                PROMPT_VERSION,
+                request.preferences_prompt,
+                limited_hotels,
+                extra={"prompt_format": self.prompt_format},
+            )
             try:
-                return await self._rank_with_openai(request)
+                ranked = await ranking_cache.get_or_rank(
+                    key,
+                    lambda: self._rank_with_openai(request, limited_hotels),
+                    HotelRankResponse,
+                    overrides={"search_id": request.search_id},
+                )
             except Exception as e:
                 print(f"⚠️  OpenAI ranking failed: {e}, falling back to heuristic")
+                # Built per caller from its own hotels and weights
                 return self._rank_heuristic(request)
+            return self._merge_with_heuristic(ranked, request, scored, shortlist)
         else:
             print("ℹ️  No OpenAI key, using heuristic ranking")
             return self._rank_heuristic(request)
 
-    async def _rank_with_openai(self, request: HotelRankRequest) -> HotelRankResponse:
+    def _merge_with_heuristic(
+        self,
+        ranked: HotelRankResponse,
+        request: HotelRankRequest,
+        scored: ScoredCandidates,
+        shortlist: Shortlist,
+    ) -> HotelRankResponse:
+        """Append the hotels the model did not rank, in heuristic order."""
+        hotels = request.hotels
+        head_ids = [hotels[i].id for i in shortlist.head]
+        tail_ids = [hotels[i].id for i in shortlist.tail]
+        ordered_ids = merge_ranked_ids(ranked.ordered_ids, head_ids, tail_ids)
+
+        items_by_id = {item.id: item for item in ranked.items}
+        unranked = [
+            i for i in shortlist.head + shortlist.tail if hotels[i].id not in items_by_id
+        ]
+        for item in self._heuristic_items(request, scored, unranked):
+            item.tags = ["heuristic"]
+            items_by_id[item.id] = item
+
+        notes = list(ranked.meta.notes or [])
+        if tail_ids:
+            notes.append(
+                f"Model re-ranked the top {len(head_ids)} of {len(hotels)} hotels; "
+                "the rest follow in heuristic order"
+            )
+        return HotelRankResponse(
+            search_id=ranked.search_id,
+            ordered_ids=ordered_ids,
+            items=[items_by_id[i] for i in ordered_ids],
+            meta=ranked.meta.model_copy(update={"notes": notes}),
+        )
+
+    async def _rank_with_openai(
+        self, request: HotelRankRequest, hotels: List[HotelForRanking]
+    ) -> HotelRankResponse:
         """Rank hotels using OpenAI API."""
 
         # Build the prompt
-        hotels_text = self._build_hotels_summary(request)
         system_prompt = self._build_system_prompt()
-        user_prompt = f"""User preferences: {request.preferences_prompt}
-
-Hotels to rank:
-{hotels_text}
-
-Return a JSON array of ranked hotels with this exact structure:
-[
-  {{
-    "id": "hotel_id",
-    "score": 0.95,
-    "title": "Brief descriptive title (max 140 chars)",
-    "rationale_short": "Why this hotel ranks here (max 240 chars)",
-    "pros_keywords": ["keyword1", "keyword2", ...],
-    "cons_keywords": ["keyword1", "keyword2", ...]
-  }},
-  ...
-]
-
-Rules:
-- Score from 0.0 to 1.0 (higher is better)
-- Order by score descending
-- Max 8 keywords per pros/cons
-- Consider: location, price, rating, amenities, user preferences
-- Be concise and specific
-"""
+        user_prompt = self._build_user_prompt(request, hotels)
 
         # Call OpenAI
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
+        async with openai_slot():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.3,
+                response_format={"type": "json_object"},
+            )
 
         # Parse response
         content = response.choices[0].message.content
@@ -105,7 +162,7 @@ Rules:
         ordered_ids = []
 
         # Create a lookup dictionary for hotels by ID
-        hotels_by_id = {hotel.id: hotel for hotel in request.hotels}
+        hotels_by_id = {hotel.id: hotel for hotel in hotels}
 
         # Debug: Print hotel links
         print(f"🔍 Debug: Hotels by ID lookup:")
@@ -141,35 +198,49 @@ Rules:
             ),
         )
 
+    def _score(self, request: HotelRankRequest) -> ScoredCandidates:
+        """Heuristic scores for every hotel in the request."""
+        hotels = request.hotels
+        return HOTEL_SCORING.score(
+            {
+                "rating": [hotel.rating for hotel in hotels],
+                "price": [
+                    hotel.total_price if hotel.total_price > 0 else None
+                    for hotel in hotels
+                ],
+                "reviews": [hotel.reviews_count or 0 for hotel in hotels],
+            },
+            request.weights,
+        )
+
     def _rank_heuristic(self, request: HotelRankRequest) -> HotelRankResponse:
-        """Fallback heuristic ranking based on rating and price."""
-
-        # Calculate scores based on rating and price
-        hotels_with_scores = []
-
-        for hotel in request.hotels:
-            # Base score from rating (0-5 → 0-0.5)
-            rating_score = (hotel.rating or 3.0) / 10.0
-
-            # Price score (lower is better, normalized)
-            prices = [h.total_price for h in request.hotels if h.total_price > 0]
-            if prices:
-                min_price = min(prices)
-                max_price = max(prices)
-                if max_price > min_price:
-                    price_score = 0.3 * (
-                        1 - (hotel.total_price - min_price) / (max_price - min_price)
-                    )
-                else:
-                    price_score = 0.3
-            else:
-                price_score = 0.2
+        """Fallback heuristic ranking based on rating, price and reviews."""
+        scored = self._score(request)
+        items = self._heuristic_items(request, scored, scored.ranked())
+
+        return HotelRankResponse(
+            search_id=request.search_id,
+            ordered_ids=[item.id for item in items],
+            items=items,
+            meta=HotelRankMeta(
+                used_model=HEURISTIC_MODEL,
+                deterministic=True,
+                notes=["Heuristic ranking based on rating, price, and reviews"],
+            ),
+        )
 
-            # Review count bonus (up to 0.2)
-            review_bonus = min(0.2, (hotel.reviews_count or 0) / 1000 * 0.2)
+    def _heuristic_items(
+        self, request: HotelRankRequest, scored: ScoredCandidates, indices: List[int]
+    ) -> List[HotelRankItem]:
+        """Build heuristic rank items for the given hotels (by index)."""
+        hotels = request.hotels
+        scores = scored.scores.tolist()
+        prices = [hotel.total_price for hotel in hotels if hotel.total_price > 0]
+        average_price = sum(prices) / len(prices) if prices else 0
 
-            total_score = rating_score + price_score + review_bonus
-            total_score = min(1.0, max(0.0, total_score))
+        items = []
+        for index in indices:
+            hotel = hotels[index]
 
             # Generate pros/cons
             pros = []
@@ -186,56 +257,61 @@ Rules:
 
             if not hotel.free_cancellation:
                 cons.append("no free cancellation")
-            if hotel.total_price > (sum(prices) / len(prices) if prices else 0):
+            if hotel.total_price > average_price:
                 cons.append("higher price")
 
-            hotels_with_scores.append(
-                {
-                    "hotel": hotel,
-                    "score": total_score,
-                    "pros": pros or ["good option"],
-                    "cons": cons or [],
-                }
+            items.append(
+                HotelRankItem(
+                    id=hotel.id,
+                    score=round(scores[index], 2),
+                    title=f"{hotel.name} - {hotel.location}",
+                    rationale_short=f"Rating {hotel.rating or 'N/A'}/5, ${hotel.total_price:.0f} total, {hotel.reviews_count or 0} reviews",
+                    pros_keywords=pros or ["good option"],
+                    cons_keywords=cons,
+                    tags=None,
+                    link=hotel.link,
+                )
             )
+        return items
 
-        # Sort by score descending
-        hotels_with_scores.sort(key=lambda x: x["score"], reverse=True)
+    def _build_user_prompt(
+        self, request: HotelRankRequest, hotels: List[HotelForRanking]
+    ) -> str:
+        """Build the user prompt with preferences and hotel data."""
+        hotels_text = self._build_hotels_summary(hotels)
+        return f"""User preferences: {request.preferences_prompt}
 
-        # Build response
-        items = []
-        ordered_ids = []
+Hotels to rank:
+{hotels_text}
 
-        for ranked in hotels_with_scores:
-            hotel = ranked["hotel"]
-            item = HotelRankItem(
-                id=hotel.id,
-                score=round(ranked["score"], 2),
-                title=f"{hotel.name} - {hotel.location}",
-                rationale_short=f"Rating {hotel.rating or 'N/A'}/5, ${hotel.total_price:.0f} total, {hotel.reviews_count or 0} reviews",
-                pros_keywords=ranked["pros"],
-                cons_keywords=ranked["cons"],
-                tags=None,
-                link=hotel.link,
-            )
-            items.append(item)
-            ordered_ids.append(item.id)
+Return a JSON array of ranked hotels with this exact structure:
+[
+  {{
+    "id": "hotel_id",
+    "score": 0.95,
+    "title": "Brief descriptive title (max 140 chars)",
+    "rationale_short": "Why this hotel ranks here (max 240 chars)",
+    "pros_keywords": ["keyword1", "keyword2", ...],
+    "cons_keywords": ["keyword1", "keyword2", ...]
+  }},
+  ...
+]
 
-        return HotelRankResponse(
-            search_id=request.search_id,
-            ordered_ids=ordered_ids,
-            items=items,
-            meta=HotelRankMeta(
-                used_model="hotel-ranking-heuristic-v1",
-                deterministic=True,
-                notes=["Heuristic ranking based on rating, price, and reviews"],
-            ),
-        )
+Rules:
+- Score from 0.0 to 1.0 (higher is better)
+- Order by score descending
+- Max 8 keywords per pros/cons
+- Consider: location, price, rating, amenities, user preferences
+- Be concise and specific
+"""
 
-    def _build_hotels_summary(self, request: HotelRankRequest) -> str:
+    def _build_hotels_summary(self, hotels: List[HotelForRanking]) -> str:
         """Build a text summary of hotels for the prompt."""
+        if self.prompt_format == "compact":
+            return self._build_compact_hotels_summary(hotels)
 
         lines = []
-        for i, hotel in enumerate(request.hotels, 1):
+        for i, hotel in enumerate(hotels, 1):
             amenities_str = (
                 ", ".join(hotel.amenities[:5]) if hotel.amenities else "None listed"
             )
@@ -253,6 +329,33 @@ Rules:
 
         return "\n".join(lines)
 
+    def _build_compact_hotels_summary(self, hotels: List[HotelForRanking]) -> str:
+        """Tabular summary: one row per hotel with short column aliases."""
+        currency = hotels[0].currency if hotels else "USD"
+        table = compact_table(
+            ["id", "name", "area", "tot", "ngt", "rt", "rv", "cls", "type", "am", "fc"],
+            (
+                [
+                    hotel.id,
+                    hotel.name,
+                    hotel.location,
+                    round(hotel.total_price),
+                    round(hotel.price_per_night),
+                    hotel.rating,
+                    hotel.reviews_count,
+                    hotel.hotel_class,
+                    hotel.property_type,
+                    (hotel.amenities or [])[:5],
+                    hotel.free_cancellation,
+                ]
+                for hotel in hotels
+            ),
+        )
+        return (
+            f"(tot/ngt=total/nightly price {currency}, rt=rating /5, rv=reviews, "
+            f"cls=stars, am=amenities, fc=free cancellation)\n{table}"
+        )
+
     def _build_system_prompt(self) -> str:
         """Build the system prompt for OpenAI."""
 
@@ -269,3 +372,7 @@ Consider these factors:
 
 Provide honest, balanced assessments. Highlight genuine pros and cons.
 Output must be valid JSON matching the specified structure."""
+
+
+# Built once by the service registry at application startup
+services.register("hotel_ranker", OpenAIHotelRanker)
@@ -4,7 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user
-from app.db import User, get_async_session
+from app.core.services import services
+from app.db import TripHotel, User, get_async_session
 from app.hotels.ai_ranker import OpenAIHotelRanker
 from app.hotels.schemas import (
     HotelPropertyDetailsQuery,
@@ -20,9 +21,14 @@ from app.trips.service import trips_service
 router = APIRouter(prefix="/hotels", tags=["hotels"])
 
 
-def _svc() -> GoogleHotelsService:
-    """Dependency to get Google Hotels service."""
-    return GoogleHotelsService()
+async def _svc() -> GoogleHotelsService:
+    """Dependency to get the shared Google Hotels service."""
+    return services.get("google_hotels")
+
+
+async def _ranker() -> OpenAIHotelRanker:
+    """Dependency to get the shared hotel ranker."""
+    return services.get("hotel_ranker")
 
 
 # ============================================================================
@@ -68,7 +74,9 @@ async def hotel_property_details(
 
 
 @router.post("/rank", response_model=HotelRankResponse)
-async def rank_hotels(req: HotelRankRequest):
+async def rank_hotels(
+    req: HotelRankRequest, ranker: OpenAIHotelRanker = Depends(_ranker)
+):
     """
     Rank hotels using AI-powered analysis.
 
@@ -78,7 +86,6 @@ async def rank_hotels(req: HotelRankRequest):
     Uses OpenAI for intelligent ranking with heuristic fallback.
     """
     try:
-        ranker = OpenAIHotelRanker()
         result = await ranker.rank_hotels(req)
         return result
     except Exception as e:
@@ -87,9 +94,11 @@ async def rank_hotels(req: HotelRankRequest):
 
 
 @router.post("/ai-rank", response_model=HotelRankResponse)
-async def rank_hotels_alias(req: HotelRankRequest):
+async def rank_hotels_alias(
+    req: HotelRankRequest, ranker: OpenAIHotelRanker = Depends(_ranker)
+):
     """Legacy alias: /ai-rank -> /rank"""
-    return await rank_hotels(req)
+    return await rank_hotels(req, ranker)
 
 
 # ============================================================================
@@ -119,30 +128,31 @@ async def select_hotel_for_trip(
 
         print(f"✅ Trip found: {trip.from_city} → {trip.to_city}")
 
-        # Update trip with hotel information
-        trip.selected_hotel_id = req.hotel_id
-        trip.selected_hotel_name = req.hotel_name
-        trip.selected_hotel_location = req.location
-        trip.selected_hotel_price_per_night = req.price_per_night
-        trip.selected_hotel_total_price = req.total_price
-        trip.selected_hotel_currency = req.currency
-        trip.selected_hotel_check_in = req.check_in_date
-        trip.selected_hotel_check_out = req.check_out_date
-        trip.selected_hotel_rating = req.rating
-        trip.selected_hotel_reviews_count = req.reviews_count
-        trip.selected_hotel_class = req.hotel_class
-        trip.selected_hotel_amenities = req.amenities
-        trip.selected_hotel_free_cancellation = req.free_cancellation
-        trip.selected_hotel_score = req.score
-        trip.selected_hotel_title = req.title
-        trip.selected_hotel_pros = req.pros_keywords
-        trip.selected_hotel_cons = req.cons_keywords
-        trip.selected_hotel_thumbnail = req.thumbnail
-        trip.selected_hotel_link = req.link
+        # Upsert the trip's hotel row (trip_hotels, keyed by trip)
+        hotel = await session.get(TripHotel, trip.id) or TripHotel(trip_id=trip.id)
+        hotel.hotel_id = req.hotel_id
+        hotel.name = req.hotel_name
+        hotel.location = req.location
+        hotel.price_per_night = req.price_per_night
+        hotel.total_price = req.total_price
+        hotel.currency = req.currency
+        hotel.check_in = req.check_in_date
+        hotel.check_out = req.check_out_date
+        hotel.rating = req.rating
+        hotel.reviews_count = req.reviews_count
+        hotel.hotel_class = req.hotel_class
+        hotel.amenities = req.amenities
+        hotel.free_cancellation = req.free_cancellation
+        hotel.score = req.score
+        hotel.title = req.title
+        hotel.pros = req.pros_keywords
+        hotel.cons = req.cons_keywords
+        hotel.thumbnail = req.thumbnail
+        hotel.link = req.link
+        session.add(hotel)
 
         # Save to database
         await session.commit()
-        await session.refresh(trip)
 
         print(f"✅ Hotel {req.hotel_name} saved successfully!")
 
@@ -1,9 +1,11 @@
 """Hotel search and property schemas for SerpApi Google Hotels."""
 
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+from app.ranking.engine import HOTEL_SCORING
+
 
 class HotelSearchQuery(BaseModel):
     """Query parameters for hotel search via SerpApi."""
@@ -141,6 +143,16 @@ class HotelRankRequest(BaseModel):
         ..., description="User preferences for hotel selection"
     )
     locale: Optional[dict] = None
+    weights: Optional[Dict[str, float]] = Field(
+        None, description="Heuristic scoring weights: rating, price, reviews"
+    )
+
+    @field_validator("weights")
+    @classmethod
+    def validate_weights(cls, v):
+        if v is not None:
+            HOTEL_SCORING.resolve_weights(v)
+        return v
 
 
 class HotelRankItem(BaseModel):
@@ -2,12 +2,17 @@
 
 from typing import Any, Dict, Optional
 
-import httpx
-
+from app.core.cache import cache_key
+from app.core.http import HTTPClientPool, http_pool
+from app.core.services import services
 from app.core.settings import settings
+from app.core.singleflight import SingleFlight, create_singleflight
 
 SERP_ENGINE = "google_hotels"
 
+# Shared across instances so concurrent identical searches coalesce
+_hotels_singleflight = create_singleflight("google_hotels")
+
 
 def _csv(val: Optional[list[int]]) -> Optional[str]:
     """Convert list of integers to CSV string."""
@@ -26,9 +31,16 @@ def _bool(val: Optional[bool]) -> Optional[str]:
 class GoogleHotelsService:
     """Service for fetching hotel data from SerpApi Google Hotels."""
 
-    def __init__(self, base_url: str | None = None):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        http: HTTPClientPool | None = None,
+        singleflight: SingleFlight | None = None,
+    ):
         self.base_url = base_url or "https://serpapi.com/search.json"
         self.api_key = settings.serpapi_key
+        self.http = http or http_pool
+        self.singleflight = singleflight or _hotels_singleflight
         if not self.api_key:
             raise RuntimeError("SERPAPI_KEY is not configured in settings")
 
@@ -77,18 +89,9 @@ class GoogleHotelsService:
         # Drop None values
         query = {k: v for k, v in query.items() if v is not None}
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.get(self.base_url, params=query)
-            r.raise_for_status()
-            data = r.json()
-
-        # Check for errors from SerpApi
-        status = data.get("search_metadata", {}).get("status")
-        if status == "Error":
-            msg = data.get("error") or "SerpApi returned an error"
-            raise RuntimeError(msg)
-
-        return data
+        return await self.singleflight.do(
+            cache_key("google_hotels.search", query), lambda: self._get(query)
+        )
 
     async def property_details(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Get detailed information for a specific property."""
@@ -112,15 +115,24 @@ class GoogleHotelsService:
         # Drop None values
         query = {k: v for k, v in query.items() if v is not None}
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.get(self.base_url, params=query)
-            r.raise_for_status()
-            data = r.json()
+        return await self.singleflight.do(
+            cache_key("google_hotels.property", query), lambda: self._get(query)
+        )
+
+    async def _get(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Call SerpApi and raise on API-level errors."""
+        r = await self.http.get(self.base_url, params=query)
+        r.raise_for_status()
+        data = r.json()
 
-        # Check for errors
+        # Check for errors from SerpApi
         status = data.get("search_metadata", {}).get("status")
         if status == "Error":
             msg = data.get("error") or "SerpApi returned an error"
             raise RuntimeError(msg)
 
         return data
+
+
+# Singleton instance, built by the service registry at application startup
+services.register("google_hotels", GoogleHotelsService)
@@ -0,0 +1,14 @@
+"""Background jobs module exports."""
+
+from .router import router as jobs_router
+from .schemas import JobResponse
+from .service import jobs_service
+from .worker import JobWorker, job_worker
+
+__all__ = [
+    "jobs_router",
+    "JobResponse",
+    "jobs_service",
+    "JobWorker",
+    "job_worker",
+]
@@ -0,0 +1,81 @@
+"""Background job API routes."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.core.settings import settings
+from app.core.sse import format_sse
+from app.db import User, get_async_session
+from app.db.models import JobStatus
+from app.jobs.schemas import JobResponse
+from app.jobs.service import jobs_service
+from app.jobs.worker import job_worker
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+TERMINAL_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the status and progress of a background job."""
+    job = await jobs_service.get_job(session, job_id, current_user.id)
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream job progress as Server-Sent Events.
+
+    Emits a `progress` event whenever the job's stage or status changes and
+    closes the stream after the final `succeeded` or `failed` event.
+    """
+    job = await jobs_service.get_job(session, job_id, current_user.id)
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    user_id = current_user.id
+
+    async def event_stream():
+        last = None
+        while True:
+            # Fresh session per poll: the job is updated by the worker (possibly
+            # in another process) and the request session is not kept open
+            async with job_worker.session_factory() as poll_session:
+                current = await jobs_service.get_job(poll_session, job_id, user_id)
+            if current is None:
+                return
+
+            payload = JobResponse.model_validate(current).model_dump(mode="json")
+            snapshot = (payload["status"], payload["stage"], payload["progress"])
+            if snapshot != last:
+                last = snapshot
+                yield format_sse("progress", payload)
+
+            if current.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(settings.job_events_poll_seconds)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,28 @@
+"""Background job schemas and DTOs."""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.db.models import JobStatus
+
+
+class JobResponse(BaseModel):
+    """Background job status."""
+
+    id: str
+    trip_id: str
+    kind: str
+    status: JobStatus
+    stage: Optional[str] = None
+    progress: int
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,174 @@
+"""Background job persistence layer."""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.db.models import JobStatus, PlanJob
+
+
+class JobsService:
+    """Service for creating, claiming and updating background jobs."""
+
+    async def get_or_create_job(
+        self,
+        session: AsyncSession,
+        trip_id: str,
+        user_id: str,
+        kind: str,
+        rerun_succeeded: bool = False,
+    ) -> Tuple[PlanJob, bool]:
+        """
+        Return the job for (trip_id, kind), creating it if needed.
+
+        The second value tells whether the job must be (re)enqueued: True for a
+        new job or a failed job being retried, False when an existing job is
+        queued, running or already succeeded, so retried requests never start
+        the work twice. ``rerun_succeeded`` re-queues a succeeded job too, for
+        when its result no longer applies (e.g. the trip went back to draft).
+        """
+        job = await self._get_trip_job(session, trip_id, kind)
+
+        if job is None:
+            job = PlanJob(
+                trip_id=trip_id,
+                user_id=user_id,
+                kind=kind,
+                status=JobStatus.QUEUED,
+                stage="queued",
+            )
+            session.add(job)
+            try:
+                await session.commit()
+            except IntegrityError:
+                # A concurrent request created the job first
+                await session.rollback()
+                return await self._get_trip_job(session, trip_id, kind), False
+            await session.refresh(job)
+            return job, True
+
+        if job.status == JobStatus.FAILED or (
+            rerun_succeeded and job.status == JobStatus.SUCCEEDED
+        ):
+            job.status = JobStatus.QUEUED
+            job.stage = "queued"
+            job.progress = 0
+            job.error = None
+            job.finished_at = None
+            await session.commit()
+            await session.refresh(job)
+            return job, True
+
+        return job, False
+
+    async def get_job(
+        self, session: AsyncSession, job_id: str, user_id: str
+    ) -> Optional[PlanJob]:
+        """Get a job owned by the user."""
+        stmt = select(PlanJob).where(PlanJob.id == job_id, PlanJob.user_id == user_id)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def claim_job(self, session: AsyncSession, job_id: str) -> Optional[PlanJob]:
+        """
+        Atomically move a queued job to running.
+
+        Returns None when another worker (or process) already claimed it.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            update(PlanJob)
+            .where(PlanJob.id == job_id, PlanJob.status == JobStatus.QUEUED)
+            .values(
+                status=JobStatus.RUNNING,
+                stage="starting",
+                attempts=PlanJob.attempts + 1,
+                started_at=now,
+                lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+            )
+        )
+        result = await session.execute(stmt)
+        await session.commit()
+        if result.rowcount != 1:
+            return None
+        return await session.get(PlanJob, job_id, populate_existing=True)
+
+    async def update_progress(
+        self, session: AsyncSession, job_id: str, stage: str, progress: int
+    ) -> None:
+        """Record the current step of a running job."""
+        await session.execute(
+            update(PlanJob)
+            .where(PlanJob.id == job_id)
+            .values(stage=stage, progress=progress)
+        )
+        await session.commit()
+
+    async def complete_job(self, session: AsyncSession, job_id: str) -> None:
+        """Mark a job as succeeded."""
+        await self._finish(session, job_id, JobStatus.SUCCEEDED, "done", 100, None)
+
+    async def fail_job(self, session: AsyncSession, job_id: str, error: str) -> None:
+        """Mark a job as failed; the next finalize request retries it."""
+        await self._finish(session, job_id, JobStatus.FAILED, "failed", None, error)
+
+    async def recover_jobs(self, session: AsyncSession) -> List[str]:
+        """
+        Return the ids of jobs that should be (re)enqueued on startup.
+
+        Running jobs whose lease expired belonged to a worker that died mid-job
+        and are put back in the queue.
+        """
+        await session.execute(
+            update(PlanJob)
+            .where(
+                PlanJob.status == JobStatus.RUNNING,
+                PlanJob.lease_expires_at < datetime.utcnow(),
+            )
+            .values(status=JobStatus.QUEUED, stage="queued")
+        )
+        await session.commit()
+
+        stmt = (
+            select(PlanJob.id)
+            .where(PlanJob.status == JobStatus.QUEUED)
+            .order_by(PlanJob.created_at)
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def _get_trip_job(
+        self, session: AsyncSession, trip_id: str, kind: str
+    ) -> Optional[PlanJob]:
+        stmt = select(PlanJob).where(PlanJob.trip_id == trip_id, PlanJob.kind == kind)
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def _finish(
+        self,
+        session: AsyncSession,
+        job_id: str,
+        status: JobStatus,
+        stage: str,
+        progress: Optional[int],
+        error: Optional[str],
+    ) -> None:
+        values = {
+            "status": status,
+            "stage": stage,
+            "error": error,
+            "finished_at": datetime.utcnow(),
+            "lease_expires_at": None,
+        }
+        if progress is not None:
+            values["progress"] = progress
+        await session.execute(update(PlanJob).where(PlanJob.id == job_id).values(**values))
+        await session.commit()
+
+
+# Global service instance
+jobs_service = JobsService()
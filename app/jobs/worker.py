@@ -0,0 +1,137 @@
+"""In-process worker pool that executes persisted background jobs."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logging import get_logger
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+from app.db.database import async_session_factory
+from app.db.models import PlanJob
+from app.jobs.service import jobs_service
+
+logger = get_logger(__name__)
+
+# report(stage, progress) lets a handler publish its current step
+ProgressReporter = Callable[[str, int], Awaitable[None]]
+JobHandler = Callable[[AsyncSession, PlanJob, ProgressReporter], Awaitable[None]]
+
+
+class JobWorker:
+    """
+    Pool of asyncio tasks pulling job ids from a queue.
+
+    Jobs live in the database, so the queue only carries ids: a job is claimed
+    with an atomic status update before it runs, which keeps it from running
+    twice even with several app processes, and queued jobs left over from a
+    previous run are picked up again on start.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+    ):
+        self.concurrency = concurrency or settings.job_worker_concurrency
+        self.session_factory = session_factory or async_session_factory
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Counters
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that executes jobs of the given kind."""
+        self._handlers[kind] = handler
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Spawn the worker tasks and re-enqueue unfinished jobs."""
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        async with self.session_factory() as session:
+            job_ids = await jobs_service.recover_jobs(session)
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        if job_ids:
+            logger.info(f"Re-enqueued {len(job_ids)} unfinished job(s)")
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; jobs still queued resume on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def enqueue(self, job_id: str) -> None:
+        """Schedule a persisted job for execution."""
+        if not self.started:
+            await self.start()
+        self._queue.put_nowait(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed the worker loop")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        async with self.session_factory() as session:
+            job = await jobs_service.claim_job(session, job_id)
+            if job is None:
+                return  # Already running or finished elsewhere
+
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                await jobs_service.fail_job(session, job_id, f"Unknown job kind: {job.kind}")
+                return
+
+            async def report(stage: str, progress: int) -> None:
+                await jobs_service.update_progress(session, job_id, stage, progress)
+
+            self.running += 1
+            try:
+                await handler(session, job, report)
+            except Exception as e:
+                logger.exception(f"Job {job_id} ({job.kind}) failed")
+                await session.rollback()
+                await jobs_service.fail_job(session, job_id, str(e))
+                self.failed += 1
+            else:
+                await jobs_service.complete_job(session, job_id)
+                self.succeeded += 1
+            finally:
+                self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker pool counters."""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+# Global worker pool (started in the application lifespan)
+job_worker = JobWorker()
+register_metrics("jobs", job_worker.stats)
@@ -5,9 +5,16 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth.cache import revocations
+from app.auth.tokens import check_signing_key
 from app.core import settings, configure_logging
+from app.core.http import http_pool
+from app.core.llm import close_openai_client
 from app.core.logging import log_request_middleware
-from app.db import init_db, close_db
+from app.core.services import services
+from app.db import async_session_factory, init_db, close_db
+from app.flights.searches import prune_searches
+from app.jobs import job_worker
 from app.api import api_router
 
 
@@ -16,9 +23,24 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     configure_logging(settings.debug)
+    check_signing_key()
     await init_db()
+    if settings.flight_search_retention_days > 0:
+        async with async_session_factory() as session:
+            await prune_searches(session, settings.flight_search_retention_days)
+    await http_pool.start()
+    await services.start()
+    await job_worker.start()
+    if revocations is not None:
+        await revocations.start()
     yield
     # Shutdown
+    if revocations is not None:
+        await revocations.stop()
+    await job_worker.stop()
+    await services.close()
+    await http_pool.close()
+    await close_openai_client()
     await close_db()
 
 
@@ -0,0 +1,27 @@
+"""Shared ranking infrastructure for the flight, hotel and venue rankers."""
+
+from .cache import RankingCache, ranking_cache, ranking_cache_key
+from .engine import (
+    FLIGHT_SCORING,
+    HOTEL_SCORING,
+    VENUE_SCORING,
+    Criterion,
+    ScoredCandidates,
+    ScoringEngine,
+)
+from .prefilter import Shortlist, diverse_shortlist, merge_ranked_ids
+
+__all__ = [
+    "RankingCache",
+    "ranking_cache",
+    "ranking_cache_key",
+    "Criterion",
+    "ScoredCandidates",
+    "ScoringEngine",
+    "FLIGHT_SCORING",
+    "HOTEL_SCORING",
+    "VENUE_SCORING",
+    "Shortlist",
+    "diverse_shortlist",
+    "merge_ranked_ids",
+]
@@ -0,0 +1,108 @@
+"""Content-addressed cache for LLM ranking results."""
+
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.cache import (
+    DatabaseCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    TieredCacheBackend,
+)
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+from app.core.singleflight import SingleFlight, create_singleflight
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def ranking_cache_key(
+    ranker: str,
+    model: str,
+    prompt_version: str,
+    preferences: Optional[str],
+    candidates: Sequence[BaseModel],
+    extra: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Stable hash of everything that determines a ranking.
+
+    Candidates are canonicalized (sorted keys, no nulls) and sorted, so the same
+    set submitted in a different order maps to the same key; whitespace-only
+    differences in the preferences are ignored.
+    """
+    payload = {
+        "ranker": ranker,
+        "model": model,
+        "prompt_version": prompt_version,
+        "preferences": " ".join((preferences or "").split()),
+        "candidates": sorted(
+            _canonical(c.model_dump(mode="json", exclude_none=True)) for c in candidates
+        ),
+        "extra": extra or {},
+    }
+    digest = hashlib.sha256(_canonical(payload).encode("utf-8")).hexdigest()
+    return f"{ranker}:{digest}"
+
+
+class RankingCache:
+    """
+    Cache of ranking responses keyed by `ranking_cache_key`.
+
+    Concurrent identical rankings share one model call (single-flight). A
+    failed model call raises to every caller sharing it and nothing is
+    stored, so each caller builds its own fallback from its own request.
+    Request-scoped fields (search/trip ids) are replaced on every hit via
+    ``overrides``.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache], singleflight: SingleFlight):
+        self.cache = cache
+        self.singleflight = singleflight
+
+    async def get_or_rank(
+        self,
+        key: str,
+        rank: Callable[[], Awaitable[ResponseT]],
+        response_model: Type[ResponseT],
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> ResponseT:
+        """Return the cached ranking for ``key`` or compute and store it."""
+        if self.cache is None:
+            return await rank()
+
+        async def fetch() -> Dict[str, Any]:
+            result = await self.singleflight.do(key, rank)
+            return result.model_dump(mode="json")
+
+        value = await self.cache.get_or_fetch(key, fetch)
+        return response_model.model_validate({**value, **(overrides or {})})
+
+
+def _build_ranking_cache() -> RankingCache:
+    singleflight = create_singleflight("ranking")
+    if not settings.ranking_cache_enabled:
+        return RankingCache(None, singleflight)
+
+    backend: Any = MemoryCacheBackend(max_entries=settings.ranking_cache_memory_entries)
+    if settings.ranking_cache_backend == "database":
+        backend = TieredCacheBackend(
+            backend,
+            DatabaseCacheBackend(
+                "ranking", max_entries=settings.ranking_cache_max_entries
+            ),
+        )
+    cache = ResponseCache("ranking", backend, settings.ranking_cache_ttl_seconds)
+    register_metrics("ranking_cache", cache.stats)
+    return RankingCache(cache, singleflight)
+
+
+# Global cache shared by all rankers
+ranking_cache = _build_ranking_cache()
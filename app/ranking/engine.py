@@ -0,0 +1,148 @@
+"""Vectorized multi-criteria scoring for heuristic rankings."""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Criterion:
+    """One scoring dimension (a column of the candidate table)."""
+
+    weight: float
+    higher_is_better: bool
+    transform: Optional[Callable[[np.ndarray], np.ndarray]] = None
+
+
+@dataclass
+class ScoredCandidates:
+    """Result of scoring a candidate table."""
+
+    scores: np.ndarray  # Weighted score in [0, 1] per candidate (input order)
+    order: np.ndarray  # Candidate indices, best first (ties keep input order)
+    normalized: Dict[str, np.ndarray]  # Per-criterion [0, 1] goodness
+
+    def ranked(self) -> List[int]:
+        return self.order.tolist()
+
+
+class ScoringEngine:
+    """
+    Columnar scorer: builds one float array per criterion, normalizes each to
+    [0, 1] (min-max, flipped when lower is better) and combines them with
+    weights in a single pass, so ranking thousands of candidates takes
+    milliseconds instead of per-item Python loops.
+
+    Missing values (None) score neutral (0.5) on that criterion; a criterion
+    where all candidates are equal scores 1.0 for everyone.
+    """
+
+    def __init__(self, name: str, criteria: Mapping[str, Criterion]):
+        self.name = name
+        self.criteria = dict(criteria)
+
+    @property
+    def default_weights(self) -> Dict[str, float]:
+        return {key: c.weight for key, c in self.criteria.items()}
+
+    def resolve_weights(self, overrides: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+        """Merge user weights over the defaults, rejecting unknown criteria."""
+        weights = self.default_weights
+        for key, value in (overrides or {}).items():
+            if key not in self.criteria:
+                raise ValueError(
+                    f"Unknown {self.name} weight '{key}'. "
+                    f"Valid weights: {', '.join(sorted(self.criteria))}"
+                )
+            if value < 0:
+                raise ValueError(f"Weight '{key}' must be >= 0")
+            weights[key] = float(value)
+        if sum(weights.values()) <= 0:
+            raise ValueError("At least one weight must be positive")
+        return weights
+
+    def score(
+        self,
+        columns: Mapping[str, Sequence[Optional[float]]],
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> ScoredCandidates:
+        """Score candidates given one value sequence per criterion."""
+        resolved = self.resolve_weights(weights)
+        size = len(next(iter(columns.values()))) if columns else 0
+        total = np.zeros(size, dtype=np.float64)
+        normalized: Dict[str, np.ndarray] = {}
+
+        for key, criterion in self.criteria.items():
+            values = columns.get(key)
+            if values is None:
+                continue
+            column = np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
+            if criterion.transform is not None:
+                column = criterion.transform(column)
+            goodness = _normalize(column, criterion.higher_is_better)
+            normalized[key] = goodness
+            total += resolved[key] * goodness
+
+        weight_sum = sum(resolved[key] for key in normalized) or 1.0
+        scores = np.clip(total / weight_sum, 0.0, 1.0)
+        order = np.argsort(-scores, kind="stable")
+        return ScoredCandidates(scores=scores, order=order, normalized=normalized)
+
+
+def _normalize(column: np.ndarray, higher_is_better: bool) -> np.ndarray:
+    missing = np.isnan(column)
+    if missing.all():
+        return np.full(column.shape, 0.5)
+    low = np.nanmin(column)
+    high = np.nanmax(column)
+    if high > low:
+        goodness = (column - low) / (high - low)
+    else:
+        goodness = np.ones_like(column)
+    if not higher_is_better:
+        goodness = 1.0 - goodness
+    goodness[missing] = 0.5
+    return goodness
+
+
+def price_level(value: Optional[str]) -> Optional[float]:
+    """Map a Google price level ("$".."$$$$") to 1..4."""
+    if not value:
+        return None
+    count = value.count("$")
+    return float(count) if count else None
+
+
+# ------------------------- Domain engines -------------------------
+
+FLIGHT_SCORING = ScoringEngine(
+    "flight",
+    {
+        "price": Criterion(weight=0.45, higher_is_better=False),
+        "duration": Criterion(weight=0.25, higher_is_better=False),
+        "stops": Criterion(weight=0.20, higher_is_better=False),
+        "emissions": Criterion(weight=0.05, higher_is_better=False),
+        "layover": Criterion(weight=0.05, higher_is_better=False),
+    },
+)
+
+HOTEL_SCORING = ScoringEngine(
+    "hotel",
+    {
+        "rating": Criterion(weight=0.5, higher_is_better=True),
+        "price": Criterion(weight=0.3, higher_is_better=False),
+        "reviews": Criterion(weight=0.2, higher_is_better=True, transform=np.log1p),
+    },
+)
+
+VENUE_SCORING = ScoringEngine(
+    "venue",
+    {
+        "rating": Criterion(weight=0.6, higher_is_better=True),
+        "reviews": Criterion(weight=0.3, higher_is_better=True, transform=np.log1p),
+        "price": Criterion(weight=0.1, higher_is_better=False),
+    },
+)
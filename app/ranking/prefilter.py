@@ -0,0 +1,73 @@
+"""Heuristic pre-filter that decides which candidates the LLM re-ranks."""
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Sequence
+
+from .engine import ScoredCandidates
+
+
+@dataclass
+class Shortlist:
+    """Split of a heuristically scored candidate set."""
+
+    head: List[int]  # Indices sent to the model, in heuristic order
+    tail: List[int]  # Remaining indices, in heuristic order
+
+
+def diverse_shortlist(
+    scored: ScoredCandidates,
+    groups: Sequence[Hashable],
+    k: int,
+    max_per_group: int = 0,
+) -> Shortlist:
+    """
+    Pick the top ``k`` candidates by heuristic score, allowing at most
+    ``max_per_group`` of them per diversity group (airline + stops, venue
+    type, ...). Slots a capped group cannot use go to the next best
+    candidates; if there are not enough groups the cap is relaxed rather
+    than sending fewer than ``k``. ``k <= 0`` sends everything.
+    """
+    order = scored.ranked()
+    if k <= 0 or k >= len(order):
+        return Shortlist(head=order, tail=[])
+
+    head: List[int] = []
+    skipped: List[int] = []
+    counts: Dict[Hashable, int] = {}
+    for index in order:
+        if len(head) == k:
+            break
+        group = groups[index]
+        if max_per_group > 0 and counts.get(group, 0) >= max_per_group:
+            skipped.append(index)
+            continue
+        counts[group] = counts.get(group, 0) + 1
+        head.append(index)
+
+    if len(head) < k:
+        head.extend(skipped[: k - len(head)])
+
+    chosen = set(head)
+    return Shortlist(
+        head=[i for i in order if i in chosen],
+        tail=[i for i in order if i not in chosen],
+    )
+
+
+def merge_ranked_ids(
+    model_ids: Sequence[str], head_ids: Sequence[str], tail_ids: Sequence[str]
+) -> List[str]:
+    """
+    Final order: the model's ranking of the shortlist (unknown and duplicate
+    ids dropped), then shortlist ids the model omitted and finally the
+    heuristic tail.
+    """
+    allowed = set(head_ids)
+    merged: List[str] = []
+    seen = set()
+    for candidate_id in list(model_ids) + list(head_ids):
+        if candidate_id in allowed and candidate_id not in seen:
+            seen.add(candidate_id)
+            merged.append(candidate_id)
+    merged.extend(tail_ids)
+    return merged
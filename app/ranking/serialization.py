@@ -0,0 +1,38 @@
+"""Compact tabular serialization of ranking candidates for LLM prompts."""
+
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "y" if value else "n"
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, (list, tuple)):
+        return ";".join(_cell(v) for v in value)
+    return " ".join(str(value).replace("|", "/").split())
+
+
+def compact_table(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
+    """
+    One header row plus one pipe-separated row per candidate. Empty cells
+    mean unknown, lists are ``;``-joined and booleans are ``y``/``n``.
+    """
+    lines = ["|".join(header)]
+    lines.extend("|".join(_cell(value) for value in row) for row in rows)
+    return "\n".join(lines)
+
+
+def relative_time(value: datetime, reference: date) -> str:
+    """Clock time with a day offset from ``reference``: ``06:15+1``."""
+    offset = (value.date() - reference).days
+    clock = value.strftime("%H:%M")
+    return f"{clock}{offset:+d}" if offset else clock
+
+
+def first_date(values: Iterable[Optional[datetime]]) -> Optional[date]:
+    dates = [value.date() for value in values if value is not None]
+    return min(dates) if dates else None
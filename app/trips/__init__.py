@@ -1,6 +1,7 @@
 """Trips module exports."""
 
 from .router import router as trips_router
+from .dependencies import require_trip_owner
 from .schemas import (
     TripCreateRequest,
     TripUpdateRequest,
@@ -13,6 +14,7 @@ from .service import trips_service
 
 __all__ = [
     "trips_router",
+    "require_trip_owner",
     "TripCreateRequest",
     "TripUpdateRequest", 
     "TripResponse",
@@ -0,0 +1,27 @@
+"""Trip dependencies for sub-resource routes."""
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.dependencies import get_current_user
+from app.db import User, get_async_session
+from app.trips.service import trips_service
+
+
+async def require_trip_owner(
+    trip_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+) -> str:
+    """
+    Resolve the ``{trip_id}`` path parameter of a trip the user owns.
+
+    Checks ownership without loading the trip (see ``TripsService.owns_trip``)
+    and raises 404 otherwise; routes that need trip fields should load the
+    trip instead.
+    """
+    if not await trips_service.owns_trip(session, trip_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found"
+        )
+    return trip_id
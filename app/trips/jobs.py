@@ -0,0 +1,133 @@
+"""Background job handlers for trips."""
+
+import asyncio
+from typing import Any, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.planner import generate_trip_plan, stream_trip_plan
+from app.db.models import PlanJob, Trip, TripStatus
+from app.jobs.service import jobs_service
+from app.jobs.worker import ProgressReporter, job_worker
+from app.trips.service import trips_service
+
+FINALIZE_TRIP_JOB = "finalize_trip"
+
+# Generic checklist stored alongside the plan (can be enhanced with AI later)
+DEFAULT_CHECKLIST = {
+    "pre_trip": [
+        "Check passport validity (6 months minimum)",
+        "Apply for visa if required",
+        "Book transportation and accommodation",
+        "Arrange travel insurance",
+        "Notify bank of travel dates",
+    ],
+    "packing": [
+        "Travel documents (passport, visa, tickets)",
+        "Clothing appropriate for destination weather",
+        "Toiletries and medications",
+        "Electronics and chargers",
+        "Emergency contact information",
+    ],
+    "documents": [
+        "Passport",
+        "Visa",
+        "Flight tickets",
+        "Hotel confirmations",
+        "Travel insurance documents",
+    ],
+    "during_trip": [
+        "Keep important documents secure",
+        "Stay aware of local customs",
+        "Keep emergency contacts handy",
+        "Monitor weather and local news",
+    ],
+}
+
+
+async def finalize_trip_job(
+    session: AsyncSession, job: PlanJob, report: ProgressReporter
+) -> None:
+    """Generate the AI plan for a trip, then save plan and checklist."""
+    trip = await trips_service.get_trip_by_id(
+        session, job.trip_id, job.user_id, with_selections=True
+    )
+    if not trip:
+        raise Exception("Trip not found")
+
+    if trip.status == TripStatus.PLANNED:
+        return  # Finalized by an earlier attempt; never call the model twice
+
+    # Generate AI-powered trip plan using OpenAI Structured Outputs
+    await report("generating_plan", 10)
+    print(f"Generating AI plan for trip {trip.id}...")
+    plan_json = await generate_trip_plan(trip)
+    print(f"Plan generated successfully. Keys: {list(plan_json.keys())}")
+
+    # Save plan and finalize trip
+    await report("saving_plan", 90)
+    finalized_trip = await trips_service.finalize_trip(
+        session, job.trip_id, job.user_id, plan_json, DEFAULT_CHECKLIST
+    )
+    if not finalized_trip:
+        raise Exception("Trip not found or cannot be finalized")
+
+
+job_worker.register(FINALIZE_TRIP_JOB, finalize_trip_job)
+
+
+# Streaming generations keep running if the client disconnects
+_streaming_tasks: Set[asyncio.Task] = set()
+
+
+def start_streaming_finalize(job: PlanJob, trip: Trip) -> "asyncio.Queue[Optional[Tuple[str, Any]]]":
+    """
+    Run a claimed finalize job with the streaming planner in the background.
+
+    Returns a queue receiving ``("day", dict)`` per generated day, then
+    ``("plan", dict)`` and ``("done", dict)`` or ``("error", dict)``, and
+    finally ``None``. The plan is saved even if nobody reads the queue.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(_run_streaming_finalize(job, trip, events))
+    _streaming_tasks.add(task)
+    task.add_done_callback(_streaming_tasks.discard)
+    return events
+
+
+async def _run_streaming_finalize(job: PlanJob, trip: Trip, events: asyncio.Queue) -> None:
+    expected_days = max(1, (trip.end_date.date() - trip.start_date.date()).days + 1)
+
+    async with job_worker.session_factory() as session:
+        try:
+            await jobs_service.update_progress(session, job.id, "generating_plan", 10)
+            plan_json = None
+            days = 0
+            async for kind, value in stream_trip_plan(trip):
+                if kind == "day":
+                    days += 1
+                    events.put_nowait(("day", value.model_dump()))
+                    progress = 10 + min(79, 80 * days // expected_days)
+                    await jobs_service.update_progress(
+                        session, job.id, "generating_plan", progress
+                    )
+                else:
+                    plan_json = value
+
+            await jobs_service.update_progress(session, job.id, "saving_plan", 90)
+            finalized_trip = await trips_service.finalize_trip(
+                session, job.trip_id, job.user_id, plan_json, DEFAULT_CHECKLIST
+            )
+            if not finalized_trip:
+                raise Exception("Trip not found or cannot be finalized")
+
+            await jobs_service.complete_job(session, job.id)
+            events.put_nowait(("plan", plan_json))
+            events.put_nowait(("done", {"job_id": job.id, "trip_id": job.trip_id}))
+        except Exception as e:
+            print(f"Error streaming trip plan: {str(e)}")
+            await session.rollback()
+            await jobs_service.fail_job(session, job.id, str(e))
+            events.put_nowait(("error", {"job_id": job.id, "detail": str(e)}))
+        finally:
+            events.put_nowait(None)
@@ -2,13 +2,15 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.ai.planner import generate_trip_plan
 from app.auth import get_current_user
+from app.core.sse import format_sse
 from app.db import User, get_async_session
 from app.db.models import TripStatus
+from app.jobs import JobResponse, job_worker, jobs_service
 from app.trips.schemas import (
     TripChecklistResponse,
     TripCreateRequest,
@@ -17,6 +19,7 @@ from app.trips.schemas import (
     TripResponse,
     TripUpdateRequest,
 )
+from app.trips.jobs import FINALIZE_TRIP_JOB, start_streaming_finalize
 from app.trips.service import trips_service
 
 router = APIRouter(prefix="/trips", tags=["trips"])
@@ -30,23 +33,48 @@ async def create_trip(
 ):
     """Create a new trip."""
     trip = await trips_service.create_trip(session, current_user.id, trip_data)
-    return trip
+    return trips_service.to_response(trip)
 
 
 @router.get("", response_model=TripListResponse)
 async def get_trips(
-    status: Optional[TripStatus] = Query(None, description="Filter by trip status"),
-    page: int = Query(1, ge=1, description="Page number"),
+    status: Optional[TripStatus] = Query(
+        None, description="Filter by trip status (default: all but cancelled)"
+    ),
+    page: int = Query(1, ge=1, description="Page number (ignored with cursor)"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (keyset pagination)"
+    ),
+    include_total: bool = Query(True, description="Count matching trips (cached)"),
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Get user's trips with pagination."""
-    trips, total = await trips_service.get_user_trips(
-        session, current_user.id, status, page, per_page
-    )
+    """Get user's trips, newest first, by cursor or (for compatibility) page."""
+    if cursor:
+        try:
+            trips, next_cursor = await trips_service.get_user_trips_after(
+                session, current_user.id, status, cursor, per_page
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))  # `status` is shadowed here
+        page = None
+    else:
+        trips, next_cursor = await trips_service.get_user_trips(
+            session, current_user.id, status, page, per_page
+        )
 
-    return TripListResponse(trips=trips, total=total, page=page, per_page=per_page)
+    total = None
+    if include_total:
+        total = await trips_service.count_user_trips(session, current_user.id, status)
+
+    return TripListResponse(
+        trips=[trips_service.to_response(trip) for trip in trips],
+        total=total,
+        page=page,
+        per_page=per_page,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{trip_id}", response_model=TripResponse)
@@ -55,57 +83,17 @@ async def get_trip(
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Get a specific trip."""
-    trip = await trips_service.get_trip_by_id(session, trip_id, current_user.id)
+    """Get a specific trip with its selected flight, hotel and venues."""
+    trip = await trips_service.get_trip_by_id(
+        session, trip_id, current_user.id, with_selections=True
+    )
 
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found"
         )
 
-    # Build the selected flight info if it exists
-    selected_flight = trips_service._build_selected_flight_info(trip)
-
-    # Build the selected hotel info if it exists (returns dict directly)
-    selected_hotel = trips_service._build_selected_hotel_info(trip)
-
-    # Parse selected_entertainments JSON if it exists
-    selected_entertainments = None
-    if trip.selected_entertainments:
-        if isinstance(trip.selected_entertainments, str):
-            import json
-
-            try:
-                selected_entertainments = json.loads(trip.selected_entertainments)
-            except:
-                selected_entertainments = []
-        elif isinstance(trip.selected_entertainments, list):
-            selected_entertainments = trip.selected_entertainments
-
-    # Create response with selected flight and hotel
-    return TripResponse(
-        id=trip.id,
-        user_id=trip.user_id,
-        from_city=trip.from_city,
-        to_city=trip.to_city,
-        start_date=trip.start_date,
-        end_date=trip.end_date,
-        transport=trip.transport,
-        adults=trip.adults,
-        children=trip.children,
-        budget_min=trip.budget_min,
-        budget_max=trip.budget_max,
-        entertainment_tags=trip.entertainment_tags,
-        notes=trip.notes,
-        status=trip.status,
-        timezone=trip.timezone,
-        ics_token=trip.ics_token,
-        created_at=trip.created_at,
-        updated_at=trip.updated_at,
-        selected_flight=selected_flight,
-        selected_hotel=selected_hotel,
-        selected_entertainments=selected_entertainments,
-    )
+    return trips_service.to_response(trip)
 
 
 @router.patch("/{trip_id}", response_model=TripResponse)
@@ -125,7 +113,7 @@ async def update_trip(
             status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found"
         )
 
-    return trip
+    return trips_service.to_response(trip)
 
 
 @router.delete("/{trip_id}")
@@ -145,23 +133,32 @@ async def delete_trip(
     return {"message": "Trip deleted successfully"}
 
 
-@router.post("/{trip_id}/finalize", response_model=TripResponse)
+@router.post(
+    "/{trip_id}/finalize",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def finalize_trip(
     trip_id: str,
+    response: Response,
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Finalize a trip and generate AI-powered daily plan.
+    Finalize a trip and generate AI-powered daily plan in the background.
 
     This endpoint:
     1. Validates the trip belongs to the user
-    2. Generates a detailed daily itinerary using OpenAI Structured Outputs
-    3. Considers selected flight, hotel, and user preferences
-    4. Stores the generated plan in the database
-    5. Updates trip status to 'planned'
+    2. Queues a finalize job and returns it immediately (202 Accepted)
+    3. The job generates a detailed daily itinerary using OpenAI Structured
+       Outputs, considering selected flight, hotel, and user preferences
+    4. The job stores the plan and checklist and sets the trip to 'planned'
+
+    Poll `GET /jobs/{job_id}` or subscribe to `GET /jobs/{job_id}/events`
+    for progress. The call is idempotent per trip: retrying returns the
+    existing job instead of generating the plan again (failed jobs are retried,
+    and a trip moved back out of 'planned' is planned again).
     """
-    # First, get the trip to pass to AI planner
     trip = await trips_service.get_trip_by_id(session, trip_id, current_user.id)
 
     if not trip:
@@ -170,73 +167,104 @@ async def finalize_trip(
             detail="Trip not found",
         )
 
-    if trip.status == TripStatus.PLANNED:
+    # A trip taken back out of "planned" is planned again
+    job, needs_enqueue = await jobs_service.get_or_create_job(
+        session,
+        trip_id,
+        current_user.id,
+        FINALIZE_TRIP_JOB,
+        rerun_succeeded=trip.status != TripStatus.PLANNED,
+    )
+
+    if trip.status == TripStatus.PLANNED and needs_enqueue:
+        # Finalized before background jobs existed: nothing left to run
+        await jobs_service.complete_job(session, job.id)
+        await session.refresh(job)
+        needs_enqueue = False
+
+    if needs_enqueue:
+        await job_worker.enqueue(job.id)
+
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job
+
+
+@router.get("/{trip_id}/plan/stream")
+async def stream_trip_plan(
+    trip_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Finalize a trip while streaming the AI plan as Server-Sent Events.
+
+    Events:
+    - `job`: the finalize job driving this generation
+    - `day`: one validated `TripDay`, sent as soon as the model finishes it
+    - `plan`: the complete normalized plan (stored like `/finalize` does)
+    - `done` / `error`: end of the stream
+
+    Shares the per-trip finalize job with `POST /finalize`, so a plan is only
+    generated once. Already planned trips replay the stored plan; a plan that
+    is being generated by the background worker returns 409.
+    """
+    # The planner reads the selected flight, hotel and venues
+    trip = await trips_service.get_trip_by_id(
+        session, trip_id, current_user.id, with_selections=True
+    )
+
+    if not trip:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Trip is already finalized",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found",
         )
 
-    try:
-        # Generate AI-powered trip plan using OpenAI Structured Outputs
-        print(f"Generating AI plan for trip {trip_id}...")
-        plan_json = generate_trip_plan(trip)
-        print(f"Plan generated successfully. Keys: {list(plan_json.keys())}")
-
-        # Generate a simple checklist (can be enhanced with AI later)
-        checklist_json = {
-            "pre_trip": [
-                "Check passport validity (6 months minimum)",
-                "Apply for visa if required",
-                "Book transportation and accommodation",
-                "Arrange travel insurance",
-                "Notify bank of travel dates",
-            ],
-            "packing": [
-                "Travel documents (passport, visa, tickets)",
-                "Clothing appropriate for destination weather",
-                "Toiletries and medications",
-                "Electronics and chargers",
-                "Emergency contact information",
-            ],
-            "documents": [
-                "Passport",
-                "Visa",
-                "Flight tickets",
-                "Hotel confirmations",
-                "Travel insurance documents",
-            ],
-            "during_trip": [
-                "Keep important documents secure",
-                "Stay aware of local customs",
-                "Keep emergency contacts handy",
-                "Monitor weather and local news",
-            ],
-        }
-
-        # Save plan and finalize trip
-        finalized_trip = await trips_service.finalize_trip(
-            session, trip_id, current_user.id, plan_json, checklist_json
-        )
+    job, needs_run = await jobs_service.get_or_create_job(
+        session,
+        trip_id,
+        current_user.id,
+        FINALIZE_TRIP_JOB,
+        rerun_succeeded=trip.status != TripStatus.PLANNED,
+    )
 
-        if not finalized_trip:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Trip not found or cannot be finalized",
-            )
+    if trip.status == TripStatus.PLANNED:
+        if needs_run:
+            await jobs_service.complete_job(session, job.id)
+        stored = await trips_service.get_trip_plan(session, trip_id, current_user.id)
+        plan_json = stored.plan_json if stored else {}
 
-        return finalized_trip
+        async def replay_stream():
+            for day in plan_json.get("days", []):
+                yield format_sse("day", day)
+            yield format_sse("plan", plan_json)
+            yield format_sse("done", {"job_id": job.id, "trip_id": trip_id})
 
-    except Exception as e:
-        # Log the error and return a helpful message
-        import traceback
+        return StreamingResponse(replay_stream(), media_type="text/event-stream")
 
-        print(f"Error generating trip plan: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+    claimed = await jobs_service.claim_job(session, job.id) if needs_run else None
+    if not claimed:
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to generate trip plan: {str(e)}",
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Trip plan is already being generated (job {job.id})",
         )
 
+    events = start_streaming_finalize(claimed, trip)
+    job_payload = JobResponse.model_validate(claimed).model_dump(mode="json")
+
+    async def event_stream():
+        yield format_sse("job", job_payload)
+        while True:
+            item = await events.get()
+            if item is None:
+                return
+            yield format_sse(*item)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.get("/{trip_id}/plan", response_model=TripPlanResponse)
 async def get_trip_plan(
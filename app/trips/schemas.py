@@ -127,9 +127,10 @@ class TripListResponse(BaseModel):
     """Trip list response."""
 
     trips: List[TripResponse]
-    total: int
-    page: int
+    total: Optional[int]  # None when include_total=false
+    page: Optional[int]  # None in cursor mode
     per_page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
 
 
 class TripPlanResponse(BaseModel):
@@ -1,88 +1,171 @@
 """Trip service layer."""
 
+import base64
+import json
+import time
 import uuid
-from typing import List, Optional
-
-from sqlalchemy import func, select
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import (
+    String,
+    exists,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.db.models import Trip, TripChecklist, TripPlan, TripStatus, User
-from app.trips.schemas import SelectedFlightInfo, TripCreateRequest, TripUpdateRequest
+from sqlalchemy.orm import joinedload, undefer
+
+from app.core.cache import CacheEntry, MemoryCacheBackend
+from app.core.metrics import register_metrics
+from app.core.settings import settings
+from app.db.models import (
+    TRIP_NOT_CANCELLED,
+    Trip,
+    TripChecklist,
+    TripFlight,
+    TripHotel,
+    TripPlan,
+    TripStatus,
+    User,
+)
+from app.trips.schemas import (
+    SelectedFlightInfo,
+    TripCreateRequest,
+    TripResponse,
+    TripUpdateRequest,
+)
+
+# Raw stored created_at: SQLite keeps it as text whose format depends on how
+# the row was written, so cursors compare against exactly that text
+_CREATED_KEY = type_coerce(Trip.created_at, String).label("created_key")
+
+# Everything a full trip view needs beyond the trip row (one joined query)
+_SELECTIONS = (
+    joinedload(Trip.flight),
+    joinedload(Trip.hotel),
+    undefer(Trip.selected_entertainments),
+)
+
+_TRIP_FIELDS = [
+    name for name in TripResponse.model_fields if not name.startswith("selected_")
+]
+
+
+def encode_cursor(created_key: Any, trip_id: str) -> str:
+    """Opaque keyset cursor pointing just past the given row."""
+    if isinstance(created_key, datetime):
+        created_key = created_key.isoformat()
+    payload = json.dumps([created_key, trip_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of ``encode_cursor``; raises ValueError on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_key, trip_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(created_key, str) or not isinstance(trip_id, str):
+        raise ValueError("Invalid cursor")
+    return created_key, trip_id
 
 
 class TripsService:
     """Service for trip management."""
 
-    def _build_selected_flight_info(self, trip: Trip) -> Optional[SelectedFlightInfo]:
-        """Build SelectedFlightInfo from trip model."""
-        if not trip.selected_flight_id:
+    def __init__(self):
+        # (user_id, status) -> trip count, dropped whenever the user's trips change
+        self._counts = MemoryCacheBackend(max_entries=10000)
+        # "user_id:trip_id" -> True for confirmed owners (see owns_trip)
+        self._owners = MemoryCacheBackend(max_entries=10000)
+        self._ownership = {"memo_hits": 0, "cache_hits": 0, "queries": 0}
+
+    def _build_selected_flight_info(
+        self, flight: Optional[TripFlight]
+    ) -> Optional[SelectedFlightInfo]:
+        """Build SelectedFlightInfo from the trip's flight row."""
+        if flight is None or not flight.flight_id:
             return None
 
         return SelectedFlightInfo(
-            flight_id=trip.selected_flight_id,
-            airline=trip.selected_flight_airline,
-            flight_number=trip.selected_flight_number,
-            departure_airport=trip.selected_flight_departure_airport,
-            arrival_airport=trip.selected_flight_arrival_airport,
-            departure_time=trip.selected_flight_departure_time,
-            arrival_time=trip.selected_flight_arrival_time,
-            price=(
-                float(trip.selected_flight_price) if trip.selected_flight_price else 0.0
-            ),
-            currency=trip.selected_flight_currency or "USD",
-            total_duration_min=trip.selected_flight_duration_min or 0,
-            stops=trip.selected_flight_stops or 0,
-            score=(
-                float(trip.selected_flight_score)
-                if trip.selected_flight_score
-                else None
-            ),
-            title=trip.selected_flight_title,
-            pros_keywords=trip.selected_flight_pros,
-            cons_keywords=trip.selected_flight_cons,
+            flight_id=flight.flight_id,
+            airline=flight.airline,
+            flight_number=flight.flight_number,
+            departure_airport=flight.departure_airport,
+            arrival_airport=flight.arrival_airport,
+            departure_time=flight.departure_time,
+            arrival_time=flight.arrival_time,
+            price=float(flight.price) if flight.price else 0.0,
+            currency=flight.currency or "USD",
+            total_duration_min=flight.duration_min or 0,
+            stops=flight.stops or 0,
+            score=float(flight.score) if flight.score else None,
+            title=flight.title,
+            pros_keywords=flight.pros,
+            cons_keywords=flight.cons,
         )
 
-    def _build_selected_hotel_info(self, trip: Trip) -> Optional[dict]:
-        """Build selected hotel info dict from trip model."""
-        if not trip.selected_hotel_id:
+    def _build_selected_hotel_info(self, hotel: Optional[TripHotel]) -> Optional[dict]:
+        """Build selected hotel info dict from the trip's hotel row."""
+        if hotel is None or not hotel.hotel_id:
             return None
 
         # Return as dict to avoid circular import
         return {
-            "hotel_id": trip.selected_hotel_id,
-            "hotel_name": trip.selected_hotel_name,
-            "location": trip.selected_hotel_location,
+            "hotel_id": hotel.hotel_id,
+            "hotel_name": hotel.name,
+            "location": hotel.location,
             "price_per_night": (
-                float(trip.selected_hotel_price_per_night)
-                if trip.selected_hotel_price_per_night
-                else 0.0
-            ),
-            "total_price": (
-                float(trip.selected_hotel_total_price)
-                if trip.selected_hotel_total_price
-                else 0.0
+                float(hotel.price_per_night) if hotel.price_per_night else 0.0
             ),
-            "currency": trip.selected_hotel_currency or "USD",
-            "check_in_date": trip.selected_hotel_check_in,
-            "check_out_date": trip.selected_hotel_check_out,
-            "rating": (
-                float(trip.selected_hotel_rating)
-                if trip.selected_hotel_rating
-                else None
-            ),
-            "reviews_count": trip.selected_hotel_reviews_count,
-            "hotel_class": trip.selected_hotel_class,
-            "amenities": trip.selected_hotel_amenities,
-            "free_cancellation": trip.selected_hotel_free_cancellation,
-            "score": (
-                float(trip.selected_hotel_score) if trip.selected_hotel_score else None
-            ),
-            "title": trip.selected_hotel_title,
-            "pros_keywords": trip.selected_hotel_pros,
-            "cons_keywords": trip.selected_hotel_cons,
-            "thumbnail": trip.selected_hotel_thumbnail,
+            "total_price": float(hotel.total_price) if hotel.total_price else 0.0,
+            "currency": hotel.currency or "USD",
+            "check_in_date": hotel.check_in,
+            "check_out_date": hotel.check_out,
+            "rating": float(hotel.rating) if hotel.rating else None,
+            "reviews_count": hotel.reviews_count,
+            "hotel_class": hotel.hotel_class,
+            "amenities": hotel.amenities,
+            "free_cancellation": hotel.free_cancellation,
+            "score": float(hotel.score) if hotel.score else None,
+            "title": hotel.title,
+            "pros_keywords": hotel.pros,
+            "cons_keywords": hotel.cons,
+            "thumbnail": hotel.thumbnail,
         }
 
+    def to_response(self, trip: Trip) -> TripResponse:
+        """
+        Build a TripResponse from whatever was loaded for ``trip``.
+
+        Selections are only filled in when the trip was loaded with
+        ``with_selections=True``; lists and writes return them as None.
+        """
+        unloaded = inspect(trip).unloaded
+        response = TripResponse(
+            **{name: getattr(trip, name) for name in _TRIP_FIELDS}
+        )
+        if "flight" not in unloaded:
+            response.selected_flight = self._build_selected_flight_info(trip.flight)
+        if "hotel" not in unloaded:
+            response.selected_hotel = self._build_selected_hotel_info(trip.hotel)
+        if "selected_entertainments" not in unloaded:
+            entertainments = trip.selected_entertainments
+            if isinstance(entertainments, str):
+                try:
+                    entertainments = json.loads(entertainments)
+                except ValueError:
+                    entertainments = []
+            response.selected_entertainments = entertainments or None
+        return response
+
     async def create_trip(
         self,
         session: AsyncSession,
@@ -94,6 +177,7 @@ class TripsService:
 
         session.add(trip)
         await session.commit()
+        await self._invalidate_counts(user_id)
         await session.refresh(trip)
         return trip
 
@@ -102,12 +186,76 @@ class TripsService:
         session: AsyncSession,
         trip_id: str,  # Changed from UUID to str
         user_id: str,  # Changed from UUID to str
+        with_selections: bool = False,
     ) -> Optional[Trip]:
-        """Get a trip by ID for a specific user."""
+        """
+        Get a trip by ID for a specific user.
+
+        Only the trip row itself is loaded unless ``with_selections`` is set,
+        which also fetches the selected flight, hotel and venues.
+        """
         stmt = select(Trip).where(Trip.id == trip_id, Trip.user_id == user_id)
+        if with_selections:
+            stmt = stmt.options(*_SELECTIONS)
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def owns_trip(self, session: AsyncSession, trip_id: str, user_id: str) -> bool:
+        """
+        Whether ``user_id`` owns ``trip_id`` (an EXISTS on the primary key).
+
+        A trip never changes owner, so confirmed ownership is memoized on the
+        session for the rest of the request and, for
+        TRIP_OWNERSHIP_CACHE_TTL_SECONDS, per user in process. Misses (404s)
+        are never cached.
+        """
+        key = f"{user_id}:{trip_id}"
+        memo = session.info.setdefault("owned_trips", set())
+        if key in memo:
+            self._ownership["memo_hits"] += 1
+            return True
+        if await self._owners.get(key) is not None:
+            self._ownership["cache_hits"] += 1
+            memo.add(key)
+            return True
+
+        self._ownership["queries"] += 1
+        stmt = select(exists().where(Trip.id == trip_id, Trip.user_id == user_id))
+        owned = bool((await session.execute(stmt)).scalar())
+        if owned:
+            memo.add(key)
+            ttl = settings.trip_ownership_cache_ttl_seconds
+            if ttl > 0:
+                expires = time.time() + ttl
+                await self._owners.set(key, CacheEntry(True, expires, expires))
+        return owned
+
+    def stats(self) -> dict:
+        """Ownership-check counters and cache sizes for /api/v1/metrics."""
+        return {
+            "ownership": dict(self._ownership),
+            "ownership_cached": len(self._owners),
+            "counts_cached": len(self._counts),
+        }
+
+    def _user_trips_query(self, user_id: str, status: Optional[TripStatus]):
+        """Newest first; served by ix_trips_user_status_created / _active_created."""
+        stmt = select(Trip, _CREATED_KEY).where(Trip.user_id == user_id)
+        if status:
+            stmt = stmt.where(Trip.status == status)
+        else:
+            stmt = stmt.where(text(TRIP_NOT_CANCELLED))
+        return stmt.order_by(Trip.created_at.desc(), Trip.id.desc())
+
+    @staticmethod
+    def _page(rows, limit: int) -> tuple[List[Trip], Optional[str]]:
+        trips = [row[0] for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.created_key, last[0].id)
+        return trips, next_cursor
+
     async def get_user_trips(
         self,
         session: AsyncSession,
@@ -115,27 +263,69 @@ class TripsService:
         status: Optional[TripStatus] = None,
         page: int = 1,
         per_page: int = 20,
-    ) -> tuple[List[Trip], int]:
-        """Get trips for a user with pagination."""
-        # Build query
-        stmt = select(Trip).where(Trip.user_id == user_id)
+    ) -> tuple[List[Trip], Optional[str]]:
+        """
+        Get trips for a user with offset pagination (compatibility mode).
 
-        if status:
-            stmt = stmt.where(Trip.status == status)
+        Deep pages scan every skipped row; follow the returned cursor with
+        ``get_user_trips_after`` instead.
+        """
+        stmt = self._user_trips_query(user_id, status)
+        stmt = stmt.offset((page - 1) * per_page).limit(per_page + 1)
 
-        # Count total
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        count_result = await session.execute(count_stmt)
-        total = count_result.scalar()
+        result = await session.execute(stmt)
+        return self._page(result.all(), per_page)
 
-        # Apply pagination and ordering
-        stmt = stmt.order_by(Trip.created_at.desc())
-        stmt = stmt.offset((page - 1) * per_page).limit(per_page)
+    async def get_user_trips_after(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        status: Optional[TripStatus] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> tuple[List[Trip], Optional[str]]:
+        """Get the page of a user's trips following ``cursor`` (keyset pagination)."""
+        stmt = self._user_trips_query(user_id, status)
+        if cursor:
+            created_key, trip_id = decode_cursor(cursor)
+            if session.bind.dialect.name == "sqlite":
+                created = literal(created_key, String)
+            else:
+                created = datetime.fromisoformat(created_key)
+            # Row-value comparison, so the index seeks straight to the cursor
+            stmt = stmt.where(tuple_(Trip.created_at, Trip.id) < tuple_(created, trip_id))
+
+        result = await session.execute(stmt.limit(limit + 1))
+        return self._page(result.all(), limit)
+
+    async def count_user_trips(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        status: Optional[TripStatus] = None,
+    ) -> int:
+        """Count a user's trips, cached for TRIPS_COUNT_CACHE_TTL_SECONDS."""
+        key = f"{user_id}:{status.value if status else '*'}"
+        entry = await self._counts.get(key)
+        if entry is not None:
+            return entry.value
+
+        stmt = select(func.count()).select_from(Trip).where(Trip.user_id == user_id)
+        if status:
+            stmt = stmt.where(Trip.status == status)
+        else:
+            stmt = stmt.where(text(TRIP_NOT_CANCELLED))
+        total = (await session.execute(stmt)).scalar_one()
 
-        result = await session.execute(stmt)
-        trips = result.scalars().all()
+        ttl = settings.trips_count_cache_ttl_seconds
+        if ttl > 0:
+            expires = time.time() + ttl
+            await self._counts.set(key, CacheEntry(total, expires, expires))
+        return total
 
-        return list(trips), total
+    async def _invalidate_counts(self, user_id: str) -> None:
+        for status in ("*", *(s.value for s in TripStatus)):
+            await self._counts.delete(f"{user_id}:{status}")
 
     async def update_trip(
         self,
@@ -156,6 +346,7 @@ class TripsService:
             setattr(trip, field, value)
 
         await session.commit()
+        await self._invalidate_counts(user_id)
         await session.refresh(trip)
         return trip
 
@@ -173,6 +364,7 @@ class TripsService:
 
         trip.status = TripStatus.CANCELLED
         await session.commit()
+        await self._invalidate_counts(user_id)
         return True
 
     async def finalize_trip(
@@ -201,6 +393,7 @@ class TripsService:
         trip.status = TripStatus.PLANNED
 
         await session.commit()
+        await self._invalidate_counts(user_id)
         await session.refresh(trip)
         return trip
 
@@ -212,8 +405,7 @@ class TripsService:
     ) -> Optional[TripPlan]:
         """Get the plan for a trip."""
         # Verify user owns the trip
-        trip = await self.get_trip_by_id(session, trip_id, user_id)
-        if not trip:
+        if not await self.owns_trip(session, trip_id, user_id):
             return None
 
         stmt = select(TripPlan).where(TripPlan.trip_id == trip_id)
@@ -228,8 +420,7 @@ class TripsService:
     ) -> Optional[TripChecklist]:
         """Get the checklist for a trip."""
         # Verify user owns the trip
-        trip = await self.get_trip_by_id(session, trip_id, user_id)
-        if not trip:
+        if not await self.owns_trip(session, trip_id, user_id):
             return None
 
         stmt = select(TripChecklist).where(TripChecklist.trip_id == trip_id)
@@ -245,27 +436,29 @@ class TripsService:
         if not trip:
             return None
 
-        # Update trip with selected flight information
-        trip.selected_flight_id = flight_data.get("flight_id")
-        trip.selected_flight_airline = flight_data.get("airline")
-        trip.selected_flight_number = flight_data.get("flight_number")
-        trip.selected_flight_departure_airport = flight_data.get("departure_airport")
-        trip.selected_flight_arrival_airport = flight_data.get("arrival_airport")
-        trip.selected_flight_departure_time = flight_data.get("departure_time")
-        trip.selected_flight_arrival_time = flight_data.get("arrival_time")
-        trip.selected_flight_price = flight_data.get("price")
-        trip.selected_flight_currency = flight_data.get("currency")
-        trip.selected_flight_duration_min = flight_data.get("total_duration_min")
-        trip.selected_flight_stops = flight_data.get("stops")
-        trip.selected_flight_score = flight_data.get("score")
-        trip.selected_flight_title = flight_data.get("title")
-        trip.selected_flight_pros = flight_data.get("pros_keywords")
-        trip.selected_flight_cons = flight_data.get("cons_keywords")
+        # The selection lives in trip_flights, keyed by trip
+        flight = await session.get(TripFlight, trip.id) or TripFlight(trip_id=trip.id)
+        flight.flight_id = flight_data.get("flight_id")
+        flight.airline = flight_data.get("airline")
+        flight.flight_number = flight_data.get("flight_number")
+        flight.departure_airport = flight_data.get("departure_airport")
+        flight.arrival_airport = flight_data.get("arrival_airport")
+        flight.departure_time = flight_data.get("departure_time")
+        flight.arrival_time = flight_data.get("arrival_time")
+        flight.price = flight_data.get("price")
+        flight.currency = flight_data.get("currency")
+        flight.duration_min = flight_data.get("total_duration_min")
+        flight.stops = flight_data.get("stops")
+        flight.score = flight_data.get("score")
+        flight.title = flight_data.get("title")
+        flight.pros = flight_data.get("pros_keywords")
+        flight.cons = flight_data.get("cons_keywords")
+        session.add(flight)
 
         await session.commit()
-        await session.refresh(trip)
         return trip
 
 
 # Global service instance
 trips_service = TripsService()
+register_metrics("trips", trips_service.stats)
@@ -0,0 +1,59 @@
+"""
+Benchmark the offline airport index.
+
+Measures loading the bundled dataset, exact city/alias lookups, fuzzy
+(typo) lookups, nearest-airport queries and memoized repeats.
+
+Usage:
+    python benchmarks/airport_index.py [--rounds 2000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.geo import AirportIndex  # noqa: E402
+
+EXACT = ["London", "new york", "São Paulo, Brazil", "Doha", "NYC", "Heathrow", "jfk"]
+FUZZY = ["Barcelonna", "Duabi", "Frankfrut", "Tokio", "Moskow", "Almatty", "Nowhereville"]
+
+
+def timed(fn, rounds: int) -> float:
+    """Mean microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main(args) -> None:
+    started = time.perf_counter()
+    index = AirportIndex.load()
+    print(
+        f"Loaded {len(index.airports)} airports, {len(index._keys)} names "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms\n"
+    )
+
+    rng = random.Random(5)
+    points = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(args.rounds)]
+    queries = iter(points * 2)
+    rows = [
+        ("exact lookup", lambda: [index._resolve(q) for q in EXACT], len(EXACT)),
+        ("fuzzy lookup", lambda: [index._resolve(q) for q in FUZZY], len(FUZZY)),
+        ("nearest (k=3)", lambda: index.nearest(*next(queries), k=3), 1),
+        ("memoized", lambda: [index.resolve(q) for q in FUZZY], len(FUZZY)),
+    ]
+    print(f"  {'query':<16} {'µs/call':>9}")
+    for name, fn, per_round in rows:
+        rounds = max(1, args.rounds // per_round)
+        print(f"  {name:<16} {timed(fn, rounds) / per_round:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    main(parser.parse_args())
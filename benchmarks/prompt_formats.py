@@ -0,0 +1,146 @@
+"""
+Benchmark ranking prompt size and latency per serialization mode.
+
+Builds the flight, hotel and venue ranking prompts from the recorded search
+fixtures in ``benchmarks/fixtures`` in both the ``verbose`` and ``compact``
+formats and reports input tokens and prompt build time. With ``--live`` it
+also calls OpenAI (OPENAI_API_KEY required) and reports end-to-end ranking
+latency per mode.
+
+Usage:
+    python benchmarks/prompt_formats.py [--live] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.entertainment.ai_ranker import OpenAIEntertainmentRanker  # noqa: E402
+from app.entertainment.schemas import EntertainmentRankRequest  # noqa: E402
+from app.flights.ai_ranker import OpenAIFlightRanker  # noqa: E402
+from app.flights.schemas import RankRequest  # noqa: E402
+from app.hotels.ai_ranker import OpenAIHotelRanker  # noqa: E402
+from app.hotels.schemas import HotelRankRequest  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+FORMATS = ("verbose", "compact")
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_encoding.encode(text))
+
+    TOKENIZER = "tiktoken o200k_base"
+except ImportError:
+    # Rough BPE approximation: words, 1-3 digit groups and punctuation
+    _token_re = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+    def count_tokens(text: str) -> int:
+        return len(_token_re.findall(text))
+
+    TOKENIZER = "approximate (install tiktoken for exact counts)"
+
+
+def _load(name: str) -> dict:
+    with open(FIXTURES / name) as f:
+        return json.load(f)
+
+
+def _ranker(cls, prompt_format: str, live: bool):
+    if live:
+        ranker = cls()
+    else:
+        # Prompt building needs no client
+        ranker = cls.__new__(cls)
+        ranker.model = "gpt-4o-mini"
+        ranker.client = None
+    ranker.prompt_format = prompt_format
+    return ranker
+
+
+def _cases(prompt_format: str, live: bool):
+    """(name, prompts builder, live ranking call) per ranker."""
+    flights = RankRequest(**_load("flights_ala_doh.json"))
+    hotels = HotelRankRequest(**_load("hotels_doh.json"))
+    venues = EntertainmentRankRequest(**_load("venues_doh.json"))
+
+    flight_ranker = _ranker(OpenAIFlightRanker, prompt_format, live)
+    hotel_ranker = _ranker(OpenAIHotelRanker, prompt_format, live)
+    venue_ranker = _ranker(OpenAIEntertainmentRanker, prompt_format, live)
+
+    return [
+        (
+            f"flights ({len(flights.flights)})",
+            lambda: (
+                flight_ranker._build_system_prompt(),
+                flight_ranker._build_user_prompt(flights, flights.flights),
+            ),
+            lambda: flight_ranker._call_openai(flights, flights.flights),
+        ),
+        (
+            f"hotels ({len(hotels.hotels)})",
+            lambda: (
+                hotel_ranker._build_system_prompt(),
+                hotel_ranker._build_user_prompt(hotels, hotels.hotels),
+            ),
+            lambda: hotel_ranker._rank_with_openai(hotels, hotels.hotels),
+        ),
+        (
+            f"venues ({len(venues.venues)})",
+            lambda: venue_ranker._build_prompts(venues, venues.venues),
+            lambda: venue_ranker._call_openai(venues, venues.venues),
+        ),
+    ]
+
+
+async def main(live: bool, runs: int) -> None:
+    print(f"Tokenizer: {TOKENIZER}\n")
+    print(f"{'ranker':<14} {'format':<8} {'tokens':>7} {'build ms':>9} {'e2e s':>7}")
+
+    baseline = {}
+    for prompt_format in FORMATS:
+        for name, build, call in _cases(prompt_format, live):
+            started = time.perf_counter()
+            for _ in range(100):
+                system_prompt, user_prompt = build()
+            build_ms = (time.perf_counter() - started) * 1000 / 100
+            tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+
+            e2e = "-"
+            if live:
+                timings = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    await call()
+                    timings.append(time.perf_counter() - started)
+                e2e = f"{statistics.median(timings):.2f}"
+
+            saving = ""
+            if prompt_format == "verbose":
+                baseline[name] = tokens
+            else:
+                saving = f"  (-{100 * (1 - tokens / baseline[name]):.0f}% tokens)"
+            print(
+                f"{name:<14} {prompt_format:<8} {tokens:>7} {build_ms:>9.2f} {e2e:>7}{saving}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", action="store_true", help="Call OpenAI and time rankings")
+    parser.add_argument("--runs", type=int, default=3, help="Live calls per ranker and format")
+    args = parser.parse_args()
+    if args.live and not os.getenv("OPENAI_API_KEY"):
+        sys.exit("--live needs OPENAI_API_KEY")
+    asyncio.run(main(args.live, args.runs))
@@ -0,0 +1,114 @@
+"""
+Benchmark the per-request overhead removed by the service registry.
+
+Compares building the rankers and SerpAPI services on every request (the
+previous behaviour) with looking them up in the lifespan-managed registry,
+first in isolation and then end to end through ``POST /api/v1/hotels/rank``
+on the recorded hotel fixture (heuristic ranking, no network).
+
+Usage:
+    python benchmarks/service_registry.py [--requests 300]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SERPAPI_KEY", "benchmark")
+
+import httpx  # noqa: E402
+
+from app.core.services import services  # noqa: E402
+from app.core.settings import settings  # noqa: E402
+from app.entertainment.ai_ranker import OpenAIEntertainmentRanker  # noqa: E402
+from app.entertainment.service import GoogleMapsService  # noqa: E402
+from app.flights.ai_ranker import OpenAIFlightRanker  # noqa: E402
+from app.hotels.ai_ranker import OpenAIHotelRanker  # noqa: E402
+from app.hotels.router import _ranker as hotel_ranker_dependency  # noqa: E402
+from app.hotels.service import GoogleHotelsService  # noqa: E402
+from app.main import app  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "hotels_doh.json"
+PER_REQUEST = {
+    "flight_ranker": OpenAIFlightRanker,
+    "venue_ranker": OpenAIEntertainmentRanker,
+    "hotel_ranker": OpenAIHotelRanker,
+    "google_hotels": GoogleHotelsService,
+    "google_maps": GoogleMapsService,
+}
+
+
+def _per_call_us(func, n: int) -> float:
+    # Constructors print debug lines; keep the cost but not the noise
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for _ in range(n):
+            func()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+async def _new_hotel_ranker() -> OpenAIHotelRanker:
+    # Previous behaviour: a fresh ranker inside every request
+    return OpenAIHotelRanker()
+
+
+async def _rank_latency(client: httpx.AsyncClient, payload: dict, n: int) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for _ in range(n):
+            response = await client.post("/api/v1/hotels/rank", json=payload)
+            response.raise_for_status()
+    return (time.perf_counter() - started) / n * 1000
+
+
+async def main(requests: int) -> None:
+    print("Construction per request vs registry lookup (µs per call)")
+    settings.openai_api_key = settings.openai_api_key or "sk-benchmark"
+    with contextlib.redirect_stdout(io.StringIO()):
+        await services.start()
+    for name, cls in PER_REQUEST.items():
+        built = _per_call_us(cls, 2000)
+        shared = _per_call_us(lambda: services.get(name), 2000)
+        print(f"  {name:<14} new: {built:8.1f}   registry: {shared:6.2f}")
+    await services.close()
+
+    # What every ranker construction paid before the OpenAI client was shared
+    from openai import AsyncOpenAI
+
+    sdk = _per_call_us(lambda: AsyncOpenAI(api_key="sk-benchmark"), 200)
+    print(f"  {'AsyncOpenAI()':<14} new: {sdk:8.1f}   (per-request SDK client, for reference)")
+
+    # End to end: heuristic hotel ranking (no OpenAI key, no network)
+    settings.openai_api_key = None
+    payload = json.loads(FIXTURE.read_text())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _rank_latency(client, payload, 20)  # warm up
+
+        # Interleave rounds so warm-up and GC noise hit both modes; keep the best
+        per_request, shared = [], []
+        for _ in range(3):
+            app.dependency_overrides[hotel_ranker_dependency] = _new_hotel_ranker
+            per_request.append(await _rank_latency(client, payload, requests))
+            app.dependency_overrides.clear()
+            shared.append(await _rank_latency(client, payload, requests))
+        per_request, shared = min(per_request), min(shared)
+
+    print(f"\nPOST /hotels/rank ({len(payload['hotels'])} hotels, {requests} requests)")
+    print(f"  ranker per request: {per_request:.3f} ms")
+    print(f"  registry singleton: {shared:.3f} ms")
+    print(f"  builds: {services.stats()['builds']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
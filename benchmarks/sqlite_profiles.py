@@ -0,0 +1,184 @@
+"""
+Benchmark concurrent reads and writes under each SQLite profile.
+
+Builds one migrated database per profile (``default``: rollback journal,
+SQLite settings; ``performance``: WAL plus the SQLITE_* pragmas) with
+``--trips`` trips. Then ``--processes`` worker processes (like uvicorn
+workers sharing one file) each run, for ``--seconds``, ``--readers`` tasks
+listing a user's trips and ``--writers`` tasks selecting 20 venues for a trip
+(the bulk upsert, one transaction each) through the app's engine factory.
+Reports operations per second, p50/p95 latency and "database is locked"
+failures per profile.
+
+Usage:
+    python benchmarks/sqlite_profiles.py [--trips 20000] [--processes 4] [--readers 8] [--writers 2]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+
+from app.db.database import ALEMBIC_INI, create_engine  # noqa: E402
+from app.entertainment.selections import upsert_selections  # noqa: E402
+from app.trips.service import trips_service  # noqa: E402
+
+PROFILES = ("default", "performance")
+USERS = 200
+
+
+def build(path: str, trips: int) -> list:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+
+    rng = random.Random(7)
+    users = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(USERS)]
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (id, username, created_at) VALUES (?, ?, '2025-01-01')",
+        [(user_id, f"user{i}") for i, user_id in enumerate(users)],
+    )
+    rows = [
+        (
+            str(uuid.UUID(int=rng.getrandbits(128))), users[i % USERS], "Almaty", "Doha",
+            "2025-05-01 00:00:00", "2025-05-08 00:00:00", "FLIGHT", 1, 0, "DRAFT", str(i),
+            f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+        )
+        for i in range(trips)
+    ]
+    conn.executemany(
+        "INSERT INTO trips (id, user_id, from_city, to_city, start_date, end_date, "
+        "transport, adults, children, status, ics_token, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return [(row[0], row[1]) for row in rows]
+
+
+async def run_worker(path: str, profile: str, trips: list, args) -> tuple:
+    engine = create_engine(f"sqlite+aiosqlite:///{path}", sqlite_profile=profile)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    deadline = time.perf_counter() + args.seconds
+    latencies = {"read": [], "write": []}
+    locked = {"read": 0, "write": 0}
+
+    async def reader(rng: random.Random):
+        while time.perf_counter() < deadline:
+            _, user_id = rng.choice(trips)
+            started = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    await trips_service.get_user_trips(session, user_id, None, 1, 20)
+            except OperationalError:
+                locked["read"] += 1
+                continue
+            latencies["read"].append(time.perf_counter() - started)
+
+    async def writer(rng: random.Random):
+        while time.perf_counter() < deadline:
+            trip_id, _ = rng.choice(trips)
+            venues = [
+                {"venue": {"place_id": f"p{rng.randrange(50)}", "title": "Venue"}}
+                for _ in range(20)
+            ]
+            started = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    await upsert_selections(session, trip_id, venues)
+                    await session.commit()
+            except OperationalError:
+                locked["write"] += 1
+                continue
+            latencies["write"].append(time.perf_counter() - started)
+
+    rng = random.Random(os.getpid())
+    await asyncio.gather(
+        *(reader(random.Random(rng.random())) for _ in range(args.readers)),
+        *(writer(random.Random(rng.random())) for _ in range(args.writers)),
+    )
+    await engine.dispose()
+    return latencies, locked
+
+
+def _worker(path: str, profile: str, trips: list, args) -> tuple:
+    return asyncio.run(run_worker(path, profile, trips, args))
+
+
+def run_profile(path: str, profile: str, trips: list, args) -> dict:
+    latencies = {"read": [], "write": []}
+    locked = {"read": 0, "write": 0}
+    with ProcessPoolExecutor(args.processes) as pool:
+        futures = [
+            pool.submit(_worker, path, profile, trips, args) for _ in range(args.processes)
+        ]
+        for future in futures:
+            worker_latencies, worker_locked = future.result()
+            for kind in latencies:
+                latencies[kind].extend(worker_latencies[kind])
+                locked[kind] += worker_locked[kind]
+
+    results = {}
+    for kind, samples in latencies.items():
+        samples.sort()
+        results[kind] = {
+            "ops": len(samples) / args.seconds,
+            "p50": statistics.median(samples) * 1000 if samples else float("nan"),
+            "p95": samples[int(len(samples) * 0.95)] * 1000 if samples else float("nan"),
+            "locked": locked[kind],
+        }
+    return results
+
+
+def main(args) -> None:
+    print(
+        f"{args.processes} processes x ({args.readers} readers + {args.writers} writers) "
+        f"for {args.seconds:.0f}s on {args.trips:,} trips"
+    )
+    print(
+        f"\n  {'profile':<12} {'kind':<6} {'ops/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'locked':>7}"
+    )
+    for profile in PROFILES:
+        path = args.db.replace(".db", f"_{profile}.db")
+        trips = build(path, args.trips)
+        results = run_profile(path, profile, trips, args)
+        for kind, row in results.items():
+            print(
+                f"  {profile:<12} {kind:<6} {row['ops']:>8.0f} {row['p50']:>8.2f} "
+                f"{row['p95']:>8.2f} {row['locked']:>7}"
+            )
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--db", default="/tmp/profiles_bench.db")
+    main(parser.parse_args())
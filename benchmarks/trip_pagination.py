@@ -0,0 +1,157 @@
+"""
+Benchmark GET /trips pagination on a synthetic trips table.
+
+Builds a SQLite database with ``--trips`` rows (default 1M); one heavy user owns
+``--heavy-share`` of them and the rest are spread over ``--users`` users. Then
+it times offset pages against keyset (cursor) pages at increasing depth, plus
+the uncached and cached trip count, with and without the composite
+``trips(user_id, [status,] created_at, id)`` indexes.
+
+Usage:
+    python benchmarks/trip_pagination.py [--trips 1000000] [--db /tmp/trips_bench.db]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.database import Base  # noqa: E402
+from app.db.models import TripStatus  # noqa: E402
+from app.trips.service import encode_cursor, trips_service  # noqa: E402
+
+HEAVY_USER = "00000000-0000-4000-8000-000000000000"
+STATUSES = ["DRAFT", "PLANNED", "PLANNED", "COMPLETED", "CANCELLED"]
+DEPTHS = [1, 100, 1000, 3000, 9000]
+PER_PAGE = 20
+INDEXES = ("ix_trips_user_status_created", "ix_trips_user_created")
+
+
+def build(path: str, trips: int, users: int, heavy_share: float) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+
+    rng = random.Random(7)
+    start = datetime(2023, 1, 1)
+    heavy = int(trips * heavy_share)
+    others = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(users)]
+
+    def rows():
+        for i in range(trips):
+            user_id = HEAVY_USER if i < heavy else others[i % users]
+            # Second resolution like the server default, so timestamps tie
+            created = (start + timedelta(seconds=i // 3 * 7)).strftime("%Y-%m-%d %H:%M:%S")
+            yield (
+                str(uuid.UUID(int=rng.getrandbits(128))), user_id, "Almaty", "Doha",
+                "2025-05-01 00:00:00", "2025-05-08 00:00:00", "FLIGHT", 1, 0,
+                rng.choice(STATUSES), str(i), created,
+            )
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany(
+        "INSERT INTO trips (id, user_id, from_city, to_city, start_date, end_date, "
+        "transport, adults, children, status, ics_token, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows(),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def _timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def measure(path: str, label: str) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    print(f"\n[{label}]")
+    print(f"  {'page':>6} {'offset ms':>10} {'cursor ms':>10}")
+
+    async with session_factory() as session:
+        for status in (None, TripStatus.PLANNED):
+            name = status.value if status else "all"
+            for page in DEPTHS:
+                # Cursor of the row just before this page, as a client would hold it
+                cursor = None
+                if page > 1:
+                    stmt = (
+                        trips_service._user_trips_query(HEAVY_USER, status)
+                        .offset((page - 1) * PER_PAGE - 1)
+                        .limit(1)
+                    )
+                    row = (await session.execute(stmt)).first()
+                    if row is None:
+                        break  # Fewer trips than this depth
+                    cursor = encode_cursor(row.created_key, row[0].id)
+
+                offset_ms = await _timed(
+                    lambda: trips_service.get_user_trips(
+                        session, HEAVY_USER, status, page, PER_PAGE
+                    )
+                )
+                cursor_ms = await _timed(
+                    lambda: trips_service.get_user_trips_after(
+                        session, HEAVY_USER, status, cursor, PER_PAGE
+                    )
+                )
+                print(f"  {page:>6} {offset_ms:>10.2f} {cursor_ms:>10.2f}  ({name})")
+                session.expunge_all()
+
+        await trips_service._counts.clear()
+        uncached = await _timed(
+            lambda: trips_service.count_user_trips(session, HEAVY_USER), repeat=1
+        )
+        cached = await _timed(lambda: trips_service.count_user_trips(session, HEAVY_USER))
+        print(f"  count(*) heavy user: {uncached:.2f} ms, cached: {cached:.4f} ms")
+        await trips_service._counts.clear()
+
+    await engine.dispose()
+
+
+async def main(args) -> None:
+    if args.rebuild or not os.path.exists(args.db):
+        started = time.perf_counter()
+        build(args.db, args.trips, args.users, args.heavy_share)
+        print(f"Built {args.trips:,} trips in {time.perf_counter() - started:.0f}s")
+
+    await measure(args.db, "composite indexes")
+
+    conn = sqlite3.connect(args.db)
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_bench_trips_user ON trips (user_id)")
+    conn.commit()
+    conn.close()
+    await measure(args.db, "user_id index only (previous schema + FK index)")
+    os.remove(args.db)  # Indexes were dropped; rebuild next time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--heavy-share", type=float, default=0.2)
+    parser.add_argument("--db", default="/tmp/trips_bench.db")
+    parser.add_argument("--rebuild", action="store_true")
+    asyncio.run(main(parser.parse_args()))
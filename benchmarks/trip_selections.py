@@ -0,0 +1,243 @@
+"""
+Benchmark the trips row before and after moving selections to side tables.
+
+Builds a SQLite database at migration 0002 (flight/hotel selection columns on
+``trips``) with ``--trips`` rows that all have a flight, hotel and venues
+selected, copies it and upgrades the copy to head (``trip_flights`` /
+``trip_hotels``, deferred venues). Then it compares the average stored
+``trips`` row size and the latency of loading one trip, an ownership check,
+a 20-trip list page and the full trip view, as the ORM issues them on each
+schema. Before the split all of these loaded the same full row.
+
+Usage:
+    python benchmarks/trip_selections.py [--trips 50000] [--db /tmp/selections_bench.db]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.ext.automap import automap_base  # noqa: E402
+
+from app.db.database import ALEMBIC_INI  # noqa: E402
+from app.trips.service import trips_service  # noqa: E402
+
+USERS = 1000
+PER_PAGE = 20
+VENUES = [
+    {
+        "venue": {"place_id": f"p{i}", "title": f"Venue {i}", "address": "Corniche, Doha"},
+        "ranking": {"score": 0.8, "pros_keywords": ["views", "food"]},
+    }
+    for i in range(5)
+]
+
+
+def _migrate(path: str, revision: str) -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, revision)
+
+
+def build(path: str, trips: int) -> list:
+    if os.path.exists(path):
+        os.remove(path)
+    _migrate(path, "0002")
+
+    rng = random.Random(7)
+    users = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(USERS)]
+    venues = json.dumps(VENUES)
+    pros, cons = json.dumps(["direct", "cheap"]), json.dumps(["early"])
+
+    def rows():
+        for i in range(trips):
+            yield (
+                str(uuid.UUID(int=rng.getrandbits(128))), users[i % USERS], "Almaty",
+                "Doha", "2025-05-01 00:00:00", "2025-05-08 00:00:00", "FLIGHT", 1, 0,
+                "DRAFT", str(i), f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+                f"QR-{i}", "Qatar Airways", "QR 292", "ALA", "DOH",
+                "2025-05-01 03:00:00", "2025-05-01 06:00:00", 420.0, "USD", 300, 0,
+                0.91, "Best overall", pros, cons,
+                f"h{i}", "Souq Waqif Boutique Hotel", "Al Souq, Old Doha, Qatar", 150.0,
+                1050.0, "USD", "2025-05-01", "2025-05-08", 4.6, 1234, 5,
+                json.dumps(["pool", "spa", "wifi", "breakfast"]), 1, 0.88,
+                "Central and quiet", pros, cons, "https://example.com/thumb.jpg",
+                "https://example.com/book", venues,
+            )
+
+    columns = (
+        "id, user_id, from_city, to_city, start_date, end_date, transport, adults, "
+        "children, status, ics_token, created_at, selected_flight_id, "
+        "selected_flight_airline, selected_flight_number, "
+        "selected_flight_departure_airport, selected_flight_arrival_airport, "
+        "selected_flight_departure_time, selected_flight_arrival_time, "
+        "selected_flight_price, selected_flight_currency, selected_flight_duration_min, "
+        "selected_flight_stops, selected_flight_score, selected_flight_title, "
+        "selected_flight_pros, selected_flight_cons, selected_hotel_id, "
+        "selected_hotel_name, selected_hotel_location, selected_hotel_price_per_night, "
+        "selected_hotel_total_price, selected_hotel_currency, selected_hotel_check_in, "
+        "selected_hotel_check_out, selected_hotel_rating, selected_hotel_reviews_count, "
+        "selected_hotel_class, selected_hotel_amenities, "
+        "selected_hotel_free_cancellation, selected_hotel_score, selected_hotel_title, "
+        "selected_hotel_pros, selected_hotel_cons, selected_hotel_thumbnail, "
+        "selected_hotel_link, selected_entertainments"
+    )
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    placeholders = ", ".join("?" * len(columns.split(",")))
+    conn.executemany(f"INSERT INTO trips ({columns}) VALUES ({placeholders})", rows())
+    conn.commit()
+    conn.execute("ANALYZE")
+    sample = [row for row in conn.execute("SELECT id, user_id FROM trips LIMIT 200")]
+    conn.close()
+    return sample
+
+
+def row_bytes(path: str, table: str) -> float:
+    """Average stored payload of one row (sum of column lengths)."""
+    conn = sqlite3.connect(path)
+    try:
+        names = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        total = " + ".join(f"coalesce(length(CAST({name} AS BLOB)), 0)" for name in names)
+        return conn.execute(f"SELECT avg({total}) FROM {table}").fetchone()[0] or 0.0
+    finally:
+        conn.close()
+
+
+async def _timed(func, repeat: int) -> float:
+    for _ in range(20):
+        await func()  # Warm up statement caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def measure_wide(path: str, sample: list, repeat: int) -> dict:
+    """The previous model: one mapped class over every trips column."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Wide = automap_base()
+    async with engine.connect() as conn:
+        await conn.run_sync(lambda sync: Wide.prepare(autoload_with=sync))
+    WideTrip = Wide.classes.trips
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        counter = [0]
+
+        async def load():
+            trip_id, user_id = sample[counter[0] % len(sample)]
+            counter[0] += 1
+            stmt = select(WideTrip).where(WideTrip.id == trip_id, WideTrip.user_id == user_id)
+            (await session.execute(stmt)).scalar_one()
+            session.expunge_all()
+
+        async def page():
+            stmt = (
+                select(WideTrip)
+                .where(WideTrip.user_id == sample[0][1])
+                .order_by(WideTrip.created_at.desc(), WideTrip.id.desc())
+                .limit(PER_PAGE)
+            )
+            (await session.execute(stmt)).scalars().all()
+            session.expunge_all()
+
+        # Every load was the full row, whatever the caller needed
+        row = await _timed(load, repeat)
+        results = {
+            "trip row": row,
+            "owns trip": row,
+            "list page": await _timed(page, repeat),
+            "full view": row,
+        }
+    await engine.dispose()
+    return results
+
+
+async def measure_split(path: str, sample: list, repeat: int) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        def load(with_selections: bool):
+            counter = [0]
+
+            async def run():
+                trip_id, user_id = sample[counter[0] % len(sample)]
+                counter[0] += 1
+                await trips_service.get_trip_by_id(
+                    session, trip_id, user_id, with_selections=with_selections
+                )
+                session.expunge_all()
+
+            return run
+
+        async def owns():
+            trip_id, user_id = sample[0]
+            await trips_service.owns_trip(session, trip_id, user_id)
+
+        async def page():
+            await trips_service.get_user_trips(session, sample[0][1], None, 1, PER_PAGE)
+            session.expunge_all()
+
+        results = {
+            "trip row": await _timed(load(False), repeat),
+            "owns trip": await _timed(owns, repeat),
+            "list page": await _timed(page, repeat),
+            "full view": await _timed(load(True), repeat),
+        }
+    await engine.dispose()
+    return results
+
+
+def main(args) -> None:
+    started = time.perf_counter()
+    sample = build(args.db, args.trips)
+    print(f"Built {args.trips:,} trips at revision 0002 in {time.perf_counter() - started:.0f}s")
+
+    split = args.db.replace(".db", "_split.db")
+    shutil.copy(args.db, split)
+    started = time.perf_counter()
+    _migrate(split, "head")
+    print(f"Migrated a copy to head in {time.perf_counter() - started:.1f}s")
+
+    wide_row = row_bytes(args.db, "trips")
+    split_row = row_bytes(split, "trips")
+    print(f"\nAverage trips row: {wide_row:.0f} bytes before, {split_row:.0f} bytes after")
+    print(
+        f"  (side rows: trip_flights {row_bytes(split, 'trip_flights'):.0f} bytes, "
+        f"trip_hotels {row_bytes(split, 'trip_hotels'):.0f} bytes)"
+    )
+    print("  selected_entertainments stays on trips but is deferred")
+
+    # Migrations run their own event loop, so measure only after they finish
+    before = asyncio.run(measure_wide(args.db, sample, args.repeat))
+    after = asyncio.run(measure_split(split, sample, args.repeat))
+    print(f"\n  {'query':<10} {'before ms':>10} {'after ms':>10}")
+    for name in before:
+        print(f"  {name:<10} {before[name]:>10.3f} {after[name]:>10.3f}")
+
+    os.remove(args.db)
+    os.remove(split)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trips", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--db", default="/tmp/selections_bench.db")
+    main(parser.parse_args())
@@ -48,6 +48,21 @@ export interface TripListResponse {
   per_page: number;
 }
 
+export interface JobResponse {
+  id: string;
+  trip_id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  stage?: string | null;
+  progress: number;
+  error?: string | null;
+  attempts: number;
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+  updated_at?: string | null;
+}
+
 // Storage utilities
 export const getAccessToken = (): string | null => {
   return localStorage.getItem('access_token');
@@ -189,9 +204,22 @@ export const tripsApi = {
   },
 
   finalizeTrip: async (tripId: string): Promise<TripResponse> => {
-    return apiRequest<TripResponse>(`/trips/${tripId}/finalize`, {
+    // Finalization runs as a background job: start it, then poll until done
+    let job = await apiRequest<JobResponse>(`/trips/${tripId}/finalize`, {
       method: 'POST',
     });
+    while (job && (job.status === 'queued' || job.status === 'running')) {
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+      job = await apiRequest<JobResponse>(`/jobs/${job.id}`);
+    }
+    if (!job || job.status === 'failed') {
+      throw new Error(job?.error || 'Failed to generate trip plan');
+    }
+    return apiRequest<TripResponse>(`/trips/${tripId}`);
+  },
+
+  getJob: async (jobId: string): Promise<JobResponse> => {
+    return apiRequest<JobResponse>(`/jobs/${jobId}`);
   },
 
   getTripPlan: async (tripId: string) => {
@@ -0,0 +1,466 @@
+"""Baseline schema (what Base.metadata.create_all built before migrations).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:13:50.109568
+
+"""
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+from app.db.models import JSONArray
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _missing(table: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def _ensure_index(table: str, name: str, columns: List[str], unique: bool) -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def _ensure_column(table: str, column: sa.Column) -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+    if column.name not in existing:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(column)
+
+
+def upgrade() -> None:
+    """
+    Create the schema, or bring a database made by ``create_all`` up to it:
+    missing tables, columns added since and indexes are created, existing
+    ones are left alone.
+    """
+    if _missing('cache_entries'):
+        op.create_table('cache_entries',
+        sa.Column('namespace', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('value', sqlite.JSON(), nullable=False),
+        sa.Column('fresh_until', sa.Float(), nullable=False),
+        sa.Column('stale_until', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('namespace', 'key')
+        )
+    _ensure_index('cache_entries', 'ix_cache_entries_stale_until', ['stale_until'], unique=False)
+
+    if _missing('culture_tips'):
+        op.create_table('culture_tips',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('country_code', sa.String(length=3), nullable=False),
+        sa.Column('content_md', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _ensure_index('culture_tips', 'ix_culture_tips_country_code', ['country_code'], unique=False)
+
+    if _missing('token_revocations'):
+        op.create_table('token_revocations',
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('revoked_at', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('token_hash')
+        )
+    _ensure_index('token_revocations', 'ix_token_revocations_revoked_at', ['revoked_at'], unique=False)
+
+    if _missing('users'):
+        op.create_table('users',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _ensure_index('users', 'ix_users_username', ['username'], unique=True)
+
+    if _missing('google_accounts'):
+        op.create_table('google_accounts',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('google_user_id', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('trips'):
+        op.create_table('trips',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('from_city', sa.String(length=100), nullable=False),
+        sa.Column('to_city', sa.String(length=100), nullable=False),
+        sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('transport', sa.Enum('FLIGHT', 'TRAIN', 'CAR', 'BOAT', name='transporttype'), nullable=False),
+        sa.Column('adults', sa.Integer(), nullable=False),
+        sa.Column('children', sa.Integer(), nullable=False),
+        sa.Column('budget_min', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('budget_max', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('entertainment_tags', JSONArray(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('DRAFT', 'PLANNED', 'ACTIVE', 'COMPLETED', 'CANCELLED', name='tripstatus'), nullable=False),
+        sa.Column('timezone', sa.String(length=50), nullable=True),
+        sa.Column('ics_token', sa.String(length=36), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('selected_flight_id', sa.String(length=255), nullable=True),
+        sa.Column('selected_flight_airline', sa.String(length=100), nullable=True),
+        sa.Column('selected_flight_number', sa.String(length=50), nullable=True),
+        sa.Column('selected_flight_departure_airport', sa.String(length=10), nullable=True),
+        sa.Column('selected_flight_arrival_airport', sa.String(length=10), nullable=True),
+        sa.Column('selected_flight_departure_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('selected_flight_arrival_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('selected_flight_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('selected_flight_currency', sa.String(length=10), nullable=True),
+        sa.Column('selected_flight_duration_min', sa.Integer(), nullable=True),
+        sa.Column('selected_flight_stops', sa.Integer(), nullable=True),
+        sa.Column('selected_flight_score', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('selected_flight_title', sa.String(length=255), nullable=True),
+        sa.Column('selected_flight_pros', sqlite.JSON(), nullable=True),
+        sa.Column('selected_flight_cons', sqlite.JSON(), nullable=True),
+        sa.Column('selected_hotel_id', sa.String(length=255), nullable=True),
+        sa.Column('selected_hotel_name', sa.String(length=255), nullable=True),
+        sa.Column('selected_hotel_location', sa.String(length=500), nullable=True),
+        sa.Column('selected_hotel_price_per_night', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('selected_hotel_total_price', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('selected_hotel_currency', sa.String(length=10), nullable=True),
+        sa.Column('selected_hotel_check_in', sa.String(length=50), nullable=True),
+        sa.Column('selected_hotel_check_out', sa.String(length=50), nullable=True),
+        sa.Column('selected_hotel_rating', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('selected_hotel_reviews_count', sa.Integer(), nullable=True),
+        sa.Column('selected_hotel_class', sa.Integer(), nullable=True),
+        sa.Column('selected_hotel_amenities', sqlite.JSON(), nullable=True),
+        sa.Column('selected_hotel_free_cancellation', sa.Boolean(), nullable=True),
+        sa.Column('selected_hotel_score', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('selected_hotel_title', sa.String(length=255), nullable=True),
+        sa.Column('selected_hotel_pros', sqlite.JSON(), nullable=True),
+        sa.Column('selected_hotel_cons', sqlite.JSON(), nullable=True),
+        sa.Column('selected_hotel_thumbnail', sa.String(length=1000), nullable=True),
+        sa.Column('selected_hotel_link', sa.String(length=1000), nullable=True),
+        sa.Column('selected_entertainments', sqlite.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _ensure_index('trips', 'ix_trips_user_created', ['user_id', 'created_at', 'id'], unique=False)
+    _ensure_index('trips', 'ix_trips_user_status_created', ['user_id', 'status', 'created_at', 'id'], unique=False)
+
+    if _missing('user_sessions'):
+        op.create_table('user_sessions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _ensure_index('user_sessions', 'ix_user_sessions_token', ['token'], unique=True)
+
+    if _missing('activity_searches'):
+        op.create_table('activity_searches',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('query', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('calendar_bindings'):
+        op.create_table('calendar_bindings',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('google_account_id', sa.String(length=36), nullable=False),
+        sa.Column('calendar_id', sa.String(length=255), nullable=False),
+        sa.Column('sync_mode', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['google_account_id'], ['google_accounts.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('culture_guides'):
+        op.create_table('culture_guides',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('destination', sa.String(length=255), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('tips_json', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    _ensure_index('culture_guides', 'ix_culture_guides_trip_id', ['trip_id'], unique=True)
+
+    if _missing('entertainment_selections'):
+        op.create_table('entertainment_selections',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('venue_id', sa.String(length=255), nullable=False),
+        sa.Column('venue_name', sa.String(length=255), nullable=False),
+        sa.Column('venue_type', sa.String(length=100), nullable=True),
+        sa.Column('address', sa.String(length=500), nullable=True),
+        sa.Column('rating', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('reviews_count', sa.Integer(), nullable=True),
+        sa.Column('price_level', sa.String(length=10), nullable=True),
+        sa.Column('latitude', sa.Numeric(precision=10, scale=7), nullable=True),
+        sa.Column('longitude', sa.Numeric(precision=10, scale=7), nullable=True),
+        sa.Column('website', sa.String(length=1000), nullable=True),
+        sa.Column('phone', sa.String(length=50), nullable=True),
+        sa.Column('opening_hours', sqlite.JSON(), nullable=True),
+        sa.Column('types', sqlite.JSON(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('thumbnail', sa.String(length=1000), nullable=True),
+        sa.Column('score', sa.Numeric(precision=3, scale=2), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('pros_keywords', sqlite.JSON(), nullable=True),
+        sa.Column('cons_keywords', sqlite.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('flight_searches'):
+        op.create_table('flight_searches',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('query', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('google_tokens'):
+        op.create_table('google_tokens',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('google_account_id', sa.String(length=36), nullable=False),
+        sa.Column('access_token', sa.Text(), nullable=False),
+        sa.Column('refresh_token', sa.Text(), nullable=True),
+        sa.Column('token_type', sa.String(length=50), nullable=False),
+        sa.Column('scope', sa.String(length=500), nullable=True),
+        sa.Column('expiry', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['google_account_id'], ['google_accounts.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('hotel_searches'):
+        op.create_table('hotel_searches',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('query', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('itinerary_items'):
+        op.create_table('itinerary_items',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('day_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('type', sa.Enum('FLIGHT', 'HOTEL', 'ACTIVITY', 'NOTE', name='itineraryitemtype'), nullable=False),
+        sa.Column('ref_table', sa.String(length=50), nullable=True),
+        sa.Column('ref_id', sa.String(length=36), nullable=True),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('plan_jobs'):
+        op.create_table('plan_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus'), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('trip_id', 'kind', name='uq_plan_jobs_trip_kind')
+        )
+    _ensure_index('plan_jobs', 'ix_plan_jobs_status', ['status'], unique=False)
+    _ensure_index('plan_jobs', 'ix_plan_jobs_trip_id', ['trip_id'], unique=False)
+
+    if _missing('trip_checklists'):
+        op.create_table('trip_checklists',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('checklist_json', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('trip_plans'):
+        op.create_table('trip_plans',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('plan_json', sqlite.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('activities'):
+        op.create_table('activities',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('search_id', sa.String(length=36), nullable=False),
+        sa.Column('provider', sa.String(length=100), nullable=False),
+        sa.Column('payload', sqlite.JSON(), nullable=False),
+        sa.Column('pros', JSONArray(), nullable=True),
+        sa.Column('cons', JSONArray(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['search_id'], ['activity_searches.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('calendar_events'):
+        op.create_table('calendar_events',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('itinerary_item_id', sa.String(length=36), nullable=False),
+        sa.Column('google_event_id', sa.String(length=255), nullable=False),
+        sa.Column('etag', sa.String(length=255), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['itinerary_item_id'], ['itinerary_items.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('flight_options'):
+        op.create_table('flight_options',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('search_id', sa.String(length=36), nullable=False),
+        sa.Column('provider', sa.String(length=100), nullable=False),
+        sa.Column('price_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('price_currency', sa.String(length=3), nullable=False),
+        sa.Column('payload', sqlite.JSON(), nullable=False),
+        sa.Column('pros', JSONArray(), nullable=True),
+        sa.Column('cons', JSONArray(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['search_id'], ['flight_searches.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('hotel_options'):
+        op.create_table('hotel_options',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('search_id', sa.String(length=36), nullable=False),
+        sa.Column('provider', sa.String(length=100), nullable=False),
+        sa.Column('price_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('price_currency', sa.String(length=3), nullable=False),
+        sa.Column('payload', sqlite.JSON(), nullable=False),
+        sa.Column('pros', JSONArray(), nullable=True),
+        sa.Column('cons', JSONArray(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['search_id'], ['hotel_searches.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('flight_selections'):
+        op.create_table('flight_selections',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('option_id', sa.String(length=36), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['option_id'], ['flight_options.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    if _missing('hotel_selections'):
+        op.create_table('hotel_selections',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        sa.Column('option_id', sa.String(length=36), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['option_id'], ['hotel_options.id'], ),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    # Columns added after the table first shipped
+    _ensure_column("trips", sa.Column("selected_hotel_link", sa.String(length=1000), nullable=True))
+    _ensure_column("token_revocations", sa.Column("expires_at", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('hotel_selections')
+    op.drop_table('flight_selections')
+    op.drop_table('hotel_options')
+    op.drop_table('flight_options')
+    op.drop_table('calendar_events')
+    op.drop_table('activities')
+    op.drop_table('trip_plans')
+    op.drop_table('trip_checklists')
+    with op.batch_alter_table('plan_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_plan_jobs_trip_id'))
+        batch_op.drop_index(batch_op.f('ix_plan_jobs_status'))
+
+    op.drop_table('plan_jobs')
+    op.drop_table('itinerary_items')
+    op.drop_table('hotel_searches')
+    op.drop_table('google_tokens')
+    op.drop_table('flight_searches')
+    op.drop_table('entertainment_selections')
+    with op.batch_alter_table('culture_guides', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_culture_guides_trip_id'))
+
+    op.drop_table('culture_guides')
+    op.drop_table('calendar_bindings')
+    op.drop_table('activity_searches')
+    with op.batch_alter_table('user_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_sessions_token'))
+
+    op.drop_table('user_sessions')
+    with op.batch_alter_table('trips', schema=None) as batch_op:
+        batch_op.drop_index('ix_trips_user_status_created')
+        batch_op.drop_index('ix_trips_user_created')
+
+    op.drop_table('trips')
+    op.drop_table('google_accounts')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('token_revocations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_revocations_revoked_at'))
+
+    op.drop_table('token_revocations')
+    with op.batch_alter_table('culture_tips', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_culture_tips_country_code'))
+
+    op.drop_table('culture_tips')
+    with op.batch_alter_table('cache_entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cache_entries_stale_until'))
+
+    op.drop_table('cache_entries')
+    # ### end Alembic commands ###
@@ -0,0 +1,112 @@
+"""Move the selected flight/hotel out of trips into trip_flights/trip_hotels.
+
+Existing selections are copied to the side tables before the trips columns
+are dropped; downgrade copies them back.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:19:14.916843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (side table column, trips column, type)
+FLIGHT_COLUMNS = [
+    ('flight_id', 'selected_flight_id', sa.String(length=255)),
+    ('airline', 'selected_flight_airline', sa.String(length=100)),
+    ('flight_number', 'selected_flight_number', sa.String(length=50)),
+    ('departure_airport', 'selected_flight_departure_airport', sa.String(length=10)),
+    ('arrival_airport', 'selected_flight_arrival_airport', sa.String(length=10)),
+    ('departure_time', 'selected_flight_departure_time', sa.DateTime(timezone=True)),
+    ('arrival_time', 'selected_flight_arrival_time', sa.DateTime(timezone=True)),
+    ('price', 'selected_flight_price', sa.Numeric(precision=10, scale=2)),
+    ('currency', 'selected_flight_currency', sa.String(length=10)),
+    ('duration_min', 'selected_flight_duration_min', sa.Integer()),
+    ('stops', 'selected_flight_stops', sa.Integer()),
+    ('score', 'selected_flight_score', sa.Numeric(precision=3, scale=2)),
+    ('title', 'selected_flight_title', sa.String(length=255)),
+    ('pros', 'selected_flight_pros', sqlite.JSON()),
+    ('cons', 'selected_flight_cons', sqlite.JSON()),
+]
+
+HOTEL_COLUMNS = [
+    ('hotel_id', 'selected_hotel_id', sa.String(length=255)),
+    ('name', 'selected_hotel_name', sa.String(length=255)),
+    ('location', 'selected_hotel_location', sa.String(length=500)),
+    ('price_per_night', 'selected_hotel_price_per_night', sa.Numeric(precision=10, scale=2)),
+    ('total_price', 'selected_hotel_total_price', sa.Numeric(precision=10, scale=2)),
+    ('currency', 'selected_hotel_currency', sa.String(length=10)),
+    ('check_in', 'selected_hotel_check_in', sa.String(length=50)),
+    ('check_out', 'selected_hotel_check_out', sa.String(length=50)),
+    ('rating', 'selected_hotel_rating', sa.Numeric(precision=3, scale=2)),
+    ('reviews_count', 'selected_hotel_reviews_count', sa.Integer()),
+    ('hotel_class', 'selected_hotel_class', sa.Integer()),
+    ('amenities', 'selected_hotel_amenities', sqlite.JSON()),
+    ('free_cancellation', 'selected_hotel_free_cancellation', sa.Boolean()),
+    ('score', 'selected_hotel_score', sa.Numeric(precision=3, scale=2)),
+    ('title', 'selected_hotel_title', sa.String(length=255)),
+    ('pros', 'selected_hotel_pros', sqlite.JSON()),
+    ('cons', 'selected_hotel_cons', sqlite.JSON()),
+    ('thumbnail', 'selected_hotel_thumbnail', sa.String(length=1000)),
+    ('link', 'selected_hotel_link', sa.String(length=1000)),
+]
+
+SIDE_TABLES = [
+    ('trip_flights', FLIGHT_COLUMNS),
+    ('trip_hotels', HOTEL_COLUMNS),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in SIDE_TABLES:
+        op.create_table(table,
+        sa.Column('trip_id', sa.String(length=36), nullable=False),
+        *[sa.Column(name, type_, nullable=True) for name, _, type_ in columns],
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+        sa.PrimaryKeyConstraint('trip_id')
+        )
+
+        # Backfill: one side row per trip that had a selection
+        side = ', '.join(name for name, _, _ in columns)
+        wide = ', '.join(old for _, old, _ in columns)
+        op.execute(
+            f"INSERT INTO {table} (trip_id, {side}) "
+            f"SELECT id, {wide} FROM trips WHERE {columns[0][1]} IS NOT NULL"
+        )
+
+    with op.batch_alter_table('trips', schema=None) as batch_op:
+        for _, columns in SIDE_TABLES:
+            for _, old, _ in columns:
+                batch_op.drop_column(old)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('trips', schema=None) as batch_op:
+        for _, columns in SIDE_TABLES:
+            for _, old, type_ in columns:
+                batch_op.add_column(sa.Column(old, type_, nullable=True))
+
+    for table, columns in SIDE_TABLES:
+        assignments = ', '.join(
+            f"{old} = (SELECT {name} FROM {table} WHERE {table}.trip_id = trips.id)"
+            for name, old, _ in columns
+        )
+        op.execute(
+            f"UPDATE trips SET {assignments} "
+            f"WHERE id IN (SELECT trip_id FROM {table})"
+        )
+        op.drop_table(table)
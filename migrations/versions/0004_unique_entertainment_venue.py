@@ -0,0 +1,46 @@
+"""Make entertainment selections unique per (trip_id, venue_id).
+
+Selections saved without a place_id (empty venue_id) are keyed by their own
+id, and repeated selections of a venue keep only the newest row. The unique
+index replaces the trip_id index, which it covers as its leading column.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:27:41.206518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE entertainment_selections SET venue_id = id WHERE venue_id = ''")
+    op.execute(
+        "DELETE FROM entertainment_selections WHERE EXISTS ("
+        "SELECT 1 FROM entertainment_selections AS newer "
+        "WHERE newer.trip_id = entertainment_selections.trip_id "
+        "AND newer.venue_id = entertainment_selections.venue_id "
+        "AND (newer.created_at > entertainment_selections.created_at "
+        "OR (newer.created_at = entertainment_selections.created_at "
+        "AND newer.id > entertainment_selections.id)))"
+    )
+
+    with op.batch_alter_table('entertainment_selections', schema=None) as batch_op:
+        batch_op.create_index('uq_entertainment_selections_trip_venue', ['trip_id', 'venue_id'], unique=True)
+        batch_op.drop_index(batch_op.f('ix_entertainment_selections_trip_id'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('entertainment_selections', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_entertainment_selections_trip_id'), ['trip_id'], unique=False)
+        batch_op.drop_index('uq_entertainment_selections_trip_venue')
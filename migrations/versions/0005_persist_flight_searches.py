@@ -0,0 +1,43 @@
+"""Store flight search results: result order and the shared Google Flights URL.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:36:02.771945
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('flight_searches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('google_flights_url', sa.String(length=2000), nullable=True))
+
+    with op.batch_alter_table('flight_options', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index('ix_flight_options_search_position', ['search_id', 'position'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_flight_options_search_id'))
+
+    with op.batch_alter_table('flight_options', schema=None) as batch_op:
+        batch_op.alter_column('position', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('flight_options', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_flight_options_search_id'), ['search_id'], unique=False)
+        batch_op.drop_index('ix_flight_options_search_position')
+        batch_op.drop_column('position')
+
+    with op.batch_alter_table('flight_searches', schema=None) as batch_op:
+        batch_op.drop_column('google_flights_url')
@@ -0,0 +1,167 @@
+"""Test the offline airport index: lookups, fuzzy matches, nearest airports."""
+
+import asyncio
+import os
+import random
+import tempfile
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.core.services import services
+from app.db.database import ALEMBIC_INI, get_async_session
+from app.flights.service import flight_search_service
+from app.geo import AirportIndex, haversine_km, normalize
+from app.main import app
+from app.trips.service import trips_service
+
+# A sample of the mappings the router used to hard-code
+LEGACY = {
+    "new york": "JFK",
+    "london": "LHR",
+    "paris": "CDG",
+    "dubai": "DXB",
+    "doha": "DOH",
+    "almaty": "ALA",
+    "astana": "NQZ",
+    "istanbul": "IST",
+    "tokyo": "NRT",
+    "sao paulo": "GRU",
+    "moscow": "SVO",
+    "kyiv": "KBP",
+    "kiev": "KBP",
+    "belgrade": "BEG",
+}
+
+
+def test_exact_lookups():
+    index: AirportIndex = services.get("airport_index")
+    for city, code in LEGACY.items():
+        assert index.airport_code(city) == code, city
+
+    assert normalize("São Paulo") == "sao paulo"
+    assert index.airport_code("São Paulo, Brazil") == "GRU"
+    assert index.airport_code("NYC") == "JFK"
+    assert index.airport_code("Heathrow") == "LHR"
+    assert index.airport_code("jfk") == "JFK"
+    assert index.get("doh").city == "Doha"
+
+    london = [m.airport.iata for m in index.resolve("London")]
+    assert london[0] == "LHR" and {"LGW", "STN", "LCY"} <= set(london)
+    assert all(m.confidence == 1.0 for m in index.resolve("London"))
+
+    # A country code after the comma picks that country's airport
+    assert index.airport_code("San Jose, CR") == "SJO"
+
+
+def test_fuzzy_lookups():
+    index: AirportIndex = services.get("airport_index")
+    for typo, code in {
+        "Barcelonna": "BCN",
+        "Duabi": "DXB",
+        "Frankfrut": "FRA",
+        "Moskow": "SVO",
+    }.items():
+        best = index.resolve(typo)[0]
+        assert best.airport.iata == code, typo
+        assert 0.5 <= best.confidence < 1.0
+
+    assert index.resolve("Nowhereville") == ()
+    assert index.airport_code("Frankfrut", min_confidence=0.95) is None
+
+
+def test_nearest_matches_brute_force():
+    index: AirportIndex = services.get("airport_index")
+    assert index.nearest(51.5074, -0.1278)[0].airport.iata == "LCY"
+
+    rng = random.Random(3)
+    for _ in range(200):
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        found = [n.airport.iata for n in index.nearest(lat, lon, k=3)]
+        expected = sorted(
+            index.airports,
+            key=lambda a: haversine_km(lat, lon, a.latitude, a.longitude),
+        )[:3]
+        assert found == [a.iata for a in expected]
+
+    nearby = index.nearest(25.2532, 55.3657, k=10, radius_km=100)
+    assert [n.airport.iata for n in nearby][:2] == ["DXB", "SHJ"]
+    assert all(n.distance_km <= 100 for n in nearby)
+
+
+def _migrate(path: str) -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+
+
+async def _run_unknown_city_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    serpapi_calls = []
+
+    async def fake_search(**kwargs):
+        serpapi_calls.append(kwargs)
+        return [], None
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    flight_search_service.search_flights = fake_search
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "geo"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            async def search(from_city: str):
+                trip = {
+                    "from_city": from_city,
+                    "to_city": "Doha",
+                    "start_date": "2025-12-15T00:00:00",
+                    "end_date": "2025-12-22T00:00:00",
+                    "transport": "flight",
+                }
+                trip_id = (
+                    await client.post("/api/v1/trips", json=trip, headers=headers)
+                ).json()["id"]
+                return await client.get(
+                    "/api/v1/flights/search", params={"trip_id": trip_id}, headers=headers
+                )
+
+            response = await search("Nowhereville")
+            assert response.status_code == 422
+            assert "departure_id" in response.json()["detail"]
+            assert serpapi_calls == []
+
+            response = await search("Almatty")
+            assert response.status_code == 200
+            assert serpapi_calls[0]["departure_id"] == "ALA"
+            assert serpapi_calls[0]["arrival_id"] == "DOH"
+    finally:
+        del flight_search_service.search_flights
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await trips_service._owners.clear()
+        await engine.dispose()
+
+
+def test_unknown_city_is_rejected_before_serpapi():
+    path = os.path.join(tempfile.mkdtemp(), "geo.db")
+    _migrate(path)
+    asyncio.run(_run_unknown_city_check(path))
+
+
+if __name__ == "__main__":
+    test_exact_lookups()
+    test_fuzzy_lookups()
+    test_nearest_matches_brute_force()
+    test_unknown_city_is_rejected_before_serpapi()
+    print("\n🎉 Airport index tests passed!")
@@ -9,7 +9,7 @@ from datetime import datetime
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.db.models import Trip
+from app.db.models import Trip, TripFlight
 
 
 async def test_flight_save():
@@ -36,35 +36,31 @@ async def test_flight_save():
         print(f"   User ID: {trip.user_id}")
 
         # Update with flight info
-        trip.selected_flight_id = "test_flight_123"
-        trip.selected_flight_airline = "Delta"
-        trip.selected_flight_number = "DL999"
-        trip.selected_flight_departure_airport = "JFK"
-        trip.selected_flight_arrival_airport = "LAX"
-        trip.selected_flight_departure_time = datetime.fromisoformat(
-            "2025-12-01T08:00:00"
-        )
-        trip.selected_flight_arrival_time = datetime.fromisoformat(
-            "2025-12-01T11:30:00"
-        )
-        trip.selected_flight_price = 450.0
-        trip.selected_flight_currency = "USD"
-        trip.selected_flight_duration_min = 210
-        trip.selected_flight_stops = 0
-        trip.selected_flight_score = 0.9
-        trip.selected_flight_title = "Test Flight"
-        trip.selected_flight_pros = ["direct", "cheap"]
-        trip.selected_flight_cons = ["busy"]
+        flight = await session.get(TripFlight, trip.id) or TripFlight(trip_id=trip.id)
+        flight.flight_id = "test_flight_123"
+        flight.airline = "Delta"
+        flight.flight_number = "DL999"
+        flight.departure_airport = "JFK"
+        flight.arrival_airport = "LAX"
+        flight.departure_time = datetime.fromisoformat("2025-12-01T08:00:00")
+        flight.arrival_time = datetime.fromisoformat("2025-12-01T11:30:00")
+        flight.price = 450.0
+        flight.currency = "USD"
+        flight.duration_min = 210
+        flight.stops = 0
+        flight.score = 0.9
+        flight.title = "Test Flight"
+        flight.pros = ["direct", "cheap"]
+        flight.cons = ["busy"]
+        session.add(flight)
 
         # Commit
         await session.commit()
         print("✅ Flight information saved to database!")
 
         # Verify
-        await session.refresh(trip)
-        print(
-            f"✅ Verified: {trip.selected_flight_airline} {trip.selected_flight_number}"
-        )
+        await session.refresh(flight)
+        print(f"✅ Verified: {flight.airline} {flight.flight_number}")
 
 
 if __name__ == "__main__":
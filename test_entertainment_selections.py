@@ -0,0 +1,223 @@
+"""Test the bulk entertainment selection upsert: one statement, unique venues."""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.db.database import ALEMBIC_INI, get_async_session
+from app.entertainment import selections as selections_module
+from app.main import app
+from app.trips.service import trips_service
+
+TRIP = {
+    "from_city": "Almaty",
+    "to_city": "Doha",
+    "start_date": "2025-05-01T00:00:00",
+    "end_date": "2025-05-08T00:00:00",
+    "transport": "flight",
+}
+
+
+def _venues(count: int, title: str = "Venue", score: float = 0.5) -> list:
+    return [
+        {
+            "venue": {"place_id": f"p{i}", "title": f"{title} {i}", "rating": 4.5},
+            "ranking": {"score": score, "pros_keywords": ["views"]},
+        }
+        for i in range(count)
+    ]
+
+
+def _migrate(path: str, revision: str = "head") -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, revision)
+
+
+async def _run_upsert_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "entertainment_selections" in statement:
+            statements.append(statement)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "venues"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip_id = (
+                await client.post("/api/v1/trips", json=TRIP, headers=headers)
+            ).json()["id"]
+
+            # 20 venues (one repeated in the request) are a single INSERT
+            statements.clear()
+            response = await client.post(
+                "/api/v1/entertainment/select",
+                json={"trip_id": trip_id, "selections": _venues(20) + _venues(1)},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            assert len(statements) == 1
+            assert statements[0].lstrip().startswith("INSERT")
+            assert "ON CONFLICT" in statements[0] and "RETURNING" in statements[0]
+            first = response.json()
+            assert first["selected_count"] == 20
+            ids = {s["venue_name"]: s["id"] for s in first["selections"]}
+
+            # Selecting again refreshes the rows in place
+            response = await client.post(
+                "/api/v1/entertainment/select",
+                json={"trip_id": trip_id, "selections": _venues(5, "Renamed", 0.9)},
+                headers=headers,
+            )
+            again = response.json()["selections"]
+            assert [s["score"] for s in again] == [0.9] * 5
+            assert {s["id"] for s in again} == {ids[f"Venue {i}"] for i in range(5)}
+
+            listed = (
+                await client.get(f"/api/v1/entertainment/{trip_id}/selections", headers=headers)
+            ).json()
+            assert listed["total_selections"] == 20
+            assert {s["id"] for s in listed["selections"]} == set(ids.values())
+
+            # Venues without a place_id never collide
+            for _ in range(2):
+                await client.post(
+                    "/api/v1/entertainment/select",
+                    json={"trip_id": trip_id, "selections": [{"venue": {"title": "Souq"}}]},
+                    headers=headers,
+                )
+
+            trip = (await client.get(f"/api/v1/trips/{trip_id}", headers=headers)).json()
+            assert len(trip["selected_entertainments"]) == 20
+
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT count(*) FROM entertainment_selections").fetchone() == (22,)
+        finally:
+            conn.close()
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await trips_service._owners.clear()
+        await engine.dispose()
+
+
+def test_selection_upsert_is_one_statement():
+    path = os.path.join(tempfile.mkdtemp(), "venues.db")
+    _migrate(path)
+    asyncio.run(_run_upsert_check(path))
+
+
+async def _run_fallback_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (id, username, created_at) VALUES ('u1', 'portable', '2025-01-01')"
+    )
+    conn.execute(
+        "INSERT INTO trips (id, user_id, from_city, to_city, start_date, end_date, "
+        "transport, adults, children, status, ics_token) VALUES ('t1', 'u1', 'Almaty', "
+        "'Doha', '2025-05-01', '2025-05-08', 'FLIGHT', 1, 0, 'DRAFT', 'ics')"
+    )
+    conn.commit()
+    conn.close()
+
+    # A dialect without an ON CONFLICT insert takes the per-row path
+    saved = selections_module._INSERTS.pop("sqlite")
+    try:
+        async with session_factory() as session:
+            first = await selections_module.upsert_selections(session, "t1", _venues(3))
+            await session.commit()
+            again = await selections_module.upsert_selections(
+                session, "t1", _venues(2, "Renamed", 0.9) + _venues(4)[3:]
+            )
+            await session.commit()
+
+        assert len(first) == 3
+        ids = {row.venue_id: row.id for row in first}
+        assert {row.venue_id: row.id for row in again if row.venue_id != "p3"} == {
+            "p0": ids["p0"],
+            "p1": ids["p1"],
+        }
+        assert sorted(row.venue_name for row in again) == ["Renamed 0", "Renamed 1", "Venue 3"]
+
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT count(*) FROM entertainment_selections").fetchone() == (4,)
+        finally:
+            conn.close()
+    finally:
+        selections_module._INSERTS["sqlite"] = saved
+        await engine.dispose()
+
+
+def test_selection_upsert_without_on_conflict():
+    path = os.path.join(tempfile.mkdtemp(), "portable_venues.db")
+    _migrate(path)
+    asyncio.run(_run_fallback_check(path))
+
+
+def test_migration_dedupes_existing_selections():
+    path = os.path.join(tempfile.mkdtemp(), "legacy_venues.db")
+    _migrate(path, "0003")
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (id, username, created_at) VALUES ('u1', 'legacy', '2025-01-01')"
+    )
+    conn.execute(
+        "INSERT INTO trips (id, user_id, from_city, to_city, start_date, end_date, "
+        "transport, adults, children, status, ics_token) VALUES ('t1', 'u1', 'Almaty', "
+        "'Doha', '2025-05-01', '2025-05-08', 'FLIGHT', 1, 0, 'DRAFT', 'ics')"
+    )
+    conn.executemany(
+        "INSERT INTO entertainment_selections (id, trip_id, venue_id, venue_name, created_at) "
+        "VALUES (?, 't1', ?, ?, ?)",
+        [
+            ("s1", "p1", "Old", "2025-01-01 00:00:00"),
+            ("s2", "p1", "New", "2025-01-02 00:00:00"),
+            ("s3", "", "No place", "2025-01-01 00:00:00"),
+            ("s4", "", "No place", "2025-01-01 00:00:00"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    _migrate(path)
+
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT id, venue_id, venue_name FROM entertainment_selections ORDER BY id"
+        ).fetchall()
+        assert rows == [("s2", "p1", "New"), ("s3", "s3", "No place"), ("s4", "s4", "No place")]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_selection_upsert_is_one_statement()
+    test_selection_upsert_without_on_conflict()
+    test_migration_dedupes_existing_selections()
+    print("\n🎉 Entertainment selection tests passed!")
@@ -0,0 +1,174 @@
+"""Load test: other endpoints stay responsive while trip plans are generating.
+
+Runs the real FastAPI app in-process against a temporary SQLite database and
+replaces the shared OpenAI client with a fake one whose completions take a
+while, so no network access or API key is needed.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.core.llm as llm
+from app.ai.planner import TripPlan
+from app.core.settings import settings
+from app.db.database import Base, get_async_session
+from app.jobs import job_worker
+from app.main import app
+
+PLAN_SECONDS = 1.0
+
+
+class SlowFakeCompletions:
+    """Mimics ``client.beta.chat.completions`` with a slow, awaitable parse."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    async def parse(self, **kwargs):
+        self.calls += 1
+        self._in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self._in_flight -= 1
+        plan = TripPlan(
+            title="Doha getaway",
+            timezone="Asia/Qatar",
+            start_date="2025-12-15",
+            end_date="2025-12-20",
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed=plan))]
+        )
+
+
+async def _create_trip(client: httpx.AsyncClient, headers: dict) -> str:
+    response = await client.post(
+        "/api/v1/trips",
+        json={
+            "from_city": "Almaty",
+            "to_city": "Doha",
+            "start_date": "2025-12-15T00:00:00",
+            "end_date": "2025-12-20T00:00:00",
+            "transport": "flight",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+async def _run_responsiveness_check(finalize_count: int, max_concurrency: int):
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'load.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    completions = SlowFakeCompletions(PLAN_SECONDS)
+    saved = (settings.openai_api_key, settings.openai_max_concurrency)
+    saved_worker = (job_worker.session_factory, job_worker.concurrency)
+    settings.openai_api_key = "sk-test"
+    settings.openai_max_concurrency = max_concurrency
+    await llm.close_openai_client()
+    llm._client = SimpleNamespace(
+        beta=SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    )
+    app.dependency_overrides[get_async_session] = override_session
+    job_worker.session_factory = session_factory
+    job_worker.concurrency = finalize_count
+    await job_worker.start()
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/v1/auth/register", json={"username": "loadtester"})
+            login = await client.post("/api/v1/auth/login", json={"username": "loadtester"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip_ids = [await _create_trip(client, headers) for _ in range(finalize_count)]
+
+            started = time.perf_counter()
+            job_ids = []
+            for trip_id in trip_ids:
+                response = await client.post(f"/api/v1/trips/{trip_id}/finalize", headers=headers)
+                assert response.status_code == 202, response.text
+                job_ids.append(response.json()["id"])
+
+            # Hammer a cheap endpoint while the plans are generating
+            latencies = []
+            pending = set(job_ids)
+            while pending:
+                t0 = time.perf_counter()
+                health = await client.get("/api/v1/health")
+                latencies.append(time.perf_counter() - t0)
+                assert health.status_code == 200
+                for job_id in list(pending):
+                    job = (await client.get(f"/api/v1/jobs/{job_id}", headers=headers)).json()
+                    assert job["status"] != "failed", job
+                    if job["status"] == "succeeded":
+                        pending.discard(job_id)
+                await asyncio.sleep(0.02)
+            elapsed = time.perf_counter() - started
+
+            trips = [
+                (await client.get(f"/api/v1/trips/{trip_id}", headers=headers)).json()
+                for trip_id in trip_ids
+            ]
+    finally:
+        await job_worker.stop()
+        job_worker.session_factory, job_worker.concurrency = saved_worker
+        app.dependency_overrides.pop(get_async_session, None)
+        llm._client = None
+        llm._semaphore = None
+        settings.openai_api_key, settings.openai_max_concurrency = saved
+        await engine.dispose()
+
+    assert all(trip["status"] == "planned" for trip in trips)
+    return completions, latencies, elapsed
+
+
+def test_health_stays_responsive_during_plan_generation():
+    completions, latencies, elapsed = asyncio.run(
+        _run_responsiveness_check(finalize_count=3, max_concurrency=8)
+    )
+    print(
+        f"📊 {len(latencies)} health checks during planning, "
+        f"max latency {max(latencies) * 1000:.1f} ms, plans done in {elapsed:.2f}s"
+    )
+    # With a blocking client the loop would stall for the whole completion
+    assert len(latencies) >= 10
+    assert max(latencies) < 0.25
+    # Plans generated concurrently rather than one after another
+    assert completions.peak_in_flight == 3
+    assert elapsed < PLAN_SECONDS * 2
+
+
+def test_openai_concurrency_is_bounded():
+    completions, latencies, elapsed = asyncio.run(
+        _run_responsiveness_check(finalize_count=4, max_concurrency=2)
+    )
+    assert completions.calls == 4
+    assert completions.peak_in_flight == 2
+    assert elapsed >= PLAN_SECONDS * 2
+    # Queued plans wait on the semaphore without blocking other requests
+    assert max(latencies) < 0.25
+
+
+if __name__ == "__main__":
+    test_health_stays_responsive_during_plan_generation()
+    test_openai_concurrency_is_bounded()
+    print("\n🎉 Event loop responsiveness tests passed!")
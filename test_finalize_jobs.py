@@ -0,0 +1,274 @@
+"""Test background trip finalization jobs (idempotency, progress, SSE, recovery)."""
+
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.core.llm as llm
+from app.ai.planner import TripPlan
+from app.core.settings import settings
+from app.db.database import Base, get_async_session
+from app.db.models import JobStatus, PlanJob
+from app.jobs import JobWorker, job_worker
+from app.main import app
+from app.trips.jobs import FINALIZE_TRIP_JOB, finalize_trip_job
+
+
+class FakePlanner:
+    """Mimics ``client.beta.chat.completions``; can fail the first N calls."""
+
+    def __init__(self, delay: float = 0.2, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def parse(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError("model overloaded")
+        plan = TripPlan(
+            title="Doha getaway",
+            timezone="Asia/Qatar",
+            start_date="2025-12-15",
+            end_date="2025-12-20",
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed=plan))]
+        )
+
+
+class Harness:
+    """App wired to a temporary database, a fake model and the job worker."""
+
+    def __init__(self, planner: FakePlanner):
+        self.planner = planner
+
+    async def __aenter__(self):
+        tmpdir = tempfile.mkdtemp()
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'jobs.db')}"
+        )
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_session():
+            async with self.session_factory() as session:
+                yield session
+
+        self._saved = (settings.openai_api_key, settings.job_events_poll_seconds)
+        self._saved_factory = job_worker.session_factory
+        settings.openai_api_key = "sk-test"
+        settings.job_events_poll_seconds = 0.05
+        await llm.close_openai_client()
+        llm._client = SimpleNamespace(
+            beta=SimpleNamespace(chat=SimpleNamespace(completions=self.planner))
+        )
+        app.dependency_overrides[get_async_session] = override_session
+        job_worker.session_factory = self.session_factory
+        await job_worker.start()
+
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+        await self.client.post("/api/v1/auth/register", json={"username": "jobtester"})
+        login = await self.client.post("/api/v1/auth/login", json={"username": "jobtester"})
+        self.user_id = login.json()["user_id"]
+        self.headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        await job_worker.stop()
+        job_worker.session_factory = self._saved_factory
+        app.dependency_overrides.pop(get_async_session, None)
+        llm._client = None
+        llm._semaphore = None
+        settings.openai_api_key, settings.job_events_poll_seconds = self._saved
+        await self.engine.dispose()
+
+    async def create_trip(self) -> str:
+        response = await self.client.post(
+            "/api/v1/trips",
+            json={
+                "from_city": "Almaty",
+                "to_city": "Doha",
+                "start_date": "2025-12-15T00:00:00",
+                "end_date": "2025-12-20T00:00:00",
+                "transport": "flight",
+            },
+            headers=self.headers,
+        )
+        return response.json()["id"]
+
+    async def finalize(self, trip_id: str) -> dict:
+        response = await self.client.post(
+            f"/api/v1/trips/{trip_id}/finalize", headers=self.headers
+        )
+        assert response.status_code == 202, response.text
+        assert response.headers["location"] == f"/api/v1/jobs/{response.json()['id']}"
+        return response.json()
+
+    async def wait_for(self, job_id: str, timeout: float = 5.0) -> dict:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            job = (
+                await self.client.get(f"/api/v1/jobs/{job_id}", headers=self.headers)
+            ).json()
+            if job["status"] in ("succeeded", "failed"):
+                return job
+            assert asyncio.get_running_loop().time() < deadline, job
+            await asyncio.sleep(0.02)
+
+
+async def _run_idempotency_check():
+    async with Harness(FakePlanner()) as h:
+        trip_id = await h.create_trip()
+
+        first = await h.finalize(trip_id)
+        assert first["status"] == "queued"
+
+        # Retries while the job is in flight return the same job
+        retries = await asyncio.gather(*(h.finalize(trip_id) for _ in range(5)))
+        assert {job["id"] for job in retries} == {first["id"]}
+
+        done = await h.wait_for(first["id"])
+        assert done["status"] == "succeeded" and done["progress"] == 100
+        assert done["attempts"] == 1
+
+        # Retry after success: same job, no second model call
+        again = await h.finalize(trip_id)
+        assert again["id"] == first["id"] and again["status"] == "succeeded"
+        await asyncio.sleep(0.1)
+        assert h.planner.calls == 1
+
+        trip = (await h.client.get(f"/api/v1/trips/{trip_id}", headers=h.headers)).json()
+        assert trip["status"] == "planned"
+        plan = await h.client.get(f"/api/v1/trips/{trip_id}/plan", headers=h.headers)
+        assert plan.status_code == 200
+        assert plan.json()["plan_json"]["title"] == "Doha getaway"
+
+
+async def _run_failure_retry_check():
+    async with Harness(FakePlanner(delay=0.05, failures=1)) as h:
+        trip_id = await h.create_trip()
+
+        job = await h.wait_for((await h.finalize(trip_id))["id"])
+        assert job["status"] == "failed"
+        assert "model overloaded" in job["error"]
+
+        # A failed job is re-queued by the next finalize call
+        retry = await h.finalize(trip_id)
+        assert retry["id"] == job["id"] and retry["status"] == "queued"
+        job = await h.wait_for(retry["id"])
+        assert job["status"] == "succeeded" and job["attempts"] == 2
+        assert job["error"] is None
+        assert h.planner.calls == 2
+
+
+async def _run_replan_check():
+    async with Harness(FakePlanner(delay=0.05)) as h:
+        trip_id = await h.create_trip()
+        first = await h.wait_for((await h.finalize(trip_id))["id"])
+        assert first["status"] == "succeeded"
+
+        # Back to draft: the next finalize plans the trip again
+        patched = await h.client.patch(
+            f"/api/v1/trips/{trip_id}", json={"status": "draft"}, headers=h.headers
+        )
+        assert patched.json()["status"] == "draft"
+        retry = await h.finalize(trip_id)
+        assert retry["id"] == first["id"] and retry["status"] == "queued"
+        job = await h.wait_for(retry["id"])
+        assert job["status"] == "succeeded" and job["attempts"] == 2
+        assert h.planner.calls == 2
+
+        trip = (await h.client.get(f"/api/v1/trips/{trip_id}", headers=h.headers)).json()
+        assert trip["status"] == "planned"
+
+
+async def _run_sse_progress_check():
+    async with Harness(FakePlanner(delay=0.3)) as h:
+        trip_id = await h.create_trip()
+        job = await h.finalize(trip_id)
+
+        events = []
+        async with h.client.stream(
+            "GET", f"/api/v1/jobs/{job['id']}/events", headers=h.headers
+        ) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    events.append(json.loads(line[len("data: "):]))
+
+        stages = [event["stage"] for event in events]
+        assert "generating_plan" in stages
+        assert events[-1]["status"] == "succeeded"
+        assert [e["progress"] for e in events] == sorted(e["progress"] for e in events)
+
+        missing = await h.client.get("/api/v1/jobs/nope/events", headers=h.headers)
+        assert missing.status_code == 404
+
+
+async def _run_recovery_check():
+    async with Harness(FakePlanner(delay=0.05)) as h:
+        trip_id = await h.create_trip()
+
+        # A job persisted by a process that died before running it
+        async with h.session_factory() as session:
+            job = PlanJob(
+                trip_id=trip_id,
+                user_id=h.user_id,
+                kind=FINALIZE_TRIP_JOB,
+                status=JobStatus.QUEUED,
+            )
+            session.add(job)
+            await session.commit()
+            job_id = job.id
+
+        worker = JobWorker(concurrency=1, session_factory=h.session_factory)
+        worker.register(FINALIZE_TRIP_JOB, finalize_trip_job)
+        await worker.start()
+        try:
+            done = await h.wait_for(job_id)
+        finally:
+            await worker.stop()
+        assert done["status"] == "succeeded"
+        assert worker.succeeded == 1
+
+
+def test_finalize_is_idempotent_per_trip():
+    asyncio.run(_run_idempotency_check())
+
+
+def test_failed_job_is_retried():
+    asyncio.run(_run_failure_retry_check())
+
+
+def test_redrafted_trip_is_planned_again():
+    asyncio.run(_run_replan_check())
+
+
+def test_job_progress_stream():
+    asyncio.run(_run_sse_progress_check())
+
+
+def test_unfinished_jobs_recovered_on_start():
+    asyncio.run(_run_recovery_check())
+
+
+if __name__ == "__main__":
+    test_finalize_is_idempotent_per_trip()
+    test_failed_job_is_retried()
+    test_redrafted_trip_is_planned_again()
+    test_job_progress_stream()
+    test_unfinished_jobs_recovered_on_start()
+    print("\n🎉 Finalize job tests passed!")
@@ -0,0 +1,175 @@
+"""Test the flexible-date price calendar, as JSON and as Server-Sent Events."""
+
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.core.cache import create_response_cache
+from app.core.settings import settings
+from app.db.database import get_async_session
+from app.flights.service import FlightSearchService, flight_search_service
+from app.main import app
+from app.trips.service import trips_service
+from test_airport_index import _migrate
+
+TRIP = {
+    "from_city": "Doha",
+    "to_city": "London",
+    "start_date": "2025-12-15T00:00:00",
+    "end_date": "2025-12-22T00:00:00",
+    "transport": "flight",
+}
+
+
+def _fare(outbound: str, inbound: str) -> int:
+    """Cheaper the later you leave and the earlier you return."""
+    return 1000 - 10 * int(outbound[-2:]) + 5 * int(inbound[-2:])
+
+
+class DatedSerpAPI:
+    """Prices each date combination; 2025-12-13 departures fail upstream."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, url, params=None, **kwargs):
+        out, ret = params["outbound_date"], params["return_date"]
+        self.calls.append((out, ret))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Later dates answer faster, so arrival order differs from grid order
+            await asyncio.sleep(0.01 * (30 - int(out[-2:])))
+        finally:
+            self.in_flight -= 1
+        if out == "2025-12-13":
+            return httpx.Response(500, request=httpx.Request("GET", url))
+        flight = {
+            "flights": [
+                {
+                    "departure_airport": {"id": params["departure_id"], "time": f"{out} 08:00"},
+                    "arrival_airport": {"id": params["arrival_id"], "time": f"{out} 13:05"},
+                    "airline": "Qatar Airways",
+                    "flight_number": "QR 3",
+                    "duration": 425,
+                }
+            ],
+            "total_duration": 425,
+            "price": _fare(out, ret),
+        }
+        body = {
+            "search_metadata": {"google_flights_url": f"https://flights.test/{out}/{ret}"},
+            "best_flights": [flight, {**flight, "price": _fare(out, ret) + 200}],
+        }
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+
+def _events(body: str):
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        yield event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+async def _run_calendar_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    serpapi = DatedSerpAPI()
+    service = FlightSearchService(
+        http=serpapi, cache=create_response_cache("calendar_test", "memory", ttl_seconds=60)
+    )
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    flight_search_service.search_flights = service.search_flights
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "flexible"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip_id = (
+                await client.post("/api/v1/trips", json=TRIP, headers=headers)
+            ).json()["id"]
+
+            response = await client.get(
+                "/api/v1/flights/calendar", params={"trip_id": trip_id}, headers=headers
+            )
+            assert response.status_code == 200
+            calendar = response.json()
+            assert (calendar["departure_id"], calendar["arrival_id"]) == ("DOH", "LHR")
+            assert calendar["outbound_dates"] == ["2025-12-14", "2025-12-15", "2025-12-16"]
+            assert calendar["return_dates"] == ["2025-12-21", "2025-12-22", "2025-12-23"]
+            assert calendar["prices"] == [
+                [_fare(out, ret) for ret in calendar["return_dates"]]
+                for out in calendar["outbound_dates"]
+            ]
+            cheapest = calendar["cheapest"]
+            assert (cheapest["outbound_date"], cheapest["return_date"]) == (
+                "2025-12-16",
+                "2025-12-21",
+            )
+            assert cheapest["itinerary"]["price"]["amount"] == cheapest["min_price"]
+            assert cheapest["itinerary"]["google_flights_url"].endswith("2025-12-16/2025-12-21")
+            assert len(calendar["cells"]) == 9
+            assert len(serpapi.calls) == 9
+            assert serpapi.peak <= settings.flight_calendar_concurrency
+
+            # A wider window streams cells as they arrive; cached cells first
+            async with client.stream(
+                "GET",
+                "/api/v1/flights/calendar",
+                params={"trip_id": trip_id, "days": 2, "stream": "true"},
+                headers=headers,
+            ) as streamed:
+                assert streamed.headers["content-type"].startswith("text/event-stream")
+                events = list(_events((await streamed.aread()).decode()))
+
+            names = [name for name, _ in events]
+            assert names == ["cell"] * 25 + ["calendar", "done"]
+            cells = [data for name, data in events if name == "cell"]
+            assert {(c["outbound_date"], c["return_date"]) for c in cells[:9]} == {
+                (c["outbound_date"], c["return_date"]) for c in calendar["cells"]
+            }
+            assert len(serpapi.calls) == 25  # Only the 16 new cells were searched
+
+            failed = [c for c in cells if c["outbound_date"] == "2025-12-13"]
+            assert len(failed) == 5 and all(c["error"] and c["min_price"] is None for c in failed)
+            summary = events[-2][1]
+            assert "cells" not in summary
+            assert summary["prices"][0] == [None] * 5
+            assert summary["cheapest"]["outbound_date"] == "2025-12-17"
+
+            too_wide = await client.get(
+                "/api/v1/flights/calendar",
+                params={"trip_id": trip_id, "days": settings.flight_calendar_max_days + 1},
+                headers=headers,
+            )
+            assert too_wide.status_code == 422
+    finally:
+        del flight_search_service.search_flights
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await trips_service._owners.clear()
+        await engine.dispose()
+
+
+def test_flight_calendar():
+    path = os.path.join(tempfile.mkdtemp(), "calendar.db")
+    _migrate(path)
+    asyncio.run(_run_calendar_check(path))
+
+
+if __name__ == "__main__":
+    test_flight_calendar()
+    print("\n🎉 Flight calendar tests passed!")
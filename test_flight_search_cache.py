@@ -0,0 +1,122 @@
+"""Test the flight search response cache without calling SerpAPI."""
+
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from app.core.cache import ResponseCache, SQLiteCacheBackend, create_response_cache
+from app.flights.service import FlightSearchService
+
+SAMPLE_SERPAPI_RESPONSE = {
+    "search_metadata": {"google_flights_url": "https://www.google.com/travel/flights"},
+    "best_flights": [
+        {
+            "flights": [
+                {
+                    "departure_airport": {"id": "DOH", "time": "2025-12-15 08:00"},
+                    "arrival_airport": {"id": "LHR", "time": "2025-12-15 13:05"},
+                    "airline": "Qatar Airways",
+                    "flight_number": "QR 3",
+                    "duration": 425,
+                }
+            ],
+            "total_duration": 425,
+            "price": 780,
+            "carbon_emissions": {"this_flight": 410000},
+        }
+    ],
+}
+
+
+class FakeHTTP:
+    """Stand-in for HTTPClientPool that counts upstream calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        return httpx.Response(
+            200, json=SAMPLE_SERPAPI_RESPONSE, request=httpx.Request("GET", url)
+        )
+
+
+async def _run_service_cache_check():
+    http = FakeHTTP()
+    cache = create_response_cache("test_flights", "memory", ttl_seconds=60)
+    service = FlightSearchService(http=http, cache=cache)
+
+    flights, url = await service.search_flights("doh", "lhr", "2025-12-15")
+    assert len(flights) == 1 and url
+
+    # Same query with different casing is served from cache
+    flights2, _ = await service.search_flights(" DOH", "LHR ", "2025-12-15", hl="EN")
+    assert http.calls == 1, "second identical search should not hit SerpAPI"
+    assert flights2[0].id == flights[0].id
+
+    # A different query misses
+    await service.search_flights("DOH", "LHR", "2025-12-16")
+    assert http.calls == 2
+
+    stats = cache.stats()
+    print(f"📊 Cache stats: {stats}")
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+async def _run_stale_while_revalidate_check():
+    calls = {"n": 0}
+
+    async def fetch():
+        calls["n"] += 1
+        return {"version": calls["n"]}
+
+    cache = create_response_cache("swr", "memory", ttl_seconds=0.2, stale_seconds=60)
+    assert (await cache.get_or_fetch("k", fetch))["version"] == 1
+    await asyncio.sleep(0.3)
+
+    # Stale value is returned immediately while a refresh runs in background
+    assert (await cache.get_or_fetch("k", fetch))["version"] == 1
+    await asyncio.sleep(0.01)
+    assert (await cache.get_or_fetch("k", fetch))["version"] == 2
+    assert cache.stale_hits == 1 and cache.refreshes == 1
+
+
+async def _run_sqlite_backend_check():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        cache = ResponseCache("disk", SQLiteCacheBackend(path, "disk"), ttl_seconds=60)
+
+        async def fetch():
+            return {"flights": [1, 2, 3]}
+
+        await cache.get_or_fetch("k", fetch)
+
+        # A new cache instance on the same file sees the stored entry
+        reopened = ResponseCache("disk", SQLiteCacheBackend(path, "disk"), ttl_seconds=60)
+
+        async def fail():
+            raise AssertionError("should be served from disk")
+
+        assert await reopened.get_or_fetch("k", fail) == {"flights": [1, 2, 3]}
+        assert reopened.hits == 1
+
+
+def test_flight_search_is_cached():
+    asyncio.run(_run_service_cache_check())
+
+
+def test_stale_while_revalidate():
+    asyncio.run(_run_stale_while_revalidate_check())
+
+
+def test_sqlite_backend_persists():
+    asyncio.run(_run_sqlite_backend_check())
+
+
+if __name__ == "__main__":
+    test_flight_search_is_cached()
+    test_stale_while_revalidate()
+    test_sqlite_backend_persists()
+    print("\n🎉 Flight search cache tests passed!")
@@ -0,0 +1,181 @@
+"""Test persisted flight searches: stored once, served and re-ranked by search_id."""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.db.database import ALEMBIC_INI, get_async_session
+from app.flights import router as flights_router
+from app.flights.searches import prune_searches
+from app.flights.service import flight_search_service
+from app.main import app
+from app.trips.service import trips_service
+from test_hybrid_ranking import FakeFlightCompletions, _ranker
+from test_ranking_engine import _flights
+
+TRIP = {
+    "from_city": "Almaty",
+    "to_city": "Doha",
+    "start_date": "2025-12-15T00:00:00",
+    "end_date": "2025-12-22T00:00:00",
+    "transport": "flight",
+}
+URL = "https://www.google.com/travel/flights?tfs=abc"
+
+
+def _migrate(path: str) -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+
+
+async def _run_search_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    serpapi_calls = []
+    flights = _flights(12)
+    completions = FakeFlightCompletions()
+
+    async def fake_search(**kwargs):
+        serpapi_calls.append(kwargs)
+        return [f.model_copy() for f in flights], URL
+
+    async def empty_search(**kwargs):
+        return [], URL
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    app.dependency_overrides[flights_router._ranker] = lambda: _ranker(completions)
+    flight_search_service.search_flights = fake_search
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "flyer"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip_id = (
+                await client.post("/api/v1/trips", json=TRIP, headers=headers)
+            ).json()["id"]
+
+            search = (
+                await client.get(
+                    "/api/v1/flights/search",
+                    params={"trip_id": trip_id, "departure_id": "ALA", "arrival_id": "DOH"},
+                    headers=headers,
+                )
+            ).json()
+            search_id = search["search_id"]
+
+            # The stored results read back exactly, in order
+            stored = await client.get(f"/api/v1/flights/search/{search_id}", headers=headers)
+            assert stored.status_code == 200
+            assert stored.json() == search
+            assert [f["id"] for f in stored.json()["flights"]] == [f.id for f in flights]
+
+            # Rank by search_id alone: no SerpAPI call, no flights in the body
+            for prompt in ("cheapest", "fewest stops"):
+                ranked = await client.post(
+                    "/api/v1/flights/rank",
+                    json={"search_id": search_id, "preferences_prompt": prompt},
+                    headers=headers,
+                )
+                assert ranked.status_code == 200
+                assert sorted(ranked.json()["ordered_ids"]) == sorted(f.id for f in flights)
+                assert ranked.json()["search_id"] == search_id
+            assert len(serpapi_calls) == 1
+
+            # Stored searches are private to the trip's owner
+            assert (
+                await client.post(
+                    "/api/v1/flights/rank",
+                    json={"search_id": search_id, "preferences_prompt": "cheapest"},
+                )
+            ).status_code == 401
+            other = await client.post("/api/v1/auth/register", json={"username": "other"})
+            other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+            for response in (
+                await client.get(f"/api/v1/flights/search/{search_id}", headers=other_headers),
+                await client.get("/api/v1/flights/search/missing", headers=headers),
+            ):
+                assert response.status_code == 404
+
+        # One option row per itinerary; the shared URL is stored once
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT count(*) FROM flight_options").fetchone() == (12,)
+            assert conn.execute(
+                "SELECT count(*) FROM flight_options WHERE payload LIKE '%google.com%'"
+            ).fetchone() == (0,)
+            assert conn.execute("SELECT google_flights_url FROM flight_searches").fetchone() == (
+                URL,
+            )
+        finally:
+            conn.close()
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            params = {"trip_id": trip_id, "departure_id": "ALA", "arrival_id": "DOH"}
+            # Nothing found: nothing stored
+            flight_search_service.search_flights = empty_search
+            empty = (
+                await client.get("/api/v1/flights/search", params=params, headers=headers)
+            ).json()
+            assert empty["search_id"] is None and empty["total_results"] == 0
+
+            flight_search_service.search_flights = fake_search
+            kept_id = (
+                await client.get("/api/v1/flights/search", params=params, headers=headers)
+            ).json()["search_id"]
+
+        # Old searches are pruned unless one of their options was selected
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT count(*) FROM flight_searches").fetchone() == (2,)
+            conn.execute("UPDATE flight_searches SET created_at = datetime('now', '-40 days')")
+            conn.execute(
+                "INSERT INTO flight_selections (id, trip_id, option_id) "
+                "SELECT 'sel', ?, id FROM flight_options WHERE search_id = ? LIMIT 1",
+                (trip_id, kept_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        async with session_factory() as session:
+            assert await prune_searches(session, 30) == 1
+            assert await prune_searches(session, 30) == 0
+
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT id FROM flight_searches").fetchall() == [(kept_id,)]
+            assert conn.execute("SELECT count(*) FROM flight_options").fetchone() == (12,)
+        finally:
+            conn.close()
+    finally:
+        del flight_search_service.search_flights
+        app.dependency_overrides.pop(get_async_session, None)
+        app.dependency_overrides.pop(flights_router._ranker, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await trips_service._owners.clear()
+        await engine.dispose()
+
+
+def test_search_results_are_stored_and_reranked():
+    path = os.path.join(tempfile.mkdtemp(), "searches.db")
+    _migrate(path)
+    asyncio.run(_run_search_check(path))
+
+
+if __name__ == "__main__":
+    test_search_results_are_stored_and_reranked()
+    print("\n🎉 Flight search persistence tests passed!")
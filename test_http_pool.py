@@ -0,0 +1,66 @@
+"""Test that the shared HTTP pool reuses connections across requests (no API keys needed)."""
+
+import asyncio
+
+from app.core.http import HTTPClientPool
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP/1.1 keep-alive server returning a small JSON body."""
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if not request:
+                break
+            body = b'{"ok": true}'
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: keep-alive\r\n\r\n" + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_keepalive_check():
+    server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/search"
+
+    pool = HTTPClientPool(http2=False, max_connections_per_host=4)
+    await pool.start()
+    try:
+        for i in range(5):
+            response = await pool.get(url, params={"q": i})
+            assert response.json() == {"ok": True}
+
+        stats = pool.stats()
+        print(f"📊 Pool stats after sequential calls: {stats}")
+        assert stats["requests"] == 5
+        assert stats["tcp_connects"] == 1, "connection should be reused"
+        assert stats["connections_in_use"] == 0
+
+        # Concurrent calls are capped per host
+        await asyncio.gather(*(pool.get(url) for _ in range(10)))
+        stats = pool.stats()
+        assert stats["requests"] == 15
+        assert stats["tcp_connects"] <= 4
+        print(f"✅ {stats['tcp_connects']} TCP connects for {stats['requests']} requests")
+    finally:
+        await pool.close()
+        server.close()
+        await server.wait_closed()
+
+
+def test_http_pool_reuses_connections():
+    """Sequential requests share one connection; concurrency respects the host cap."""
+    asyncio.run(_run_keepalive_check())
+
+
+if __name__ == "__main__":
+    test_http_pool_reuses_connections()
+    print("\n🎉 HTTP pool test passed!")
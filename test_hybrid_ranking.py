@@ -0,0 +1,178 @@
+"""Test the hybrid ranking pipeline: heuristic pre-filter, then LLM re-rank."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import app.flights.ai_ranker as flight_ranker_module
+from app.core.cache import MemoryCacheBackend, ResponseCache
+from app.core.settings import settings
+from app.core.singleflight import SingleFlight
+from app.flights.ai_ranker import OpenAIFlightRanker
+from app.flights.schemas import RankRequest
+from app.ranking import FLIGHT_SCORING, RankingCache, diverse_shortlist, merge_ranked_ids
+from test_ranking_engine import _flights
+
+
+class FakeFlightCompletions:
+    """Ranks whatever flights it is sent in reverse order."""
+
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.fail = fail
+        self.delay = delay
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        prompt = json.loads(kwargs["messages"][1]["content"])
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        ids = [f["id"] for f in prompt["flights"]][::-1]
+        content = json.dumps(
+            {
+                "ordered_ids": ids,
+                "items": [
+                    {
+                        "id": flight_id,
+                        "score": 0.9,
+                        "title": "Model pick",
+                        "rationale_short": "Matches preferences",
+                        "pros_keywords": ["comfortable"],
+                        "cons_keywords": [],
+                    }
+                    for flight_id in ids
+                ],
+                "meta": {"used_model": "gpt-4o-mini", "deterministic": True, "notes": []},
+            }
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+def _ranker(completions) -> OpenAIFlightRanker:
+    ranker = OpenAIFlightRanker.__new__(OpenAIFlightRanker)
+    ranker.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    ranker.model = "gpt-4o-mini"
+    ranker.prompt_format = "verbose"
+    return ranker
+
+
+def test_diverse_shortlist():
+    scored = FLIGHT_SCORING.score({"price": list(range(10))})
+    groups = ["a"] * 6 + ["b"] * 2 + ["c"] * 2
+
+    shortlist = diverse_shortlist(scored, groups, k=5, max_per_group=2)
+    assert shortlist.head == [0, 1, 6, 7, 8]
+    assert shortlist.tail == [2, 3, 4, 5, 9]
+
+    # Too few groups: the cap is relaxed instead of sending fewer than k
+    shortlist = diverse_shortlist(scored, ["a"] * 10, k=4, max_per_group=2)
+    assert shortlist.head == [0, 1, 2, 3]
+
+    assert diverse_shortlist(scored, groups, k=0).tail == []
+    assert merge_ranked_ids(["x", "bogus", "x"], ["y", "x"], ["z"]) == ["x", "y", "z"]
+
+
+async def _run_hybrid_check():
+    flights = _flights(120)
+    for i, flight in enumerate(flights):
+        flight.legs[0].marketing = ["Qatar Airways", "Air Astana", "flydubai"][i % 3]
+    completions = FakeFlightCompletions()
+    request = RankRequest(search_id="s", flights=flights, preferences_prompt="cheap")
+
+    result = await _ranker(completions).rank_flights(request)
+
+    sent = [f["id"] for f in completions.prompts[0]["flights"]]
+    assert len(sent) == settings.ranking_llm_top_k_flights
+    by_id = {f.id: f for f in flights}
+    groups = {}
+    for flight_id in sent:
+        flight = by_id[flight_id]
+        key = (flight.legs[0].marketing, flight.stops)
+        groups[key] = groups.get(key, 0) + 1
+    assert max(groups.values()) <= settings.ranking_max_per_group
+
+    # Model order for the shortlist, then every other flight in heuristic order
+    scored = FLIGHT_SCORING.score(
+        {
+            "price": [f.price.amount for f in flights],
+            "duration": [f.total_duration_min for f in flights],
+            "stops": [f.stops for f in flights],
+            "emissions": [f.emissions_kg for f in flights],
+            "layover": [f.layovers_min or 0 for f in flights],
+        }
+    )
+    heuristic_order = [flights[i].id for i in scored.ranked()]
+    assert result.ordered_ids[: len(sent)] == sent[::-1]
+    assert result.ordered_ids[len(sent):] == [i for i in heuristic_order if i not in sent]
+    assert len(result.items) == 120
+    assert [item.id for item in result.items] == result.ordered_ids
+    assert result.items[-1].tags == ["heuristic"]
+    assert any("top 15 of 120" in note for note in result.meta.notes)
+
+    # The prompt no longer carries every flight
+    full = len(json.dumps([f.model_dump(mode="json") for f in flights]))
+    shortlisted = len(json.dumps(completions.prompts[0]["flights"]))
+    print(f"📊 Prompt flight payload: {shortlisted} chars vs {full} for the full set")
+
+    # Model failure: the heuristic ranks the full set
+    failing = FakeFlightCompletions(fail=True)
+    request = RankRequest(search_id="s", flights=flights, preferences_prompt="fast")
+    result = await _ranker(failing).rank_flights(request)
+    assert result.meta.used_model == "heuristic_fallback"
+    assert result.ordered_ids == heuristic_order
+
+
+async def _run_shared_failure_check():
+    flights = _flights(120)
+    for i, flight in enumerate(flights):
+        flight.legs[0].marketing = ["Qatar Airways", "Air Astana", "flydubai"][i % 3]
+    ranker = _ranker(FakeFlightCompletions())
+    full = RankRequest(search_id="a", flights=flights, preferences_prompt="cheap")
+    # Same shortlist, fewer flights in the tail
+    tail = set(ranker._score(full).ranked()[60:80])
+    fewer = RankRequest(
+        search_id="b",
+        flights=[f for i, f in enumerate(flights) if i not in tail],
+        preferences_prompt="cheap",
+    )
+
+    failing = FakeFlightCompletions(fail=True, delay=0.05)
+    ranker = _ranker(failing)
+    results = await asyncio.gather(ranker.rank_flights(full), ranker.rank_flights(fewer))
+    assert len(failing.prompts) == 1  # One shared model call
+
+    # Each caller gets the fallback for its own flights
+    for request, result in zip((full, fewer), results):
+        assert result.meta.used_model == "heuristic_fallback"
+        assert result.search_id == request.search_id
+        assert sorted(result.ordered_ids) == sorted(f.id for f in request.flights)
+
+
+def _with_fresh_cache(check):
+    original = flight_ranker_module.ranking_cache
+    flight_ranker_module.ranking_cache = RankingCache(
+        ResponseCache("test_hybrid", MemoryCacheBackend(max_entries=10), ttl_seconds=60),
+        SingleFlight("test_hybrid"),
+    )
+    try:
+        asyncio.run(check())
+    finally:
+        flight_ranker_module.ranking_cache = original
+
+
+def test_hybrid_flight_ranking():
+    _with_fresh_cache(_run_hybrid_check)
+
+
+def test_shared_model_failure_falls_back_per_request():
+    _with_fresh_cache(_run_shared_failure_check)
+
+
+if __name__ == "__main__":
+    test_diverse_shortlist()
+    test_hybrid_flight_ranking()
+    test_shared_model_failure_falls_back_per_request()
+    print("\n🎉 Hybrid ranking tests passed!")
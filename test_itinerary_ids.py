@@ -0,0 +1,113 @@
+"""Test deterministic itinerary IDs and de-duplication of SerpAPI results."""
+
+import asyncio
+import copy
+
+import httpx
+
+from app.flights.service import FlightSearchService, merge_itineraries
+from app.ranking import ranking_cache_key
+
+
+def _flight(flight_no: str, departure: str, price: int, emissions=None) -> dict:
+    flight = {
+        "flights": [
+            {
+                "departure_airport": {"id": "DOH", "time": f"2025-12-15 {departure}"},
+                "arrival_airport": {"id": "LHR", "time": "2025-12-15 23:05"},
+                "airline": "Qatar Airways",
+                "flight_number": flight_no,
+                "duration": 425,
+            }
+        ],
+        "total_duration": 425,
+        "price": price,
+    }
+    if emissions is not None:
+        flight["carbon_emissions"] = {"this_flight": emissions}
+    return flight
+
+
+RESPONSE = {
+    "search_metadata": {"google_flights_url": "https://www.google.com/travel/flights"},
+    "best_flights": [_flight("QR 3", "08:00", 780), _flight("QR 5", "14:00", 700)],
+    "other_flights": [
+        # QR 3 again, cheaper and with emissions; QR 5 again at a higher fare
+        _flight("QR3", "08:00", 750, emissions=410000),
+        _flight("QR 5", "14:00", 720, emissions=395000),
+        _flight("QR 7", "19:00", 650),
+    ],
+}
+
+
+class FakeHTTP:
+    def __init__(self, body: dict):
+        self.body = body
+
+    async def get(self, url, params=None, **kwargs):
+        return httpx.Response(200, json=self.body, request=httpx.Request("GET", url))
+
+
+async def _search(body: dict):
+    service = FlightSearchService(http=FakeHTTP(body), cache=None)
+    flights, _ = await service.search_flights("DOH", "LHR", "2025-12-15")
+    return flights
+
+
+def test_duplicates_are_merged_in_order():
+    flights = asyncio.run(_search(RESPONSE))
+
+    # First-seen order; QR 3 is represented by its cheaper "QR3" copy
+    assert [f.legs[0].flight_no for f in flights] == ["QR3", "QR 5", "QR 7"]
+    assert [f.price.amount for f in flights] == [750, 700, 650]
+    # The cheaper duplicate wins; fields only the other copy had are kept
+    assert flights[0].emissions_kg == 410000
+    assert flights[1].emissions_kg == 395000
+    assert len({f.id for f in flights}) == 3
+
+
+def test_unpriced_duplicates_never_win():
+    unpriced = _flight("QR 7", "19:00", 0, emissions=380000)
+    del unpriced["price"]
+    body = copy.deepcopy(RESPONSE)
+    body["best_flights"].insert(0, unpriced)
+    body["other_flights"].append(_flight("QR 9", "22:00", 0))
+    del body["other_flights"][-1]["price"]
+
+    flights = asyncio.run(_search(body))
+    qr7 = [f for f in flights if f.legs[0].flight_no == "QR 7"]
+    # The priced copy wins despite coming later, and keeps the emissions
+    assert len(qr7) == 1 and qr7[0].price.amount == 650
+    assert qr7[0].emissions_kg == 380000
+    assert flights[0] is qr7[0]  # In the unpriced copy's first-seen slot
+
+    merged = merge_itineraries(flights)
+    assert [f.legs[0].flight_no for f in merged] == ["QR 7", "QR 5", "QR3", "QR 9"]
+    assert merged[-1].price.amount == 0
+
+
+def test_ids_are_stable_across_searches():
+    first = asyncio.run(_search(RESPONSE))
+    again = asyncio.run(_search(copy.deepcopy(RESPONSE)))
+    assert [f.id for f in first] == [f.id for f in again]
+
+    # A different fare or departure is a different itinerary
+    repriced = copy.deepcopy(RESPONSE)
+    repriced["other_flights"][-1]["price"] = 640
+    repriced["best_flights"][1]["flights"][0]["departure_airport"]["time"] = "2025-12-15 15:00"
+    changed = asyncio.run(_search(repriced))
+    assert changed[0].id == first[0].id
+    assert changed[1].id != first[1].id
+    assert changed[2].id != first[2].id
+
+    # Stable IDs make repeated searches hit the ranking cache
+    assert ranking_cache_key("flights", "model", "v1", "cheapest", first) == (
+        ranking_cache_key("flights", "model", "v1", "cheapest", again)
+    )
+
+
+if __name__ == "__main__":
+    test_duplicates_are_merged_in_order()
+    test_unpriced_duplicates_never_win()
+    test_ids_are_stable_across_searches()
+    print("\n🎉 Itinerary ID tests passed!")
@@ -0,0 +1,209 @@
+"""Test metro-area flight search: concurrent per-pair searches, merged results."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.core.cache import create_response_cache
+from app.db.database import get_async_session
+from app.flights.service import FlightSearchService, flight_search_service
+from app.main import app
+from app.trips.service import trips_service
+from test_airport_index import _migrate
+
+DELAY = 0.2
+
+
+def _serpapi_flight(dep: str, arr: str, flight_no: str, price: int) -> dict:
+    return {
+        "flights": [
+            {
+                "departure_airport": {"id": dep, "time": "2025-12-15 08:00"},
+                "arrival_airport": {"id": arr, "time": "2025-12-15 13:05"},
+                "airline": "Qatar Airways",
+                "flight_number": flight_no,
+                "duration": 425,
+            }
+        ],
+        "total_duration": 425,
+        "price": price,
+    }
+
+
+class SlowSerpAPI:
+    """Answers each airport pair after DELAY seconds; tracks concurrency."""
+
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, url, params=None, **kwargs):
+        self.calls.append((params["departure_id"], params["arrival_id"]))
+        fare = 900 - len(self.calls)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(DELAY)
+        finally:
+            self.in_flight -= 1
+        dep, arr = params["departure_id"], params["arrival_id"]
+        body = {
+            "search_metadata": {"google_flights_url": f"https://flights.test/{dep}-{arr}"},
+            "best_flights": [_serpapi_flight(dep, arr, f"QR {dep}{arr}", 500)],
+            # Every DOH pair also lists the same codeshare at a pair-specific fare
+            "other_flights": [_serpapi_flight("DOH", "LHR", "QR 3", fare)],
+        }
+        return httpx.Response(200, json=body, request=httpx.Request("GET", url))
+
+
+async def _run_fan_out_check():
+    serpapi = SlowSerpAPI()
+    service = FlightSearchService(
+        http=serpapi, cache=create_response_cache("metro_test", "memory", ttl_seconds=60)
+    )
+
+    started = time.perf_counter()
+    flights, url = await service.search_metro(
+        ["DOH"], ["LHR", "LGW", "STN"], "2025-12-15", concurrency=3
+    )
+    elapsed = time.perf_counter() - started
+
+    # Three pairs in about the time of one
+    assert serpapi.peak == 3
+    assert elapsed < DELAY * 2
+    assert url == "https://flights.test/DOH-LHR"
+
+    # One itinerary per pair plus a single copy of the shared flight, cheapest kept
+    assert len(flights) == 4
+    assert [f.price.amount for f in flights] == sorted(f.price.amount for f in flights)
+    shared = [f for f in flights if f.legs[0].flight_no == "QR 3"]
+    assert len(shared) == 1 and shared[0].price.amount == 897
+    assert {f.google_flights_url for f in flights if f.legs[0].flight_no != "QR 3"} == {
+        "https://flights.test/DOH-LHR",
+        "https://flights.test/DOH-LGW",
+        "https://flights.test/DOH-STN",
+    }
+
+    # Pairs are cached individually: adding airports only searches the new pairs
+    await service.search_metro(["DOH"], ["LHR", "LGW", "STN", "LCY"], "2025-12-15")
+    assert len(serpapi.calls) == 4 and serpapi.calls[-1] == ("DOH", "LCY")
+
+    # The semaphore bounds the fan-out
+    serpapi.peak = 0
+    await service.search_metro(
+        ["DOH", "BAH"], ["LHR", "LGW", "STN"], "2025-12-20", concurrency=2
+    )
+    assert serpapi.peak == 2 and len(serpapi.calls) == 10
+
+
+async def _run_failed_pairs_check():
+    calls = []
+
+    async def search_flights(departure_id, arrival_id, **kwargs):
+        calls.append(arrival_id)
+        if arrival_id != "LGW":
+            raise Exception("Flight search failed")
+        return [], "https://flights.test/DOH-LGW"
+
+    service = FlightSearchService(cache=None)
+    service.search_flights = search_flights
+    flights, url = await service.search_metro(["DOH"], ["LHR", "LGW"], "2025-12-15")
+    assert flights == [] and url == "https://flights.test/DOH-LGW"
+
+    calls.clear()
+    try:
+        await service.search_metro(["DOH"], ["LHR", "STN"], "2025-12-15")
+        raise AssertionError("expected the pair failure to propagate")
+    except Exception as e:
+        assert str(e) == "Flight search failed"
+    assert sorted(calls) == ["LHR", "STN"]
+
+
+def test_metro_search_fans_out_and_merges():
+    asyncio.run(_run_fan_out_check())
+    asyncio.run(_run_failed_pairs_check())
+
+
+async def _run_endpoint_check(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    service = FlightSearchService(
+        http=SlowSerpAPI(),
+        cache=create_response_cache("metro_endpoint", "memory", ttl_seconds=60),
+    )
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    flight_search_service.search_flights = service.search_flights
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "metro"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip = {
+                "from_city": "Doha",
+                "to_city": "London",
+                "start_date": "2025-12-15T00:00:00",
+                "end_date": "2025-12-22T00:00:00",
+                "transport": "flight",
+            }
+            trip_id = (
+                await client.post("/api/v1/trips", json=trip, headers=headers)
+            ).json()["id"]
+
+            response = await client.get(
+                "/api/v1/flights/search",
+                params={"trip_id": trip_id, "metro": "true", "max_airports": 2},
+                headers=headers,
+            )
+            assert response.status_code == 200
+            search = response.json()
+            assert search["search_params"]["departure_ids"] == ["DOH"]
+            assert search["search_params"]["arrival_ids"] == ["LHR", "LGW"]
+            assert sorted(service.http.calls) == [("DOH", "LGW"), ("DOH", "LHR")]
+            assert search["total_results"] == 3
+
+            # Per-pair URLs survive the round trip through storage
+            stored = await client.get(
+                f"/api/v1/flights/search/{search['search_id']}", headers=headers
+            )
+            assert stored.json() == search
+
+            # Without metro the primary airports alone are searched
+            single = (
+                await client.get(
+                    "/api/v1/flights/search", params={"trip_id": trip_id}, headers=headers
+                )
+            ).json()
+            assert "arrival_ids" not in single["search_params"]
+            assert single["search_params"]["arrival_id"] == "LHR"
+            assert len(service.http.calls) == 2  # Served from the per-pair cache
+    finally:
+        del flight_search_service.search_flights
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await trips_service._owners.clear()
+        await engine.dispose()
+
+
+def test_metro_search_endpoint():
+    path = os.path.join(tempfile.mkdtemp(), "metro.db")
+    _migrate(path)
+    asyncio.run(_run_endpoint_check(path))
+
+
+if __name__ == "__main__":
+    test_metro_search_fans_out_and_merges()
+    test_metro_search_endpoint()
+    print("\n🎉 Metro-area search tests passed!")
@@ -0,0 +1,243 @@
+"""Test streaming trip plan generation over Server-Sent Events."""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.core.llm as llm
+from app.ai.planner import TripDay, TripEvent, TripPlan, stream_trip_plan
+from app.core.settings import settings
+from app.db.database import Base, get_async_session
+from app.jobs import job_worker
+from app.main import app
+
+CHUNK_DELAY = 0.01
+
+
+def _sample_plan() -> TripPlan:
+    days = [
+        TripDay(
+            date=f"2025-12-{15 + i}",
+            city="Doha",
+            events=[
+                TripEvent(
+                    title=f"Museum {{visit}} \"{i}\"",
+                    start=f"2025-12-{15 + i}T10:00:00",
+                    end=f"2025-12-{15 + i}T12:00:00",
+                    transport_reco="metro",
+                    priority="essential",
+                    tags=[" Culture "],
+                )
+            ],
+        )
+        for i in range(5)
+    ]
+    return TripPlan(
+        title="Doha getaway",
+        timezone="Asia/Qatar",
+        start_date="2025-12-15",
+        end_date="2025-12-19",
+        days=days,
+    )
+
+
+class FakeStream:
+    """Mimics the OpenAI chat completion stream context manager."""
+
+    def __init__(self, plan: TripPlan, chunk_size: int = 24):
+        self.plan = plan
+        self.text = plan.model_dump_json()
+        self.chunk_size = chunk_size
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        for i in range(0, len(self.text), self.chunk_size):
+            await asyncio.sleep(CHUNK_DELAY)
+            yield SimpleNamespace(type="content.delta", delta=self.text[i : i + self.chunk_size])
+        yield SimpleNamespace(type="content.done")
+
+    async def get_final_completion(self):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(parsed=self.plan))]
+        )
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def stream(self, **kwargs):
+        self.calls += 1
+        assert kwargs["response_format"] is TripPlan
+        return FakeStream(_sample_plan())
+
+
+def _parse_sse(lines):
+    events, event = [], None
+    for line in lines:
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+async def _run_stream_check():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'stream.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    completions = FakeCompletions()
+    saved_key, saved_factory = settings.openai_api_key, job_worker.session_factory
+    settings.openai_api_key = "sk-test"
+    await llm.close_openai_client()
+    llm._client = SimpleNamespace(
+        beta=SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    )
+    app.dependency_overrides[get_async_session] = override_session
+    job_worker.session_factory = session_factory
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/v1/auth/register", json={"username": "streamer"})
+            login = await client.post("/api/v1/auth/login", json={"username": "streamer"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip = await client.post(
+                "/api/v1/trips",
+                json={
+                    "from_city": "Almaty",
+                    "to_city": "Doha",
+                    "start_date": "2025-12-15T00:00:00",
+                    "end_date": "2025-12-19T00:00:00",
+                    "transport": "flight",
+                },
+                headers=headers,
+            )
+            trip_id = trip.json()["id"]
+
+            async with client.stream(
+                "GET", f"/api/v1/trips/{trip_id}/plan/stream", headers=headers
+            ) as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/event-stream")
+                lines = [line async for line in response.aiter_lines()]
+
+            events = _parse_sse(lines)
+            kinds = [kind for kind, _ in events]
+            assert kinds == ["job"] + ["day"] * 5 + ["plan", "done"], kinds
+
+            # Days are validated and normalized as they stream
+            days = [data for kind, data in events if kind == "day"]
+            assert [d["date"] for d in days] == [f"2025-12-{15 + i}" for i in range(5)]
+            assert days[0]["events"][0]["tags"] == ["culture"]
+            assert days[0]["events"][0]["title"] == 'Museum {visit} "0"'
+
+            # The final plan is stored like /finalize does
+            stored = await client.get(f"/api/v1/trips/{trip_id}/plan", headers=headers)
+            assert stored.json()["plan_json"]["days"] == days
+            trip = (await client.get(f"/api/v1/trips/{trip_id}", headers=headers)).json()
+            assert trip["status"] == "planned"
+
+            # Shares the per-trip job with /finalize: no second generation
+            job = await client.post(f"/api/v1/trips/{trip_id}/finalize", headers=headers)
+            assert job.json()["status"] == "succeeded"
+            async with client.stream(
+                "GET", f"/api/v1/trips/{trip_id}/plan/stream", headers=headers
+            ) as response:
+                replay = _parse_sse([line async for line in response.aiter_lines()])
+            assert [kind for kind, _ in replay] == ["day"] * 5 + ["plan", "done"]
+            assert completions.calls == 1
+
+            # A trip moved back to draft streams a fresh plan instead of a 409
+            await client.patch(
+                f"/api/v1/trips/{trip_id}", json={"status": "draft"}, headers=headers
+            )
+            async with client.stream(
+                "GET", f"/api/v1/trips/{trip_id}/plan/stream", headers=headers
+            ) as response:
+                assert response.status_code == 200
+                fresh = _parse_sse([line async for line in response.aiter_lines()])
+            assert [kind for kind, _ in fresh] == ["job"] + ["day"] * 5 + ["plan", "done"]
+            assert completions.calls == 2
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        job_worker.session_factory = saved_factory
+        llm._client = None
+        llm._semaphore = None
+        settings.openai_api_key = saved_key
+        await engine.dispose()
+
+
+async def _run_time_to_first_day_check():
+    completions = FakeCompletions()
+    saved_key = settings.openai_api_key
+    settings.openai_api_key = "sk-test"
+    llm._client = SimpleNamespace(
+        beta=SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    )
+    trip = SimpleNamespace(
+        from_city="Almaty",
+        to_city="Doha",
+        timezone="Asia/Qatar",
+        start_date=datetime(2025, 12, 15),
+        end_date=datetime(2025, 12, 19),
+        adults=2,
+        children=0,
+        entertainment_tags=["museums"],
+        notes=None,
+        budget_max=None,
+        flight=None,
+        hotel=None,
+        selected_entertainments=None,
+    )
+    try:
+        arrivals = []
+        started = time.perf_counter()
+        async for kind, value in stream_trip_plan(trip):
+            arrivals.append((kind, time.perf_counter() - started))
+    finally:
+        llm._client = None
+        llm._semaphore = None
+        settings.openai_api_key = saved_key
+
+    assert [kind for kind, _ in arrivals] == ["day"] * 5 + ["plan"]
+    first_day, total = arrivals[0][1], arrivals[-1][1]
+    print(f"📊 First day after {first_day:.2f}s, full plan after {total:.2f}s")
+    # Days stream as they complete instead of after the whole document
+    assert first_day < total / 2
+
+
+def test_plan_stream_emits_days_incrementally():
+    asyncio.run(_run_stream_check())
+
+
+def test_time_to_first_day():
+    asyncio.run(_run_time_to_first_day_check())
+
+
+if __name__ == "__main__":
+    test_plan_stream_emits_days_incrementally()
+    test_time_to_first_day()
+    print("\n🎉 Plan streaming tests passed!")
@@ -0,0 +1,67 @@
+"""Test compact tabular serialization of ranking prompts."""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+from app.flights.ai_ranker import OpenAIFlightRanker
+from app.flights.schemas import RankRequest
+from app.hotels.ai_ranker import OpenAIHotelRanker
+from app.hotels.schemas import HotelRankRequest
+from app.ranking.serialization import compact_table, relative_time
+
+FIXTURES = Path(__file__).parent / "benchmarks" / "fixtures"
+
+
+def _fixture(name: str) -> dict:
+    return json.loads((FIXTURES / name).read_text())
+
+
+def _ranker(cls, prompt_format: str):
+    ranker = cls.__new__(cls)
+    ranker.model = "gpt-4o-mini"
+    ranker.client = None
+    ranker.prompt_format = prompt_format
+    return ranker
+
+
+def test_compact_table_cells():
+    table = compact_table(
+        ["id", "p", "am", "fc", "name"],
+        [["a", 12.50, ["Pool", "Spa"], True, "Bar | Grill\nDoha"], ["b", None, [], False, 3]],
+    )
+    assert table.splitlines() == [
+        "id|p|am|fc|name",
+        "a|12.5|Pool;Spa|y|Bar / Grill Doha",
+        "b|||n|3",
+    ]
+    assert relative_time(datetime(2025, 12, 15, 8, 5), date(2025, 12, 15)) == "08:05"
+    assert relative_time(datetime(2025, 12, 16, 0, 49), date(2025, 12, 15)) == "00:49+1"
+
+
+def test_compact_prompts_are_smaller_and_complete():
+    request = RankRequest(**_fixture("flights_ala_doh.json"))
+    verbose = _ranker(OpenAIFlightRanker, "verbose")._build_user_prompt(
+        request, request.flights
+    )
+    compact = _ranker(OpenAIFlightRanker, "compact")._build_user_prompt(
+        request, request.flights
+    )
+    rows = compact.splitlines()[3:]
+    assert rows[0] == "id|p|dur|st|co2|lay|route|dep|arr|fno|air"
+    assert [row.split("|")[0] for row in rows[1:]] == [f.id for f in request.flights]
+    assert request.preferences_prompt in compact
+    print(f"📊 Flight prompt: {len(compact)} chars compact vs {len(verbose)} verbose")
+    assert len(compact) < len(verbose) / 3
+
+    hotels = HotelRankRequest(**_fixture("hotels_doh.json"))
+    verbose = _ranker(OpenAIHotelRanker, "verbose")._build_user_prompt(hotels, hotels.hotels)
+    compact = _ranker(OpenAIHotelRanker, "compact")._build_user_prompt(hotels, hotels.hotels)
+    assert all(hotel.id in compact for hotel in hotels.hotels)
+    assert len(compact) < len(verbose)
+
+
+if __name__ == "__main__":
+    test_compact_table_cells()
+    test_compact_prompts_are_smaller_and_complete()
+    print("\n🎉 Prompt serialization tests passed!")
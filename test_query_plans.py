@@ -0,0 +1,208 @@
+"""Test that migrations build the models' schema and router queries use indexes."""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import httpx
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.db.database import ALEMBIC_INI, Base, get_async_session, head_revision
+from app.jobs.service import jobs_service
+from app.main import app
+from app.trips.jobs import FINALIZE_TRIP_JOB
+from app.trips.service import trips_service
+
+
+def _migrate(path: str) -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+
+
+def _full_scans(path: str, queries) -> list:
+    """Plan rows that read a whole table instead of searching an index."""
+    scans = []
+    conn = sqlite3.connect(path)
+    try:
+        for statement, parameters in queries:
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                detail = row[-1]
+                if detail.startswith("SCAN") and "CONSTANT ROW" not in detail:
+                    scans.append((detail, statement))
+    finally:
+        conn.close()
+    return scans
+
+
+def _plans(path: str, queries) -> str:
+    conn = sqlite3.connect(path)
+    try:
+        return "\n".join(
+            row[-1]
+            for statement, parameters in queries
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        )
+    finally:
+        conn.close()
+
+
+async def _exercise_routes(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    queries = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0] in ("SELECT", "UPDATE", "DELETE"):
+            queries.append((statement, parameters))
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "planner"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            await client.post("/api/v1/auth/login", json={"username": "planner"})
+            await client.get("/api/v1/auth/me", headers=headers)
+
+            trip = await client.post(
+                "/api/v1/trips",
+                json={
+                    "from_city": "Almaty",
+                    "to_city": "Doha",
+                    "start_date": "2025-05-01T00:00:00",
+                    "end_date": "2025-05-08T00:00:00",
+                    "transport": "flight",
+                },
+                headers=headers,
+            )
+            trip_id = trip.json()["id"]
+
+            first = (await client.get("/api/v1/trips?per_page=1", headers=headers)).json()
+            await client.get(
+                "/api/v1/trips",
+                params={"cursor": first["next_cursor"] or "", "per_page": 1},
+                headers=headers,
+            )
+            await client.get("/api/v1/trips?status=draft", headers=headers)
+            await client.get(f"/api/v1/trips/{trip_id}", headers=headers)
+            await client.patch(
+                f"/api/v1/trips/{trip_id}", json={"adults": 2}, headers=headers
+            )
+            await client.get(f"/api/v1/trips/{trip_id}/plan", headers=headers)
+            await client.get(f"/api/v1/trips/{trip_id}/checklist", headers=headers)
+
+            await client.post(
+                "/api/v1/flights/select",
+                json={
+                    "trip_id": trip_id,
+                    "flight_id": "QR-292",
+                    "airline": "Qatar Airways",
+                    "flight_number": "QR 292",
+                    "departure_airport": "ALA",
+                    "arrival_airport": "DOH",
+                    "departure_time": "2025-05-01T03:00:00",
+                    "arrival_time": "2025-05-01T06:00:00",
+                    "price": 420.0,
+                    "currency": "USD",
+                    "total_duration_min": 300,
+                    "stops": 0,
+                },
+                headers=headers,
+            )
+            await client.get(f"/api/v1/flights/{trip_id}/selection", headers=headers)
+            await client.post(
+                "/api/v1/hotels/select",
+                json={
+                    "trip_id": trip_id,
+                    "hotel_id": "h1",
+                    "hotel_name": "Souq Waqif Boutique",
+                    "location": "Old Doha",
+                    "price_per_night": 150.0,
+                    "total_price": 1050.0,
+                    "check_in_date": "2025-05-01",
+                    "check_out_date": "2025-05-08",
+                },
+                headers=headers,
+            )
+            await client.post(
+                "/api/v1/entertainment/select",
+                json={
+                    "trip_id": trip_id,
+                    "selections": [{"venue": {"place_id": "p1", "title": "Souq Waqif"}}],
+                },
+                headers=headers,
+            )
+            await client.get(f"/api/v1/entertainment/{trip_id}/selections", headers=headers)
+            await client.get(f"/api/v1/culture/guide/{trip_id}", headers=headers)
+
+            async with session_factory() as session:
+                job, _ = await jobs_service.get_or_create_job(
+                    session, trip_id, login.json()["user_id"], FINALIZE_TRIP_JOB
+                )
+                await jobs_service.claim_job(session, job.id)
+                await jobs_service.recover_jobs(session)
+            await client.get(f"/api/v1/jobs/{job.id}", headers=headers)
+
+            await client.delete(f"/api/v1/trips/{trip_id}", headers=headers)
+            await client.post("/api/v1/auth/logout", headers=headers)
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await engine.dispose()
+    return queries
+
+
+def test_migrations_match_models():
+    path = os.path.join(tempfile.mkdtemp(), "schema.db")
+    _migrate(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn)
+            assert context.get_current_revision() == head_revision()
+            assert compare_metadata(context, Base.metadata) == []
+    finally:
+        engine.dispose()
+
+
+def test_router_queries_use_indexes():
+    path = os.path.join(tempfile.mkdtemp(), "plans.db")
+    _migrate(path)
+    queries = asyncio.run(_exercise_routes(path))
+    assert len(queries) > 20
+
+    assert _full_scans(path, queries) == []
+
+    plans = _plans(path, queries)
+    for index in (
+        "ix_trips_user_active_created",
+        "ix_trips_user_status_created",
+        "ix_user_sessions_token",
+        "uq_entertainment_selections_trip_venue",
+        "ix_trip_plans_trip_id",
+        "ix_trip_checklists_trip_id",
+        "ix_culture_guides_trip_id",
+    ):
+        assert index in plans, index
+
+
+if __name__ == "__main__":
+    test_migrations_match_models()
+    test_router_queries_use_indexes()
+    print("\n🎉 Query plan tests passed!")
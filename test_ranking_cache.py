@@ -0,0 +1,221 @@
+"""Test the content-addressed LLM ranking cache."""
+
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.hotels.ai_ranker as hotel_ranker_module
+from app.core.cache import (
+    DatabaseCacheBackend,
+    MemoryCacheBackend,
+    ResponseCache,
+    TieredCacheBackend,
+)
+from app.core.settings import settings
+from app.core.singleflight import SingleFlight
+from app.db.database import Base
+from app.hotels.ai_ranker import OpenAIHotelRanker
+from app.hotels.schemas import HotelForRanking, HotelRankRequest
+from app.ranking import RankingCache, ranking_cache_key
+
+
+def _hotels(n: int = 8):
+    return [
+        HotelForRanking(
+            id=f"hotel-{i}",
+            name=f"Hotel {i}",
+            location="West Bay, Doha",
+            price_per_night=100 + 10 * i,
+            total_price=500 + 50 * i,
+            rating=4.0 + (i % 5) / 10,
+            reviews_count=100 * i,
+            amenities=["Pool", "Wi-Fi"],
+            free_cancellation=i % 2 == 0,
+            link=f"https://example.com/hotel-{i}",
+        )
+        for i in range(n)
+    ]
+
+
+class FakeChatCompletions:
+    """Mimics ``client.chat.completions`` returning a fixed hotel ranking."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.05):
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("rate limited")
+        rankings = [
+            {
+                "id": f"hotel-{i}",
+                "score": round(1 - i / 10, 2),
+                "title": f"Hotel {i}",
+                "rationale_short": "Great value",
+                "pros_keywords": ["pool"],
+                "cons_keywords": [],
+            }
+            for i in range(8)
+        ]
+        content = json.dumps({"rankings": rankings})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+def _ranker(completions: FakeChatCompletions) -> OpenAIHotelRanker:
+    ranker = OpenAIHotelRanker()
+    ranker.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return ranker
+
+
+def _memory_cache(name: str) -> RankingCache:
+    cache = ResponseCache(name, MemoryCacheBackend(max_entries=100), ttl_seconds=60)
+    return RankingCache(cache, SingleFlight(name))
+
+
+async def _run_hit_check():
+    cache = _memory_cache("test_ranking_hits")
+    hotel_ranker_module.ranking_cache = cache
+    completions = FakeChatCompletions()
+    ranker = _ranker(completions)
+    hotels = _hotels()
+
+    first = await ranker.rank_hotels(
+        HotelRankRequest(search_id="s1", hotels=hotels, preferences_prompt="pool, quiet")
+    )
+    assert first.meta.used_model == ranker.model
+
+    # Same candidates in another order, new search id, extra whitespace: a hit
+    shuffled = hotels[:]
+    random.Random(7).shuffle(shuffled)
+    request = HotelRankRequest(
+        search_id="s2", hotels=shuffled, preferences_prompt="  pool,   quiet "
+    )
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        second = await ranker.rank_hotels(request)
+        timings.append(time.perf_counter() - started)
+    assert completions.calls == 1
+    assert second.search_id == "s2"
+    assert second.ordered_ids == first.ordered_ids
+    print(f"📊 Cached ranking served in {min(timings) * 1000:.2f} ms (min of 20)")
+    assert sorted(timings)[len(timings) // 2] < 0.005
+
+    # Different preferences: a miss
+    await ranker.rank_hotels(
+        HotelRankRequest(search_id="s3", hotels=hotels, preferences_prompt="cheap")
+    )
+    assert completions.calls == 2
+    stats = cache.cache.stats()
+    assert stats["hits"] == 20 and stats["misses"] == 2
+
+
+async def _run_concurrent_and_fallback_check():
+    cache = _memory_cache("test_ranking_fallback")
+    hotel_ranker_module.ranking_cache = cache
+
+    # Concurrent identical rankings share one model call
+    completions = FakeChatCompletions(delay=0.1)
+    ranker = _ranker(completions)
+    request = HotelRankRequest(search_id="s", hotels=_hotels(), preferences_prompt="spa")
+    await asyncio.gather(*(ranker.rank_hotels(request) for _ in range(5)))
+    assert completions.calls == 1
+
+    # Heuristic fallbacks are returned but never cached
+    failing = FakeChatCompletions(fail=True)
+    ranker = _ranker(failing)
+    request = HotelRankRequest(search_id="s", hotels=_hotels(), preferences_prompt="gym")
+    for _ in range(2):
+        result = await ranker.rank_hotels(request)
+        assert result.meta.used_model == hotel_ranker_module.HEURISTIC_MODEL
+    assert failing.calls == 2
+
+
+async def _run_persistent_tier_check():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'rank.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def tiered(name):
+        backend = TieredCacheBackend(
+            MemoryCacheBackend(max_entries=10),
+            DatabaseCacheBackend("ranking", max_entries=2, session_factory=session_factory),
+        )
+        cache = ResponseCache(name, backend, ttl_seconds=60)
+        return RankingCache(cache, SingleFlight(name))
+
+    try:
+        completions = FakeChatCompletions()
+        hotel_ranker_module.ranking_cache = tiered("worker_a")
+        request = HotelRankRequest(search_id="a", hotels=_hotels(), preferences_prompt="x")
+        await _ranker(completions).rank_hotels(request)
+
+        # Another worker (empty memory tier) reads the shared database tier
+        worker_b = tiered("worker_b")
+        hotel_ranker_module.ranking_cache = worker_b
+        result = await _ranker(completions).rank_hotels(request)
+        assert completions.calls == 1
+        assert result.search_id == "a"
+        assert worker_b.cache.stats()["persistent_hits"] == 1
+
+        # Size bound evicts the oldest rows
+        for prefs in ("y", "z", "w"):
+            await _ranker(completions).rank_hotels(
+                HotelRankRequest(search_id="a", hotels=_hotels(), preferences_prompt=prefs)
+            )
+        store = worker_b.cache.backend.persistent
+        key = ranking_cache_key(
+            "hotels",
+            "gpt-4o-mini",
+            hotel_ranker_module.PROMPT_VERSION,
+            "x",
+            _hotels(),
+            extra={"prompt_format": settings.ranking_prompt_format},
+        )
+        assert await store.get(key) is None
+    finally:
+        await engine.dispose()
+
+
+def _restore(func):
+    def wrapper():
+        original = hotel_ranker_module.ranking_cache
+        try:
+            asyncio.run(func())
+        finally:
+            hotel_ranker_module.ranking_cache = original
+
+    return wrapper
+
+
+def test_identical_rankings_are_served_from_cache():
+    _restore(_run_hit_check)()
+
+
+def test_concurrent_rankings_and_fallbacks():
+    _restore(_run_concurrent_and_fallback_check)()
+
+
+def test_persistent_tier_is_shared():
+    _restore(_run_persistent_tier_check)()
+
+
+if __name__ == "__main__":
+    test_identical_rankings_are_served_from_cache()
+    test_concurrent_rankings_and_fallbacks()
+    test_persistent_tier_is_shared()
+    print("\n🎉 Ranking cache tests passed!")
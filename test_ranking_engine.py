@@ -0,0 +1,183 @@
+"""Test the vectorized heuristic ranking engine."""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from app.flights.ai_ranker import OpenAIFlightRanker
+from app.flights.schemas import FlightLeg, Itinerary, Price, RankRequest
+from app.hotels.ai_ranker import OpenAIHotelRanker
+from app.hotels.schemas import HotelForRanking, HotelRankRequest
+from app.ranking import FLIGHT_SCORING, VENUE_SCORING
+
+
+def _flights(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    departure = datetime(2025, 12, 15, 8, 0)
+    flights = []
+    for i in range(n):
+        stops = rng.choice([0, 1, 1, 2])
+        duration = rng.randint(300, 1200)
+        flights.append(
+            Itinerary(
+                id=f"flight-{i}",
+                price=Price(amount=rng.randint(200, 2000), currency="USD"),
+                total_duration_min=duration,
+                stops=stops,
+                emissions_kg=rng.choice([None, rng.randint(200, 900)]),
+                layovers_min=rng.randint(40, 400) if stops else None,
+                legs=[
+                    FlightLeg(
+                        dep_iata="ALA",
+                        dep_time=departure,
+                        arr_iata="DOH",
+                        arr_time=departure + timedelta(minutes=duration),
+                        marketing="Qatar Airways",
+                        flight_no=f"QR {i}",
+                        duration_min=duration,
+                    )
+                ],
+            )
+        )
+    return flights
+
+
+def _bare_flight_ranker() -> OpenAIFlightRanker:
+    # The heuristic path needs no OpenAI client
+    return OpenAIFlightRanker.__new__(OpenAIFlightRanker)
+
+
+def test_scores_are_normalized_and_directional():
+    scored = FLIGHT_SCORING.score(
+        {
+            "price": [100, 300, 200],
+            "duration": [600, 300, 450],
+            "stops": [0, 0, 0],
+            "emissions": [None, None, None],
+            "layover": [0, 0, 0],
+        },
+        {"price": 1, "duration": 0, "stops": 0, "emissions": 0, "layover": 0},
+    )
+    assert scored.ranked() == [0, 2, 1]
+    assert scored.scores.tolist() == [1.0, 0.0, 0.5]
+
+    scored = VENUE_SCORING.score(
+        {"rating": [4.0, 4.8, None], "reviews": [10, 10, 10], "price": [None] * 3},
+        {"rating": 1, "reviews": 0, "price": 0},
+    )
+    assert scored.ranked() == [1, 2, 0]
+
+    with pytest.raises(ValueError):
+        FLIGHT_SCORING.resolve_weights({"comfort": 1.0})
+    with pytest.raises(ValidationError):
+        RankRequest(search_id="s", flights=[], preferences_prompt="", weights={"price": -1})
+
+
+def test_weights_change_the_order():
+    flights = _flights(200)
+    ranker = _bare_flight_ranker()
+    cheapest = ranker._heuristic_ranking(
+        RankRequest(
+            search_id="s",
+            flights=flights,
+            preferences_prompt="",
+            weights={"price": 1, "duration": 0, "stops": 0, "emissions": 0, "layover": 0},
+        )
+    )
+    fastest = ranker._heuristic_ranking(
+        RankRequest(
+            search_id="s",
+            flights=flights,
+            preferences_prompt="",
+            weights={"price": 0, "duration": 1, "stops": 0, "emissions": 0, "layover": 0},
+        )
+    )
+    by_id = {f.id: f for f in flights}
+    assert cheapest.ordered_ids[0] == min(flights, key=lambda f: f.price.amount).id
+    assert fastest.ordered_ids[0] == min(flights, key=lambda f: f.total_duration_min).id
+    assert cheapest.ordered_ids != fastest.ordered_ids
+    assert "lowest price" in cheapest.items[0].pros_keywords
+    prices = [by_id[i].price.amount for i in cheapest.ordered_ids]
+    assert prices == sorted(prices)
+
+
+def test_full_result_sets_rank_in_milliseconds():
+    flights = _flights(5000)
+    ranker = _bare_flight_ranker()
+    request = RankRequest(search_id="s", flights=flights, preferences_prompt="")
+
+    started = time.perf_counter()
+    scored = FLIGHT_SCORING.score(
+        {
+            "price": [f.price.amount for f in flights],
+            "duration": [f.total_duration_min for f in flights],
+            "stops": [f.stops for f in flights],
+            "emissions": [f.emissions_kg for f in flights],
+            "layover": [f.layovers_min or 0 for f in flights],
+        }
+    )
+    scoring_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    result = ranker._heuristic_ranking(request)
+    ranking_ms = (time.perf_counter() - started) * 1000
+
+    print(f"📊 Scored 5000 flights in {scoring_ms:.1f} ms, full ranking in {ranking_ms:.1f} ms")
+    assert len(result.ordered_ids) == 5000  # No truncation to 30
+    assert len(set(result.ordered_ids)) == 5000
+    assert scored.ranked() == [int(i.split("-")[1]) for i in result.ordered_ids]
+    assert scoring_ms < 50
+
+    hotels = [
+        HotelForRanking(
+            id=f"hotel-{i}",
+            name=f"Hotel {i}",
+            location="Doha",
+            price_per_night=50 + i % 400,
+            total_price=250 + (i * 7) % 2000,
+            rating=3.0 + (i % 21) / 10,
+            reviews_count=i % 3000,
+        )
+        for i in range(5000)
+    ]
+    started = time.perf_counter()
+    hotel_result = OpenAIHotelRanker()._rank_heuristic(
+        HotelRankRequest(search_id="s", hotels=hotels, preferences_prompt="")
+    )
+    hotel_ms = (time.perf_counter() - started) * 1000
+    print(f"📊 Ranked 5000 hotels in {hotel_ms:.1f} ms")
+    assert len(hotel_result.ordered_ids) == 5000
+    scores = [item.score for item in hotel_result.items]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_unpriced_flights_are_not_cheapest():
+    flights = _flights(3)
+    for flight, amount in zip(flights, [0, 500, 900]):
+        flight.price.amount = amount  # 0: SerpAPI listed no price
+    result = _bare_flight_ranker()._heuristic_ranking(
+        RankRequest(
+            search_id="s",
+            flights=flights,
+            preferences_prompt="",
+            weights={"price": 1, "duration": 0, "stops": 0, "emissions": 0, "layover": 0},
+        )
+    )
+
+    # An unknown fare scores neutral: below the cheapest, above the dearest
+    assert result.ordered_ids == ["flight-1", "flight-0", "flight-2"]
+    assert [item.score for item in result.items] == [1.0, 0.5, 0.0]
+    pros = {item.id: item.pros_keywords for item in result.items}
+    assert "lowest price" in pros["flight-1"]
+    assert "lowest price" not in pros["flight-0"]
+
+
+if __name__ == "__main__":
+    test_scores_are_normalized_and_directional()
+    test_weights_change_the_order()
+    test_full_result_sets_rank_in_milliseconds()
+    test_unpriced_flights_are_not_cheapest()
+    print("\n🎉 Ranking engine tests passed!")
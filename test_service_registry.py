@@ -0,0 +1,118 @@
+"""Test the lifespan-managed service registry."""
+
+import asyncio
+import contextlib
+import io
+import json
+import logging
+from pathlib import Path
+
+import httpx
+
+import app.core.llm as llm
+from app.core.services import ServiceRegistry, services
+from app.core.settings import settings
+from app.entertainment.ai_ranker import OpenAIEntertainmentRanker
+from app.flights.ai_ranker import OpenAIFlightRanker
+from app.main import app
+
+FIXTURE = Path(__file__).parent / "benchmarks" / "fixtures" / "hotels_doh.json"
+
+
+async def _run_registry_check():
+    registry = ServiceRegistry()
+    closed = []
+    attempts = {"flaky": 0}
+
+    def flaky():
+        attempts["flaky"] += 1
+        if attempts["flaky"] == 1:
+            raise RuntimeError("API key missing")
+        return object()
+
+    async def close_pool(instance):
+        closed.append(instance)
+
+    registry.register("pool", dict, close=close_pool)
+    registry.register("flaky", flaky)
+
+    # A service that fails at startup does not block the others
+    await registry.start()
+    assert registry.stats()["active"] == ["pool"]
+    pool = registry.get("pool")
+    assert registry.get("pool") is pool
+    assert registry.get("flaky") is registry.get("flaky")  # Built lazily on retry
+    assert registry.builds == {"pool": 1, "flaky": 1}
+
+    await registry.close()
+    assert closed == [pool]
+    assert registry.stats()["active"] == []
+
+
+async def _run_endpoint_check():
+    saved_key = settings.openai_api_key
+    settings.openai_api_key = None  # Heuristic hotel ranking, no network
+    await services.close()
+    builds_before = services.builds.get("hotel_ranker", 0)
+    payload = json.loads(FIXTURE.read_text())
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(5):
+                response = await client.post("/api/v1/hotels/rank", json=payload)
+                assert response.status_code == 200
+                assert len(response.json()["ordered_ids"]) == len(payload["hotels"])
+
+            metrics = (await client.get("/api/v1/metrics")).json()
+        # One ranker for every request
+        assert metrics["services"]["builds"]["hotel_ranker"] == builds_before + 1
+        assert "hotel_ranker" in metrics["services"]["active"]
+    finally:
+        await services.close()
+        settings.openai_api_key = saved_key
+
+
+async def _run_quiet_construction_check():
+    saved_key = settings.openai_api_key
+    settings.openai_api_key = "sk-secret-0123456789"
+    await llm.close_openai_client()
+    logs = io.StringIO()
+    handler = logging.StreamHandler(logs)
+    root = logging.getLogger()
+    saved_level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            OpenAIFlightRanker()
+            OpenAIEntertainmentRanker()
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(saved_level)
+        await llm.close_openai_client()
+        settings.openai_api_key = saved_key
+
+    # Building a ranker prints nothing and never logs any part of the key
+    assert stdout.getvalue() == ""
+    assert "ranker initialized" in logs.getvalue()
+    assert "sk-" not in logs.getvalue()
+
+
+def test_registry_lifecycle():
+    asyncio.run(_run_registry_check())
+
+
+def test_rank_endpoint_reuses_ranker():
+    asyncio.run(_run_endpoint_check())
+
+
+def test_rankers_build_quietly():
+    asyncio.run(_run_quiet_construction_check())
+
+
+if __name__ == "__main__":
+    test_registry_lifecycle()
+    test_rank_endpoint_reuses_ranker()
+    test_rankers_build_quietly()
+    print("\n🎉 Service registry tests passed!")
@@ -0,0 +1,209 @@
+"""Test stateless signed session tokens, their denylist and key rotation."""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import RevocationChannel, token_cache
+from app.auth.tokens import SignedTokens, TokenDenylist, check_signing_key, signed_tokens
+from app.core.settings import DEFAULT_SECRET_KEY, settings
+from app.db.database import Base, get_async_session
+from app.db.models import UserSession
+from app.main import app
+
+
+async def _temp_database():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'auth.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _run_endpoint_check():
+    engine, session_factory = await _temp_database()
+    session_lookups = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_lookups(conn, cursor, statement, parameters, context, executemany):
+        if "user_sessions" in statement:
+            session_lookups.append(statement)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    saved_mode = settings.auth_token_mode
+    settings.auth_token_mode = "signed"
+    app.dependency_overrides[get_async_session] = override_session
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "stateless"})
+            token = login.json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            assert "." in token
+
+            for _ in range(3):
+                me = await client.get("/api/v1/auth/me", headers=headers)
+                assert me.status_code == 200
+                assert me.json()["username"] == "stateless"
+
+            # Tampering with the claims breaks the signature
+            payload, signature = token.split(".")
+            forged = {"Authorization": f"Bearer {payload[:-2]}AA.{signature}"}
+            assert (await client.get("/api/v1/auth/me", headers=forged)).status_code == 401
+
+            assert (await client.post("/api/v1/auth/logout", headers=headers)).status_code == 200
+            assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+
+            metrics = (await client.get("/api/v1/metrics")).json()
+            assert metrics["auth_tokens"]["denylisted"] >= 1
+
+        # Neither login nor verification touched the sessions table
+        assert session_lookups == []
+        async with session_factory() as session:
+            count = await session.scalar(select(func.count()).select_from(UserSession))
+        assert count == 0
+    finally:
+        settings.auth_token_mode = saved_mode
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await engine.dispose()
+
+
+def _check_rotation_and_expiry():
+    expires = datetime.utcnow() + timedelta(days=1)
+    old = SignedTokens(secret_key="old-secret", key_id="1", previous_keys={})
+    token = old.issue("user-1", expires)
+    assert old.verify(token).user_id == "user-1"
+
+    # Rotated: new tokens use key 2, tokens signed by key 1 stay valid
+    rotated = SignedTokens(
+        secret_key="new-secret", key_id="2", previous_keys={"1": "old-secret"}
+    )
+    assert rotated.verify(token).key_id == "1"
+    assert rotated.verify(rotated.issue("user-1", expires)).key_id == "2"
+
+    # Once key 1 is retired its tokens are rejected
+    retired = SignedTokens(secret_key="new-secret", key_id="2", previous_keys={})
+    assert retired.verify(token) is None
+
+    expired = old.issue("user-1", datetime.utcnow() - timedelta(seconds=1))
+    assert old.verify(expired) is None
+    assert old.verify("not-a-token.sig") is None
+    assert old.stats()["rejected"] == 2
+
+
+async def _run_cross_worker_check():
+    engine, session_factory = await _temp_database()
+    expires = datetime.utcnow() + timedelta(days=1)
+    channel_b = RevocationChannel(session_factory)
+    worker_a = SignedTokens(
+        secret_key="shared", key_id="1", previous_keys={},
+        denylist=TokenDenylist(RevocationChannel(session_factory)),
+    )
+    worker_b = SignedTokens(
+        secret_key="shared", key_id="1", previous_keys={},
+        denylist=TokenDenylist(channel_b),
+    )
+    try:
+        token = worker_a.issue("user-1", expires)
+        claims = worker_b.verify(token)
+        await worker_a.denylist.revoke(claims.token_id, claims.expires_at)
+        assert worker_a.verify(token) is None
+        assert worker_b.verify(token) is not None  # Until the next poll
+
+        await channel_b.sync()
+        assert worker_b.verify(token) is None
+
+        # A worker started later loads revocations still in force
+        channel_c = RevocationChannel(session_factory, poll_seconds=60)
+        worker_c = SignedTokens(
+            secret_key="shared", key_id="1", previous_keys={},
+            denylist=TokenDenylist(channel_c),
+        )
+        await channel_c.start()
+        assert worker_c.verify(token) is None
+        await channel_c.stop()
+    finally:
+        await engine.dispose()
+
+
+async def _run_session_mode_check():
+    engine, session_factory = await _temp_database()
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    assert settings.auth_token_mode == "session"
+    app.dependency_overrides[get_async_session] = override_session
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "victim"})
+            user_id = login.json()["user_id"]
+
+            # Anyone can sign with the default key; session mode must not accept it
+            forged = signed_tokens.issue(user_id, datetime.utcnow() + timedelta(hours=1))
+            headers = {"Authorization": f"Bearer {forged}"}
+            assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+            assert (await client.post("/api/v1/auth/logout", headers=headers)).status_code == 401
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await engine.dispose()
+
+
+def _check_signing_key_required():
+    saved = settings.auth_token_mode, settings.secret_key
+    try:
+        settings.auth_token_mode = "signed"
+        for secret in (DEFAULT_SECRET_KEY, ""):
+            settings.secret_key = secret
+            try:
+                check_signing_key()
+                raise AssertionError("signed mode must refuse a placeholder key")
+            except RuntimeError:
+                pass
+        settings.secret_key = "a-private-key"
+        check_signing_key()
+
+        # Session mode doesn't need one
+        settings.auth_token_mode, settings.secret_key = "session", DEFAULT_SECRET_KEY
+        check_signing_key()
+    finally:
+        settings.auth_token_mode, settings.secret_key = saved
+
+
+def test_signed_tokens_rejected_in_session_mode():
+    asyncio.run(_run_session_mode_check())
+    _check_signing_key_required()
+
+
+def test_signed_token_endpoints():
+    asyncio.run(_run_endpoint_check())
+
+
+def test_signed_token_rotation_and_expiry():
+    _check_rotation_and_expiry()
+
+
+def test_signed_token_denylist_cross_worker():
+    asyncio.run(_run_cross_worker_check())
+
+
+if __name__ == "__main__":
+    test_signed_token_endpoints()
+    test_signed_token_rotation_and_expiry()
+    test_signed_token_denylist_cross_worker()
+    test_signed_tokens_rejected_in_session_mode()
+    print("\n🎉 Signed token tests passed!")
@@ -0,0 +1,120 @@
+"""Test single-flight coalescing of concurrent identical external searches."""
+
+import asyncio
+
+import httpx
+
+from app.core.settings import settings
+from app.core.singleflight import SingleFlight
+from app.hotels.service import GoogleHotelsService
+
+
+class SlowFakeHTTP:
+    """Stand-in for HTTPClientPool with a slow upstream that counts calls."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.calls = 0
+
+    async def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(
+            200,
+            json={"search_metadata": {"status": "Success"}, "properties": []},
+            request=httpx.Request("GET", url),
+        )
+
+
+async def _run_hotels_coalescing_check():
+    http = SlowFakeHTTP()
+    group = SingleFlight("test_hotels")
+    params = {"q": "Doha", "check_in_date": "2025-12-15", "check_out_date": "2025-12-20"}
+
+    # Separate service instances still share the single-flight group
+    results = await asyncio.gather(
+        *(
+            GoogleHotelsService(http=http, singleflight=group).search(params)
+            for _ in range(10)
+        )
+    )
+    assert http.calls == 1, f"expected 1 upstream call, got {http.calls}"
+    assert all(r is results[0] for r in results)
+    print(f"📊 Single-flight stats: {group.stats()}")
+    assert group.coalesced == 9
+
+    # Once finished, the next call goes upstream again
+    await GoogleHotelsService(http=http, singleflight=group).search(params)
+    assert http.calls == 2
+
+
+async def _run_cancellation_check():
+    group = SingleFlight("test_cancel")
+    started = asyncio.Event()
+    upstream = {"runs": 0, "cancelled": 0}
+
+    async def fetch():
+        upstream["runs"] += 1
+        started.set()
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            upstream["cancelled"] += 1
+            raise
+        return "result"
+
+    # Cancelling one waiter does not cancel the shared call
+    first = asyncio.create_task(group.do("k", fetch))
+    second = asyncio.create_task(group.do("k", fetch))
+    await started.wait()
+    first.cancel()
+    assert await second == "result"
+    assert upstream == {"runs": 1, "cancelled": 0}
+
+    # Cancelling every waiter abandons the upstream call
+    started.clear()
+    only = asyncio.create_task(group.do("k2", fetch))
+    await started.wait()
+    only.cancel()
+    await asyncio.sleep(0.01)
+    assert upstream["cancelled"] == 1
+    assert group.abandoned == 1 and group.stats()["in_flight"] == 0
+
+
+async def _run_error_propagation_check():
+    group = SingleFlight("test_errors")
+
+    async def boom():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        group.do("k", boom), group.do("k", boom), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert group.executions == 1
+
+
+def test_concurrent_hotel_searches_coalesce():
+    # The service requires a key; the fake upstream never sees it
+    saved_key = settings.serpapi_key
+    settings.serpapi_key = saved_key or "test-key"
+    try:
+        asyncio.run(_run_hotels_coalescing_check())
+    finally:
+        settings.serpapi_key = saved_key
+
+
+def test_cancellation_safety():
+    asyncio.run(_run_cancellation_check())
+
+
+def test_errors_are_shared():
+    asyncio.run(_run_error_propagation_check())
+
+
+if __name__ == "__main__":
+    test_concurrent_hotel_searches_coalesce()
+    test_cancellation_safety()
+    test_errors_are_shared()
+    print("\n🎉 Single-flight tests passed!")
@@ -0,0 +1,69 @@
+"""Test the engine factory: SQLite profile pragmas and server pool settings."""
+
+import asyncio
+import os
+import tempfile
+
+from sqlalchemy import text
+
+import app.db.database as database
+from app.core.settings import settings
+
+
+async def _pragmas(profile: str) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), f"{profile}.db")
+    engine = database.create_engine(f"sqlite+aiosqlite:///{path}", sqlite_profile=profile)
+    try:
+        # Two connections open at once: the pragmas apply to each of them
+        async with engine.connect() as first, engine.connect() as second:
+            values = {}
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size"):
+                values[name] = (await first.execute(text(f"PRAGMA {name}"))).scalar()
+                assert (await second.execute(text(f"PRAGMA {name}"))).scalar() == values[name]
+            return values
+    finally:
+        await engine.dispose()
+
+
+def test_performance_profile_pragmas():
+    values = asyncio.run(_pragmas("performance"))
+    assert values == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size_bytes,
+    }
+
+
+def test_default_profile_leaves_sqlite_alone():
+    values = asyncio.run(_pragmas("default"))
+    assert values["journal_mode"] == "delete"
+    assert values["synchronous"] == 2  # FULL
+    assert values["mmap_size"] == 0
+
+
+def test_server_databases_get_pool_settings(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        database, "create_async_engine", lambda url, **kwargs: calls.append((url, kwargs))
+    )
+    monkeypatch.setattr(settings, "db_pool_size", 25)
+    monkeypatch.setattr(settings, "db_pool_recycle_seconds", 300)
+
+    database.create_engine("postgresql+asyncpg://app@db/travel")
+    database.create_engine("sqlite+aiosqlite:///:memory:", sqlite_profile="default")
+
+    (pg_url, pg_kwargs), (_, sqlite_kwargs) = calls
+    assert pg_url == "postgresql+asyncpg://app@db/travel"
+    assert pg_kwargs["pool_size"] == 25
+    assert pg_kwargs["pool_recycle"] == 300
+    assert pg_kwargs["max_overflow"] == settings.db_max_overflow
+    assert pg_kwargs["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert "pool_size" not in sqlite_kwargs
+
+
+if __name__ == "__main__":
+    test_performance_profile_pragmas()
+    test_default_profile_leaves_sqlite_alone()
+    print("\n🎉 SQLite profile tests passed!")
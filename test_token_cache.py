@@ -0,0 +1,131 @@
+"""Test the in-process bearer-token cache and its invalidation."""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import RevocationChannel, TokenCache, token_cache
+from app.db.database import Base, get_async_session
+from app.db.models import User
+from app.main import app
+
+
+async def _temp_database():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'auth.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _run_endpoint_check():
+    engine, session_factory = await _temp_database()
+    session_lookups = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_lookups(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "user_sessions" in statement:
+            session_lookups.append(statement)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    token_cache.clear()
+    hits_before = token_cache.hits
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "cached"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            for _ in range(5):
+                me = await client.get("/api/v1/auth/me", headers=headers)
+                assert me.status_code == 200
+                assert me.json()["username"] == "cached"
+            # Only the first request reached the database
+            assert len(session_lookups) == 1
+            assert token_cache.hits == hits_before + 4
+
+            metrics = (await client.get("/api/v1/metrics")).json()
+            assert metrics["auth_cache"]["hit_ratio"] > 0
+
+            # Logout revokes the cached token immediately
+            assert (await client.post("/api/v1/auth/logout", headers=headers)).status_code == 200
+            assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 401
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await engine.dispose()
+
+
+async def _run_expiry_check():
+    cache = TokenCache(max_entries=2, ttl_seconds=60, enabled=True)
+    user = User(id="u1", username="alice", created_at=datetime.utcnow())
+
+    # Never served past the session expiry, even inside the TTL
+    cache.set("expired", user, datetime.utcnow() - timedelta(seconds=1))
+    assert cache.get("expired") is None
+
+    cache.set("a", user, datetime.utcnow() + timedelta(days=1))
+    cache.set("b", user, datetime.utcnow() + timedelta(days=1))
+    cached = cache.get("a")
+    assert cached is not user and cached.id == "u1"
+
+    # LRU: "b" is the least recently used
+    cache.set("c", user, datetime.utcnow() + timedelta(days=1))
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    stale = TokenCache(ttl_seconds=0, enabled=True)
+    stale.set("a", user, datetime.utcnow() + timedelta(days=1))
+    assert stale.get("a") is None
+
+
+async def _run_cross_worker_check():
+    engine, session_factory = await _temp_database()
+    user = User(id="u1", username="alice", created_at=datetime.utcnow())
+    expires = datetime.utcnow() + timedelta(days=1)
+    try:
+        channel_b = RevocationChannel(session_factory)
+        worker_a = TokenCache(channel=RevocationChannel(session_factory), enabled=True)
+        worker_b = TokenCache(channel=channel_b, enabled=True)
+        for worker in (worker_a, worker_b):
+            worker.set("shared", user, expires)
+            worker.set("other", user, expires)
+
+        await worker_a.invalidate("shared")
+        assert worker_a.get("shared") is None
+        assert worker_b.get("shared") is not None  # Until the next poll
+
+        await channel_b.sync()
+        assert worker_b.get("shared") is None
+        assert worker_b.get("other") is not None
+        assert worker_b.stats()["invalidations"] == 1
+    finally:
+        await engine.dispose()
+
+
+def test_token_cache_endpoints():
+    asyncio.run(_run_endpoint_check())
+
+
+def test_token_cache_expiry_and_eviction():
+    asyncio.run(_run_expiry_check())
+
+
+def test_token_cache_cross_worker_invalidation():
+    asyncio.run(_run_cross_worker_check())
+
+
+if __name__ == "__main__":
+    test_token_cache_endpoints()
+    test_token_cache_expiry_and_eviction()
+    test_token_cache_cross_worker_invalidation()
+    print("\n🎉 Token cache tests passed!")
@@ -26,19 +26,22 @@ async def test_trip_loading():
         trip_id = "856ab99f-ec37-4ea2-be53-de94026fba3a"
         user_id = "869f80df-faee-4eee-b602-70360b563bcd"
 
-        trip = await trips_service.get_trip_by_id(session, trip_id, user_id)
+        trip = await trips_service.get_trip_by_id(
+            session, trip_id, user_id, with_selections=True
+        )
 
         if not trip:
             print(f"❌ Trip not found")
             return
 
         print(f"✅ Trip loaded: {trip.from_city} → {trip.to_city}")
-        print(f"   selected_flight_id: {trip.selected_flight_id}")
-        print(f"   selected_flight_airline: {trip.selected_flight_airline}")
-        print(f"   selected_flight_number: {trip.selected_flight_number}")
+        if trip.flight:
+            print(f"   flight_id: {trip.flight.flight_id}")
+            print(f"   airline: {trip.flight.airline}")
+            print(f"   flight_number: {trip.flight.flight_number}")
 
         # Try to build selected flight info
-        selected_flight = trips_service._build_selected_flight_info(trip)
+        selected_flight = trips_service._build_selected_flight_info(trip.flight)
 
         if selected_flight:
             print(f"✅ Selected flight built successfully!")
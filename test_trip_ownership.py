@@ -0,0 +1,137 @@
+"""Test the EXISTS ownership check: request memo, TTL cache and dependency."""
+
+import asyncio
+import os
+import tempfile
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.core.settings import settings
+from app.db.database import Base, get_async_session
+from app.main import app
+from app.trips.schemas import TripCreateRequest
+from app.trips.service import trips_service
+
+TRIP = {
+    "from_city": "Almaty",
+    "to_city": "Doha",
+    "start_date": "2025-05-01T00:00:00",
+    "end_date": "2025-05-08T00:00:00",
+    "transport": "flight",
+}
+
+
+async def _temp_database():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'owners.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _run_endpoint_check():
+    engine, session_factory = await _temp_database()
+    ownership_queries = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "EXISTS" in statement:
+            ownership_queries.append(statement)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    await trips_service._owners.clear()
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            owner = await client.post("/api/v1/auth/register", json={"username": "owner"})
+            other = await client.post("/api/v1/auth/register", json={"username": "other"})
+            owner_headers = {"Authorization": f"Bearer {owner.json()['access_token']}"}
+            other_headers = {"Authorization": f"Bearer {other.json()['access_token']}"}
+            trip_id = (
+                await client.post("/api/v1/trips", json=TRIP, headers=owner_headers)
+            ).json()["id"]
+
+            # First check queries, the rest are served from the TTL cache
+            for path in (
+                f"/api/v1/flights/{trip_id}/selection",
+                f"/api/v1/entertainment/{trip_id}/selections",
+                f"/api/v1/flights/{trip_id}/selection",
+                f"/api/v1/trips/{trip_id}/checklist",
+            ):
+                response = await client.get(path, headers=owner_headers)
+                assert response.status_code in (200, 404)
+                assert response.json().get("detail") != "Trip not found"
+            assert len(ownership_queries) == 1
+
+            # Someone else's trip: 404 every time, and never cached
+            for _ in range(2):
+                response = await client.get(
+                    f"/api/v1/flights/{trip_id}/selection", headers=other_headers
+                )
+                assert response.status_code == 404
+            response = await client.get(
+                f"/api/v1/entertainment/{trip_id}/selections", headers=other_headers
+            )
+            assert response.status_code == 404
+            assert len(ownership_queries) == 4
+
+            metrics = (await client.get("/api/v1/metrics")).json()["trips"]
+            assert metrics["ownership"]["cache_hits"] >= 3
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._owners.clear()
+        await trips_service._counts.clear()
+        await engine.dispose()
+
+
+async def _run_request_memo_check():
+    engine, session_factory = await _temp_database()
+    queries = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "EXISTS" in statement:
+            queries.append(statement)
+
+    saved_ttl = settings.trip_ownership_cache_ttl_seconds
+    settings.trip_ownership_cache_ttl_seconds = 0
+    try:
+        async with session_factory() as session:
+            trip = await trips_service.create_trip(session, "u1", TripCreateRequest(**TRIP))
+            for _ in range(3):
+                assert await trips_service.owns_trip(session, trip.id, "u1")
+            assert not await trips_service.owns_trip(session, trip.id, "u2")
+        assert len(queries) == 2  # One per (user, trip) in this session
+
+        # A new session (request) asks again: TTL cache is disabled
+        async with session_factory() as session:
+            assert await trips_service.owns_trip(session, trip.id, "u1")
+        assert len(queries) == 3
+    finally:
+        settings.trip_ownership_cache_ttl_seconds = saved_ttl
+        await trips_service._owners.clear()
+        await trips_service._counts.clear()
+        await engine.dispose()
+
+
+def test_ownership_dependency_and_cache():
+    asyncio.run(_run_endpoint_check())
+
+
+def test_ownership_request_memo():
+    asyncio.run(_run_request_memo_check())
+
+
+if __name__ == "__main__":
+    test_ownership_dependency_and_cache()
+    test_ownership_request_memo()
+    print("\n🎉 Trip ownership tests passed!")
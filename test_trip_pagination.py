@@ -0,0 +1,152 @@
+"""Test keyset pagination and cached totals for GET /trips."""
+
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.database import Base, get_async_session
+from app.db.models import TransportType, Trip, TripStatus
+from app.main import app
+from app.trips.service import trips_service
+
+
+async def _seed(session_factory, user_id: str) -> None:
+    """25 trips with timestamp ties, some in SQLite's CURRENT_TIMESTAMP format."""
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    async with session_factory() as session:
+        for i in range(15):
+            session.add(
+                Trip(
+                    user_id=user_id,
+                    from_city="Almaty",
+                    to_city="Doha",
+                    start_date=base,
+                    end_date=base + timedelta(days=3),
+                    transport=TransportType.FLIGHT,
+                    status=TripStatus.PLANNED if i % 3 == 0 else TripStatus.DRAFT,
+                    created_at=base + timedelta(minutes=i // 4),  # Groups of 4 share one
+                )
+            )
+        for i in range(10):
+            # Written by the server default: second resolution, no microseconds
+            await session.execute(
+                text(
+                    "INSERT INTO trips (id, user_id, from_city, to_city, start_date, "
+                    "end_date, transport, adults, children, status, ics_token, created_at) "
+                    "VALUES "
+                    "(:id, :user_id, 'Almaty', 'Doha', '2025-02-01 00:00:00', "
+                    "'2025-02-04 00:00:00', 'FLIGHT', 1, 0, 'DRAFT', :id, :created_at)"
+                ),
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "created_at": f"2025-01-02 08:00:0{i // 5}",
+                },
+            )
+        await session.commit()
+
+
+async def _run_pagination_check():
+    tmpdir = tempfile.mkdtemp()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'trips.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    count_queries = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_counts(conn, cursor, statement, parameters, context, executemany):
+        if "count(*)" in statement:
+            count_queries.append(statement)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "pager"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            await _seed(session_factory, login.json()["user_id"])
+
+            # Offset mode (compatibility) defines the expected order
+            full = (
+                await client.get("/api/v1/trips?per_page=100", headers=headers)
+            ).json()
+            expected = [trip["id"] for trip in full["trips"]]
+            assert full["total"] == 25 and len(expected) == 25
+            assert full["next_cursor"] is None
+
+            # Cursor walk: same order, no duplicates across timestamp ties
+            first = (await client.get("/api/v1/trips?per_page=4", headers=headers)).json()
+            assert first["page"] == 1
+            walked = [trip["id"] for trip in first["trips"]]
+            cursor = first["next_cursor"]
+            while cursor:
+                response = await client.get(
+                    "/api/v1/trips",
+                    params={"per_page": 4, "cursor": cursor, "include_total": "false"},
+                    headers=headers,
+                )
+                body = response.json()
+                assert body["page"] is None and body["total"] is None
+                walked.extend(trip["id"] for trip in body["trips"])
+                cursor = body["next_cursor"]
+            assert walked == expected
+
+            # Filtered walk
+            planned = (
+                await client.get("/api/v1/trips?status=planned&per_page=2", headers=headers)
+            ).json()
+            assert planned["total"] == 5
+            seen = [trip["id"] for trip in planned["trips"]]
+            cursor = planned["next_cursor"]
+            while cursor:
+                body = (
+                    await client.get(
+                        "/api/v1/trips",
+                        params={"status": "planned", "per_page": 2, "cursor": cursor},
+                        headers=headers,
+                    )
+                ).json()
+                assert all(trip["status"] == "planned" for trip in body["trips"])
+                seen.extend(trip["id"] for trip in body["trips"])
+                cursor = body["next_cursor"]
+            assert len(seen) == len(set(seen)) == 5
+
+            bad = await client.get("/api/v1/trips?cursor=garbage", headers=headers)
+            assert bad.status_code == 400
+
+            # Totals are cached until the user's trips change
+            queries_before = len(count_queries)
+            for _ in range(3):
+                await client.get("/api/v1/trips?per_page=1", headers=headers)
+            assert len(count_queries) == queries_before
+
+            await client.delete(f"/api/v1/trips/{expected[0]}", headers=headers)
+            cancelled = (
+                await client.get("/api/v1/trips?status=cancelled", headers=headers)
+            ).json()
+            assert cancelled["total"] == 1
+            assert len(count_queries) == queries_before + 1
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        await trips_service._counts.clear()
+        await engine.dispose()
+
+
+def test_trip_keyset_pagination():
+    asyncio.run(_run_pagination_check())
+
+
+if __name__ == "__main__":
+    test_trip_keyset_pagination()
+    print("\n🎉 Trip pagination tests passed!")
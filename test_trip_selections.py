@@ -0,0 +1,210 @@
+"""Test trip selections in side tables: narrow list/ownership loads, backfill."""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+import httpx
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.cache import token_cache
+from app.db.database import ALEMBIC_INI, get_async_session
+from app.main import app
+from app.trips.service import trips_service
+
+TRIP = {
+    "from_city": "Almaty",
+    "to_city": "Doha",
+    "start_date": "2025-05-01T00:00:00",
+    "end_date": "2025-05-08T00:00:00",
+    "transport": "flight",
+}
+
+FLIGHT = {
+    "flight_id": "QR-292",
+    "airline": "Qatar Airways",
+    "flight_number": "QR 292",
+    "departure_airport": "ALA",
+    "arrival_airport": "DOH",
+    "departure_time": "2025-05-01T03:00:00",
+    "arrival_time": "2025-05-01T06:00:00",
+    "price": 420.0,
+    "currency": "USD",
+    "total_duration_min": 300,
+    "stops": 0,
+    "pros_keywords": ["direct"],
+}
+
+HOTEL = {
+    "hotel_id": "h1",
+    "hotel_name": "Souq Waqif Boutique",
+    "location": "Old Doha",
+    "price_per_night": 150.0,
+    "total_price": 1050.0,
+    "check_in_date": "2025-05-01",
+    "check_out_date": "2025-05-08",
+    "amenities": ["pool"],
+    "link": "https://example.com/h1",
+}
+
+
+def _migrate(path: str, revision: str = "head") -> None:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, revision)
+
+
+async def _client_session(path: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_session
+    return engine
+
+
+async def _run_selection_check(path: str):
+    engine = await _client_session(path)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT"):
+            statements.append(statement)
+
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            login = await client.post("/api/v1/auth/register", json={"username": "picker"})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            trip = (await client.post("/api/v1/trips", json=TRIP, headers=headers)).json()
+            assert trip["selected_flight"] is None and trip["selected_entertainments"] is None
+
+            for body in (FLIGHT, {**FLIGHT, "flight_number": "QR 294"}):
+                response = await client.post(
+                    "/api/v1/flights/select",
+                    json={"trip_id": trip["id"], **body},
+                    headers=headers,
+                )
+                assert response.status_code == 200
+            response = await client.post(
+                "/api/v1/hotels/select", json={"trip_id": trip["id"], **HOTEL}, headers=headers
+            )
+            assert response.status_code == 200
+            await client.post(
+                "/api/v1/entertainment/select",
+                json={
+                    "trip_id": trip["id"],
+                    "selections": [{"venue": {"place_id": "p1", "title": "Museum"}}],
+                },
+                headers=headers,
+            )
+
+            # Full view: one query brings the trip, flight, hotel and venues
+            statements.clear()
+            full = (await client.get(f"/api/v1/trips/{trip['id']}", headers=headers)).json()
+            trip_reads = [s for s in statements if "FROM trips" in s]
+            assert len(trip_reads) == 1
+            assert "trip_flights" in trip_reads[0] and "trip_hotels" in trip_reads[0]
+            assert full["selected_flight"]["flight_number"] == "QR 294"  # Replaced
+            assert full["selected_flight"]["pros_keywords"] == ["direct"]
+            assert full["selected_hotel"]["hotel_name"] == "Souq Waqif Boutique"
+            assert full["selected_hotel"]["price_per_night"] == 150.0
+            assert full["selected_entertainments"][0]["venue"]["place_id"] == "p1"
+
+            selection = (
+                await client.get(f"/api/v1/flights/{trip['id']}/selection", headers=headers)
+            ).json()
+            assert selection["selected_flight"]["airline"] == "Qatar Airways"
+
+            # Lists and ownership checks leave the selections alone
+            statements.clear()
+            listed = (await client.get("/api/v1/trips", headers=headers)).json()
+            assert listed["trips"][0]["selected_entertainments"] is None
+            await client.get(f"/api/v1/trips/{trip['id']}/plan", headers=headers)
+            for statement in statements:
+                assert "trip_flights" not in statement and "trip_hotels" not in statement
+                assert "selected_entertainments" not in statement
+
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("SELECT count(*) FROM trip_flights").fetchone() == (1,)
+            assert conn.execute("SELECT count(*) FROM trip_hotels").fetchone() == (1,)
+        finally:
+            conn.close()
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await trips_service._counts.clear()
+        await engine.dispose()
+
+
+async def _run_backfill_check(path: str, trip_id: str, token: str):
+    engine = await _client_session(path)
+    token_cache.clear()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            full = (await client.get(f"/api/v1/trips/{trip_id}", headers=headers)).json()
+            assert full["selected_flight"]["airline"] == "flydubai"
+            assert full["selected_flight"]["price"] == 413.0
+            assert full["selected_flight"]["cons_keywords"] == ["early"]
+            assert full["selected_hotel"]["hotel_name"] == "Marina Inn"
+            assert full["selected_hotel"]["free_cancellation"] is True
+    finally:
+        app.dependency_overrides.pop(get_async_session, None)
+        token_cache.clear()
+        await engine.dispose()
+
+
+def test_selections_live_in_side_tables():
+    path = os.path.join(tempfile.mkdtemp(), "selections.db")
+    _migrate(path)
+    asyncio.run(_run_selection_check(path))
+
+
+def test_migration_backfills_selections():
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    _migrate(path, "0002")  # Selections still on the trips row
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (id, username, created_at) VALUES ('u1', 'legacy', '2025-01-01')"
+    )
+    conn.execute(
+        "INSERT INTO user_sessions (id, user_id, token, expires_at) "
+        "VALUES ('s1', 'u1', 'legacy-token', '2999-01-01 00:00:00')"
+    )
+    conn.execute(
+        "INSERT INTO trips (id, user_id, from_city, to_city, start_date, end_date, "
+        "transport, adults, children, status, ics_token, "
+        "selected_flight_id, selected_flight_airline, selected_flight_number, "
+        "selected_flight_departure_airport, selected_flight_arrival_airport, "
+        "selected_flight_departure_time, selected_flight_arrival_time, "
+        "selected_flight_price, selected_flight_cons, selected_hotel_id, "
+        "selected_hotel_name, selected_hotel_free_cancellation) VALUES "
+        "('t1', 'u1', 'Istanbul', 'Dubai', '2025-11-11', '2025-11-15', 'FLIGHT', 1, 0, "
+        "'DRAFT', 'ics', 'f1', 'flydubai', 'FZ 752', 'IST', 'DXB', "
+        "'2025-11-11 14:00:00', '2025-11-11 18:15:00', 413, '[\"early\"]', "
+        "'h1', 'Marina Inn', 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    _migrate(path)
+    asyncio.run(_run_backfill_check(path, "t1", "legacy-token"))
+
+
+if __name__ == "__main__":
+    test_selections_live_in_side_tables()
+    test_migration_backfills_selections()
+    print("\n🎉 Trip selection tests passed!")
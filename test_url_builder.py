@@ -0,0 +1,116 @@
+"""Test Skyscanner link building on the offline city resolver."""
+
+import json
+import os
+import tempfile
+
+import url_builder
+from app.core.services import services
+from app.geo import CityResolver
+
+
+def _resolver(path=None, calls=None):
+    def geocoder(city):
+        calls.append(city)
+        return {"Lusail": (25.42, 51.49)}.get(city)
+
+    return CityResolver(services.get("airport_index"), path, geocoder if calls is not None else None)
+
+
+def test_build_url_matches_previous_format():
+    cfg = url_builder.TripFilters(
+        origin_city="Doha",
+        destination_city="Krakow",
+        outbound_date="2025-12-15",
+        return_date="2025-12-30",
+        outbound_alts=False,
+        checked_bag=True,
+        prefer_directs=False,
+    )
+    assert url_builder.build_url(cfg, _resolver()) == (
+        "https://www.skyscanner.qa/transport/flights/doh/krk/251215/251230/"
+        "?rtn=1&adultsv2=1&childrenv2=0&cabinclass=economy"
+        "&outboundaltsenabled=false&preferdirects=false&fare-attributes=checked-bag"
+    )
+
+    one_way = url_builder.TripFilters("London", "New York", "20251215", adults=2)
+    assert url_builder.build_url(one_way, _resolver()) == (
+        "https://www.skyscanner.qa/transport/flights/lhr/jfk/251215/"
+        "?adultsv2=2&childrenv2=0&cabinclass=economy"
+    )
+
+
+def test_unknown_cities_are_geocoded_once_and_persisted():
+    path = os.path.join(tempfile.mkdtemp(), "cities.json")
+    calls = []
+    resolver = _resolver(path, calls)
+    cfg = url_builder.TripFilters("Lusail", "Almaty", "2025-12-15")
+
+    for _ in range(3):
+        assert "/transport/flights/doh/ala/" in url_builder.build_url(cfg, resolver)
+    assert calls == ["Lusail"]
+    with open(path) as f:
+        assert json.load(f) == {"lusail": [25.42, 51.49]}
+
+    # A new process reads the cache: no geocoding at all
+    fresh_calls = []
+    fresh = _resolver(path, fresh_calls)
+    assert "/transport/flights/doh/ala/" in url_builder.build_url(cfg, fresh)
+    assert fresh_calls == []
+
+
+def test_build_urls_batch():
+    calls = []
+    resolver = _resolver(None, calls)
+    cities = ["Doha", "London", "Tokio", "Lusail", "Nowhereville"]
+    cfgs = [
+        url_builder.TripFilters(origin, destination, "2025-12-15")
+        for origin in cities
+        for destination in cities
+        if origin != destination
+    ]
+    results = url_builder.build_urls(cfgs, resolver)
+
+    assert len(results) == len(cfgs)
+    for cfg, result in zip(cfgs, results):
+        if "Nowhereville" in (cfg.origin_city, cfg.destination_city):
+            assert result.url is None and "Nowhereville" in result.error
+        else:
+            assert result.error is None and result.url.startswith("https://")
+    assert results[0].url.startswith("https://www.skyscanner.qa/transport/flights/doh/lhr/")
+    assert calls.count("Lusail") == 1
+
+
+def test_geocoder_failures_stay_per_trip():
+    def geocoder(city):
+        raise TimeoutError("geocoder timed out")
+
+    resolver = CityResolver(services.get("airport_index"), None, geocoder)
+    results = url_builder.build_urls(
+        [
+            url_builder.TripFilters("Doha", "London", "2025-12-15"),
+            url_builder.TripFilters("Doha", "Lusail", "2025-12-15"),
+        ],
+        resolver,
+    )
+    assert results[0].url.startswith("https://www.skyscanner.qa/transport/flights/doh/lhr/")
+    assert results[1].url is None and "Lusail" in results[1].error
+    assert "timed out" in results[1].error
+
+
+def test_use_mac_resolves_one_airport_per_city():
+    resolver = _resolver()
+    plain = url_builder.TripFilters("London", "Doha", "2025-12-15")
+    mac = url_builder.TripFilters("London", "Doha", "2025-12-15", use_mac=True)
+    assert url_builder.build_url(mac, resolver) == url_builder.build_url(plain, resolver)
+    # One memoized lookup per city, shared by both flavours
+    assert resolver.airports.cache_info().misses == 2
+
+
+if __name__ == "__main__":
+    test_build_url_matches_previous_format()
+    test_unknown_cities_are_geocoded_once_and_persisted()
+    test_build_urls_batch()
+    test_geocoder_failures_stay_per_trip()
+    test_use_mac_resolves_one_airport_per_city()
+    print("\n🎉 URL builder tests passed!")